@@ -1,11 +1,5 @@
 import os
 import pytz
-from pathlib import Path
-from flask import Flask, send_from_directory, send_file
-from .core import PyAutomation
-from .state_machine import OPCUAServer
-
-app = Flask(__name__, instance_relative_config=False)
 
 MANUFACTURER = os.environ.get('AUTOMATION_MANUFACTURER')
 SEGMENT = os.environ.get('AUTOMATION_SEGMENT')
@@ -22,109 +16,51 @@ AUTOMATION_OPCUA_SERVER_PORT = os.environ.get('AUTOMATION_OPCUA_SERVER_PORT') or
 AUTOMATION_LOGGER_PERIOD = os.environ.get('AUTOMATION_LOGGER_PERIOD') or 10.0
 AUTOMATION_APP_SECRET_KEY = os.environ.get('AUTOMATION_APP_SECRET_KEY') or "073821603fcc483f9afee3f1500782a4"
 AUTOMATION_SUPERUSER_PASSWORD = os.environ.get('AUTOMATION_SUPERUSER_PASSWORD') or "super_ultra_secret_password"
+# Retención del histórico en días por tabla (0 = sin límite) y tamaño máximo de la base SQLite en MB (0 = sin límite)
+AUTOMATION_RETENTION_DAYS = {
+    "TagValue": float(os.environ.get('AUTOMATION_TAGVALUE_RETENTION_DAYS') or 0),
+    "AlarmSummary": float(os.environ.get('AUTOMATION_ALARMSUMMARY_RETENTION_DAYS') or 0),
+    "Events": float(os.environ.get('AUTOMATION_EVENTS_RETENTION_DAYS') or 0),
+    "Logs": float(os.environ.get('AUTOMATION_LOGS_RETENTION_DAYS') or 0),
+    # Rollups: el de 1 minuto crece con cada tag (1440 filas/día), los más gruesos se conservan más
+    "TagRollupMinute": float(os.environ.get('AUTOMATION_TAGROLLUPMINUTE_RETENTION_DAYS') or 90),
+    "TagRollupHour": float(os.environ.get('AUTOMATION_TAGROLLUPHOUR_RETENTION_DAYS') or 730),
+    "TagRollupDay": float(os.environ.get('AUTOMATION_TAGROLLUPDAY_RETENTION_DAYS') or 0)
+}
+AUTOMATION_SQLITE_MAX_SIZE_MB = float(os.environ.get('AUTOMATION_SQLITE_MAX_SIZE_MB') or 1024)
+AUTOMATION_RETENTION_PERIOD = float(os.environ.get('AUTOMATION_RETENTION_PERIOD') or 3600)
+# Días tras los cuales el histórico de tags pasa al archivo comprimido (0 = deshabilitado)
+AUTOMATION_ARCHIVE_AFTER_DAYS = float(os.environ.get('AUTOMATION_ARCHIVE_AFTER_DAYS') or 0)
+
+# Subsistemas pesados (Flask, API, base de datos, OPC UA) se cargan en el primer acceso,
+# así `import automation.tags` o `automation.variables` no los importan
+_LAZY_ATTRIBUTES = {
+    "PyAutomation": ".core",
+    "OPCUAServer": ".state_machine",
+    "app": ".application",
+    "server": ".application",
+    "opcua_server": ".application",
+    "CreateApp": ".application",
+    "HMI_DIST_PATH": ".application"
+}
+
 
-# Ruta del frontend React construido
-# Buscar en múltiples ubicaciones: primero en el paquete instalado, luego en desarrollo local
-def _find_hmi_dist_path():
-    """Busca el directorio HMI dist en múltiples ubicaciones."""
-    # 1. Intentar usando importlib.resources (Python 3.9+, preferido sobre pkg_resources)
-    try:
-        import importlib.resources
-        try:
-            # Intentar acceder al directorio hmi como recurso
-            hmi_files = importlib.resources.files('automation') / 'hmi'
-            if hmi_files.is_dir() and (hmi_files / 'index.html').exists():
-                # Para obtener la ruta del sistema de archivos
-                with importlib.resources.as_file(hmi_files) as hmi_path:
-                    if hmi_path.exists() and (hmi_path / 'index.html').exists():
-                        return str(hmi_path)
-        except (ModuleNotFoundError, FileNotFoundError, AttributeError, TypeError):
-            pass
-    except ImportError:
-        pass
-    
-    # 3. Intentar en la ubicación relativa al archivo actual (paquete instalado)
-    current_file = Path(__file__).parent
-    package_hmi_path = current_file / "hmi"
-    if package_hmi_path.exists() and (package_hmi_path / "index.html").exists():
-        return str(package_hmi_path)
-    
-    # 4. Intentar en la ubicación local (desarrollo)
-    local_path = os.path.join(".", "hmi", "dist")
-    if os.path.exists(local_path) and os.path.exists(os.path.join(local_path, "index.html")):
-        return local_path
-    
-    return None
+def __getattr__(name:str):
+    r"""
+    Imports the subsystem that defines `name` on first access (PEP 562).
+    """
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
 
-HMI_DIST_PATH = _find_hmi_dist_path()
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
 
-class CreateApp():
-    """Initialize the core application."""
+    return value
 
-    def __call__(self):
-        """
-        Documentation here
-        """
-        app.client = None
-        self.application = app
-        
-        with app.app_context():
 
-            from . import extensions
-            extensions.init_app(app)
+def __dir__():
 
-            from . import modules
-            modules.init_app(app)
-            
-            # Configurar rutas para servir el frontend React
-            self._setup_frontend_routes(app)
-            
-            return app
-    
-    def _setup_frontend_routes(self, app):
-        """
-        Configura las rutas para servir el frontend React construido en /hmi.
-        Sirve archivos estáticos y redirige todas las rutas bajo /hmi al index.html (SPA routing).
-        Estas rutas se registran con baja prioridad para no interferir con Dash y la API.
-        """
-        # Verificar si existe el directorio del frontend construido
-        if not HMI_DIST_PATH or not os.path.exists(HMI_DIST_PATH):
-            return  # Si no existe, no configuramos las rutas (modo desarrollo o sin frontend)
-        
-        # Servir archivos estáticos del frontend (JS, CSS, assets, etc.) bajo /hmi
-        @app.route('/hmi/assets/<path:filename>')
-        def serve_frontend_assets(filename):
-            """Sirve archivos estáticos del frontend (JS, CSS, imágenes, etc.)"""
-            assets_dir = os.path.join(HMI_DIST_PATH, 'assets')
-            if os.path.exists(assets_dir):
-                return send_from_directory(assets_dir, filename)
-            return None
-        
-        # Ruta catch-all para SPA bajo /hmi: todas las rutas /hmi/* sirven el index.html
-        @app.route('/hmi/', defaults={'path': ''})
-        @app.route('/hmi/<path:path>')
-        def serve_frontend_hmi(path):
-            """
-            Sirve el frontend React bajo /hmi.
-            Para rutas que no sean archivos estáticos, sirve index.html (SPA routing).
-            """
-            # Intentar servir el archivo estático si existe
-            if path:
-                file_path = os.path.join(HMI_DIST_PATH, path)
-                if os.path.exists(file_path) and os.path.isfile(file_path):
-                    return send_from_directory(HMI_DIST_PATH, path)
-            
-            # Para todas las demás rutas bajo /hmi, servir index.html (SPA routing)
-            index_path = os.path.join(HMI_DIST_PATH, 'index.html')
-            if os.path.exists(index_path):
-                return send_file(index_path)
-            
-            return None
-        
-__application = CreateApp()
-server = __application()    
-server.config['AUTOMATION_APP_SECRET_KEY'] = AUTOMATION_APP_SECRET_KEY
-server.config['AUTOMATION_SUPERUSER_PASSWORD'] = AUTOMATION_SUPERUSER_PASSWORD
-server.config['BUNDLE_ERRORS'] = True
-opcua_server = OPCUAServer()
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
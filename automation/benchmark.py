@@ -0,0 +1,468 @@
+r"""
+Benchmark suite of the acquisition-to-history pipeline.
+
+Runs offline, in a single process, against a local OPC UA server stand-in (`opcua.Server` on
+127.0.0.1 with `--tags` variables updated at `--rate` Hz) and a temporary SQLite database:
+
+* **opcua**: notifications received and processed by `DAS` per second and notification lag.
+* **cvt**: `CVTEngine.set_value` throughput (lock, filters, IAD, snapshot).
+* **alarms**: `CVTEngine.set_value` throughput of tags with a HIGH alarm, with values crossing
+  the setpoint on every update (one evaluation and one state transition per update).
+* **socketio**: cost of `Tag.serialize` and `SocketIO.emit` of the `on.tag` event.
+* **history**: `DataLogger.write_tags` rows per second on SQLite (partitions and rollups).
+* **queries**: `read_trends` and `read_tabular_data` latency over the generated history.
+
+The report is a JSON document; `--compare` checks it against a previous report and exits with
+status 1 when a metric regresses more than `--tolerance` (metrics ending in `_per_sec` must not
+drop, metrics ending in `_ms` or `_us` must not grow).
+
+**Usage:**
+
+```
+python -m automation.benchmark
+python -m automation.benchmark --tags 500 --rate 5 --duration 10 --output report.json
+python -m automation.benchmark --sections cvt alarms --compare report.json --tolerance 0.2
+```
+"""
+import argparse, json, os, platform, random, socket, sqlite3, subprocess, sys, tempfile, threading, time
+from datetime import datetime, timedelta
+import numpy as np
+
+SECTIONS = ("opcua", "cvt", "alarms", "socketio", "history", "queries")
+HIGHER_IS_BETTER = ("_per_sec",)
+LOWER_IS_BETTER = ("_ms", "_us")
+
+
+def best_of(func, repeat:int)->float:
+    r"""
+    Runs `func` `repeat` times and returns the best time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+
+    return best
+
+
+def define_tags(prefix:str, tags:int, url:str="", namespaces:list=None)->list:
+    r"""
+    Creates `tags` float tags in the CVT (`{prefix}-0001`...) and returns them.
+    """
+    from .tags import CVTEngine
+    cvt = CVTEngine()
+    cvt.set_tags([
+        {
+            "name": f"{prefix}-{index:04d}",
+            "unit": "Pa",
+            "data_type": "float",
+            "description": "",
+            "variable": "Pressure",
+            "opcua_address": url if namespaces else "",
+            "node_namespace": namespaces[index] if namespaces else ""
+        } for index in range(tags)
+    ])
+
+    return [cvt.get_tag_by_name(name=f"{prefix}-{index:04d}") for index in range(tags)]
+
+
+def bench_opcua(tags:int, rate:float, duration:float)->dict:
+    r"""
+    Updates `tags` server variables at `rate` Hz during `duration` seconds and measures the
+    notifications processed by DAS.
+    """
+    from opcua import Server
+    from .opcua.models import Client
+    from .opcua.subscription import DAS
+
+    with socket.socket() as sock:
+
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    url = f"opc.tcp://127.0.0.1:{port}/benchmark/"
+    server = Server()
+    server.set_endpoint(url)
+    idx = server.register_namespace("urn:pyautomation:benchmark")
+    folder = server.get_objects_node().add_object(idx, "Benchmark")
+    nodes = [folder.add_variable(idx, f"BENCH-OPCUA-{index:04d}", 0.0) for index in range(tags)]
+    server.start()
+    client = Client(url, client_name="benchmark")
+    try:
+        client.connect()
+        define_tags("BENCH-OPCUA", tags, url=url, namespaces=[node.nodeid.to_string() for node in nodes])
+        subscription = client.create_subscription(max(10, int(1000 / rate / 2)), DAS())
+        DAS().subscribe_many(subscription=subscription, client=client, client_name="benchmark", nodes=[client.get_node(node.nodeid) for node in nodes])
+        health = client.health
+        # Los valores iniciales de la suscripción no se cuentan
+        time.sleep(0.5)
+        received = health.notifications
+        health.notification_lag.__init__()
+
+        sent = 0
+        period = 1.0 / rate
+        started = time.perf_counter()
+        tick = 0
+        while time.perf_counter() - started < duration:
+
+            tick += 1
+            for node in nodes:
+
+                node.set_value(float(tick))
+
+            sent += tags
+            delay = started + tick * period - time.perf_counter()
+            if delay > 0:
+
+                time.sleep(delay)
+
+        elapsed = time.perf_counter() - started
+        # Espera a que se procesen las notificaciones pendientes
+        previous = -1
+        while health.notifications != previous:
+
+            previous = health.notifications
+            time.sleep(0.3)
+
+        received = health.notifications - received
+        lag = health.notification_lag.summary()
+
+    finally:
+        client.disconnect()
+        server.stop()
+
+    return {
+        "sent": sent,
+        "received": received,
+        "send_updates_per_sec": round(sent / elapsed),
+        "received_notifications_per_sec": round(received / elapsed),
+        "notification_lag_p50_ms": lag["p50_ms"],
+        "notification_lag_p95_ms": lag["p95_ms"]
+    }
+
+
+def bench_cvt(tags:int, updates:int, repeat:int, prefix:str="BENCH-CVT")->dict:
+    r"""
+    Measures `CVTEngine.set_value` throughput over `tags` tags.
+    """
+    from .tags import CVTEngine
+    cvt = CVTEngine()
+    ids = [tag.id for tag in define_tags(prefix, tags)]
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 20, updates).tolist()
+    timestamp = datetime.now()
+
+    def update():
+
+        for index, value in enumerate(values):
+
+            cvt.set_value(id=ids[index % tags], value=value, timestamp=timestamp)
+
+    seconds = best_of(update, repeat)
+
+    return {"updates": updates, "updates_per_sec": round(updates / seconds), "update_us": round(seconds / updates * 1e6, 2)}
+
+
+def bench_alarms(tags:int, updates:int, repeat:int)->dict:
+    r"""
+    Measures `CVTEngine.set_value` throughput of tags with a HIGH alarm (setpoint 50) and values
+    alternating between 40 and 60.
+    """
+    from .alarms import Alarm
+    from .models import StringType, FloatType
+    from .tags import CVTEngine
+    cvt = CVTEngine()
+    _tags = define_tags("BENCH-ALARM", tags)
+    alarms = [
+        Alarm(name=f"BENCH-ALARM-{index:04d}.HI", tag=tag, alarm_type=StringType("HIGH"), alarm_setpoint=FloatType(50.0))
+        for index, tag in enumerate(_tags)
+    ]
+    ids = [tag.id for tag in _tags]
+    timestamp = datetime.now()
+
+    def update():
+
+        for index in range(updates):
+
+            cvt.set_value(id=ids[index % tags], value=40.0 if (index // tags) % 2 else 60.0, timestamp=timestamp)
+
+    seconds = best_of(update, repeat)
+    states = sorted({alarm.state.state for alarm in alarms})
+
+    return {"updates": updates, "evaluations_per_sec": round(updates / seconds), "evaluation_us": round(seconds / updates * 1e6, 2), "states": states}
+
+
+def bench_socketio(tags:int, updates:int, repeat:int)->dict:
+    r"""
+    Measures the serialization and the emit (without connected clients) of the `on.tag` event.
+    """
+    from flask import Flask
+    from flask_socketio import SocketIO
+    from .tags import CVTEngine
+    sio = SocketIO(Flask(__name__), async_mode="threading")
+    _tags = [CVTEngine().get_tag_by_name(name=f"BENCH-CVT-{index:04d}") for index in range(tags)]
+    if not all(_tags):
+
+        _tags = define_tags("BENCH-CVT", tags)
+
+    payloads = list()
+    serialize = best_of(lambda: payloads.__setitem__(slice(None), [_tags[index % tags].serialize() for index in range(updates)]), repeat)
+    emit = best_of(lambda: [sio.emit("on.tag", data=payload) for payload in payloads], repeat)
+
+    return {
+        "updates": updates,
+        "serialize_us": round(serialize / updates * 1e6, 2),
+        "emit_us": round(emit / updates * 1e6, 2),
+        "payload_bytes": len(json.dumps(payloads[0], default=str))
+    }
+
+
+def bench_history(tags:int, rows:int, repeat:int, folder:str, batch:int=1000)->tuple:
+    r"""
+    Writes `rows` samples of `tags` tags (one day of history) with `DataLogger.write_tags` on a
+    SQLite file (three days of history) and measures the trend and tabular queries over it.
+
+    **Returns:**
+
+    * **tuple**: (history report, queries report)
+    """
+    from peewee import SqliteDatabase
+    from .dbmodels import Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor
+    from .logger.datalogger import DataLogger, DATETIME_FORMAT
+
+    models = [Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor]
+    db = SqliteDatabase(os.path.join(folder, "history.db"), pragmas={"journal_mode": "wal", "synchronous": 1})
+    logger = DataLogger()
+    previous = (logger._db, logger.is_history_logged)
+    try:
+        with db.bind_ctx(models):
+
+            db.create_tables(models)
+            Variables.insert(name="Pressure").execute()
+            Units.insert(name="Pascal", unit="Pa", variable_id=1).execute()
+            DataTypes.insert(name="float").execute()
+            names = [f"BENCH-HIST-{index:04d}" for index in range(tags)]
+            Tags.insert_many([
+                {"identifier": name, "name": name, "unit": 1, "data_type": 1, "display_name": name, "display_unit": 1}
+                for name in names
+            ]).execute()
+            logger.set_db(db)
+            logger.set_is_history_logged(True)
+
+            # Tres días de historia, todos los tags muestreados al mismo período (recientes, dentro
+            # de la retención de los rollups)
+            samples = max(1, rows // tags)
+            period = 3 * 86400 / samples
+            stop = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            start = stop - timedelta(days=3)
+            rng = random.Random(0)
+            data = [
+                {"tag": name, "value": round(rng.gauss(50, 10), 3), "timestamp": start + timedelta(seconds=sample * period)}
+                for sample in range(samples) for name in names
+            ]
+            started = time.perf_counter()
+            for offset in range(0, len(data), batch):
+
+                logger.write_tags(tags=data[offset:offset + batch])
+
+            seconds = time.perf_counter() - started
+            # En modo WAL las escrituras recientes están en history.db-wal: se vuelcan antes de medir
+            db.execute_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            files = [os.path.join(folder, name) for name in ("history.db", "history.db-wal")]
+            history = {
+                "rows": len(data),
+                "batch": batch,
+                "rows_per_sec": round(len(data) / seconds),
+                "db_bytes": sum(os.path.getsize(file) for file in files if os.path.exists(file))
+            }
+
+            # Las tendencias de más de ~1.4 días se leen de los rollups (las consultas crudas de
+            # read_trends usan funciones de PostgreSQL); la tabla se lee también sobre 30 minutos
+            selected = names[:min(5, tags)]
+            window = (start.strftime(DATETIME_FORMAT), stop.strftime(DATETIME_FORMAT))
+            recent = ((stop - timedelta(minutes=30)).strftime(DATETIME_FORMAT), stop.strftime(DATETIME_FORMAT))
+            queries = {
+                "tags": len(selected),
+                "trend_ms": round(best_of(lambda: logger.read_trends(*window, "UTC", selected), repeat) * 1000, 2),
+                "tabular_first_page_ms": round(best_of(lambda: logger.read_tabular_data(*window, "UTC", selected, 60, 1, 100), repeat) * 1000, 2),
+                "tabular_last_page_ms": round(best_of(lambda: logger.read_tabular_data(*window, "UTC", selected, 60, 43, 100), repeat) * 1000, 2),
+                "tabular_recent_ms": round(best_of(lambda: logger.read_tabular_data(*recent, "UTC", selected, 1, 1, 100), repeat) * 1000, 2)
+            }
+
+    finally:
+        logger.set_db(previous[0])
+        logger.set_is_history_logged(previous[1])
+        db.close()
+
+    return history, queries
+
+
+def environment()->dict:
+    r"""
+    Returns the commit, interpreter and platform of the run.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def run(tags:int=200, rate:float=10.0, duration:float=5.0, updates:int=20000, rows:int=20000, repeat:int=3, sections:tuple=SECTIONS)->dict:
+    r"""
+    Runs the benchmark.
+
+    **Parameters:**
+
+    * **tags** (int): Tags of every section.
+    * **rate** (float): Update rate of the OPC UA variables (Hz).
+    * **duration** (float): Seconds of OPC UA updates.
+    * **updates** (int): Updates of the CVT, alarms and Socket.IO sections.
+    * **rows** (int): History rows written.
+    * **repeat** (int): Repetitions of the timed sections (best time is reported).
+    * **sections** (tuple): Sections to run.
+
+    **Returns:**
+
+    * **dict**: {environment, parameters, results: {section: metrics}}
+    """
+    from .core import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+    report = {
+        "environment": environment(),
+        "parameters": {"tags": tags, "rate": rate, "duration": duration, "updates": updates, "rows": rows, "repeat": repeat},
+        "results": dict()
+    }
+    results = report["results"]
+    if "opcua" in sections:
+
+        results["opcua"] = bench_opcua(tags, rate, duration)
+
+    if "cvt" in sections:
+
+        results["cvt"] = bench_cvt(tags, updates, repeat)
+
+    if "alarms" in sections:
+
+        results["alarms"] = bench_alarms(tags, updates, repeat)
+
+    if "socketio" in sections:
+
+        results["socketio"] = bench_socketio(tags, updates, repeat)
+
+    if "history" in sections or "queries" in sections:
+
+        with tempfile.TemporaryDirectory() as folder:
+
+            history, queries = bench_history(tags, rows, repeat, folder)
+
+        if "history" in sections:
+
+            results["history"] = history
+
+        if "queries" in sections:
+
+            results["queries"] = queries
+
+    return report
+
+
+def compare(report:dict, baseline:dict, tolerance:float=0.2)->list:
+    r"""
+    Compares the metrics of two reports.
+
+    **Parameters:**
+
+    * **report** (dict): Current report.
+    * **baseline** (dict): Previous report.
+    * **tolerance** (float): Allowed relative change in the bad direction.
+
+    **Returns:**
+
+    * **list**: Regressions [{metric, baseline, current, change}].
+
+    Usage:
+
+    ```python
+    >>> from automation.benchmark import compare
+    >>> baseline = {"results": {"cvt": {"updates_per_sec": 1000, "update_us": 10.0}}}
+    >>> report = {"results": {"cvt": {"updates_per_sec": 700, "update_us": 11.0}}}
+    >>> compare(report, baseline, tolerance=0.2)
+    [{'metric': 'cvt.updates_per_sec', 'baseline': 1000, 'current': 700, 'change': -0.3}]
+
+    ```
+    """
+    regressions = list()
+    for section, metrics in report.get("results", dict()).items():
+
+        previous = baseline.get("results", dict()).get(section, dict())
+        for name, value in metrics.items():
+
+            before = previous.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+
+                continue
+
+            change = (value - before) / before
+            if (name.endswith(HIGHER_IS_BETTER) and change < -tolerance) or (name.endswith(LOWER_IS_BETTER) and change > tolerance):
+
+                regressions.append({"metric": f"{section}.{name}", "baseline": before, "current": value, "change": round(change, 3)})
+
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Acquisition-to-history pipeline benchmark")
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=10.0, help="OPC UA update rate (Hz)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of OPC UA updates")
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--output", help="Writes the report to this file")
+    parser.add_argument("--compare", help="Previous report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    report = run(
+        tags=args.tags,
+        rate=args.rate,
+        duration=args.duration,
+        updates=args.updates,
+        rows=args.rows,
+        repeat=args.repeat,
+        sections=tuple(args.sections)
+    )
+    if args.compare:
+
+        with open(args.compare) as file:
+
+            report["regressions"] = compare(report, json.load(file), tolerance=args.tolerance)
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+
+        with open(args.output, "w") as file:
+
+            file.write(text)
+
+    print(text)
+    if report.get("regressions"):
+
+        sys.exit(1)
@@ -17,6 +17,10 @@ class Buffer(list):
     ```
     """
 
+    # Sin __dict__ por instancia: cada tag tiene dos buffers
+    __slots__ = ("_size", "roll_type")
+    _roll_type_allowed = ('forward', 'backward')
+
     def __init__(self, size:int=10, roll:str='forward'):
         r"""
         Initializes the Buffer.
@@ -28,7 +32,6 @@ class Buffer(list):
             * `'forward'`: Inserts at index 0 (LIFO-like display).
             * `'backward'`: Appends to end (FIFO-like).
         """
-        self._roll_type_allowed = ['forward', 'backward']
         self._size = size
         self.roll = roll
 
@@ -1,4 +1,4 @@
-import sys, logging, json, os, jwt, requests, urllib3, secrets
+import sys, logging, json, os, jwt, requests, urllib3, secrets, time
 import builtins as _builtins
 from logging.handlers import RotatingFileHandler
 from math import ceil
@@ -8,13 +8,14 @@ from peewee import SqliteDatabase, MySQLDatabase, PostgresqlDatabase
 from peewee import OperationalError, DatabaseError, InterfaceError
 # from peewee_migrations import Router
 from .dbmodels.users import Roles, Users
-from .dbmodels.machines import Machines
+from .dbmodels.machines import Machines, TagsMachines
 # PYAUTOMATION MODULES IMPORTATION
 from .singleton import Singleton
-from .workers import LoggerWorker
+from .workers import LoggerWorker, ReconnectionSupervisor, StalenessMonitor
+from .workers.reconnection import client_namespaces
 from .managers import DBManager, OPCUAClientManager, AlarmManager
 from .opcua.models import Client
-from .tags import CVTEngine, Tag
+from .tags import CVTEngine, Tag, TagSnapshot, TagSnapshotReader
 from .logger.datalogger import DataLoggerEngine
 from .logger.events import EventsLoggerEngine
 from .logger.alarms import AlarmsLoggerEngine
@@ -28,6 +29,7 @@ from .buffer import Buffer
 from .models import StringType, FloatType
 from .modules.users.users import users, User
 from .modules.users.roles import roles, Role
+from .modules.users.token_cache import token_cache
 from .dbmodels.core import BaseModel
 from .utils.decorators import validate_types, logging_error_handler
 from .utils import _colorize_message
@@ -107,6 +109,7 @@ class PyAutomation(Singleton):
         self.alarm_manager = AlarmManager()
         self.workers = list()
         self.das = DAS()
+        self._startup_report = dict()
         self.sio = None
         self.server = None
         folder_path = os.path.join(".", "logs")
@@ -899,7 +902,7 @@ class PyAutomation(Singleton):
         return self.logger_engine.read_trends(start, stop, timezone, *tags)
     
     @logging_error_handler
-    def get_tags_tables(self, start:str, stop:str, timezone:str, tags:list, page:int=1, limit:int=20):
+    def get_tags_tables(self, start:str, stop:str, timezone:str, tags:list, page:int=1, limit:int=20, cursor:str=None):
         r"""
         Retrieves historical data in a paginated table format.
 
@@ -911,12 +914,13 @@ class PyAutomation(Singleton):
         * **tags** (list): List of tag names.
         * **page** (int): Page number for pagination.
         * **limit** (int): Number of records per page.
+        * **cursor** (str, optional): Keyset pagination cursor (`next_cursor` of the previous page, "" for the first page).
 
         **Returns:**
 
         * **dict**: Paginated historical data.
         """
-        return self.logger_engine.read_table(start, stop, timezone, tags, page, limit)
+        return self.logger_engine.read_table(start, stop, timezone, tags, page, limit, cursor)
     
     @logging_error_handler
     def get_tabular_data(self, start:str, stop:str, timezone:str, tags:list, sample_time:int, page:int=1, limit:int=20):
@@ -938,7 +942,173 @@ class PyAutomation(Singleton):
         * **dict**: Resampled tabular data.
         """
         return self.logger_engine.read_tabular_data(start, stop, timezone, tags, sample_time, page, limit)
-    
+
+    @logging_error_handler
+    def set_history_compression(self, tag:str, deviation:float=None, max_time:float=None)->tuple[dict|None, str]:
+        r"""
+        Sets the history compression (swinging door) of a tag, independent of its CVT dead band.
+
+        Only the samples needed to rebuild the trend within `deviation` by linear interpolation are
+        logged, plus one sample every `max_time` seconds.
+
+        **Parameters:**
+
+        * **tag** (str): Tag name.
+        * **deviation** (float, optional): Compression deviation in display units. None uses
+          `AUTOMATION_HISTORY_DEVIATION`; 0 logs every update.
+        * **max_time** (float, optional): Maximum seconds between logged samples. None uses `AUTOMATION_HISTORY_MAX_TIME`.
+
+        **Returns:**
+
+        * **tuple**: ({tag, deviation, max_time}, message) or (None, message) if the tag does not exist.
+        """
+        if not self.cvt.get_tag_by_name(name=tag):
+
+            return None, f"Tag {tag} not found"
+
+        if self.is_db_connected():
+
+            self.logger_engine.set_history_compression(tag=tag, deviation=deviation, max_time=max_time)
+
+        if hasattr(self, 'db_worker'):
+
+            self.db_worker.compressor.configure(tag, deviation=deviation, max_time=max_time)
+            deviation, max_time = self.db_worker.compressor.settings(tag)
+
+        return {"tag": tag, "deviation": deviation, "max_time": max_time}, f"History compression of {tag} updated"
+
+    @logging_error_handler
+    def scan_iad(
+        self, 
+        tag:str, 
+        start:str, 
+        stop:str, 
+        timezone:str, 
+        algorithms:list=None, 
+        low:float=None, 
+        high:float=None, 
+        chunk_size:int=100000
+        )->dict:
+        r"""
+        Runs Instrument Anomaly Detection (frozen data, outlier, out of range) over a tag's history.
+
+        History is streamed from the datalogger in chunks and evaluated with NumPy (rolling windows
+        for frozen data, the EWMA of the online outlier detector for outliers), without replaying it
+        through the CVT.
+
+        **Parameters:**
+
+        * **tag** (str): Tag name.
+        * **start** (str): Start datetime string ('%Y-%m-%d %H:%M:%S.%f').
+        * **stop** (str): Stop datetime string ('%Y-%m-%d %H:%M:%S.%f').
+        * **timezone** (str): Timezone of start/stop and of the returned intervals.
+        * **algorithms** (list, optional): Any of 'frozen_data', 'outlier', 'out_of_range'. All by default.
+        * **low** (float, optional): Lower instrument range for out of range detection.
+        * **high** (float, optional): Upper instrument range for out of range detection.
+        * **chunk_size** (int): Rows read from the database per chunk.
+
+        **Returns:**
+
+        * **dict**: {tag, samples, anomalies: {algorithm: [{start, stop, samples}]}}
+        """
+        import pytz
+        from .iad.batch import scan, ALGORITHMS
+        _timezone = pytz.timezone(timezone)
+        datetime_format = "%Y-%m-%d %H:%M:%S.%f"
+        start_ts = _timezone.localize(datetime.strptime(start, datetime_format)).timestamp()
+        stop_ts = _timezone.localize(datetime.strptime(stop, datetime_format)).timestamp()
+
+        def chunks():
+
+            after = None
+            while True:
+
+                chunk = self.logger_engine.read_values(tag=tag, start=start_ts, stop=stop_ts, after=after, limit=chunk_size)
+                if not chunk:
+
+                    return
+
+                yield chunk["timestamps"], chunk["values"]
+                after = chunk["last"]
+                if after is None:
+
+                    return
+
+        result = scan(chunks(), algorithms=algorithms or ALGORITHMS, low=low, high=high)
+        for intervals in result["anomalies"].values():
+
+            for interval in intervals:
+
+                interval["start"] = datetime.fromtimestamp(interval["start"], _timezone).strftime(datetime_format)
+                interval["stop"] = datetime.fromtimestamp(interval["stop"], _timezone).strftime(datetime_format)
+
+        result["tag"] = tag
+
+        return result
+
+    @logging_error_handler
+    def export_history(
+        self,
+        start:str,
+        stop:str,
+        timezone:str,
+        tags:list,
+        sample_time:int=None,
+        format:str="csv",
+        chunk_size:int=10000
+        ):
+        r"""
+        Streams the history of some tags as CSV or Parquet, chunk by chunk with constant memory.
+
+        History is read with the keyset cursor of the datalogger (live table and archive); the
+        engine lock is only held while each chunk is read.
+
+        **Parameters:**
+
+        * **start** (str): Start datetime string ('%Y-%m-%d %H:%M:%S.%f').
+        * **stop** (str): Stop datetime string ('%Y-%m-%d %H:%M:%S.%f'), limited to now.
+        * **timezone** (str): Timezone of start/stop and of the exported timestamps.
+        * **tags** (list): List of tag names.
+        * **sample_time** (int, optional): Resampling interval in seconds (forward fill, one column
+          per tag). None exports the raw samples (timestamp, tag, value).
+        * **format** (str): 'csv' or 'parquet' (needs `pyarrow`).
+        * **chunk_size** (int): Rows read from the database per chunk.
+
+        **Returns:**
+
+        * **generator**: str (CSV) or bytes (Parquet) chunks.
+        """
+        import pytz
+        from .logger.export import raw_chunks, resampled_chunks, to_csv, to_parquet, FORMATS
+        if format not in FORMATS:
+
+            raise ValueError(f"Invalid format {format}. Available formats: {list(FORMATS)}")
+
+        _timezone = pytz.timezone(timezone)
+        datetime_format = "%Y-%m-%d %H:%M:%S.%f"
+        start_ts = _timezone.localize(datetime.strptime(start, datetime_format)).timestamp()
+        stop_ts = min(_timezone.localize(datetime.strptime(stop, datetime_format)).timestamp(), time.time())
+
+        if sample_time:
+
+            names = ["timestamp"] + list(tags)
+            strings = ()
+            chunks = resampled_chunks(
+                self.logger_engine.read_values, self.logger_engine.read_last_value, tags, start_ts, stop_ts, sample_time, chunk_size=chunk_size
+            )
+
+        else:
+
+            names = ["timestamp", "tag", "value"]
+            strings = (0,)
+            chunks = raw_chunks(self.logger_engine.read_values, tags, start_ts, stop_ts, chunk_size=chunk_size)
+
+        if format == "parquet":
+
+            return to_parquet(chunks, names, timezone, strings=strings)
+
+        return to_csv(chunks, names, _timezone)
+
     @logging_error_handler
     def get_segments(self):
         r"""
@@ -950,6 +1120,123 @@ class PyAutomation(Singleton):
         """
         return self.logger_engine.read_segments()
 
+    @logging_error_handler
+    def enable_tag_snapshot(self, path:str=None, capacity:int=None)->TagSnapshot:
+        r"""
+        Publishes the Current Value Table into a shared-memory (mmap) snapshot file.
+
+        Other processes (e.g. API workers spawned by gunicorn) can read current values,
+        quality and timestamps with `read_tag_snapshot` without IPC round-trips.
+
+        **Parameters:**
+
+        * **path** (str, optional): Snapshot file. Defaults to `AUTOMATION_TAG_SNAPSHOT_PATH` or `./db/cvt.snapshot`.
+        * **capacity** (int, optional): Maximum number of tags. Defaults to `AUTOMATION_TAG_SNAPSHOT_CAPACITY`, or twice
+          the tags in the CVT (at least 16384).
+
+        **Returns:**
+
+        * **TagSnapshot**: Snapshot writer.
+        """
+        if not path:
+
+            path = os.environ.get("AUTOMATION_TAG_SNAPSHOT_PATH", os.path.join(".", "db", "cvt.snapshot"))
+
+        if not capacity:
+
+            # El archivo tiene tamaño fijo (96 bytes por tag): holgura para los tags que se creen después
+            capacity = int(os.environ.get("AUTOMATION_TAG_SNAPSHOT_CAPACITY") or max(16384, 2 * len(self.cvt.get_tags() or list())))
+
+        self.disable_tag_snapshot()
+        self.tag_snapshot = TagSnapshot(path=path, capacity=capacity)
+        self.cvt.set_snapshot(snapshot=self.tag_snapshot)
+
+        return self.tag_snapshot
+
+    @logging_error_handler
+    def disable_tag_snapshot(self)->None:
+        r"""
+        Stops publishing the Current Value Table into the shared-memory snapshot.
+        """
+        snapshot = getattr(self, "tag_snapshot", None)
+        if snapshot:
+
+            self.cvt.set_snapshot(snapshot=None)
+            snapshot.close()
+            self.tag_snapshot = None
+
+    @logging_error_handler
+    def read_tag_snapshot(self, names:list=None, path:str=None)->list:
+        r"""
+        Reads current tag values from the shared-memory snapshot published by the acquisition process.
+
+        **Parameters:**
+
+        * **names** (list, optional): Tag names. All published tags if not provided.
+        * **path** (str, optional): Snapshot file. Defaults to `AUTOMATION_TAG_SNAPSHOT_PATH` or `./db/cvt.snapshot`.
+
+        **Returns:**
+
+        * **list**: Records with name, value, quality, timestamp and data_type.
+        """
+        if not path:
+
+            path = os.environ.get("AUTOMATION_TAG_SNAPSHOT_PATH", os.path.join(".", "db", "cvt.snapshot"))
+
+        reader = getattr(self, "tag_snapshot_reader", None)
+        if reader is None or reader.path != path:
+
+            if not os.path.exists(path):
+
+                return list()
+
+            self.tag_snapshot_reader = TagSnapshotReader(path=path)
+
+        return self.tag_snapshot_reader.read_many(names=names)
+
+    @logging_error_handler
+    def get_tag_values(self, names:list=None, since:int=None)->dict:
+        r"""
+        Reads the current values of the tags from the columnar store of the CVT.
+
+        **Parameters:**
+
+        * **names** (list, optional): Tag names. All tags if not provided.
+        * **since** (int, optional): Only tags changed after this sequence number (the `sequence` of a previous read).
+
+        **Returns:**
+
+        * **dict**: {sequence, data: [{id, name, value, timestamp (epoch seconds), quality}]}
+        """
+        return self.cvt.serialize_values(names=names, since=since)
+
+    @logging_error_handler
+    def get_tag_values_frame(self, names:list=None, since:int=None)->bytes:
+        r"""
+        Returns the current values of the tags as a compact binary frame (see `automation.tags.columns`).
+
+        **Parameters:**
+
+        * **names** (list, optional): Tag names. All tags if not provided.
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **bytes**: Frame.
+        """
+        return self.cvt.get_values_frame(names=names, since=since)
+
+    @logging_error_handler
+    def get_tag_values_frame_index(self)->dict:
+        r"""
+        Returns the slot -> tag name map of the binary frames; it only changes with the frame generation.
+
+        **Returns:**
+
+        * **dict**: {generation, names: {slot: name}, data_types: {slot: data type}}
+        """
+        return self.cvt.get_values_frame_index()
+
     @logging_error_handler
     @validate_types(id=str, output=None|str)
     def delete_tag(self, id:str, user:User|None=None)->None|str:
@@ -1576,6 +1863,9 @@ class PyAutomation(Singleton):
                 target_user.password = users.encode(new_password)
             message = f"Password updated successfully for {target_username}"
 
+        # Las credenciales cambiaron: forzar revalidación de sus tokens
+        token_cache.invalidate_user(username=target_username)
+
         return message, "Password changed successfully"
 
     @logging_error_handler
@@ -1627,6 +1917,9 @@ class PyAutomation(Singleton):
                 target_user.password = users.encode(new_password)
             message = f"Password reset successfully for {target_username}"
 
+        # Las credenciales cambiaron: forzar revalidación de sus tokens
+        token_cache.invalidate_user(username=target_username)
+
         return message, "Password reset successfully"
 
     @logging_error_handler
@@ -1871,7 +2164,205 @@ class PyAutomation(Singleton):
             }, 404
         
         return opcua_client.write_value(node_namespace=node_namespace, value=value)
-    
+
+    @logging_error_handler
+    def write_opcua_values(self, writes:list[dict])->tuple[list, int]:
+        r"""
+        Writes several values to OPC UA nodes with one Write service call per server.
+
+        **Parameters:**
+
+        * **writes** (list[dict]): [{opcua_address, node_namespace, value}].
+
+        **Returns:**
+
+        * **tuple**: ([result dict per write, in the order of `writes`], HTTP status code): 200 if
+          every write succeeded, 207 if some of them, otherwise the status of the failed writes.
+
+        **Usage:**
+
+        ```python
+        >>> from automation import PyAutomation
+        >>> app = PyAutomation()
+        >>> results, status = app.write_opcua_values([{"opcua_address": "opc.tcp://localhost:9999", "node_namespace": "ns=2;i=1", "value": 1.0}])
+        >>> status, results[0]["success"]
+        (404, False)
+
+        ```
+        """
+        results = [None] * len(writes)
+        statuses = set()
+        by_address = dict()
+        for index, write in enumerate(writes):
+
+            by_address.setdefault(write["opcua_address"], list()).append(index)
+
+        for opcua_address, indexes in by_address.items():
+
+            opcua_client = self.get_opcua_client_by_address(opcua_address=opcua_address)
+            if not opcua_client:
+
+                for index in indexes:
+
+                    results[index] = {
+                        'message': f'Cliente OPC UA no encontrado o no conectado para {opcua_address}',
+                        'opcua_address': opcua_address,
+                        'node_namespace': writes[index]["node_namespace"],
+                        'success': False
+                    }
+
+                statuses.add(404)
+                continue
+
+            _results, status = opcua_client.write_values([(writes[index]["node_namespace"], writes[index]["value"]) for index in indexes])
+            for index, result in zip(indexes, _results):
+
+                results[index] = result
+
+            statuses.add(status)
+
+        if not statuses or statuses == {200}:
+
+            return results, 200
+
+        if any(result["success"] for result in results):
+
+            return results, 207
+
+        return results, max(statuses)
+
+    @logging_error_handler
+    def get_opcua_write_metrics(self)->dict:
+        r"""
+        Returns the write latency metrics of every OPC UA client.
+
+        **Returns:**
+
+        * **dict**: {client_name: {count, errors, last_ms, mean_ms, p50_ms, p95_ms, max_ms}}
+        """
+        return self.opcua_client_manager.get_write_metrics()
+
+    @logging_error_handler
+    def get_opcua_health(self)->dict:
+        r"""
+        Returns the session and subscription health of every OPC UA client: publish rate,
+        notification lag, keep-alive misses, monitored items, reads, writes and reconnection.
+
+        **Returns:**
+
+        * **dict**: {client_name: {connected, connects, reconnects, subscriptions, monitored_items, publishes,
+          publish_rate, keepalives, keepalive_misses, notifications, notification_lag, reads, writes, reconnection}}
+        """
+        reconnection = self.get_opcua_reconnection_status() or dict()
+        health = self.opcua_client_manager.get_health() or dict()
+
+        return {client_name: {**item, "reconnection": reconnection.get(client_name)} for client_name, item in health.items()}
+
+    @logging_error_handler
+    def get_opcua_prometheus_metrics(self)->str:
+        r"""
+        Returns the OPC UA health metrics in the Prometheus text exposition format.
+
+        **Returns:**
+
+        * **str**: Metrics text.
+        """
+        return self.opcua_client_manager.get_prometheus_metrics(reconnection=self.get_opcua_reconnection_status())
+
+    @logging_error_handler
+    def get_latency_tracing(self, group:str=None)->dict:
+        r"""
+        Returns the per stage latency histograms of the sampled tag updates, from the OPC UA
+        SourceTimestamp to the database write.
+
+        **Parameters:**
+
+        * **group** (str, optional): Tag group (value of the `group_by` tag attribute).
+
+        **Returns:**
+
+        * **dict**: {sample_every, group_by, groups: {group: {stage: {count, mean_ms, p50_ms, p95_ms, age_p50_ms, age_p95_ms}}}}
+
+        Usage:
+
+        ```python
+        >>> from automation import PyAutomation
+        >>> app = PyAutomation()
+        >>> sorted(app.get_latency_tracing())
+        ['group_by', 'groups', 'sample_every']
+
+        ```
+        """
+        tracer = self.das.tracer
+
+        return {"sample_every": tracer.sample_every, "group_by": tracer.group_by, "groups": tracer.summary(group=group)}
+
+    @logging_error_handler
+    def export_latency_traces(self, limit:int=None)->list:
+        r"""
+        Returns the last sampled traces (stages with latency and age) for offline analysis.
+
+        **Parameters:**
+
+        * **limit** (int, optional): Maximum number of traces.
+
+        **Returns:**
+
+        * **list**: [{tag, group, source_delay_ms, stages: [{stage, latency_ms, age_ms}]}]
+        """
+        return self.das.tracer.export(limit=limit)
+
+    @logging_error_handler
+    def set_latency_tracing(self, sample_every:int=None, group_by:str=None, reset:bool=False)->dict:
+        r"""
+        Configures the latency tracing.
+
+        **Parameters:**
+
+        * **sample_every** (int, optional): Traces one out of every `sample_every` updates (0 disables it).
+        * **group_by** (str, optional): Tag attribute used to group the histograms.
+        * **reset** (bool): Drops the histograms and traces collected so far.
+
+        **Returns:**
+
+        * **dict**: {sample_every, group_by}
+        """
+        tracer = self.das.tracer
+        tracer.configure(sample_every=sample_every, group_by=group_by)
+        if reset:
+
+            tracer.reset()
+
+        return {"sample_every": tracer.sample_every, "group_by": tracer.group_by}
+
+    @logging_error_handler
+    def get_opcua_reconnection_status(self)->dict:
+        r"""
+        Returns the reconnection state of every OPC UA client (attempts, backoff and time to recover).
+
+        **Returns:**
+
+        * **dict**: {client_name: {connected, down_for_s, attempts, backoff_s, last_error, recoveries,
+          last_time_to_recover_s, max_time_to_recover_s, resubscribed}}
+        """
+        if not hasattr(self, 'opcua_supervisor'):
+
+            return dict()
+
+        return self.opcua_supervisor.status()
+
+    @logging_error_handler
+    def get_stale_tags(self)->list:
+        r"""
+        Returns the polled tags (scan time > 100 ms) whose samples stopped arriving (more than
+        `AUTOMATION_STALE_FACTOR` scan periods without samples); their quality is UncertainLastUsableValue until the next sample.
+
+        **Returns:**
+
+        * **list**: Tag names.
+        """
+        return self.cvt.get_stale_tags()
+
     @logging_error_handler
     def create_opcua_server_record(self, name:str, namespace:str, access_type:str="Read"):
         r"""
@@ -3333,32 +3824,107 @@ class PyAutomation(Singleton):
         """
         if self.is_db_connected():
 
-            tags = self.db_manager.get_tags()
             str_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            report = {"tags": 0, "loaded": 0, "failed": 0, "das": 0, "daq": 0, "phases": dict()}
+            start = time.perf_counter()
 
+            # READ: una sola consulta con joins
+            tags = self.db_manager.get_tags()
             # Asegurar que tags sea siempre una lista
             if tags is None:
                 tags = []
             elif not isinstance(tags, list):
                 tags = list(tags) if tags else []
 
+            tags = [tag for tag in tags if tag.pop("active")]
+            report["tags"] = len(tags)
+            checkpoint = time.perf_counter()
+            report["phases"]["read"] = checkpoint - start
+
+            # CVT: resolución de clientes OPC UA una sola vez y alta de los tags en un único paso
+            clients = {client_name: info.get("server_url") for client_name, info in self.get_opcua_clients().items()}
+            clients_by_url = {server_url: client_name for client_name, server_url in clients.items()}
+            definitions = list()
+            client_names = list()
             for tag in tags:
 
-                active = tag.pop("active")
+                opcua_address = tag.get("opcua_address")
+                opcua_client_name = tag.pop("opcua_client_name", None)
+                if opcua_client_name:
+                    opcua_address = clients.get(opcua_client_name) or opcua_address
+                elif opcua_address:
+                    if "opc.tcp://" in opcua_address:
+                        opcua_client_name = clients_by_url.get(opcua_address)
+                    else:
+                        opcua_client_name = opcua_address
+                        opcua_address = clients.get(opcua_client_name, opcua_address)
 
-                if active:
-                    # Si el tag tiene opcua_client_name pero no opcua_address, resolver la URL
-                    if tag.get("opcua_client_name") and not tag.get("opcua_address"):
-                        client_name = tag.get("opcua_client_name")
-                        client = self.opcua_client_manager.get(client_name)
-                        if client:
-                            tag["opcua_address"] = client.serialize().get("server_url")
-                    
-                    logging.info(f"Loading tag {tag['name']} from database")
-                    print(_colorize_message(f"[{str_date}] [INFO] Loading tag {tag['name']} from database", "INFO"))
-                    self.create_tag(reload=True, **tag)
-                    logging.info(f"Tag {tag['name']} loaded from database")
-                    print(_colorize_message(f"[{str_date}] [INFO] Tag {tag['name']} loaded from database", "INFO"))
+                tag["opcua_address"] = opcua_address
+                tag["display_name"] = tag.get("display_name") or tag["name"]
+                definitions.append(tag)
+                client_names.append(opcua_client_name)
+
+            das_nodes = dict()
+            for definition, opcua_client_name, (tag, message) in zip(definitions, client_names, self.cvt.set_tags(tags=definitions)):
+
+                if not tag:
+                    report["failed"] += 1
+                    logging.warning(f"Tag {definition['name']} not loaded from database: {message}")
+                    continue
+
+                report["loaded"] += 1
+                name = tag.get_name()
+                if opcua_client_name:
+                    tag.set_opcua_client_name(opcua_client_name, opcua_address=definition["opcua_address"])
+
+                self.db_manager.attach(tag_name=name)
+                scan_time = definition.get("scan_time")
+                if scan_time:
+                    size = ceil(10 / ceil(scan_time / 1000))
+                    self.das.buffer[name] = {"timestamp": Buffer(size=size), "values": Buffer(size=size), "unit": tag.get_display_unit()}
+                else:
+                    self.das.buffer[name] = {"timestamp": Buffer(), "values": Buffer(), "unit": tag.get_display_unit()}
+
+                if definition["opcua_address"] and definition.get("node_namespace"):
+
+                    if not scan_time or scan_time<=100:
+                        das_nodes.setdefault(definition["opcua_address"], list()).append(definition["node_namespace"])
+                    else:
+                        self.subscribe_tag(tag_name=name, scan_time=scan_time, reload=True)
+                        report["daq"] += 1
+
+            checkpoint, previous = time.perf_counter(), checkpoint
+            report["phases"]["cvt"] = checkpoint - previous
+
+            # SUBSCRIBE: una suscripción por cliente y monitored items por lotes
+            for opcua_address, namespaces in das_nodes.items():
+
+                client_name = clients_by_url.get(opcua_address)
+                opcua_client = self.opcua_client_manager.get(client_name) if client_name else None
+                if not opcua_client or not opcua_client.is_connected():
+                    logging.warning(f"OPC UA client for {opcua_address} not connected, {len(namespaces)} tags not subscribed")
+                    continue
+
+                subscription = opcua_client.create_subscription(1000, self.das)
+                nodes = [opcua_client.get_node_id_by_namespace(namespace) for namespace in namespaces]
+                report["das"] += self.das.subscribe_many(
+                    subscription=subscription,
+                    client=opcua_client,
+                    client_name=client_name,
+                    nodes=[node for node in nodes if node]
+                )
+
+            checkpoint, previous = time.perf_counter(), checkpoint
+            report["phases"]["subscribe"] = checkpoint - previous
+            report["total"] = checkpoint - start
+            self._startup_report["cvt"] = report
+            message = (
+                f"{report['loaded']}/{report['tags']} tags loaded from database in {report['total']:.3f} s "
+                f"(read {report['phases']['read']:.3f} s, cvt {report['phases']['cvt']:.3f} s, "
+                f"subscribe {report['phases']['subscribe']:.3f} s; DAS {report['das']}, DAQ {report['daq']})"
+            )
+            logging.info(message)
+            print(_colorize_message(f"[{str_date}] [INFO] {message}", "INFO"))
 
     @logging_error_handler
     @validate_types(output=None)
@@ -3388,18 +3954,30 @@ class PyAutomation(Singleton):
         print(_colorize_message(f"[{str_date}] [INFO] Loading alarms from database", "INFO"))
         if self.is_db_connected():
 
+            start = time.perf_counter()
             alarms = self.db_manager.get_alarms() or list()
+            read = time.perf_counter() - start
             logging.info(f"{len(alarms)} alarms found in database")
             print(_colorize_message(f"[{str_date}] [INFO] {len(alarms)} alarms found in database", "INFO"))
-            if alarms:
-                for alarm in alarms:
+            loaded = 0
+            for alarm in alarms:
 
-                    self.create_alarm(reload=True, **alarm)
-                    logging.info(f"Alarm {alarm['name']} loaded from database")
-                    print(_colorize_message(f"[{str_date}] [INFO] Alarm {alarm['name']} loaded from database", "INFO"))
-            else:
-                logging.info(f"No alarms found in database")
-                print(_colorize_message(f"[{str_date}] [INFO] No alarms found in database", "INFO"))
+                result = self.create_alarm(reload=True, **alarm)
+                if result and result[0]:
+                    loaded += 1
+                else:
+                    logging.warning(f"Alarm {alarm['name']} not loaded from database: {result[1] if result else None}")
+
+            total = time.perf_counter() - start
+            self._startup_report["alarms"] = {
+                "alarms": len(alarms),
+                "loaded": loaded,
+                "phases": {"read": read, "alarm_manager": total - read},
+                "total": total
+            }
+            message = f"{loaded}/{len(alarms)} alarms loaded from database in {total:.3f} s (read {read:.3f} s)"
+            logging.info(message)
+            print(_colorize_message(f"[{str_date}] [INFO] {message}", "INFO"))
 
     @logging_error_handler
     @validate_types(output=None)
@@ -3519,7 +4097,8 @@ class PyAutomation(Singleton):
         logging.info(f"Loading tag subscriptions for state machines from database")
         print(_colorize_message(f"[{str_date}] [INFO] Loading tag subscriptions for state machines from database", "INFO"))
         machines = self.machine_manager.get_machines()
-
+        start = time.perf_counter()
+        bindings = 0
 
         for machine, _, _ in machines:
             logging.info(f"Loading tag subscriptions for state machine {machine.name.value} from database")
@@ -3537,19 +4116,15 @@ class PyAutomation(Singleton):
                 machine.identifier.value = machine_db.identifier
                 logging.info(f"State machine {machine.name.value} identifier set to {machine.identifier.value} from database")
                 print(_colorize_message(f"[{str_date}] [INFO] State machine {machine.name.value} identifier set to {machine.identifier.value} from database", "INFO"))
-                tags_machine = machine_db.get_tags()
-                logging.info(f"{len(tags_machine)} tags found for state machine {machine.name.value} in database")
-                print(_colorize_message(f"[{str_date}] [INFO] {len(tags_machine)} tags found for state machine {machine.name.value} in database", "INFO"))
+                tags_machine = TagsMachines.read_by_machine(machine=machine_db)
                 for tag_machine in tags_machine:
 
-                    _tag = tag_machine.serialize()
-                    tag_name = _tag["tag"]["name"]
-                    logging.info(f"Loading tag {tag_name} from database")
-                    print(_colorize_message(f"[{str_date}] [INFO] Loading tag {tag_name} from database", "INFO"))
-                    tag = self.cvt.get_tag_by_name(name=tag_name)
-                    machine.subscribe_to(tag=tag, default_tag_name=_tag["default_tag_name"])
-                    logging.info(f"Tag {tag_name} loaded from database")
-                    print(_colorize_message(f"[{str_date}] [INFO] Tag {tag_name} loaded from database", "INFO"))
+                    tag = self.cvt.get_tag_by_name(name=tag_machine.tag.name)
+                    machine.subscribe_to(tag=tag, default_tag_name=tag_machine.default_tag_name)
+                    bindings += 1
+
+                logging.info(f"{len(tags_machine)} tags loaded for state machine {machine.name.value} from database")
+                print(_colorize_message(f"[{str_date}] [INFO] {len(tags_machine)} tags loaded for state machine {machine.name.value} from database", "INFO"))
             else:
                 logging.info(f"State machine {machine.name.value} is a data acquisition system, skipping tag subscriptions")
                 print(_colorize_message(f"[{str_date}] [INFO] State machine {machine.name.value} is a data acquisition system, skipping tag subscriptions", "INFO"))
@@ -3557,6 +4132,32 @@ class PyAutomation(Singleton):
                 machine_db = Machines.get_or_none(name=machine_name)
                 machine.identifier.value = machine_db.identifier
 
+        total = time.perf_counter() - start
+        self._startup_report["bindings"] = {"bindings": bindings, "total": total}
+        logging.info(f"{bindings} tag subscriptions for state machines loaded from database in {total:.3f} s")
+
+    @logging_error_handler
+    @validate_types(output=dict)
+    def get_startup_report(self)->dict:
+        r"""
+        Gets the timing report of the last load from database, broken down by loader and phase.
+
+        **Returns:**
+
+        * **dict**: {cvt, alarms, bindings} with counts and seconds per phase.
+
+        **Usage:**
+
+        ```python
+        >>> from automation import PyAutomation
+        >>> app = PyAutomation()
+        >>> isinstance(app.get_startup_report(), dict)
+        True
+
+        ```
+        """
+        return self._startup_report
+
     @logging_error_handler
     def add_db_table(self, table:BaseModel):
         r"""
@@ -3778,6 +4379,7 @@ class PyAutomation(Singleton):
         **Parameters:**
 
         * **fields**: Keyword arguments for filtering (e.g., name, tag, state).
+          Pass `cursor` ("" for the first page, then `next_cursor`) for keyset pagination.
 
         **Returns:**
 
@@ -4061,7 +4663,8 @@ class PyAutomation(Singleton):
             less_than_timestamp:datetime=None,
             timezone:str="UTC",
             page:int=1,
-            limit:int=20)->list:
+            limit:int=20,
+            cursor:str=None)->list:
         r"""
         Filters system events based on multiple criteria.
 
@@ -4074,6 +4677,7 @@ class PyAutomation(Singleton):
         * **classification** (str): Filter by event classification.
         * **timezone** (str): Timezone for timestamp filtering.
         * **page**, **limit**: Pagination parameters.
+        * **cursor** (str, optional): Keyset pagination cursor (`next_cursor` of the previous page, "" for the first page).
 
         **Returns:**
 
@@ -4092,7 +4696,8 @@ class PyAutomation(Singleton):
                 less_than_timestamp=less_than_timestamp,
                 timezone=timezone,
                 page=page,
-                limit=limit
+                limit=limit,
+                cursor=cursor
             )
         
         return list()
@@ -4173,7 +4778,8 @@ class PyAutomation(Singleton):
             less_than_timestamp:datetime=None,
             timezone:str="UTC",
             page:int=1,
-            limit:int=20
+            limit:int=20,
+            cursor:str=None
         )->dict:
         r"""
         Filters system logs based on criteria with pagination.
@@ -4191,6 +4797,7 @@ class PyAutomation(Singleton):
         * **timezone** (str): Timezone.
         * **page** (int): Page number for pagination.
         * **limit** (int): Items per page.
+        * **cursor** (str, optional): Keyset pagination cursor (`next_cursor` of the previous page, "" for the first page).
 
         **Returns:**
 
@@ -4209,7 +4816,8 @@ class PyAutomation(Singleton):
                 less_than_timestamp=less_than_timestamp,
                 timezone=timezone,
                 page=page,
-                limit=limit
+                limit=limit,
+                cursor=cursor
             )
         
     @logging_error_handler
@@ -4393,6 +5001,27 @@ class PyAutomation(Singleton):
             self.connect_to_db(test=test)
             self.db_worker.start()
 
+        self.opcua_supervisor = ReconnectionSupervisor(
+            self.opcua_client_manager,
+            resubscribe=lambda client: self.das.resubscribe(client, client.name, client_namespaces(self.cvt, client)),
+            notify=self.__notify_opcua_connection
+        )
+        self.opcua_supervisor.start()
+
+        # Calidad de los tags con scan time: vencen tras AUTOMATION_STALE_FACTOR periodos sin muestras
+        self.cvt.set_staleness(factor=float(os.environ.get("AUTOMATION_STALE_FACTOR", 3.0)))
+        self.staleness_monitor = StalenessMonitor(self.cvt)
+        self.staleness_monitor.start()
+
+        if str(os.environ.get("AUTOMATION_TAG_SNAPSHOT", "0")).lower() in ("1", "true", "yes", "on"):
+
+            self.enable_tag_snapshot()
+
+        # Detección de anomalías de instrumentos (IAD) en cada muestra: opt-in
+        if str(os.environ.get("AUTOMATION_IAD", "0")).lower() in ("1", "true", "yes", "on"):
+
+            self.cvt.set_iad(enabled=True)
+
         if machines:
 
             for machine in machines:
@@ -4417,6 +5046,18 @@ class PyAutomation(Singleton):
         self.db_worker.stop()
         if hasattr(self, 'subscription_monitor'):
             self.subscription_monitor.stop()
+        if hasattr(self, 'opcua_supervisor'):
+            self.opcua_supervisor.stop()
+        if hasattr(self, 'staleness_monitor'):
+            self.staleness_monitor.stop()
+
+    def __notify_opcua_connection(self, event:str, message:str):
+        r"""
+        Emits the OPC UA connection events of the reconnection supervisor.
+        """
+        if self.sio:
+
+            self.sio.emit(event, data={"message": message})
 
     @logging_error_handler
     @validate_types(level=int, output=None)
@@ -4,6 +4,7 @@ from .tags import (
     Segment,
     Tags,
     TagValue,
+    TagHistoryCompression,
     Variables,
     Units,
     DataTypes
@@ -15,6 +16,7 @@ from .alarms import (
     AlarmSummary
 )
 
+from .rollups import TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor
 from .opcua import OPCUA
 from .users import Roles, Users
 from .events import Events
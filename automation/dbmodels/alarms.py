@@ -279,6 +279,27 @@ class Alarms(BaseModel):
         """
         return cls.get_or_none(name=name)
 
+    @classmethod
+    def read_all(cls):
+        r"""
+        Retrieves all alarms with their tag, type and state in a single joined query.
+
+        **Returns:**
+
+        * **list**: A list of serialized dictionaries representing all alarms.
+        """
+        query = (
+            cls.select(cls, Tags, AlarmTypes, AlarmStates)
+            .join(Tags, on=(cls.tag == Tags.id), attr="tag")
+            .switch(cls)
+            .join(AlarmTypes, on=(cls.trigger_type == AlarmTypes.id), attr="trigger_type")
+            .switch(cls)
+            .join(AlarmStates, on=(cls.state == AlarmStates.id), attr="state")
+            .order_by(cls.id)
+        )
+
+        return [alarm.serialize() for alarm in query]
+
     @logging_error_handler
     def serialize(self):
         r"""
@@ -437,7 +458,8 @@ class AlarmSummary(BaseModel):
         greater_than_timestamp:datetime=None,
         less_than_timestamp:datetime=None,
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Filters alarm summary records with pagination.
@@ -450,6 +472,7 @@ class AlarmSummary(BaseModel):
         * **greater_than_timestamp** (datetime): Start time in UTC (naive or timezone-aware).
         * **less_than_timestamp** (datetime): End time in UTC (naive or timezone-aware).
         * **page**, **limit**: Pagination control.
+        * **cursor** (str, optional): Keyset pagination cursor (`next_cursor` of the previous page, "" for the first page). When given, `page` is ignored and totals are cached.
 
         **Returns:**
 
@@ -548,6 +571,10 @@ class AlarmSummary(BaseModel):
         
         query = query.order_by(cls.id.desc())
         
+        if cursor is not None:
+            # Keyset: el costo no depende de la profundidad de la página
+            return cls.paginate_by_keyset(query, keys=(cls.id,), cursor=cursor, limit=limit, serializer=lambda alarm: alarm.serialize())
+
         total_records = query.count()
         
         if limit <= 0: limit = 20
@@ -0,0 +1,622 @@
+r"""
+Compressed archive tier for aged tag history.
+
+History older than `AUTOMATION_ARCHIVE_AFTER_DAYS` is moved out of `TagValue` into per-tag columnar
+chunk files (one per tag and partition) under `AUTOMATION_ARCHIVE_PATH` (`db/archive` by default):
+
+```
+db/archive/{tag_id}/{first_timestamp}_{last_timestamp}.gor
+```
+
+Each chunk stores two bit streams, compressed as in Facebook's Gorilla TSDB:
+
+* **timestamps**: delta-of-delta, so a regularly sampled tag costs 1 bit per sample.
+* **values**: XOR of the IEEE 754 bits with the previous value; only the meaningful bits of the
+  XOR are stored, reusing the leading/trailing zero window of the previous value when it fits.
+
+Both are lossless. The chunk index is the file names, so locating the chunks of a time range
+needs no decoding. The datalogger merges the archive with the live table in its raw reads.
+
+Chunks are written by the acquisition process; the index of any other process (e.g. API workers)
+is rebuilt when the archive folder changes or, for new chunks of an existing tag, after `ttl` seconds.
+"""
+import logging, os, struct, threading, time
+from collections import OrderedDict
+import numpy as np
+from peewee import fn
+
+EXTENSION = ".gor"
+MAGIC = b"GOR1"
+# magic, número de muestras, bytes del stream de timestamps
+HEADER = struct.Struct("<4sII")
+# (prefijo, bits del prefijo, bits del valor) de los rangos de delta-of-delta
+DOD_RANGES = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+
+
+class BitWriter:
+    r"""
+    Appends values of arbitrary bit width to a byte buffer (most significant bit first).
+    """
+
+    __slots__ = ("buffer", "_acc", "_bits")
+
+    def __init__(self):
+
+        self.buffer = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value:int, bits:int):
+
+        self._acc = (self._acc << bits) | (value & ((1 << bits) - 1))
+        self._bits += bits
+
+        if self._bits >= 64:
+
+            extra = self._bits % 8
+            self.buffer += (self._acc >> extra).to_bytes((self._bits - extra) // 8, "big")
+            self._acc &= (1 << extra) - 1
+            self._bits = extra
+
+    def getvalue(self)->bytes:
+        r"""
+        Returns the written bits, padded with zeros to a whole byte.
+        """
+        padding = -self._bits % 8
+
+        return bytes(self.buffer + (self._acc << padding).to_bytes((self._bits + padding) // 8, "big"))
+
+
+class BitReader:
+    r"""
+    Reads values of arbitrary bit width from a byte buffer written by `BitWriter`.
+    """
+
+    __slots__ = ("data", "position", "_acc", "_bits")
+
+    def __init__(self, data:bytes, position:int=0):
+
+        self.data = data
+        self.position = position
+        self._acc = 0
+        self._bits = 0
+
+    def read(self, bits:int)->int:
+
+        while self._bits < bits:
+
+            chunk = self.data[self.position:self.position + 8]
+            if not chunk:
+
+                raise ValueError("Truncated archive chunk")
+
+            self._acc = (self._acc << (8 * len(chunk))) | int.from_bytes(chunk, "big")
+            self._bits += 8 * len(chunk)
+            self.position += len(chunk)
+
+        self._bits -= bits
+        value = self._acc >> self._bits
+        self._acc &= (1 << self._bits) - 1
+
+        return value
+
+
+def encode(timestamps, values)->bytes:
+    r"""
+    Encodes a series of samples into a Gorilla chunk.
+
+    **Parameters:**
+
+    * **timestamps** (array-like): Integer epoch timestamps, in chronological order.
+    * **values** (array-like): Float values.
+
+    **Returns:**
+
+    * **bytes**: Chunk (header + timestamp stream + value stream).
+
+    Usage:
+
+    ```python
+    >>> from automation.dbmodels.archive import encode, decode
+    >>> chunk = encode([1000, 1001, 1002, 1003, 1005], [20.5, 20.5, 20.75, 21.0, 21.0])
+    >>> len(chunk)
+    35
+    >>> timestamps, values = decode(chunk)
+    >>> timestamps.tolist(), values.tolist()
+    ([1000, 1001, 1002, 1003, 1005], [20.5, 20.5, 20.75, 21.0, 21.0])
+
+    ```
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64).tolist()
+    bits = np.asarray(values, dtype=np.float64).view(np.uint64).tolist()
+    count = len(timestamps)
+
+    # Timestamps: delta-of-delta
+    writer = BitWriter()
+    if count:
+
+        writer.write(timestamps[0], 64)
+
+    previous, delta = (timestamps[0] if count else 0), 0
+    for timestamp in timestamps[1:]:
+
+        dod = (timestamp - previous) - delta
+        delta, previous = timestamp - previous, timestamp
+        if dod == 0:
+
+            writer.write(0, 1)
+            continue
+
+        for prefix, size, width in DOD_RANGES:
+
+            if -(1 << (width - 1)) < dod <= (1 << (width - 1)):
+
+                writer.write(prefix, size)
+                writer.write(dod, width)
+                break
+
+        else:
+
+            writer.write(0b1111, 4)
+            writer.write(dod, 64)
+
+    timestamp_stream = writer.getvalue()
+
+    # Valores: XOR con el valor anterior
+    writer = BitWriter()
+    if count:
+
+        writer.write(bits[0], 64)
+
+    previous, leading, trailing = (bits[0] if count else 0), -1, 0
+    for value in bits[1:]:
+
+        xor = value ^ previous
+        previous = value
+        if xor == 0:
+
+            writer.write(0, 1)
+            continue
+
+        _leading = min(64 - xor.bit_length(), 31)
+        _trailing = (xor & -xor).bit_length() - 1
+        if leading >= 0 and _leading >= leading and _trailing >= trailing:
+
+            # Cabe en la ventana de bits significativos del valor anterior
+            writer.write(0b10, 2)
+            writer.write(xor >> trailing, 64 - leading - trailing)
+
+        else:
+
+            leading, trailing = _leading, _trailing
+            meaningful = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(meaningful - 1, 6)
+            writer.write(xor >> trailing, meaningful)
+
+    return HEADER.pack(MAGIC, count, len(timestamp_stream)) + timestamp_stream + writer.getvalue()
+
+
+def decode(chunk:bytes)->tuple:
+    r"""
+    Decodes a chunk written by `encode`.
+
+    **Returns:**
+
+    * **tuple**: (timestamps: np.ndarray[int64], values: np.ndarray[float64])
+    """
+    magic, count, timestamp_bytes = HEADER.unpack_from(chunk)
+    if magic != MAGIC:
+
+        raise ValueError("Not an archive chunk")
+
+    timestamps = [0] * count
+    reader = BitReader(chunk, HEADER.size)
+    if count:
+
+        timestamps[0] = previous = reader.read(64)
+        if previous >= 1 << 63:
+
+            timestamps[0] = previous = previous - (1 << 64)
+
+    delta = 0
+    read = reader.read
+    for index in range(1, count):
+
+        if read(1):
+
+            # '10' -> 7 bits, '110' -> 9, '1110' -> 12, '1111' -> 64
+            width = 64
+            for _, _, _width in DOD_RANGES:
+
+                if not read(1):
+
+                    width = _width
+                    break
+
+            dod = read(width)
+            if dod > (1 << (width - 1)):
+
+                dod -= 1 << width
+
+            delta += dod
+
+        previous += delta
+        timestamps[index] = previous
+
+    bits = [0] * count
+    reader = BitReader(chunk, HEADER.size + timestamp_bytes)
+    read = reader.read
+    if count:
+
+        bits[0] = previous = read(64)
+
+    leading, trailing = 0, 0
+    for index in range(1, count):
+
+        if read(1):
+
+            if read(1):
+
+                leading = read(5)
+                meaningful = read(6) + 1
+                trailing = 64 - leading - meaningful
+
+            previous ^= read(64 - leading - trailing) << trailing
+
+        bits[index] = previous
+
+    return np.asarray(timestamps, dtype=np.int64), np.asarray(bits, dtype=np.uint64).view(np.float64)
+
+
+class HistoryArchive:
+    r"""
+    Store of Gorilla chunk files, one folder per tag.
+
+    **Parameters:**
+
+    * **root** (str, optional): Archive folder. Defaults to `AUTOMATION_ARCHIVE_PATH` or `db/archive`.
+    * **cache_size** (int): Decoded chunks kept in memory.
+    * **ttl** (float): Maximum age in seconds of the chunk index before it is rebuilt.
+
+    Timestamps are whole epoch seconds, as stored by `TagValue.timestamp`.
+    """
+
+    def __init__(self, root:str=None, cache_size:int=16, ttl:float=60.0):
+
+        self.root = root or os.environ.get('AUTOMATION_ARCHIVE_PATH') or os.path.join(".", "db", "archive")
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._index = None      # {tag_id: [(first, last, path)]} ordenado por first
+        self._scanned = None    # (mtime de la carpeta, time.monotonic()) del último escaneo
+        self._cache = OrderedDict()
+
+    def __mtime(self)->int|None:
+
+        try:
+
+            return os.stat(self.root).st_mtime_ns
+
+        except FileNotFoundError:
+
+            return None
+
+    def index(self)->dict:
+        r"""
+        Returns the chunk index {tag_id: [(first, last, path)]}, built from the file names.
+
+        The folders are scanned again when the archive folder changed (a tag archived or the
+        archive created by another process) or the index is older than `ttl` seconds.
+        """
+        with self._lock:
+
+            mtime = self.__mtime()
+            if self._index is None or self._scanned[0] != mtime or time.monotonic() - self._scanned[1] > self.ttl:
+
+                self._index = dict()
+                self._scanned = (mtime, time.monotonic())
+                if os.path.isdir(self.root):
+
+                    for folder in os.scandir(self.root):
+
+                        if not (folder.is_dir() and folder.name.isdigit()):
+
+                            continue
+
+                        for entry in os.scandir(folder.path):
+
+                            span = self.__parse(entry.name)
+                            if span:
+
+                                self._index.setdefault(int(folder.name), list()).append((*span, entry.path))
+
+                    for chunks in self._index.values():
+
+                        chunks.sort()
+
+            return self._index
+
+    @staticmethod
+    def __parse(name:str)->tuple|None:
+
+        if not name.endswith(EXTENSION):
+
+            return None
+
+        try:
+
+            first, last = name[:-len(EXTENSION)].split("_")
+
+            return int(first), int(last)
+
+        except ValueError:
+
+            return None
+
+    def write(self, tag_id:int, timestamps, values)->str|None:
+        r"""
+        Writes the samples of a tag as one chunk (atomically: temporary file + rename).
+
+        **Returns:**
+
+        * **str|None**: Path of the chunk, None if there are no samples.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(timestamps):
+
+            return None
+
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, values = timestamps[order], values[order]
+        first, last = int(timestamps[0]), int(timestamps[-1])
+        folder = os.path.join(self.root, str(tag_id))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{first}_{last}{EXTENSION}")
+
+        with open(path + ".tmp", "wb") as file:
+
+            file.write(encode(timestamps, values))
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(path + ".tmp", path)
+
+        with self._lock:
+
+            chunks = self.index().setdefault(tag_id, list())
+            if path not in [chunk[2] for chunk in chunks]:
+
+                chunks.append((first, last, path))
+                chunks.sort()
+
+            self._cache.pop(path, None)
+
+        return path
+
+    def archive(self, model, stop:int=None)->int:
+        r"""
+        Copies the rows of a history model (a `TagValue` partition) to chunks, one per tag.
+
+        **Parameters:**
+
+        * **model** (BaseModel): Model with `tag`, `value` and `timestamp` fields.
+        * **stop** (int, optional): Only rows with `timestamp < stop` (epoch seconds).
+
+        **Returns:**
+
+        * **int**: Archived rows.
+        """
+        resolution = model.timestamp.resolution
+        timestamp = fn.COALESCE(model.timestamp, 0).coerce(False)
+        query = model.select(model.tag, timestamp, model.value).where(model.value.is_null(False))
+        if stop is not None:
+
+            query = query.where(model.timestamp < stop * resolution)
+
+        total = 0
+        current, timestamps, values = None, list(), list()
+        # Recorrido en streaming por (tag, timestamp): un tag en memoria a la vez
+        for tag_id, _timestamp, value in query.order_by(model.tag, model.timestamp).tuples().iterator():
+
+            if tag_id != current:
+
+                if timestamps:
+
+                    self.write(current, timestamps, values)
+                    total += len(timestamps)
+
+                current, timestamps, values = tag_id, list(), list()
+
+            timestamps.append(int(_timestamp) // resolution)
+            values.append(value)
+
+        if timestamps:
+
+            self.write(current, timestamps, values)
+            total += len(timestamps)
+
+        return total
+
+    def load(self, path:str)->tuple:
+        r"""
+        Returns the decoded (timestamps, values) of a chunk, through a small LRU cache.
+        """
+        with self._lock:
+
+            if path in self._cache:
+
+                self._cache.move_to_end(path)
+
+                return self._cache[path]
+
+        try:
+
+            with open(path, "rb") as file:
+
+                data = decode(file.read())
+
+        except FileNotFoundError:
+
+            # Borrado por la retención de otro proceso: el índice se reconstruye en la próxima lectura
+            with self._lock:
+
+                self._index = None
+
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        with self._lock:
+
+            self._cache[path] = data
+            while len(self._cache) > self.cache_size:
+
+                self._cache.popitem(last=False)
+
+        return data
+
+    def chunks(self, tag_id:int, start:float=None, stop:float=None)->list:
+        r"""
+        Returns the chunks of a tag that overlap `[start, stop]`, ordered by first timestamp.
+        """
+        return [
+            chunk for chunk in self.index().get(tag_id, list())
+            if (start is None or chunk[1] >= start) and (stop is None or chunk[0] <= stop)
+        ]
+
+    def read(self, tag_id:int, start:float, stop:float, limit:int=None)->tuple:
+        r"""
+        Reads the archived samples of a tag in `[start, stop]`, in chronological order.
+
+        **Parameters:**
+
+        * **limit** (int, optional): Return only the first `limit` samples.
+
+        **Returns:**
+
+        * **tuple**: (timestamps: np.ndarray[int64], values: np.ndarray[float64])
+        """
+        timestamps, values = list(), list()
+        collected = 0
+        for first, last, path in self.chunks(tag_id, start, stop):
+
+            if limit is not None and collected >= limit:
+
+                # Los chunks que empiezan después de la muestra `limit` ya no aportan
+                kth = np.partition(np.concatenate(timestamps), limit - 1)[limit - 1]
+                if first > kth:
+
+                    break
+
+            _timestamps, _values = self.load(path)
+            lower = np.searchsorted(_timestamps, start, side="left")
+            upper = np.searchsorted(_timestamps, stop, side="right")
+            timestamps.append(_timestamps[lower:upper])
+            values.append(_values[lower:upper])
+            collected += upper - lower
+
+        if not timestamps:
+
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        timestamps, values = np.concatenate(timestamps), np.concatenate(values)
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+
+        if limit is not None:
+
+            timestamps, values = timestamps[:limit], values[:limit]
+
+        return timestamps, values
+
+    def last(self, tag_id:int, at:float, since:float=None)->tuple|None:
+        r"""
+        Returns the last archived sample of a tag at or before `at` (and at or after `since`).
+
+        **Returns:**
+
+        * **tuple|None**: (timestamp, value)
+        """
+        best = None
+        for first, last, path in reversed(self.chunks(tag_id, since, at)):
+
+            if best is not None and last < best[0]:
+
+                continue
+
+            timestamps, values = self.load(path)
+            position = np.searchsorted(timestamps, at, side="right") - 1
+            if position >= 0 and (since is None or timestamps[position] >= since):
+
+                if best is None or timestamps[position] >= best[0]:
+
+                    best = (int(timestamps[position]), float(values[position]))
+
+        return best
+
+    def span(self, tag_ids:list)->tuple|None:
+        r"""
+        Returns the (first, last) archived timestamps of a group of tags, None if nothing is archived.
+        """
+        chunks = [chunk for tag_id in tag_ids for chunk in self.index().get(tag_id, list())]
+        if not chunks:
+
+            return None
+
+        return min(chunk[0] for chunk in chunks), max(chunk[1] for chunk in chunks)
+
+    def first_after(self, tag_ids:list, start:float)->int|None:
+        r"""
+        Returns the first archived timestamp at or after `start` of a group of tags.
+        """
+        result = None
+        for tag_id in tag_ids:
+
+            timestamps, _ = self.read(tag_id, start, float("inf"), limit=1)
+            if len(timestamps) and (result is None or timestamps[0] < result):
+
+                result = int(timestamps[0])
+
+        return result
+
+    def drop_before(self, cutoff:float)->int:
+        r"""
+        Deletes the chunks whose samples are all older than `cutoff` (epoch seconds).
+
+        **Returns:**
+
+        * **int**: Number of deleted chunks.
+        """
+        deleted = 0
+        with self._lock:
+
+            for tag_id, chunks in self.index().items():
+
+                for chunk in [chunk for chunk in chunks if chunk[1] < cutoff]:
+
+                    try:
+
+                        os.remove(chunk[2])
+
+                    except FileNotFoundError:
+
+                        pass
+
+                    chunks.remove(chunk)
+                    self._cache.pop(chunk[2], None)
+                    deleted += 1
+
+        if deleted:
+
+            logging.getLogger("pyautomation").info(f"History archive: {deleted} expired chunks deleted")
+
+        return deleted
+
+    def size(self)->int:
+        r"""
+        Returns the size of the archive in bytes.
+        """
+        return sum(os.path.getsize(chunk[2]) for chunks in self.index().values() for chunk in chunks)
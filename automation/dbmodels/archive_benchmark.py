@@ -0,0 +1,157 @@
+r"""
+Compression and scan benchmark of the history archive.
+
+Loads every column of the sample CSV files (`automation/tests/*.csv`) as the history of one tag
+and stores it twice: as `TagValue` rows in a SQLite file (row store with its two indexes) and
+as Gorilla chunks in a `HistoryArchive`. The CSV files have no time column, so the samples are
+given a 1 s period.
+
+Reports bytes per sample, compression ratio and the speed of a full scan of every tag
+(`SELECT timestamp, value ... ORDER BY timestamp` against decoding the chunks, without cache).
+
+**Usage:**
+
+```
+python -m automation.dbmodels.archive_benchmark
+python -m automation.dbmodels.archive_benchmark --repeat 5 automation/tests/SA_L1L_D_WL_SS_V2_01.csv
+```
+"""
+import argparse, csv, glob, json, os, tempfile, time
+import numpy as np
+from peewee import SqliteDatabase, fn
+from .tags import TagValue
+from .archive import HistoryArchive
+
+START = 1704067200      # 2024-01-01 00:00:00 UTC
+TESTS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests")
+
+
+def load(paths:list)->dict:
+    r"""
+    Reads the CSV files.
+
+    **Returns:**
+
+    * **dict**: {"file:column": np.ndarray} with the values of each column.
+    """
+    series = dict()
+    for path in paths:
+
+        with open(path, newline="") as file:
+
+            reader = csv.reader(file)
+            header = next(reader)
+            columns = list(zip(*[[float(value) for value in row] for row in reader if row]))
+
+        for name, values in zip(header, columns):
+
+            series[f"{os.path.basename(path)}:{name}"] = np.asarray(values, dtype=np.float64)
+
+    return series
+
+
+def run(paths:list=None, repeat:int=3)->dict:
+    r"""
+    Runs the benchmark.
+
+    **Returns:**
+
+    * **dict**: Report with sizes, compression ratios and scan speeds.
+    """
+    series = load(paths or sorted(glob.glob(os.path.join(TESTS, "*.csv"))))
+    samples = sum(len(values) for values in series.values())
+    changes = sum(int(np.count_nonzero(np.diff(values))) for values in series.values())
+    report = {
+        "tags": len(series),
+        "samples": samples,
+        # Fracción de muestras cuyo valor cambia respecto de la anterior
+        "value_changes": round(changes / samples, 3),
+        "row_store": dict(),
+        "archive": dict(),
+        "columns": dict()
+    }
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        db = SqliteDatabase(os.path.join(folder, "history.db"))
+        with db.bind_ctx([TagValue]):
+
+            db.create_tables([TagValue])
+            empty_pages = db.execute_sql("PRAGMA page_count").fetchone()[0]
+            with db.atomic():
+
+                for tag_id, values in enumerate(series.values(), start=1):
+
+                    TagValue.insert_many(
+                        [(tag_id, 1, value, START + i) for i, value in enumerate(values.tolist())],
+                        fields=[TagValue.tag, TagValue.unit, TagValue.value, TagValue.timestamp]
+                    ).execute()
+
+            page_size = db.execute_sql("PRAGMA page_size").fetchone()[0]
+            row_bytes = (db.execute_sql("PRAGMA page_count").fetchone()[0] - empty_pages) * page_size
+
+            timestamp = fn.COALESCE(TagValue.timestamp, 0).coerce(False)
+            best = float("inf")
+            for _ in range(repeat):
+
+                started = time.perf_counter()
+                for tag_id in range(1, len(series) + 1):
+
+                    list(TagValue.select(timestamp, TagValue.value).where(TagValue.tag == tag_id).order_by(TagValue.timestamp).tuples())
+
+                best = min(best, time.perf_counter() - started)
+
+            report["row_store"] = {
+                "bytes": row_bytes,
+                "bytes_per_sample": round(row_bytes / samples, 2),
+                "scan_samples_per_sec": round(samples / best)
+            }
+
+        db.close()
+
+        archive = HistoryArchive(os.path.join(folder, "archive"))
+        timestamps = dict()
+        started = time.perf_counter()
+        for tag_id, (name, values) in enumerate(series.items(), start=1):
+
+            timestamps[tag_id] = np.arange(START, START + len(values), dtype=np.int64)
+            path = archive.write(tag_id, timestamps[tag_id], values)
+            report["columns"][name] = round(os.path.getsize(path) * 8 / len(values), 2)
+
+        encode_seconds = time.perf_counter() - started
+        archive_bytes = archive.size()
+
+        best = float("inf")
+        for _ in range(repeat):
+
+            # Sin caché: cada pasada decodifica todos los chunks
+            reader = HistoryArchive(archive.root, cache_size=0)
+            started = time.perf_counter()
+            for tag_id in timestamps:
+
+                reader.read(tag_id, START, START + len(timestamps[tag_id]))
+
+            best = min(best, time.perf_counter() - started)
+
+        report["archive"] = {
+            "bytes": archive_bytes,
+            "bytes_per_sample": round(archive_bytes / samples, 2),
+            "compression_ratio_vs_row_store": round(row_bytes / archive_bytes, 1),
+            "compression_ratio_vs_raw_16_bytes": round(16 * samples / archive_bytes, 1),
+            "encode_samples_per_sec": round(samples / encode_seconds),
+            "scan_samples_per_sec": round(samples / best)
+        }
+
+    # Bits por muestra de cada columna (timestamp + valor)
+    report["columns"] = dict(sorted(report["columns"].items(), key=lambda item: item[1]))
+
+    return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="History archive benchmark (SQLite row store vs Gorilla chunks)")
+    parser.add_argument("paths", nargs="*", help="CSV files (default: automation/tests/*.csv)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(paths=args.paths, repeat=args.repeat), indent=2))
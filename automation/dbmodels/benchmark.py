@@ -0,0 +1,149 @@
+r"""
+Text search benchmark for the events table.
+
+Fills a temporary SQLite database with synthetic events and compares the previous
+`LOWER(column) LIKE '%text%'` scan against the FTS5 trigram index used by `Events.filter_by`:
+insert throughput with the sync triggers, index build time and search latency for rare and
+frequent terms.
+
+**Usage:**
+
+```
+python -m automation.dbmodels.benchmark
+python -m automation.dbmodels.benchmark --rows 100000 --repeat 3
+```
+"""
+import argparse, json, os, random, tempfile, time
+from datetime import datetime, timedelta
+from peewee import SqliteDatabase, fn
+from .users import Roles, Users
+from .events import Events
+from .search import TextSearchIndex
+
+WORDS = (
+    "pump", "valve", "compressor", "pressure", "temperature", "flow", "level", "setpoint", "alarm",
+    "operator", "changed", "started", "stopped", "tripped", "acknowledged", "manual", "automatic"
+)
+CLASSIFICATIONS = ("User", "System", "Alarm", "Machine", "Tag")
+SEARCHES = {
+    "frequent": ("message", "pressure"),
+    "rare": ("message", "PV-1234"),
+    "classification": ("classification", "machin")
+}
+
+
+def populate(rows:int, seed:int=0, batch:int=10000)->float:
+    r"""
+    Inserts `rows` synthetic events.
+
+    **Returns:**
+
+    * **float**: Rows per second.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+
+        data = list()
+        for i in range(offset, min(offset + batch, rows)):
+
+            message = " ".join(rng.choice(WORDS) for _ in range(5))
+            if i % 50000 == 0:
+
+                message += " PV-1234"
+
+            data.append({
+                "timestamp": start + timedelta(seconds=i),
+                "message": message,
+                "description": f"{rng.choice(WORDS)} {i}",
+                "classification": rng.choice(CLASSIFICATIONS),
+                "priority": 1,
+                "criticity": 1,
+                "user": 1
+            })
+
+        with Events._meta.database.atomic():
+
+            Events.insert_many(data).execute()
+
+    return rows / (time.perf_counter() - started)
+
+
+def search(condition, repeat:int)->dict:
+    r"""
+    Runs a search `repeat` times (first page of 20 rows plus count) and returns the best time.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+
+        started = time.perf_counter()
+        query = Events.select(Events.id).where(condition)
+        count = query.count()
+        list(query.order_by(Events.id.desc()).limit(20))
+        best = min(best, time.perf_counter() - started)
+
+    return {"ms": round(best * 1000, 2), "matches": count}
+
+
+def run(rows:int=1_000_000, repeat:int=3)->dict:
+    r"""
+    Runs the benchmark.
+
+    **Returns:**
+
+    * **dict**: Report with insert throughput, index build time and search latencies.
+    """
+    report = {"rows": rows, "sqlite": None, "insert_rows_per_sec": dict(), "searches": dict()}
+    with tempfile.TemporaryDirectory() as folder:
+
+        for mode in ("like", "fts5"):
+
+            db = SqliteDatabase(os.path.join(folder, f"{mode}.db"), pragmas={"journal_mode": "wal", "synchronous": 1})
+            models = [Roles, Users, Events]
+            with db.bind_ctx(models):
+
+                db.create_tables(models)
+                report["sqlite"] = db.execute_sql("SELECT sqlite_version()").fetchone()[0]
+                Roles.insert(name="operator", level=10, identifier="bench").execute()
+                Users.insert(identifier="bench", username="bench", role=1, email="bench@mail.com", password="x").execute()
+                index = TextSearchIndex(Events)
+
+                if mode == "fts5":
+
+                    # Índice creado antes de insertar: mide el costo de los triggers
+                    index.create()
+
+                report["insert_rows_per_sec"][mode] = round(populate(rows))
+
+                if mode == "fts5":
+
+                    db.execute_sql(f'DROP TRIGGER "{index.table}_fts_ai"')
+                    started = time.perf_counter()
+                    index.create()
+                    report["index_build_s"] = round(time.perf_counter() - started, 2)
+
+                for name, (field, text) in SEARCHES.items():
+
+                    if mode == "like":
+
+                        condition = fn.LOWER(getattr(Events, field)).contains(text.lower())
+
+                    else:
+
+                        condition = index.condition(field, text)
+
+                    report["searches"].setdefault(name, dict())[mode] = search(condition, repeat)
+
+            db.close()
+
+    return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Events text search benchmark (LIKE scan vs FTS5 trigram)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(rows=args.rows, repeat=args.repeat), indent=2))
@@ -1,3 +1,5 @@
+import base64, json, math, os, threading, time
+from datetime import datetime
 from peewee import Proxy, Model
 
 proxy = Proxy()
@@ -7,6 +9,115 @@ MYSQL = 'mysql'
 POSTGRESQL = 'postgresql'
 
 
+def encode_cursor(values:list|tuple)->str:
+    r"""
+    Encodes the sort key of the last row of a page into an opaque keyset cursor.
+
+    **Parameters:**
+
+    * **values** (list|tuple): Values of the keyset fields (e.g. timestamp, id).
+
+    **Returns:**
+
+    * **str**: URL-safe cursor.
+
+    Usage:
+
+    ```python
+    >>> from datetime import datetime
+    >>> from automation.dbmodels.core import encode_cursor, decode_cursor
+    >>> cursor = encode_cursor([datetime(2024, 1, 1, 12, 0, 0), 42])
+    >>> decode_cursor(cursor)
+    [datetime.datetime(2024, 1, 1, 12, 0), 42]
+
+    ```
+    """
+    _values = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+
+    return base64.urlsafe_b64encode(json.dumps(_values, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor:str)->list|None:
+    r"""
+    Decodes a cursor created by `encode_cursor`.
+
+    **Returns:**
+
+    * **list|None**: Keyset values, or None if the cursor is empty or malformed.
+    """
+    if not cursor:
+
+        return None
+
+    try:
+
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+    except (ValueError, TypeError):
+
+        return None
+
+    return [datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value for value in values]
+
+
+class CountCache:
+    r"""
+    Short-lived cache of `SELECT COUNT(*)` results keyed by the SQL of the counted query.
+
+    Keyset pages of the same filter share the same total, so the count runs once per `ttl`
+    instead of once per page. Totals may lag behind inserts by up to `ttl` seconds.
+    """
+
+    def __init__(self, ttl:float=None, max_size:int=256):
+
+        self._lock = threading.Lock()
+        self._counts = dict()
+        self.ttl = float(ttl or os.environ.get('AUTOMATION_COUNT_CACHE_TTL') or 10.0)
+        self.max_size = max_size
+
+    def count(self, query)->int:
+        r"""
+        Returns the (possibly cached) number of rows of a query.
+        """
+        sql, params = query.sql()
+        key = (sql, tuple(params))
+        now = time.monotonic()
+
+        with self._lock:
+
+            cached = self._counts.get(key)
+
+            if cached and cached[1] > now:
+
+                return cached[0]
+
+        total = query.count()
+
+        with self._lock:
+
+            if len(self._counts) >= self.max_size:
+
+                self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+
+                if len(self._counts) >= self.max_size:
+
+                    self._counts.clear()
+
+            self._counts[key] = (total, now + self.ttl)
+
+        return total
+
+    def clear(self):
+        r"""
+        Drops every cached total.
+        """
+        with self._lock:
+
+            self._counts.clear()
+
+count_cache = CountCache()
+
+
 class BaseModel(Model):
     r"""
     Base model class for all database models.
@@ -96,5 +207,112 @@ class BaseModel(Model):
         """
         return True if cls.get_or_none(id=id) else False
 
+    @classmethod
+    def paginate_by_keyset(cls, query, keys:tuple, cursor:str="", limit:int=20, serializer=None)->dict:
+        r"""
+        Returns one page of a query using keyset (seek) pagination in descending key order.
+
+        Unlike OFFSET pagination, the page is located with a `WHERE (keys) < (cursor)` condition over
+        indexed fields, so page N costs the same as page 1. The total comes from `count_cache`.
+
+        **Parameters:**
+
+        * **query** (SelectQuery): Filtered query (without pagination).
+        * **keys** (tuple): Unique sort key fields, most significant first (e.g. (timestamp, id)).
+        * **cursor** (str): `next_cursor` of the previous page; empty for the first page.
+        * **limit** (int): Records per page.
+        * **serializer** (callable, optional): Applied to each row.
+
+        **Returns:**
+
+        * **dict**: {data: list, pagination: {limit, cursor, next_cursor, total_records, total_pages, has_next, has_prev}}
+        """
+        if limit <= 0: limit = 20
+
+        total_records = count_cache.count(query)
+        total_pages = math.ceil(total_records / limit)
+        if total_pages == 0: total_pages = 1
+
+        values = decode_cursor(cursor)
+
+        if values:
+
+            query = query.where(cls.__keyset_condition(keys, values))
+
+        rows = list(query.order_by(*[key.desc() for key in keys]).limit(limit + 1))
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+
+        if has_next:
+
+            last = rows[-1]
+            next_cursor = encode_cursor([last[key.name] if isinstance(last, dict) else getattr(last, key.name) for key in keys])
+
+        return {
+            "data": [serializer(row) for row in rows] if serializer else rows,
+            "pagination": {
+                "limit": limit,
+                "cursor": cursor or None,
+                "next_cursor": next_cursor,
+                "total_records": total_records,
+                "total_pages": total_pages,
+                "has_next": has_next,
+                "has_prev": bool(values)
+            }
+        }
+
+    @staticmethod
+    def __keyset_condition(keys:tuple, values:list):
+        r"""
+        Builds `(k1, k2, ...) < (v1, v2, ...)` portably across SQLite, MySQL and PostgreSQL.
+
+        The leading `k1 <= v1` term keeps the condition sargable so the index on `k1` bounds the scan.
+        """
+        key, value = keys[0], values[0]
+
+        if len(keys) == 1:
+
+            return key < value
+
+        return (key <= value) & ((key < value) | BaseModel.__keyset_condition(keys[1:], values[1:]))
+
+    @classmethod
+    def purge_before(cls, field, cutoff:datetime, batch:int=5000)->int:
+        r"""
+        Deletes the records older than `cutoff` in short batches.
+
+        Each batch is its own transaction, so writers are only blocked for a few milliseconds
+        instead of during one long `DELETE` over the whole table.
+
+        **Parameters:**
+
+        * **field** (Field): Indexed timestamp field (e.g. `Events.timestamp`).
+        * **cutoff** (datetime): Records with `field < cutoff` are deleted.
+        * **batch** (int): Records per transaction.
+
+        **Returns:**
+
+        * **int**: Number of deleted records.
+        """
+        deleted = 0
+        while True:
+
+            # Se seleccionan los ids primero: MySQL no admite LIMIT dentro de un IN (subquery)
+            ids = [id for id, in cls.select(cls.id).where(field < cutoff).order_by(field).limit(batch).tuples()]
+            if not ids:
+
+                break
+
+            with cls._meta.database.atomic():
+
+                deleted += cls.delete().where(cls.id.in_(ids)).execute()
+
+            if len(ids) < batch:
+
+                break
+
+        return deleted
+
     class Meta:
         database = proxy
\ No newline at end of file
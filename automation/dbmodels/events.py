@@ -1,6 +1,7 @@
 import pytz
-from peewee import CharField, TimestampField, ForeignKeyField, IntegerField, fn
+from peewee import CharField, TimestampField, ForeignKeyField, IntegerField
 from ..dbmodels.core import BaseModel
+from .search import TextSearchIndex
 from datetime import datetime
 from .users import Users
 from ..modules.users.users import User
@@ -23,6 +24,9 @@ class Events(BaseModel):
     criticity = IntegerField(null=True)
     user = ForeignKeyField(Users, backref='events')
 
+    # Columnas con índice de búsqueda de texto (ver dbmodels/search.py)
+    __search_fields__ = ("message", "description", "classification")
+
     @classmethod
     def create(
         cls, 
@@ -117,7 +121,8 @@ class Events(BaseModel):
         classification:str="",
         timezone:str='UTC',
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Filters events based on criteria with pagination.
@@ -130,6 +135,7 @@ class Events(BaseModel):
         * **message**, **description**, **classification**: Text search.
         * **greater_than_timestamp**, **less_than_timestamp**: Time range.
         * **page**, **limit**: Pagination.
+        * **cursor** (str, optional): Keyset pagination cursor (`next_cursor` of the previous page, "" for the first page). When given, `page` is ignored and totals are cached.
 
         **Returns:**
 
@@ -150,13 +156,13 @@ class Events(BaseModel):
             query = query.where(cls.criticity.in_(criticities))
             
         if description:
-            query = query.where(fn.LOWER(cls.description).contains(description.lower()))
+            query = query.where(TextSearchIndex(cls).condition("description", description))
             
         if message:
-            query = query.where(fn.LOWER(cls.message).contains(message.lower()))
+            query = query.where(TextSearchIndex(cls).condition("message", message))
             
         if classification:
-            query = query.where(fn.LOWER(cls.classification).contains(classification.lower()))
+            query = query.where(TextSearchIndex(cls).condition("classification", classification))
             
         if greater_than_timestamp:
             # If it's already a datetime object (naive UTC from endpoint), use it directly
@@ -222,6 +228,10 @@ class Events(BaseModel):
             
         query = query.order_by(cls.id.desc())
 
+        if cursor is not None:
+            # Keyset: el costo no depende de la profundidad de la página
+            return cls.paginate_by_keyset(query, keys=(cls.id,), cursor=cursor, limit=limit, serializer=lambda event: event.serialize(timezone=timezone))
+
         total_records = query.count()
         
         if limit <= 0: limit = 20
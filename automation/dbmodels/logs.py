@@ -1,6 +1,7 @@
 import pytz
-from peewee import CharField, TimestampField, ForeignKeyField, fn
+from peewee import CharField, TimestampField, ForeignKeyField
 from ..dbmodels.core import BaseModel
+from .search import TextSearchIndex
 from datetime import datetime
 from .users import Users
 from .events import Events
@@ -26,6 +27,9 @@ class Logs(BaseModel):
     alarm = ForeignKeyField(AlarmSummary, null=True, backref='logs', on_delete='CASCADE')
     event = ForeignKeyField(Events, null=True, backref='logs', on_delete='CASCADE')
 
+    # Columnas con índice de búsqueda de texto (ver dbmodels/search.py)
+    __search_fields__ = ("message", "description", "classification")
+
     @classmethod
     def create(
         cls, 
@@ -119,7 +123,8 @@ class Logs(BaseModel):
         less_than_timestamp:datetime=None,
         timezone:str='UTC',
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Filters logs based on various criteria with pagination.
@@ -132,6 +137,7 @@ class Logs(BaseModel):
         * **message**, **description**, **classification**: Text search.
         * **greater_than_timestamp**, **less_than_timestamp**: Time range.
         * **page**, **limit**: Pagination control.
+        * **cursor** (str, optional): Keyset pagination cursor (`next_cursor` of the previous page, "" for the first page). When given, `page` is ignored and totals are cached.
 
         **Returns:**
 
@@ -155,13 +161,13 @@ class Logs(BaseModel):
             query = query.join(AlarmSummary).where(AlarmSummary.id.in_(alarm_subquery))
         
         if description:
-            query = query.where(fn.LOWER(cls.description).contains(description.lower()))
+            query = query.where(TextSearchIndex(cls).condition("description", description))
         
         if message:
-            query = query.where(fn.LOWER(cls.message).contains(message.lower()))
+            query = query.where(TextSearchIndex(cls).condition("message", message))
         
         if classification:
-            query = query.where(fn.LOWER(cls.classification).contains(classification.lower()))
+            query = query.where(TextSearchIndex(cls).condition("classification", classification))
         
         if greater_than_timestamp:
             # If it's already a datetime object (naive UTC from endpoint), use it directly
@@ -227,6 +233,10 @@ class Logs(BaseModel):
         
         query = query.order_by(cls.id.desc())
 
+        if cursor is not None:
+            # Keyset: el costo no depende de la profundidad de la página
+            return cls.paginate_by_keyset(query, keys=(cls.id,), cursor=cursor, limit=limit, serializer=lambda log: log.serialize(timezone=timezone))
+
         total_records = query.count()
         
         if limit <= 0: limit = 20
@@ -197,6 +197,28 @@ class TagsMachines(BaseModel):
                 )
             query.save()
 
+    @classmethod
+    def read_by_machine(cls, machine:Machines)->list:
+        r"""
+        Retrieves the tag bindings of a machine joined with their tags in a single query.
+
+        **Parameters:**
+
+        * **machine** (Machines): Machine record.
+
+        **Returns:**
+
+        * **list**: TagsMachines records with `tag` already loaded.
+        """
+        query = (
+            cls.select(cls, Tags)
+            .join(Tags, on=(cls.tag == Tags.id), attr="tag")
+            .where(cls.machine == machine)
+            .order_by(cls.id)
+        )
+
+        return list(query)
+
     def serialize(self):
         r"""
         Serializes the relationship.
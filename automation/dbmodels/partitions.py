@@ -0,0 +1,559 @@
+r"""
+Time partitioned storage for historical tag values (`TagValue`).
+
+Rows are stored in one table per period (`tagvalue_p20240101`), so expiring old history is a
+`DROP TABLE` instead of a `DELETE` + `VACUUM` over the whole table:
+
+* **SQLite**: one table per period in the same database file, with its own `(tag, timestamp)`
+  index, and a `tagvalue` view (`UNION ALL` of every partition) that the read queries use
+  unchanged. SQLite pushes the `timestamp` range of a query into every branch of the view, so a
+  partition outside the range costs a single index probe. A pre-existing `tagvalue` table with
+  rows is only moved to the `tagvalue_legacy` partition by an explicit migration
+  (`HistoryPartitions.migrate`, or `AUTOMATION_HISTORY_MIGRATE=1` at startup); until then the
+  single table is used. Once migrated the view stays in use, even with the period set to "none".
+* **PostgreSQL**: native declarative partitioning (`PARTITION BY RANGE ("timestamp")`), with
+  partition pruning done by the planner. A pre-existing, non partitioned `tagvalue` table is left
+  as is (history retention then falls back to batched deletes).
+* **Others** (MySQL): single table, batched deletes.
+
+The period is set with `AUTOMATION_HISTORY_PARTITION`: "day" (default), "week" or "none".
+"""
+import logging, os, re, threading, weakref
+from datetime import datetime, timedelta, timezone
+from peewee import Proxy, SqliteDatabase, PostgresqlDatabase
+
+DAY = "day"
+WEEK = "week"
+NONE = "none"
+PERIODS = {DAY: 1, WEEK: 7}
+VIEW = "view"
+NATIVE = "native"
+SINGLE = "single"
+LEGACY = "legacy"
+SECONDS_PER_DAY = 86400
+# SQLite limita a 500 los términos de un SELECT compuesto: la vista se arma por bloques
+VIEW_CHUNK = 400
+
+_states = weakref.WeakKeyDictionary()   # database -> {table_name: {"backend": str, "partitions": dict}}
+_lock = threading.RLock()
+
+
+def _database(model):
+
+    db = model._meta.database
+
+    return db.obj if isinstance(db, Proxy) else db
+
+
+class HistoryPartitions:
+    r"""
+    Manages the time partitions of a history model.
+
+    **Parameters:**
+
+    * **model** (BaseModel): History model with an integer `id` and a `timestamp` TimestampField.
+    * **period** (str, optional): "day", "week" or "none". Defaults to `AUTOMATION_HISTORY_PARTITION`.
+
+    Usage:
+
+    ```python
+    >>> from datetime import datetime
+    >>> from automation.dbmodels import TagValue
+    >>> from automation.dbmodels.partitions import HistoryPartitions
+    >>> partitions = HistoryPartitions(TagValue, period="week")
+    >>> partitions.name(partitions.key(datetime(2024, 1, 3, 15, 30)))
+    'tagvalue_p20240101'
+
+    ```
+    """
+
+    def __init__(self, model, period:str=None):
+
+        self.model = model
+        self.table = model._meta.table_name
+        self.period = (period or os.environ.get('AUTOMATION_HISTORY_PARTITION') or DAY).lower()
+        if self.period not in PERIODS:
+
+            self.period = NONE
+
+        self.legacy_table = f"{self.table}_{LEGACY}"
+        self.__pattern = re.compile(rf"^{re.escape(self.table)}_p(\d{{8}})$")
+
+    # Claves de partición: día (desde epoch, UTC) en que empieza el periodo
+
+    def key(self, timestamp:datetime|int|float)->int:
+        r"""
+        Returns the partition key (first UTC day of the period, counted from epoch) of a timestamp.
+        """
+        field = self.model.timestamp
+        day = (field.db_value(timestamp) // field.resolution) // SECONDS_PER_DAY
+
+        if self.period == WEEK:
+
+            # 1970-01-01 fue jueves: las semanas empiezan el lunes
+            day -= (day + 3) % 7
+
+        return day
+
+    def name(self, key:int)->str:
+        r"""
+        Returns the table name of a partition key.
+        """
+        return f"{self.table}_p{datetime(1970, 1, 1) + timedelta(days=key):%Y%m%d}"
+
+    def parse(self, name:str)->int|None:
+        r"""
+        Returns the partition key of a partition table name, None if it is not a period partition.
+        """
+        match = self.__pattern.match(name)
+        if match:
+
+            return (datetime.strptime(match.group(1), "%Y%m%d") - datetime(1970, 1, 1)).days
+
+    def bounds(self, key:int)->tuple:
+        r"""
+        Returns the `[start, stop)` range of a partition in database timestamp units.
+        """
+        resolution = self.model.timestamp.resolution
+        start = key * SECONDS_PER_DAY
+        stop = start + PERIODS.get(self.period, 1) * SECONDS_PER_DAY
+
+        return start * resolution, stop * resolution
+
+    def partition_model(self, name:str):
+        r"""
+        Returns a model bound to a partition table (same fields and indexes as the history model).
+        """
+        db = _database(self.model)
+        with _lock:
+
+            models = self.__state(db).setdefault("models", dict())
+            if name not in models:
+
+                meta = type("Meta", (), {"table_name": name, "database": db})
+                models[name] = type(f"{self.model.__name__}_{name}", (self.model,), {"Meta": meta, "__module__": self.model.__module__})
+
+            return models[name]
+
+    def __state(self, db)->dict:
+
+        return _states.setdefault(db, dict()).setdefault(self.table, {"backend": None, "partitions": dict()})
+
+    def backend(self)->str:
+        r"""
+        Returns the storage backend: "view" (SQLite), "native" (PostgreSQL) or "single".
+        """
+        db = _database(self.model)
+        with _lock:
+
+            state = self.__state(db)
+            if state["backend"] is None:
+
+                self.create()
+
+            return state["backend"]
+
+    def create(self, migrate:bool=None)->str:
+        r"""
+        Creates the partitioned storage (idempotent) and the partition of the current period.
+
+        On SQLite an existing `tagvalue` table with rows is kept as the single table unless
+        `migrate` (default: `AUTOMATION_HISTORY_MIGRATE`) is set; see `migrate`.
+
+        **Returns:**
+
+        * **str**: Backend in use: "view", "native" or "single".
+        """
+        if migrate is None:
+
+            migrate = str(os.environ.get('AUTOMATION_HISTORY_MIGRATE', "0")).lower() in ("1", "true", "yes", "on")
+
+        db = _database(self.model)
+        backend = SINGLE
+
+        with _lock:
+
+            state = self.__state(db)
+
+            try:
+
+                if isinstance(db, SqliteDatabase) and (self.period != NONE or self.__sqlite_kind(db) == "view"):
+
+                    backend = self.__create_sqlite(db, state, migrate=migrate)
+
+                elif self.period != NONE and isinstance(db, PostgresqlDatabase):
+
+                    backend = self.__create_postgres(db, state)
+
+            except Exception as err:
+
+                logging.getLogger("pyautomation").warning(f"History partitions for {self.table} not available: {err}")
+                backend = SINGLE
+
+            if backend == SINGLE:
+
+                self.model.create_table(safe=True)
+                state["partitions"] = dict()
+
+            state["backend"] = backend
+
+            if backend != SINGLE:
+
+                self.ensure([self.key(datetime.now(timezone.utc).replace(tzinfo=None))])
+
+        return backend
+
+    def migrate(self)->str:
+        r"""
+        Migrates an existing SQLite `tagvalue` table to the partitioned storage: the table is
+        renamed to `tagvalue_legacy` (kept as the oldest partition) and replaced by the view.
+
+        The migration is not reversed automatically: once the view exists it is used even if the
+        period is set to "none" (a table can not be written through a view).
+
+        **Returns:**
+
+        * **str**: Backend in use.
+        """
+        return self.create(migrate=True)
+
+    def __sqlite_kind(self, db)->str|None:
+
+        kind = db.execute_sql("SELECT type FROM sqlite_master WHERE name=?", (self.table,)).fetchone()
+
+        return kind[0] if kind else None
+
+    def __create_sqlite(self, db, state:dict, migrate:bool=False)->str:
+
+        logger = logging.getLogger("pyautomation")
+        kind = self.__sqlite_kind(db)
+        if kind == "view" and self.period == NONE:
+
+            logger.warning(f"{self.table} was migrated to time partitions: they stay in use with AUTOMATION_HISTORY_PARTITION=none")
+
+        if kind == "table":
+
+            rows = db.execute_sql(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+            if rows and not migrate:
+
+                logger.warning(
+                    f"{self.table} is a regular table with {rows} rows: history partitioning is disabled until it is "
+                    f"migrated (HistoryPartitions.migrate or AUTOMATION_HISTORY_MIGRATE=1)"
+                )
+
+                return SINGLE
+
+            if rows:
+
+                logger.warning(f"Migrating {self.table}: {rows} rows moved to the {self.legacy_table} partition")
+                db.execute_sql(f'ALTER TABLE "{self.table}" RENAME TO "{self.legacy_table}"')
+
+            else:
+
+                db.execute_sql(f'DROP TABLE "{self.table}"')
+
+        names = [row[0] for row in db.execute_sql("SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
+        state["partitions"] = {name: self.parse(name) for name in names if self.parse(name) is not None or name == self.legacy_table}
+        state["backend"] = VIEW
+        self.__create_view(db, state)
+
+        return VIEW
+
+    def __create_postgres(self, db, state:dict)->str:
+
+        kind = db.execute_sql(
+            "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = %s AND n.nspname = current_schema()", (self.table,)
+        ).fetchone()
+
+        if kind and kind[0] != "p":
+
+            logging.getLogger("pyautomation").warning(
+                f"{self.table} already exists as a regular table, history partitioning disabled"
+            )
+
+            return SINGLE
+
+        if not kind:
+
+            tag = self.model.tag.rel_model._meta.table_name
+            unit = self.model.unit.rel_model._meta.table_name
+            with db.atomic():
+
+                # La clave primaria de una tabla particionada debe incluir la columna de partición
+                db.execute_sql(
+                    f'CREATE TABLE "{self.table}" ('
+                    f'"id" SERIAL NOT NULL, '
+                    f'"tag_id" INTEGER NOT NULL REFERENCES "{tag}" ("id"), '
+                    f'"unit_id" INTEGER NOT NULL REFERENCES "{unit}" ("id"), '
+                    f'"value" REAL NOT NULL, '
+                    f'"timestamp" BIGINT NOT NULL, '
+                    f'PRIMARY KEY ("id", "timestamp")) PARTITION BY RANGE ("timestamp")'
+                )
+                db.execute_sql(f'CREATE INDEX "{self.table}_timestamp" ON "{self.table}" ("timestamp")')
+                db.execute_sql(f'CREATE INDEX "{self.table}_tag_id_timestamp" ON "{self.table}" ("tag_id", "timestamp")')
+
+        names = [row[0] for row in db.execute_sql(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s", (self.table,)
+        ).fetchall()]
+        state["partitions"] = {name: self.parse(name) for name in names if self.parse(name) is not None}
+        state["backend"] = NATIVE
+
+        return NATIVE
+
+    def partitions(self)->list:
+        r"""
+        Returns the partitions, oldest first.
+
+        **Returns:**
+
+        * **list**: [(name, start, stop)] with the `[start, stop)` range of the stored timestamps in
+          database units (the nominal period range for empty partitions).
+        """
+        if self.backend() == SINGLE:
+
+            return list()
+
+        db = _database(self.model)
+        column = self.model.timestamp.column_name
+        with _lock:
+
+            items = dict(self.__state(db)["partitions"])
+
+        result = list()
+        for name, key in items.items():
+
+            # MIN/MAX se resuelven con el índice de timestamp de la partición
+            start, stop = db.execute_sql(f'SELECT MIN("{column}"), MAX("{column}") FROM "{name}"').fetchone()
+            if start is None:
+
+                start, stop = self.bounds(key) if key is not None else (0, 0)
+
+            else:
+
+                stop += 1
+
+            result.append((name, start, stop))
+
+        result.sort(key=lambda item: (item[1], item[0]))
+
+        return result
+
+    def closed(self, now:datetime=None)->list:
+        r"""
+        Returns the partitions that no longer receive writes, oldest first: those of a period before
+        the period of `now`, and the legacy partition if all its rows are older. The current
+        partition and the ones created in advance are never included.
+
+        **Returns:**
+
+        * **list**: [(name, start, stop)] as in `partitions`.
+        """
+        if now is None:
+
+            now = datetime.now(timezone.utc)
+
+        current = self.key(now)
+        start_of_current, _ = self.bounds(current)
+        result = list()
+        for name, start, stop in self.partitions():
+
+            key = self.parse(name)
+            if (key is not None and key < current) or (key is None and stop <= start_of_current):
+
+                result.append((name, start, stop))
+
+        return result
+
+    def ensure(self, keys)->list:
+        r"""
+        Creates the partitions of the given keys that do not exist yet.
+
+        **Returns:**
+
+        * **list**: Names of the created partitions.
+        """
+        if self.backend() == SINGLE:
+
+            return list()
+
+        db = _database(self.model)
+        created = list()
+
+        with _lock:
+
+            state = self.__state(db)
+            for key in sorted(set(keys)):
+
+                name = self.name(key)
+                if name in state["partitions"]:
+
+                    continue
+
+                if state["backend"] == NATIVE:
+
+                    start, stop = self.bounds(key)
+                    db.execute_sql(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{self.table}" FOR VALUES FROM ({int(start)}) TO ({int(stop)})'
+                    )
+
+                else:
+
+                    self.partition_model(name).create_table(safe=True)
+
+                state["partitions"][name] = key
+                created.append(name)
+
+            if created and state["backend"] == VIEW:
+
+                self.__create_view(db, state)
+
+        return created
+
+    def __create_view(self, db, state:dict):
+
+        columns = ", ".join(f'"{field.column_name}"' for field in self.model._meta.sorted_fields)
+        names = sorted(state["partitions"], key=lambda name: (state["partitions"][name] is not None, state["partitions"][name] or 0))
+        selects = [f'SELECT {columns} FROM "{name}"' for name in names]
+        if len(selects) > VIEW_CHUNK:
+
+            selects = [
+                f'SELECT {columns} FROM ({" UNION ALL ".join(selects[i:i + VIEW_CHUNK])})'
+                for i in range(0, len(selects), VIEW_CHUNK)
+            ]
+
+        with db.atomic():
+
+            db.execute_sql(f'DROP VIEW IF EXISTS "{self.table}"')
+            if selects:
+
+                db.execute_sql(f'CREATE VIEW "{self.table}" AS {" UNION ALL ".join(selects)}')
+
+    def insert_many(self, rows:list)->int:
+        r"""
+        Inserts history rows, each one into the partition of its timestamp.
+
+        **Parameters:**
+
+        * **rows** (list): Row dictionaries with a `timestamp` key.
+
+        **Returns:**
+
+        * **int**: Number of inserted rows.
+        """
+        if not rows:
+
+            return 0
+
+        backend = self.backend()
+        if backend == SINGLE:
+
+            self.model.insert_many(rows).execute()
+
+            return len(rows)
+
+        groups = dict()
+        for row in rows:
+
+            groups.setdefault(self.key(row["timestamp"]), list()).append(row)
+
+        self.ensure(groups)
+
+        with _database(self.model).atomic():
+
+            for key, group in groups.items():
+
+                model = self.model if backend == NATIVE else self.partition_model(self.name(key))
+                model.insert_many(group).execute()
+
+        return len(rows)
+
+    def drop(self, name:str, backup:str=None):
+        r"""
+        Drops a partition, optionally copying its rows first into the SQLite file `backup`.
+        """
+        db = _database(self.model)
+        with _lock:
+
+            state = self.__state(db)
+            if name not in state["partitions"]:
+
+                return
+
+            if backup and state["backend"] == VIEW:
+
+                db.execute_sql("ATTACH DATABASE ? AS history_backup", (backup,))
+                try:
+
+                    db.execute_sql(f'CREATE TABLE IF NOT EXISTS history_backup."{name}" AS SELECT * FROM main."{name}"')
+
+                finally:
+
+                    db.execute_sql("DETACH DATABASE history_backup")
+
+            del state["partitions"][name]
+            state.get("models", dict()).pop(name, None)
+
+            if state["backend"] == VIEW:
+
+                self.__create_view(db, state)
+
+            db.execute_sql(f'DROP TABLE IF EXISTS "{name}"')
+
+        logging.getLogger("pyautomation").info(f"History partition {name} dropped")
+
+    def drop_before(self, cutoff:datetime)->list:
+        r"""
+        Applies a retention cutoff: drops the closed partitions whose whole range is older than
+        `cutoff` and deletes the expired rows of a partially expired legacy partition.
+
+        **Returns:**
+
+        * **list**: Names of the dropped partitions.
+        """
+        if self.backend() == SINGLE:
+
+            self.model.purge_before(self.model.timestamp, cutoff)
+
+            return list()
+
+        limit = self.model.timestamp.db_value(cutoff)
+        dropped = list()
+        # La partición actual se conserva aunque sus filas ya hayan vencido (retención de menos de un periodo)
+        closed = [item[0] for item in self.closed()]
+        for name, start, stop in self.partitions():
+
+            if name in closed and stop <= limit:
+
+                self.drop(name)
+                dropped.append(name)
+
+            elif name == self.legacy_table and start < limit:
+
+                model = self.partition_model(name)
+                model.purge_before(model.timestamp, cutoff)
+
+        return dropped
+
+    def drop_all(self):
+        r"""
+        Drops the view (or parent table) and every partition.
+        """
+        db = _database(self.model)
+        backend = self.backend()
+        with _lock:
+
+            state = self.__state(db)
+            if backend == VIEW:
+
+                db.execute_sql(f'DROP VIEW IF EXISTS "{self.table}"')
+                for name in list(state["partitions"]):
+
+                    db.execute_sql(f'DROP TABLE IF EXISTS "{name}"')
+
+            else:
+
+                db.execute_sql(f'DROP TABLE IF EXISTS "{self.table}"' + (" CASCADE" if backend == NATIVE else ""))
+
+            _states.get(db, dict()).pop(self.table, None)
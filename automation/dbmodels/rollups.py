@@ -0,0 +1,352 @@
+r"""
+Pre-aggregated history (rollups) for long-range trends.
+
+Every batch written to `TagValue` is also folded into per-tag 1-minute, 1-hour and 1-day buckets
+holding count, sum, min, max and the last value. Long-range queries read the coarsest rollup that
+satisfies the requested resolution instead of aggregating raw rows.
+
+Buckets are merged with an upsert (`count = count + new.count`, `min = least(min, new.min)`, ...),
+so out of order and repeated batches of new rows keep the rollups consistent. History written
+before the rollup tables existed is folded in by `TagRollup.backfill`, newest first. The boundary
+between both is stored in `TagRollupCursor`: raw history older than it is left to the backfill
+(even if it is written late), newer history is folded by the writer.
+
+Each level has its own retention (`AUTOMATION_RETENTION_DAYS`), applied by `TagRollup.purge_expired`.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import pytz
+from peewee import ForeignKeyField, FloatField, IntegerField, BigIntegerField, BooleanField, TimestampField, Case, EXCLUDED, fn, Proxy, MySQLDatabase
+from .core import BaseModel
+from .tags import Tags, TagValue
+
+
+class TagRollup(BaseModel):
+    r"""
+    Base model of the rollup tables. Subclasses set the bucket size in `__seconds__`.
+    """
+
+    tag = ForeignKeyField(Tags, backref='+')
+    bucket = TimestampField(utc=True)
+    samples = IntegerField()
+    value_sum = FloatField()
+    value_min = FloatField()
+    value_max = FloatField()
+    value_last = FloatField()
+    last_timestamp = TimestampField(utc=True)
+
+    __seconds__ = None
+
+    class Meta:
+        indexes = (
+            (('tag', 'bucket'), True),
+            (('bucket',), False),
+        )
+
+    @classmethod
+    def levels(cls)->tuple:
+        r"""
+        Returns the rollup models, finest first.
+        """
+        return (TagRollupMinute, TagRollupHour, TagRollupDay)
+
+    @classmethod
+    def retention_days(cls)->float:
+        r"""
+        Retention of the rollup level in days (0 keeps all).
+        """
+        from .. import AUTOMATION_RETENTION_DAYS
+        return AUTOMATION_RETENTION_DAYS.get(cls.__name__) or 0
+
+    @classmethod
+    def covers(cls, since:float)->bool:
+        r"""
+        Checks that the retention of the rollup level keeps the buckets from `since` (epoch seconds).
+        """
+        days = cls.retention_days()
+
+        return not days or since >= time.time() - days * 86400
+
+    @classmethod
+    def for_resolution(cls, seconds:float, since:float=None):
+        r"""
+        Returns the coarsest rollup whose bucket is not larger than `seconds`.
+
+        **Parameters:**
+
+        * **seconds** (float): Requested resolution (bucket or sample time) in seconds.
+        * **since** (float, optional): Start of the requested range (epoch seconds); levels whose
+          retention already purged it are skipped.
+
+        **Returns:**
+
+        * **TagRollup|None**: Rollup model, or None if raw values are needed.
+
+        Usage:
+
+        ```python
+        >>> from automation.dbmodels.rollups import TagRollup
+        >>> TagRollup.for_resolution(30) is None
+        True
+        >>> TagRollup.for_resolution(3888).__name__
+        'TagRollupHour'
+
+        ```
+        """
+        model = None
+        for level in cls.levels():
+
+            if level.__seconds__ <= seconds and (since is None or level.covers(since)):
+
+                model = level
+
+        return model
+
+    @classmethod
+    def aggregate(cls, rows, seconds:int)->list:
+        r"""
+        Folds raw rows ({tag, value, timestamp}) into bucket rows of `seconds`.
+
+        **Returns:**
+
+        * **list**: Row dictionaries ready to be merged with `merge`.
+        """
+        field = TagValue.timestamp
+        buckets = OrderedDict()
+        for row in rows:
+
+            value = row["value"]
+            if value is None:
+
+                continue
+
+            tag = row["tag"]
+            tag_id = tag if isinstance(tag, int) else tag.id
+            timestamp = field.db_value(row["timestamp"]) // field.resolution
+            key = (tag_id, timestamp - timestamp % seconds)
+            bucket = buckets.get(key)
+
+            if bucket is None:
+
+                buckets[key] = {
+                    "tag": tag_id,
+                    "bucket": key[1],
+                    "samples": 1,
+                    "value_sum": value,
+                    "value_min": value,
+                    "value_max": value,
+                    "value_last": value,
+                    "last_timestamp": timestamp
+                }
+                continue
+
+            bucket["samples"] += 1
+            bucket["value_sum"] += value
+            bucket["value_min"] = min(bucket["value_min"], value)
+            bucket["value_max"] = max(bucket["value_max"], value)
+            if timestamp >= bucket["last_timestamp"]:
+
+                bucket["value_last"] = value
+                bucket["last_timestamp"] = timestamp
+
+        return list(buckets.values())
+
+    @classmethod
+    def merge(cls, buckets:list, batch:int=500):
+        r"""
+        Upserts bucket rows, combining them with the stored buckets.
+        """
+        db = cls._meta.database
+        db = db.obj if isinstance(db, Proxy) else db
+        if isinstance(db, MySQLDatabase):
+
+            # MySQL: ON DUPLICATE KEY UPDATE, sin conflict target ni EXCLUDED
+            excluded, target = lambda field: fn.VALUES(field), None
+
+        else:
+
+            excluded, target = lambda field: getattr(EXCLUDED, field.column_name), [cls.tag, cls.bucket]
+
+        newer = excluded(cls.last_timestamp) >= cls.last_timestamp
+        # last_timestamp va al final: MySQL evalúa las asignaciones en orden
+        update = {
+            cls.samples: cls.samples + excluded(cls.samples),
+            cls.value_sum: cls.value_sum + excluded(cls.value_sum),
+            cls.value_min: Case(None, [(excluded(cls.value_min) < cls.value_min, excluded(cls.value_min))], cls.value_min),
+            cls.value_max: Case(None, [(excluded(cls.value_max) > cls.value_max, excluded(cls.value_max))], cls.value_max),
+            cls.value_last: Case(None, [(newer, excluded(cls.value_last))], cls.value_last),
+            cls.last_timestamp: Case(None, [(newer, excluded(cls.last_timestamp))], cls.last_timestamp)
+        }
+        for index in range(0, len(buckets), batch):
+
+            (cls
+                .insert_many(buckets[index:index + batch])
+                .on_conflict(conflict_target=target, update=update)
+                .execute())
+
+    @classmethod
+    def cursor(cls, rows:list=None):
+        r"""
+        Returns the backfill cursor, creating it the first time.
+
+        The cursor starts at the oldest minute bucket (rollups created before the cursor existed),
+        else at the oldest of the first written `rows`, else right after the newest raw value.
+        """
+        cursor = TagRollupCursor.get_or_none(TagRollupCursor.id == 1)
+        if cursor is not None:
+
+            return cursor
+
+        resolution = TagValue.timestamp.resolution
+        pending_before = TagRollupMinute.select(fn.MIN(TagRollupMinute.bucket).coerce(False)).scalar()
+        if pending_before is None and rows:
+
+            pending_before = min(TagValue.timestamp.db_value(row["timestamp"]) for row in rows) // resolution
+
+        elif pending_before is None:
+
+            newest = TagValue.select(fn.MAX(TagValue.timestamp).coerce(False)).scalar()
+            pending_before = None if newest is None else newest // resolution + 1
+
+        completed = pending_before is None or not TagValue.select().where(TagValue.timestamp < pending_before).exists()
+        # Id fijo: si otro proceso lo creó primero, se usa el suyo
+        (TagRollupCursor
+            .insert(id=1, pending_before=pending_before, completed=completed)
+            .on_conflict_ignore()
+            .execute())
+
+        return TagRollupCursor.get(TagRollupCursor.id == 1)
+
+    @classmethod
+    def add(cls, rows:list):
+        r"""
+        Folds a batch of new history rows into every rollup level.
+
+        Rows older than the backfill cursor are skipped: the backfill reads them from `TagValue`.
+
+        **Parameters:**
+
+        * **rows** (list): Rows written to `TagValue` ({tag, value, timestamp}).
+        """
+        rows = [row for row in rows if isinstance(row.get("tag"), (int, Tags))]
+        if not rows:
+
+            return
+
+        field = TagValue.timestamp
+        with cls._meta.database.atomic():
+
+            cursor = cls.cursor(rows)
+            if not cursor.completed:
+
+                rows = [row for row in rows if field.db_value(row["timestamp"]) // field.resolution >= cursor.pending_before]
+
+            for level in cls.levels():
+
+                level.merge(cls.aggregate(rows, level.__seconds__))
+
+    @classmethod
+    def backfill(cls, budget:float=1.0, chunk:int=3600)->bool:
+        r"""
+        Folds history written before the rollups existed, walking backwards from the backfill
+        cursor in chunks of `chunk` seconds, for at most `budget` seconds.
+
+        Each chunk moves the cursor in the same transaction, so late or repeated calls never skip
+        or count a raw row twice.
+
+        **Returns:**
+
+        * **bool**: True when there is no raw history left to fold.
+        """
+        started = time.monotonic()
+        resolution = TagValue.timestamp.resolution
+
+        while time.monotonic() - started < budget:
+
+            with cls._meta.database.atomic():
+
+                cursor = cls.cursor()
+                if cursor.completed:
+
+                    return True
+
+                previous = (TagValue
+                    .select(fn.MAX(TagValue.timestamp).coerce(False))
+                    .where(TagValue.timestamp < cursor.pending_before)
+                    .scalar())
+                if previous is None:
+
+                    cursor.completed = True
+                    cursor.save()
+
+                    return True
+
+                # El tramo termina en el minuto del último valor pendiente (así nunca está vacío)
+                previous //= resolution
+                stop = min(previous - previous % 60 + 60, cursor.pending_before)
+                start = stop - chunk
+                rows = (TagValue
+                    .select(TagValue.tag, TagValue.value, TagValue.timestamp)
+                    .where((TagValue.timestamp >= start) & (TagValue.timestamp < stop))
+                    .order_by(TagValue.timestamp)
+                    .dicts())
+
+                for level in cls.levels():
+
+                    level.merge(cls.aggregate(rows, level.__seconds__))
+
+                cursor.pending_before = start
+                cursor.save()
+
+        return False
+
+    @classmethod
+    def purge_expired(cls)->int:
+        r"""
+        Deletes the buckets older than the retention of each rollup level.
+
+        **Returns:**
+
+        * **int**: Number of deleted buckets.
+        """
+        deleted = 0
+        for level in cls.levels():
+
+            days = level.retention_days()
+            if days:
+
+                deleted += level.purge_before(level.bucket, datetime.now(pytz.utc) - timedelta(days=days))
+
+        return deleted
+
+
+class TagRollupCursor(BaseModel):
+    r"""
+    Backfill cursor of the rollups (a single row): raw history older than `pending_before`
+    (epoch seconds) is not folded yet, unless `completed`.
+    """
+
+    pending_before = BigIntegerField(null=True)
+    completed = BooleanField(default=False)
+
+
+class TagRollupMinute(TagRollup):
+    r"""
+    1-minute rollup of tag history.
+    """
+    __seconds__ = 60
+
+
+class TagRollupHour(TagRollup):
+    r"""
+    1-hour rollup of tag history.
+    """
+    __seconds__ = 3600
+
+
+class TagRollupDay(TagRollup):
+    r"""
+    1-day rollup of tag history.
+    """
+    __seconds__ = 86400
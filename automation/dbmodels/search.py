@@ -0,0 +1,181 @@
+r"""
+Indexed substring search for text columns (events and logs).
+
+The filter endpoints search `message`, `description` and `classification` with case-insensitive
+"contains" semantics. A plain `LOWER(column) LIKE '%text%'` scans the whole table, so the backend
+is chosen from the connected database:
+
+* **SQLite**: an external content FTS5 table with the `trigram` tokenizer, kept in sync by
+  insert/update/delete triggers. Searches use `column MATCH '"text"'` (3+ characters).
+* **PostgreSQL**: `pg_trgm` GIN indexes on `lower(column)`; the planner uses them for the
+  same `ILIKE '%text%'` expression, so queries are unchanged.
+* **Others** (MySQL): no index, `LIKE` scan (MySQL FULLTEXT is word based and can't answer
+  substring queries).
+"""
+import logging, weakref
+from peewee import SQL, fn, Proxy, SqliteDatabase, PostgresqlDatabase
+
+FTS5 = "fts5"
+TRIGRAM = "trigram"
+LIKE = "like"
+MIN_FTS_LENGTH = 3                      # trigram tokenizer no indexa términos más cortos
+
+_backends = weakref.WeakKeyDictionary()  # database -> {table_name: backend}
+
+
+def _database(model):
+
+    db = model._meta.database
+
+    return db.obj if isinstance(db, Proxy) else db
+
+
+class TextSearchIndex:
+    r"""
+    Creates and queries the text search index of a model.
+
+    The model declares its searchable columns with `__search_fields__`.
+
+    **Parameters:**
+
+    * **model** (BaseModel): Model with an integer `id` primary key.
+    """
+
+    def __init__(self, model):
+
+        self.model = model
+        self.table = model._meta.table_name
+        self.fields = tuple(model.__search_fields__)
+        self.fts_table = f"{self.table}_fts"
+
+    def create(self)->str:
+        r"""
+        Creates (or repairs) the index for the connected database.
+
+        **Returns:**
+
+        * **str**: Backend in use: "fts5", "trigram" or "like".
+        """
+        db = _database(self.model)
+        backend = LIKE
+
+        try:
+
+            if isinstance(db, SqliteDatabase):
+
+                backend = self.__create_fts5(db)
+
+            elif isinstance(db, PostgresqlDatabase):
+
+                backend = self.__create_trigram(db)
+
+        except Exception as err:
+
+            logging.getLogger("pyautomation").warning(f"Text search index for {self.table} not available, using LIKE: {err}")
+            backend = LIKE
+
+        _backends.setdefault(db, dict())[self.table] = backend
+
+        return backend
+
+    def __create_fts5(self, db)->str:
+
+        columns = ", ".join(f'"{field}"' for field in self.fields)
+        new_columns = ", ".join(f'new."{field}"' for field in self.fields)
+        old_columns = ", ".join(f'old."{field}"' for field in self.fields)
+        trigger = f"{self.table}_fts_ai"
+        # Si la tabla base fue recreada, los triggers desaparecen con ella y el índice queda obsoleto
+        rebuild = not db.execute_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (trigger,)
+        ).fetchone()
+
+        with db.atomic():
+
+            db.execute_sql(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS "{self.fts_table}" USING fts5({columns}, '
+                f"content='{self.table}', content_rowid='id', tokenize='trigram')"
+            )
+            db.execute_sql(
+                f'CREATE TRIGGER IF NOT EXISTS "{trigger}" AFTER INSERT ON "{self.table}" BEGIN '
+                f'INSERT INTO "{self.fts_table}"(rowid, {columns}) VALUES (new.id, {new_columns}); END'
+            )
+            db.execute_sql(
+                f'CREATE TRIGGER IF NOT EXISTS "{self.table}_fts_ad" AFTER DELETE ON "{self.table}" BEGIN '
+                f'INSERT INTO "{self.fts_table}"("{self.fts_table}", rowid, {columns}) VALUES (\'delete\', old.id, {old_columns}); END'
+            )
+            db.execute_sql(
+                f'CREATE TRIGGER IF NOT EXISTS "{self.table}_fts_au" AFTER UPDATE ON "{self.table}" BEGIN '
+                f'INSERT INTO "{self.fts_table}"("{self.fts_table}", rowid, {columns}) VALUES (\'delete\', old.id, {old_columns}); '
+                f'INSERT INTO "{self.fts_table}"(rowid, {columns}) VALUES (new.id, {new_columns}); END'
+            )
+
+            if rebuild:
+
+                db.execute_sql(f'INSERT INTO "{self.fts_table}"("{self.fts_table}") VALUES (\'rebuild\')')
+
+        return FTS5
+
+    def __create_trigram(self, db)->str:
+
+        db.execute_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+        for field in self.fields:
+
+            db.execute_sql(
+                f'CREATE INDEX IF NOT EXISTS "{self.table}_{field}_trgm" '
+                f'ON "{self.table}" USING gin (lower("{field}") gin_trgm_ops)'
+            )
+
+        return TRIGRAM
+
+    def backend(self)->str:
+        r"""
+        Returns the backend for the connected database, detecting an existing index if `create`
+        was not called in this process.
+        """
+        db = _database(self.model)
+        backends = _backends.get(db, dict())
+
+        if self.table not in backends:
+
+            backend = LIKE
+
+            if isinstance(db, SqliteDatabase):
+
+                exists = db.execute_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (self.fts_table,)
+                ).fetchone()
+                backend = FTS5 if exists else LIKE
+
+            elif isinstance(db, PostgresqlDatabase):
+
+                backend = TRIGRAM
+
+            _backends.setdefault(db, dict())[self.table] = backend
+
+        return _backends[db][self.table]
+
+    def condition(self, field:str, text:str):
+        r"""
+        Builds the case-insensitive "contains" condition for `field`.
+
+        **Parameters:**
+
+        * **field** (str): Searchable column name.
+        * **text** (str): Text to search.
+
+        **Returns:**
+
+        * **Expression**: Condition to use in `query.where(...)`.
+        """
+        if field not in self.fields:
+
+            raise ValueError(f"{field} is not a search field of {self.table}")
+
+        if self.backend() == FTS5 and len(text) >= MIN_FTS_LENGTH:
+
+            phrase = '"' + text.replace('"', '""') + '"'
+
+            return self.model.id.in_(SQL(f'(SELECT rowid FROM "{self.fts_table}" WHERE "{field}" MATCH ?)', [phrase]))
+
+        return fn.LOWER(getattr(self.model, field)).contains(text.lower())
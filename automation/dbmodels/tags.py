@@ -1,4 +1,4 @@
-from peewee import CharField, BooleanField, FloatField, ForeignKeyField, IntegerField, TimestampField, BooleanField
+from peewee import CharField, BooleanField, FloatField, ForeignKeyField, IntegerField, TimestampField, BooleanField, JOIN
 from .core import BaseModel
 from datetime import datetime
 
@@ -754,6 +754,41 @@ class Tags(BaseModel):
         """
         return self.machines
 
+    @classmethod
+    def read_all(cls):
+        r"""
+        Retrieves all tags with their units, variable, data type, segment and manufacturer
+        in a single joined query, so `serialize` doesn't hit the database per relation.
+
+        **Returns:**
+
+        * **list**: A list of serialized dictionaries representing all tags.
+        """
+        DisplayUnits = Units.alias()
+        query = (
+            cls.select(cls, Units, Variables, DataTypes, DisplayUnits, Segment, Manufacturer)
+            .join(Units, on=(cls.unit == Units.id), attr="unit")
+            .join(Variables, on=(Units.variable_id == Variables.id), attr="variable_id")
+            .switch(cls)
+            .join(DataTypes, on=(cls.data_type == DataTypes.id), attr="data_type")
+            .switch(cls)
+            .join(DisplayUnits, on=(cls.display_unit == DisplayUnits.id), attr="display_unit")
+            .switch(cls)
+            .join(Segment, JOIN.LEFT_OUTER, on=(cls.segment == Segment.id), attr="segment")
+            .join(Manufacturer, JOIN.LEFT_OUTER, on=(Segment.manufacturer == Manufacturer.id), attr="manufacturer")
+            .order_by(cls.id)
+        )
+        data = list()
+        for tag in query:
+
+            try:
+                data.append(tag.serialize())
+            except Exception as e:
+                import logging
+                logging.warning(f"Error serializing Tags record (id={tag.id}): {e}")
+
+        return data
+
     def serialize(self):
         r"""
         Serializes the tag record.
@@ -844,10 +879,52 @@ class TagValue(BaseModel):
         * **timestamp** (datetime): Time of measurement.
         * **unit** (Units): Measurement unit.
         """
-        query = cls(
-            tag=tag,
-            value=value, 
-            timestamp=timestamp,
-            unit=unit
-            )
-        query.save()
\ No newline at end of file
+        # En SQLite `tagvalue` es una vista: la fila se escribe en la partición de su timestamp
+        from .partitions import HistoryPartitions
+        HistoryPartitions(cls).insert_many([{"tag": tag, "value": value, "timestamp": timestamp, "unit": unit}])
+
+class TagHistoryCompression(BaseModel):
+    r"""
+    Per-tag history compression settings (swinging door deviation and max time between stored samples).
+    """
+
+    tag = ForeignKeyField(Tags, backref='history_compression', unique=True)
+    deviation = FloatField(null=True)
+    max_time = FloatField(null=True)
+
+    @classmethod
+    def set(cls, tag:Tags, deviation:float=None, max_time:float=None):
+        r"""
+        Creates or updates the compression settings of a tag.
+
+        **Parameters:**
+
+        * **tag** (Tags): Tag object.
+        * **deviation** (float, optional): Compression deviation in display units (None = default, 0 = disabled).
+        * **max_time** (float, optional): Maximum seconds between stored samples (None = default).
+        """
+        query = cls.get_or_none(cls.tag == tag)
+        if query:
+
+            cls.update(deviation=deviation, max_time=max_time).where(cls.id == query.id).execute()
+
+            return query
+
+        return super().create(tag=tag, deviation=deviation, max_time=max_time)
+
+    @classmethod
+    def read_all_by_tag_name(cls)->dict:
+        r"""
+        Returns the settings of the active tags.
+
+        **Returns:**
+
+        * **dict**: {tag_name: (deviation, max_time)}
+        """
+        query = (cls
+            .select(Tags.name, cls.deviation, cls.max_time)
+            .join(Tags)
+            .where(Tags.active == True)
+            .tuples())
+
+        return {name: (deviation, max_time) for name, deviation, max_time in query}
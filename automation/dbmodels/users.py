@@ -5,6 +5,7 @@ from ..modules.users.users import Users as CVTUsers
 from ..modules.users.roles import Roles as CVTRoles
 from ..modules.users.roles import Role
 from ..modules.users.users import User
+from ..modules.users.token_cache import token_cache
 from werkzeug.security import generate_password_hash, check_password_hash
 
 users = CVTUsers()
@@ -208,9 +209,16 @@ class Users(BaseModel):
             if user.decode_password(password):
                 
                 # if not user.token:
-                    
+                
+                previous = user.token
                 user.token = cls.encode(secrets.token_hex(4))
                 user.save()
+                # El token anterior deja de ser válido, después de guardar el nuevo (otro worker
+                # no puede volver a cachearlo). Solo en este worker: un login no vacía las cachés
+                # de los demás, donde el token anterior vence con el ttl
+                if previous:
+
+                    token_cache.invalidate(token=previous, shared=False)
                 
                 users.login(password=password, token=user.token, username=username, email=email)
 
@@ -229,6 +237,8 @@ class Users(BaseModel):
 
         * **token** (str): Session token.
         """
+        token_cache.invalidate(token=token)
+        users.logout(token=token)
         user = cls.get_or_none(token=token)
 
         if user:
@@ -240,6 +250,27 @@ class Users(BaseModel):
         
         return None, "Invalid Token"
 
+    @classmethod
+    def read_by_token(cls, token:str):
+        r"""
+        Retrieves the user owning a session token, with its role loaded in the same query.
+
+        **Parameters:**
+
+        * **token** (str): Session token.
+
+        **Returns:**
+
+        * **Users|None**: User record or None if the token is not assigned.
+        """
+        query = (
+            cls.select(cls, Roles)
+            .join(Roles, on=(cls.role == Roles.id), attr="role")
+            .where(cls.token == token)
+        )
+
+        return query.first()
+
     @classmethod
     def read_by_username(cls, username:str):
         r"""
@@ -331,6 +362,7 @@ class Users(BaseModel):
         
         user.password = cls.encode(new_password)
         user.save()
+        token_cache.invalidate_user(username=username)
         
         return user, f"Password updated successfully for {username}"
     
@@ -359,6 +391,7 @@ class Users(BaseModel):
         
         user.role = new_role
         user.save()
+        token_cache.invalidate_user(username=username)
         
         return user, f"Role updated successfully for {username}"
     
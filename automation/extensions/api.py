@@ -7,6 +7,7 @@ import logging, jwt
 from ..utils.decorators import decorator
 from ..dbmodels.users import Users
 from ..modules.users.users import Users as CVTUsers
+from ..modules.users.token_cache import token_cache
 
 
 authorizations = {
@@ -57,18 +58,66 @@ class Api(Singleton):
     def verify_tpt(tpt:str):
         r"""
         Verify Third Party Token
+
+        **Returns:**
+
+        * **dict|None**: Token payload if the signature is valid.
         """
         from .. import server
         try:
 
-            jwt.decode(tpt, server.config["AUTOMATION_APP_SECRET_KEY"], algorithms=["HS256"])
-
-            return True
+            return jwt.decode(tpt, server.config["AUTOMATION_APP_SECRET_KEY"], algorithms=["HS256"])
 
         except:
 
-            return 
-        
+            return
+
+    @staticmethod
+    def authenticate(token:str)->dict|None:
+        r"""
+        Resolves the identity of an API token.
+
+        Validated tokens are kept in the token cache, so repeated requests with the same token
+        don't query the database nor decode the JWT again.
+
+        **Parameters:**
+
+        * **token** (str): API token.
+
+        **Returns:**
+
+        * **dict|None**: {"username", "role_name", "role_level", "third_party"} or None if the token is invalid.
+        """
+        identity = token_cache.get(token=token)
+
+        if identity is not None:
+
+            return identity
+
+        # Sesiones activas en memoria (login vía API)
+        user = users.get_active_user(token=token)
+
+        if user is None:
+
+            user = Users.read_by_token(token=token)
+
+        if user:
+
+            return token_cache.put(
+                token=token,
+                username=user.username,
+                role_name=user.role.name,
+                role_level=user.role.level
+            )
+
+        payload = Api.verify_tpt(tpt=token)
+
+        if payload is not None:
+
+            return token_cache.put(token=token, role_name=payload.get("role"), third_party=True)
+
+        return None
+
     @classmethod
     def validate_reqparser(cls, reqparser):
         def _validate_reqparser(f):
@@ -109,16 +158,10 @@ class Api(Singleton):
                             
                             return {'message' : 'Key is missing.'}, 401
                         
-                        user = Users.get_or_none(token=token)
-
-                        if user:
+                        if Api.authenticate(token=token):
 
                             return f(*args, **kwargs)
 
-                        if Api.verify_tpt(tpt=token):
-                    
-                            return f(*args, **kwargs)
-
                         return {'message' : 'Invalid token'}, 401                  
                 
                 except Exception as err:
@@ -162,21 +205,14 @@ class Api(Singleton):
                     if not token:
                         return {'message': 'Token is required'}, 401
                     
-                    # Get user from token
-                    current_user = users.get_active_user(token=token)
+                    # Get user identity from token (cached)
+                    identity = Api.authenticate(token=token)
                     
-                    if not current_user:
-                        # Try database user
-                        db_user = Users.get_or_none(token=token)
-                        if db_user:
-                            # Get role from database
-                            role_name = db_user.role.name.upper()
-                            if role_name in [r.upper() for r in role_names]:
-                                return f(*args, **kwargs)
+                    if not identity or identity["third_party"]:
                         return {'message': 'Invalid token or insufficient permissions'}, 401
                     
                     # Check if user's role is in the allowed list
-                    user_role_name = current_user.role.name.upper()
+                    user_role_name = identity["role_name"].upper()
                     allowed_roles = [r.upper() for r in role_names]
                     
                     if user_role_name in allowed_roles:
@@ -226,21 +262,14 @@ class Api(Singleton):
                     if not token:
                         return {'message': 'Token is required'}, 401
                     
-                    # Get user from token
-                    current_user = users.get_active_user(token=token)
+                    # Get user identity from token (cached)
+                    identity = Api.authenticate(token=token)
                     
-                    if not current_user:
-                        # Try database user
-                        db_user = Users.get_or_none(token=token)
-                        if db_user:
-                            # Get role level from database
-                            role_level = db_user.role.level
-                            if role_level <= max_level:
-                                return f(*args, **kwargs)
+                    if not identity or identity["third_party"]:
                         return {'message': 'Invalid token or insufficient permissions'}, 401
                     
                     # Check if user's role level is <= max_level
-                    user_role_level = current_user.role.level
+                    user_role_level = identity["role_level"]
                     
                     if user_role_level <= max_level:
                         return f(*args, **kwargs)
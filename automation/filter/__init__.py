@@ -1,4 +1,7 @@
 from ..utils.decorators import decorator
+from ..utils.tracing import Tracer
+
+tracer = Tracer()
 
 
 @decorator
@@ -6,6 +9,7 @@ def filter(func, args, kwargs):
     r"""
     Documentation here
     """
+    tracer.stamp("cvt.lock")
     cvt = args[0]
     tag_id = kwargs["id"]
     value = kwargs["value"]
@@ -1,3 +1,4 @@
 from .frozen_data import iad_frozen_data
 from .out_of_range import iad_out_of_range
-from .outliers import iad_outlier
\ No newline at end of file
+from .outliers import iad_outlier
+from .detectors import set_range, get_range, rename, reset
\ No newline at end of file
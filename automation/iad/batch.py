@@ -0,0 +1,336 @@
+r"""
+Vectorized Instrument Anomaly Detection (IAD) over historical data.
+
+The online detectors (see `detectors.py`) evaluate one sample at a time inside `CVT.set_value`.
+For commissioning and audits the same conditions are evaluated here over NumPy arrays, chunk by
+chunk, carrying the window context (frozen data) or the EWMA statistics (outlier) across chunk
+boundaries and returning anomaly intervals instead of alarm transitions.
+"""
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .detectors import FROZEN_DATA, OUTLIER, OUT_OF_RANGE
+from .statistics import EWMAStatistics
+
+ALGORITHMS = (FROZEN_DATA, OUTLIER, OUT_OF_RANGE)
+# Bloques del filtro recursivo: decay ** -bloque acotado por e ** 8 (error relativo ~1e-13)
+FILTER_SPAN = 8.0
+
+
+def frozen_data_mask(values:np.ndarray, size:int=10, threshold:float=0.001, context:int=0)->np.ndarray:
+    r"""
+    Flags samples whose window of the last `size` samples has a standard deviation below `threshold`.
+
+    Same condition as `FrozenDataDetector`.
+
+    **Parameters:**
+
+    * **values** (np.ndarray): Samples, with `context` leading samples from the previous chunk.
+    * **size** (int): Window size.
+    * **threshold** (float): Minimum standard deviation of a live signal.
+    * **context** (int): Number of leading samples that only provide window context.
+
+    **Returns:**
+
+    * **np.ndarray**: Boolean mask for `values[context:]`.
+
+    ```python
+    >>> import numpy as np
+    >>> from automation.iad.batch import frozen_data_mask
+    >>> frozen_data_mask(np.array([1.0, 2.0, 3.0, 3.0, 3.0, 3.0]), size=3).tolist()
+    [False, False, False, False, True, True]
+
+    ```
+    """
+    mask = np.zeros(len(values), dtype=bool)
+    if len(values) >= size:
+
+        mask[size - 1:] = sliding_window_view(values, size).std(axis=1) < threshold
+
+    return mask[context:]
+
+
+def recursive_filter(inputs:np.ndarray, decay:float, initial:float=0.0)->np.ndarray:
+    r"""
+    First order recursive filter `y[n] = decay * y[n - 1] + inputs[n]`, with `y[-1] = initial`.
+
+    Vectorized in blocks: inside a block `y[n] = decay ** (n + 1) * (initial + cumsum(inputs / decay ** (i + 1)))`,
+    with blocks short enough that `decay ** -block` stays small (no scipy needed for `lfilter`).
+
+    **Parameters:**
+
+    * **inputs** (np.ndarray): Filter input.
+    * **decay** (float): Feedback coefficient in (0, 1].
+    * **initial** (float): Output before the first input.
+
+    **Returns:**
+
+    * **np.ndarray**: Filter output.
+
+    ```python
+    >>> import numpy as np
+    >>> from automation.iad.batch import recursive_filter
+    >>> recursive_filter(np.array([1.0, 1.0, 1.0]), decay=0.5, initial=4.0).tolist()
+    [3.0, 2.5, 2.25]
+
+    ```
+    """
+    output = np.empty(len(inputs), dtype=np.float64)
+    block = len(inputs) if decay >= 1.0 else max(1, int(FILTER_SPAN / -math.log(decay)))
+    powers = decay ** np.arange(1, min(block, len(inputs)) + 1, dtype=np.float64)
+    previous = initial
+    for start in range(0, len(inputs), block):
+
+        chunk = inputs[start:start + block]
+        _powers = powers[:len(chunk)]
+        output[start:start + len(chunk)] = _powers * (previous + np.cumsum(chunk / _powers))
+        previous = output[start + len(chunk) - 1]
+
+    return output
+
+
+def outlier_mask(
+        values:np.ndarray,
+        alpha:float=0.05,
+        k:float=4.0,
+        warmup:int=10,
+        min_std:float=1e-6,
+        relative_std:float=1e-3,
+        statistics:EWMAStatistics=None
+    )->np.ndarray:
+    r"""
+    Flags samples farther than `k` standard deviations from the EWMA mean of the previous samples.
+
+    Same condition and estimator as `OutlierDetector` (up to floating point rounding): the EWMA mean
+    and variance recurrences are evaluated with `recursive_filter`. Pass the same `statistics` to
+    consecutive chunks to carry the EWMA across chunk boundaries; it is left as the online
+    detector would be after the last sample.
+
+    **Parameters:**
+
+    * **values** (np.ndarray): Samples.
+    * **alpha** (float): EWMA smoothing factor.
+    * **k** (float): Number of standard deviations.
+    * **warmup** (int): Samples needed before evaluating.
+    * **min_std** (float): Absolute standard deviation floor.
+    * **relative_std** (float): Standard deviation floor relative to the mean.
+    * **statistics** (EWMAStatistics, optional): EWMA state of the previous chunks.
+
+    **Returns:**
+
+    * **np.ndarray**: Boolean mask for `values`.
+
+    ```python
+    >>> import numpy as np
+    >>> from automation.iad.batch import outlier_mask
+    >>> values = np.array([100.0 + 0.5 * (-1) ** i for i in range(50)] + [150.0])
+    >>> np.flatnonzero(outlier_mask(values)).tolist()
+    [50]
+
+    ```
+    """
+    statistics = statistics or EWMAStatistics(alpha=alpha)
+    alpha = statistics.alpha
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+
+        return np.zeros(0, dtype=bool)
+
+    first = 0
+    if statistics.count == 0:
+
+        # La primera muestra inicializa la media
+        statistics.mean, statistics.variance = float(values[0]), 0.0
+        first = 1
+
+    # Media y varianza antes de cada muestra (las usadas para evaluarla)
+    mean = np.empty(len(values) + 1, dtype=np.float64)
+    variance = np.empty(len(values) + 1, dtype=np.float64)
+    mean[:first + 1] = statistics.mean
+    variance[:first + 1] = statistics.variance
+    if len(values) > first:
+
+        mean[first + 1:] = recursive_filter(alpha * values[first:], 1.0 - alpha, initial=statistics.mean)
+        delta = values[first:] - mean[first:-1]
+        variance[first + 1:] = recursive_filter((1.0 - alpha) * alpha * delta * delta, 1.0 - alpha, initial=statistics.variance)
+
+    # Muestras previas de cada posición: se evalúan desde `warmup`
+    counts = statistics.count + np.arange(len(values))
+    std = np.maximum(np.sqrt(variance[:-1]), min_std + relative_std * np.abs(mean[:-1]))
+    mask = (counts >= warmup) & (np.abs(values - mean[:-1]) > k * std)
+
+    statistics.mean, statistics.variance = float(mean[-1]), float(variance[-1])
+    statistics.count += len(values)
+
+    return mask
+
+
+def out_of_range_mask(values:np.ndarray, low:float=None, high:float=None, context:int=0)->np.ndarray:
+    r"""
+    Flags non finite samples and samples outside [low, high]. Same condition as `OutOfRangeDetector`.
+
+    **Returns:**
+
+    * **np.ndarray**: Boolean mask for `values[context:]`.
+    """
+    values = values[context:]
+    mask = ~np.isfinite(values)
+    with np.errstate(invalid="ignore"):
+
+        if low is not None:
+
+            mask |= values < low
+
+        if high is not None:
+
+            mask |= values > high
+
+    return mask
+
+
+class IntervalBuilder:
+    r"""
+    Accumulates anomaly intervals from consecutive boolean masks (chunks).
+    """
+
+    def __init__(self):
+
+        self.intervals = list()
+        self._open = None
+
+    def update(self, timestamps:np.ndarray, mask:np.ndarray):
+        r"""
+        Adds the mask of a chunk.
+
+        **Parameters:**
+
+        * **timestamps** (np.ndarray): Epoch timestamps of the chunk.
+        * **mask** (np.ndarray): Anomaly mask of the chunk.
+        """
+        if not len(mask):
+
+            return
+
+        padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+        edges = np.diff(padded)
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1) - 1
+        for start, stop in zip(starts, stops):
+
+            samples = int(stop - start + 1)
+            if start == 0 and self._open is not None:
+
+                # Continúa el intervalo abierto en el chunk anterior
+                self._open["stop"] = float(timestamps[stop])
+                self._open["samples"] += samples
+
+            else:
+
+                self.__close()
+                self._open = {"start": float(timestamps[start]), "stop": float(timestamps[stop]), "samples": samples}
+
+            if stop != len(mask) - 1:
+
+                self.__close()
+
+        if not mask[-1]:
+
+            self.__close()
+
+    def __close(self):
+
+        if self._open is not None:
+
+            self.intervals.append(self._open)
+            self._open = None
+
+    def get_intervals(self)->list[dict]:
+        r"""
+        Closes any open interval and returns all of them.
+
+        **Returns:**
+
+        * **list[dict]**: Intervals with start, stop (epoch seconds) and samples.
+        """
+        self.__close()
+
+        return self.intervals
+
+
+def scan(
+        chunks,
+        algorithms:list|tuple=ALGORITHMS,
+        frozen_data_size:int=10,
+        frozen_data_threshold:float=0.001,
+        outlier_alpha:float=0.05,
+        outlier_k:float=4.0,
+        low:float=None,
+        high:float=None
+    )->dict:
+    r"""
+    Runs the batch IAD algorithms over a stream of chunks.
+
+    **Parameters:**
+
+    * **chunks** (iterable): Yields (timestamps, values) NumPy arrays in chronological order.
+    * **algorithms** (list): Any of 'frozen_data', 'outlier', 'out_of_range'.
+    * **frozen_data_size** (int): Frozen data window size.
+    * **frozen_data_threshold** (float): Frozen data standard deviation threshold.
+    * **outlier_alpha** (float): Outlier EWMA smoothing factor.
+    * **outlier_k** (float): Outlier number of standard deviations.
+    * **low** (float, optional): Lower instrument range for out of range detection.
+    * **high** (float, optional): Upper instrument range for out of range detection.
+
+    **Returns:**
+
+    * **dict**: {samples: int, anomalies: {algorithm: [intervals]}}
+
+    ```python
+    >>> import numpy as np
+    >>> from automation.iad.batch import scan
+    >>> timestamps = np.arange(8, dtype=float)
+    >>> values = np.array([1.0, 2.0, 50.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+    >>> chunks = [(timestamps[:4], values[:4]), (timestamps[4:], values[4:])]
+    >>> scan(chunks, algorithms=["out_of_range"], high=10.0)["anomalies"]["out_of_range"]
+    [{'start': 2.0, 'stop': 2.0, 'samples': 1}]
+
+    ```
+    """
+    builders = {algorithm: IntervalBuilder() for algorithm in algorithms}
+    context = frozen_data_size - 1
+    statistics = EWMAStatistics(alpha=outlier_alpha)
+    previous = np.empty(0, dtype=np.float64)
+    samples = 0
+    for timestamps, values in chunks:
+
+        values = np.asarray(values, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(values):
+
+            continue
+
+        samples += len(values)
+        window = np.concatenate((previous, values))
+        offset = len(previous)
+        for algorithm, builder in builders.items():
+
+            if algorithm == FROZEN_DATA:
+
+                mask = frozen_data_mask(window, size=frozen_data_size, threshold=frozen_data_threshold, context=offset)
+
+            elif algorithm == OUTLIER:
+
+                mask = outlier_mask(values, k=outlier_k, statistics=statistics)
+
+            else:
+
+                mask = out_of_range_mask(window, low=low, high=high, context=offset)
+
+            builder.update(timestamps, mask)
+
+        previous = window[-context:] if context else np.empty(0, dtype=np.float64)
+
+    return {
+        "samples": samples,
+        "anomalies": {algorithm: builder.get_intervals() for algorithm, builder in builders.items()}
+    }
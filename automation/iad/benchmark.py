@@ -0,0 +1,142 @@
+r"""
+Replay benchmark for the IAD detectors.
+
+Replays every column of the leak-detection CSVs shipped in `automation/tests/` through the
+streaming detectors and through the previous frozen data algorithm (whole buffer recomputed
+on every sample) and reports time per sample and anomalies found.
+
+**Usage:**
+
+```
+python -m automation.iad.benchmark
+python -m automation.iad.benchmark automation/tests/SA_L1L_D_WL_SS_V2_07.csv --repeat 5
+```
+"""
+import argparse, csv, json, math, os, time
+from ..buffer import Buffer
+from .detectors import FrozenDataDetector, OutlierDetector, OutOfRangeDetector
+
+TESTS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests")
+DEFAULT_FILES = (
+    os.path.join(TESTS_FOLDER, "SA_L1L_D_WL_SS_V2_01.csv"),
+    os.path.join(TESTS_FOLDER, "SA_L1L_D_WL_SS_V2_07.csv")
+)
+
+
+def read_columns(file:str)->dict:
+    r"""
+    Reads a CSV file into a dict of column name -> list of floats.
+    """
+    with open(file, newline="") as f:
+
+        reader = csv.DictReader(f)
+        columns = {name: list() for name in reader.fieldnames}
+        for row in reader:
+
+            for name, value in row.items():
+
+                columns[name].append(float(value))
+
+    return columns
+
+
+def legacy_frozen_data(values:list)->int:
+    r"""
+    Previous frozen data algorithm: mean and variance recomputed over the whole buffer per sample.
+    """
+    buffer = Buffer()
+    anomalies = 0
+    for value in values:
+
+        buffer(value)
+        if len(buffer) >= buffer.size:
+
+            mean = sum(buffer) / len(buffer)
+            variance = sum((x - mean) ** 2 for x in buffer) / len(buffer)
+            if abs(math.sqrt(variance)) < 0.001:
+
+                anomalies += 1
+
+    return anomalies
+
+
+def replay(detector, values:list)->int:
+    r"""
+    Replays values through a detector and counts anomalous samples.
+    """
+    anomalies = 0
+    update = detector.update
+    for value in values:
+
+        if update(value):
+
+            anomalies += 1
+
+    return anomalies
+
+
+def run(files:list|tuple=DEFAULT_FILES, repeat:int=3)->dict:
+    r"""
+    Runs the benchmark.
+
+    **Parameters:**
+
+    * **files** (list): CSV files to replay.
+    * **repeat** (int): Replays per column; the best time is reported.
+
+    **Returns:**
+
+    * **dict**: Report with time per sample (us) and anomalies per algorithm and column.
+    """
+    algorithms = {
+        "legacy_frozen_data": lambda values: legacy_frozen_data(values),
+        "frozen_data": lambda values: replay(FrozenDataDetector(), values),
+        "outlier": lambda values: replay(OutlierDetector(), values),
+        "out_of_range": lambda values: replay(OutOfRangeDetector(), values)
+    }
+    report = {"files": dict(), "summary": dict()}
+    totals = {name: {"samples": 0, "seconds": 0.0} for name in algorithms}
+    for file in files:
+
+        file_report = dict()
+        for column, values in read_columns(file).items():
+
+            column_report = dict()
+            for name, algorithm in algorithms.items():
+
+                best = None
+                for _ in range(repeat):
+
+                    start = time.perf_counter()
+                    anomalies = algorithm(values)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+
+                totals[name]["samples"] += len(values)
+                totals[name]["seconds"] += best
+                column_report[name] = {
+                    "us_per_sample": round(best / len(values) * 1e6, 3),
+                    "anomalies": anomalies
+                }
+
+            file_report[column] = column_report
+
+        report["files"][os.path.basename(file)] = file_report
+
+    for name, total in totals.items():
+
+        report["summary"][name] = {
+            "samples": total["samples"],
+            "us_per_sample": round(total["seconds"] / total["samples"] * 1e6, 3) if total["samples"] else None
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="IAD detectors replay benchmark")
+    parser.add_argument("files", nargs="*", default=list(DEFAULT_FILES), help="CSV files to replay")
+    parser.add_argument("--repeat", type=int, default=3, help="Replays per column")
+    args = parser.parse_args()
+    print(json.dumps(run(files=args.files, repeat=args.repeat), indent=2))
@@ -0,0 +1,341 @@
+r"""
+Instrument Anomaly Detection (IAD) detectors.
+
+Each monitored tag gets an `IADState` holding one detector per algorithm (frozen data,
+outlier, out of range) built on O(1) streaming statistics. All detectors of a tag share
+the `alarm.iad.<tag_name>` alarm: it goes abnormal when any detector flags an anomaly
+and returns to normal when all of them are clear.
+
+The detectors only run when the CVT has IAD enabled (`CVT.set_iad`, or `AUTOMATION_IAD=1` when
+PyAutomation starts). Instrument ranges live in memory only: they are set through `set_range`,
+survive a tag rename or a reset of the detectors, but are not persisted, so they must be set
+again after a restart.
+"""
+import math
+from .statistics import RollingStatistics, EWMAStatistics
+
+FROZEN_DATA = "frozen_data"
+OUTLIER = "outlier"
+OUT_OF_RANGE = "out_of_range"
+
+
+class FrozenDataDetector:
+    r"""
+    Flags a signal whose standard deviation over the last `size` samples is below `threshold`.
+
+    **Parameters:**
+
+    * **size** (int): Window size.
+    * **threshold** (float): Minimum standard deviation of a live signal.
+    """
+    description = "Frozen data anomaly"
+
+    def __init__(self, size:int=10, threshold:float=0.001):
+
+        self.threshold = threshold
+        self.statistics = RollingStatistics(size=size)
+
+    def update(self, value:float)->bool|None:
+        r"""
+        Adds a sample and evaluates the condition.
+
+        **Returns:**
+
+        * **bool|None**: True if frozen, False if not, None while the window is filling.
+        """
+        self.statistics.update(value)
+        if not self.statistics.is_full:
+
+            return None
+
+        return self.statistics.std < self.threshold
+
+
+class OutlierDetector:
+    r"""
+    Flags samples farther than `k` standard deviations from the EWMA mean.
+
+    The standard deviation is floored with `min_std` plus a fraction (`relative_std`) of the mean,
+    so tiny changes on a quiet signal are not reported as outliers.
+
+    **Parameters:**
+
+    * **alpha** (float): EWMA smoothing factor.
+    * **k** (float): Number of standard deviations.
+    * **warmup** (int): Samples needed before evaluating.
+    * **min_std** (float): Absolute standard deviation floor.
+    * **relative_std** (float): Standard deviation floor relative to the mean.
+    """
+    description = "Outlier anomaly"
+
+    def __init__(self, alpha:float=0.05, k:float=4.0, warmup:int=10, min_std:float=1e-6, relative_std:float=1e-3):
+
+        self.k = k
+        self.warmup = warmup
+        self.min_std = min_std
+        self.relative_std = relative_std
+        self.statistics = EWMAStatistics(alpha=alpha)
+
+    def update(self, value:float)->bool|None:
+        r"""
+        Evaluates a sample against the current statistics and then adds it.
+
+        **Returns:**
+
+        * **bool|None**: True if outlier, False if not, None during warm up.
+        """
+        value = float(value)
+        result = None
+        statistics = self.statistics
+        if statistics.count >= self.warmup:
+
+            std = max(statistics.std, self.min_std + self.relative_std * abs(statistics.mean))
+            result = abs(value - statistics.mean) > self.k * std
+
+        statistics.update(value)
+
+        return result
+
+
+class OutOfRangeDetector:
+    r"""
+    Flags non finite samples and samples outside the instrument range [low, high].
+
+    **Parameters:**
+
+    * **low** (float, optional): Lower range value. No lower bound if None.
+    * **high** (float, optional): Upper range value. No upper bound if None.
+    """
+    description = "Out Of Range anomaly"
+
+    def __init__(self, low:float=None, high:float=None):
+
+        self.low = low
+        self.high = high
+
+    def set_range(self, low:float=None, high:float=None):
+        r"""
+        Sets the instrument range.
+        """
+        self.low = low
+        self.high = high
+
+    def update(self, value:float)->bool:
+        r"""
+        Evaluates a sample.
+
+        **Returns:**
+
+        * **bool**: True if out of range.
+        """
+        value = float(value)
+        if not math.isfinite(value):
+
+            return True
+
+        if self.low is not None and value < self.low:
+
+            return True
+
+        if self.high is not None and value > self.high:
+
+            return True
+
+        return False
+
+
+class IADState:
+    r"""
+    Detectors, current anomalies and cached alarm handle of a tag.
+
+    **Parameters:**
+
+    * **tag_name** (str): Tag name.
+    """
+
+    def __init__(self, tag_name:str):
+
+        self.tag_name = tag_name
+        self.detectors = dict()
+        self.anomalies = dict()
+        self._alarm = None
+        self._alarm_version = None
+
+    def get_detector(self, name:str):
+        r"""
+        Gets (creating it on first use) the detector of an algorithm.
+
+        **Parameters:**
+
+        * **name** (str): 'frozen_data', 'outlier' or 'out_of_range'.
+        """
+        detector = self.detectors.get(name)
+        if detector is None:
+
+            if name == FROZEN_DATA:
+
+                detector = FrozenDataDetector()
+
+            elif name == OUTLIER:
+
+                detector = OutlierDetector()
+
+            else:
+
+                detector = OutOfRangeDetector(*ranges.get(self.tag_name, (None, None)))
+
+            self.detectors[name] = detector
+
+        return detector
+
+    def get_alarm(self):
+        r"""
+        Gets the `alarm.iad.<tag_name>` alarm.
+
+        The handle is cached and only looked up again when the alarm manager definitions change.
+        """
+        from ..managers.alarms import AlarmManager
+        alarm_manager = AlarmManager()
+        version = alarm_manager.get_version()
+        if version != self._alarm_version:
+
+            self._alarm = alarm_manager.get_alarm_by_name(name=f"alarm.iad.{self.tag_name}")
+            self._alarm_version = version
+
+        return self._alarm
+
+    def update(self, name:str, value)->bool|None:
+        r"""
+        Runs an algorithm on a new sample and updates the IAD alarm when the tag condition changes.
+
+        **Parameters:**
+
+        * **name** (str): Algorithm name.
+        * **value** (float): New sample.
+
+        **Returns:**
+
+        * **bool|None**: Detector result.
+        """
+        result = self.get_detector(name).update(value)
+        if result is None or self.anomalies.get(name) == result:
+
+            return result
+
+        self.anomalies[name] = result
+        self.__evaluate()
+
+        return result
+
+    def __evaluate(self):
+
+        alarm = self.get_alarm()
+        if not alarm:
+
+            return
+
+        anomalies = [self.detectors[name].description for name, anomaly in self.anomalies.items() if anomaly]
+        is_active = alarm.state.alarm_status.lower() == "active"
+        if anomalies and not is_active:
+
+            alarm.description = ", ".join(anomalies)
+            alarm.abnormal_condition()
+
+        elif not anomalies and is_active:
+
+            alarm.description = ""
+            alarm.normal_condition()
+
+
+states = dict()
+# Rango de instrumento por tag: sobrevive a `reset` (los estados se reconstruyen)
+ranges = dict()
+
+
+def get_state(tag_name:str)->IADState:
+    r"""
+    Gets (creating it on first use) the IAD state of a tag.
+
+    **Parameters:**
+
+    * **tag_name** (str): Tag name.
+    """
+    state = states.get(tag_name)
+    if state is None:
+
+        state = states[tag_name] = IADState(tag_name=tag_name)
+
+    return state
+
+
+def set_range(tag_name:str, low:float=None, high:float=None):
+    r"""
+    Sets the instrument range used by the out of range detection of a tag.
+
+    **Parameters:**
+
+    * **tag_name** (str): Tag name.
+    * **low** (float, optional): Lower range value.
+    * **high** (float, optional): Upper range value.
+
+    The range is kept in memory only (it is not persisted).
+    """
+    if low is None and high is None:
+
+        ranges.pop(tag_name, None)
+
+    else:
+
+        ranges[tag_name] = (low, high)
+
+    get_state(tag_name).get_detector(OUT_OF_RANGE).set_range(low=low, high=high)
+
+
+def get_range(tag_name:str)->tuple:
+    r"""
+    Gets the instrument range of a tag.
+
+    **Returns:**
+
+    * **tuple**: (low, high), None for an unbounded side.
+    """
+    return ranges.get(tag_name, (None, None))
+
+
+def rename(tag_name:str, new_name:str):
+    r"""
+    Moves the instrument range of a tag to its new name and discards its detectors.
+
+    **Parameters:**
+
+    * **tag_name** (str): Current tag name.
+    * **new_name** (str): New tag name.
+    """
+    states.pop(tag_name, None)
+    if tag_name in ranges:
+
+        ranges[new_name] = ranges.pop(tag_name)
+
+
+def reset(tag_name:str=None, keep_range:bool=True):
+    r"""
+    Discards the IAD state of a tag (or all tags), e.g. after the tag is deleted or reconfigured.
+
+    **Parameters:**
+
+    * **tag_name** (str, optional): Tag name. All tags if not provided.
+    * **keep_range** (bool): Keep the instrument range (False when the tag is deleted).
+    """
+    if tag_name is None:
+
+        states.clear()
+        if not keep_range:
+
+            ranges.clear()
+
+    else:
+
+        states.pop(tag_name, None)
+        if not keep_range:
+
+            ranges.pop(tag_name, None)
@@ -0,0 +1,170 @@
+r"""
+Streaming statistics used by the Instrument Anomaly Detection (IAD) algorithms.
+
+Both estimators update in O(1) per sample, so detectors don't have to iterate
+over their whole window on every new value.
+"""
+import math
+from collections import deque
+
+
+class RollingStatistics:
+    r"""
+    Mean and variance over a sliding window of the last `size` samples (windowed Welford).
+
+    The windowed update accumulates rounding errors that never decay (with large offsets a frozen
+    signal would keep a non-zero deviation), so every `resync` samples the mean and variance are
+    recomputed exactly from the window: still O(1) amortized per sample.
+
+    **Parameters:**
+
+    * **size** (int): Window size.
+    * **resync** (int, optional): Samples between exact recalculations. Defaults to `size`.
+
+    **Usage:**
+
+    ```python
+    >>> from automation.iad.statistics import RollingStatistics
+    >>> stats = RollingStatistics(size=3)
+    >>> for value in (1.0, 2.0, 3.0, 4.0):
+    ...     stats.update(value)
+    >>> stats.mean, stats.variance
+    (3.0, 0.6666666666666666)
+
+    ```
+    """
+    __slots__ = ("size", "resync", "values", "mean", "_m2", "_updates")
+
+    def __init__(self, size:int=10, resync:int=None):
+
+        self.size = size
+        self.resync = resync or size
+        self.values = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    def __resync(self):
+
+        count = len(self.values)
+        mean = math.fsum(self.values) / count
+        self.mean = mean
+        self._m2 = math.fsum((value - mean) ** 2 for value in self.values)
+
+    def update(self, value:float):
+        r"""
+        Adds a sample, removing the oldest one when the window is full.
+
+        **Parameters:**
+
+        * **value** (float): New sample.
+        """
+        value = float(value)
+        if len(self.values) == self.size:
+
+            old = self.values.popleft()
+            new_mean = self.mean + (value - old) / self.size
+            self._m2 += (value - old) * (value - new_mean + old - self.mean)
+            self.mean = new_mean
+
+        else:
+
+            count = len(self.values) + 1
+            delta = value - self.mean
+            self.mean += delta / count
+            self._m2 += delta * (value - self.mean)
+
+        self.values.append(value)
+        self._updates += 1
+        if self._updates >= self.resync:
+
+            # Recalculo exacto: descarta el error de redondeo acumulado
+            self._updates = 0
+            self.__resync()
+
+        # Evita varianzas negativas por errores de redondeo acumulados
+        elif self._m2 < 0.0:
+
+            self._m2 = 0.0
+
+    @property
+    def count(self)->int:
+
+        return len(self.values)
+
+    @property
+    def is_full(self)->bool:
+
+        return len(self.values) == self.size
+
+    @property
+    def variance(self)->float:
+        r"""
+        Population variance of the samples in the window.
+        """
+        if not self.values:
+
+            return 0.0
+
+        return self._m2 / len(self.values)
+
+    @property
+    def std(self)->float:
+
+        return math.sqrt(self.variance)
+
+
+class EWMAStatistics:
+    r"""
+    Exponentially weighted moving mean and variance.
+
+    **Parameters:**
+
+    * **alpha** (float): Smoothing factor in (0, 1]. Higher values react faster.
+
+    **Usage:**
+
+    ```python
+    >>> from automation.iad.statistics import EWMAStatistics
+    >>> stats = EWMAStatistics(alpha=0.5)
+    >>> for value in (1.0, 1.0, 3.0):
+    ...     stats.update(value)
+    >>> stats.mean, stats.variance
+    (2.0, 1.0)
+
+    ```
+    """
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha:float=0.1):
+
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def update(self, value:float):
+        r"""
+        Adds a sample.
+
+        **Parameters:**
+
+        * **value** (float): New sample.
+        """
+        value = float(value)
+        self.count += 1
+        if self.count == 1:
+
+            self.mean = value
+            self.variance = 0.0
+            return
+
+        delta = value - self.mean
+        increment = self.alpha * delta
+        self.mean += increment
+        self.variance = (1.0 - self.alpha) * (self.variance + delta * increment)
+
+    @property
+    def std(self)->float:
+
+        return math.sqrt(self.variance)
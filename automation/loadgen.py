@@ -0,0 +1,507 @@
+r"""
+Synthetic load generator and replay tool for tags.
+
+Drives the system with realistic data without PLCs: recorded series (the columns of CSV files
+such as the `SA_L1L_*.csv` shipped in `automation/tests/`, each replicated with a different
+offset until reaching `--tags`) or synthetic signals (`sine`, `random_walk`) are fed, at
+accelerated speed, into:
+
+* **cvt**: `CVTEngine.set_value` in this process (IAD, alarms, state machines, Socket.IO and the
+  datalogger queue of a `PyAutomation` app running in the same process see every update).
+* **opcua**: a local OPC UA server with one variable per tag (`ns=<idx>;s=<tag name>`), so a
+  separate PyAutomation instance subscribes to it as if it were a PLC.
+
+Every step can be disturbed with gaussian noise, step changes (persistent offsets) and frozen
+segments (the value is held), with independent probabilities per tag and a fixed seed, so a
+load test is reproducible.
+
+**Usage:**
+
+```
+python -m automation.loadgen --tags 2000 --speed 100 --noise 0.01 --frozen-probability 0.001 --iad
+python -m automation.loadgen sine --target opcua --tags 5000 --period 0.5 --steps 0 --mapping tags.csv
+python -m automation.loadgen automation/tests/SA_L1L_D_WL_SS_V2_07.csv --step-probability 0.0005 --step-size 3
+```
+
+In-process (with a running app whose tags already exist):
+
+```python
+from automation.loadgen import LoadGenerator, CVTSink, replay
+generator = LoadGenerator(tags=["PT-01", "FT-01"], sources=["sine"], noise=0.02)
+report = replay(generator, CVTSink(generator.tags), steps=3600, period=1.0, speed=60)
+```
+"""
+import argparse, csv, json, math, threading, time
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+from .iad.benchmark import DEFAULT_FILES, read_columns
+
+SYNTHETIC = ("sine", "random_walk")
+# Variable y unidad de las columnas de los CSV de detección de fugas (por sufijo)
+COLUMN_VARIABLES = (
+    ("PRESSURE", "Pressure", "Pa"),
+    ("MASS_FLOW", "MassFlow", "kg/sec"),
+    ("LEAKED_FLOW", "MassFlow", "kg/sec"),
+    ("DENSITY", "Density", "kg/m3"),
+    ("TEMPERATURE", "Temperature", "C"),
+    ("VOLUMETRIC_FLUID", "VolumetricFlow", "m3/sec")
+)
+
+
+def column_variable(column:str)->tuple:
+    r"""
+    Returns the (variable, unit) of a recorded column from its name.
+
+    Usage:
+
+    ```python
+    >>> from automation.loadgen import column_variable
+    >>> column_variable("FIRST_TRANSMITTER_FLUID_TEMPERATURE")
+    ('Temperature', 'C')
+    >>> column_variable("LEVEL")
+    ('Adimentional', 'adim')
+
+    ```
+    """
+    for suffix, variable, unit in COLUMN_VARIABLES:
+
+        if column.endswith(suffix):
+
+            return variable, unit
+
+    return "Adimentional", "adim"
+
+
+class LoadGenerator:
+    r"""
+    Vectorized generator of one value per tag and step.
+
+    Recorded columns are assigned to the tags round-robin; the copies of a column start at
+    different offsets and wrap around at the end of the file.
+
+    **Parameters:**
+
+    * **tags** (int | list[str]): Number of tags (named `{prefix}{column}-{copy}`) or tag names.
+    * **sources** (list): CSV files and/or synthetic signal names (`sine`, `random_walk`).
+    * **noise** (float): Gaussian noise standard deviation, relative to the signal scale.
+    * **step_probability** (float): Probability per tag and step of a step change.
+    * **step_size** (float): Step change size, relative to the signal scale.
+    * **frozen_probability** (float): Probability per tag and step of starting a frozen segment.
+    * **frozen_length** (int): Steps of every frozen segment.
+    * **prefix** (str): Prefix of the generated tag names.
+    * **seed** (int): Random seed.
+
+    Usage:
+
+    ```python
+    >>> from automation.loadgen import LoadGenerator
+    >>> generator = LoadGenerator(tags=4, sources=["sine"], frozen_probability=1.0, frozen_length=3)
+    >>> generator.tags
+    ['LG-SINE-0000', 'LG-SINE-0001', 'LG-SINE-0002', 'LG-SINE-0003']
+    >>> first = generator.step()
+    >>> bool((generator.step() == first).all() and (generator.step() == first).all())
+    True
+
+    ```
+    """
+
+    def __init__(
+            self,
+            tags:int|list=100,
+            sources:list|tuple=DEFAULT_FILES,
+            noise:float=0.0,
+            step_probability:float=0.0,
+            step_size:float=1.0,
+            frozen_probability:float=0.0,
+            frozen_length:int=50,
+            prefix:str="LG-",
+            seed:int=0
+        ):
+
+        self.rng = np.random.default_rng(seed)
+        channels = list()
+        for source in sources:
+
+            if source in SYNTHETIC:
+
+                channels.append((source.upper(), source, None))
+                continue
+
+            for column, values in read_columns(source).items():
+
+                channels.append((column, "recorded", np.asarray(values, dtype=float)))
+
+        if not channels:
+
+            raise ValueError("At least one source is required")
+
+        count = tags if isinstance(tags, int) else len(tags)
+        self.channels = [channels[index % len(channels)] for index in range(count)]
+        if isinstance(tags, int):
+
+            # Varios archivos pueden tener columnas con el mismo nombre: la copia se cuenta por nombre
+            copies = dict()
+            self.tags = list()
+            for column, _, _ in self.channels:
+
+                copies[column] = copies.get(column, -1) + 1
+                self.tags.append(f"{prefix}{column}-{copies[column]:04d}")
+
+        else:
+
+            self.tags = list(tags)
+
+        self.variables = [column_variable(column) if kind == "recorded" else ("Adimentional", "adim") for column, kind, _ in self.channels]
+        self.noise = noise
+        self.step_probability = step_probability
+        self.step_size = step_size
+        self.frozen_probability = frozen_probability
+        self.frozen_length = frozen_length
+        self.counter = 0
+
+        # Columnas grabadas: una matriz (muestras x columnas); las copias solo cambian el desplazamiento
+        columns = [index for index, (_, kind, _) in enumerate(channels) if kind == "recorded"]
+        recorded = [index for index, (_, kind, _) in enumerate(self.channels) if kind == "recorded"]
+        self._recorded = np.array(recorded, dtype=int)
+        if recorded:
+
+            length = min(len(channels[index][2]) for index in columns)
+            self._series = np.stack([channels[index][2][:length] for index in columns], axis=1)
+            self._columns = np.array([columns.index(index % len(channels)) for index in recorded], dtype=int)
+            self._offsets = np.array([(index // len(channels)) * 7919 % length for index in recorded], dtype=int)
+
+        # Señales sintéticas: base, amplitud, período (pasos) y fase aleatorios por tag
+        self._sine = np.array([index for index, (_, kind, _) in enumerate(self.channels) if kind == "sine"], dtype=int)
+        self._walk = np.array([index for index, (_, kind, _) in enumerate(self.channels) if kind == "random_walk"], dtype=int)
+        self._base = self.rng.uniform(10, 100, count)
+        self._amplitude = self._base * self.rng.uniform(0.05, 0.2, count)
+        self._steps = self.rng.uniform(60, 600, count)
+        self._phase = self.rng.uniform(0, 2 * math.pi, count)
+        self._walk_values = self._base[self._walk].copy()
+
+        # Escala de cada tag para el ruido y los escalones
+        self.scale = self._amplitude.copy()
+        if recorded:
+
+            spread = self._series.std(axis=0)
+            spread = np.where(spread > 0, spread, np.abs(self._series.mean(axis=0)) * 0.01 + 1e-3)
+            self.scale[self._recorded] = spread[self._columns]
+
+        self._offset = np.zeros(count)
+        self._frozen = np.zeros(count, dtype=int)
+        self._last = None
+
+    def __len__(self):
+
+        return len(self.tags)
+
+    def signal(self, step:int)->np.ndarray:
+        r"""
+        Returns the undisturbed value of every tag at `step`.
+        """
+        values = np.empty(len(self.tags))
+        if len(self._recorded):
+
+            rows = (step + self._offsets) % len(self._series)
+            values[self._recorded] = self._series[rows, self._columns]
+
+        if len(self._sine):
+
+            index = self._sine
+            values[index] = self._base[index] + self._amplitude[index] * np.sin(2 * math.pi * step / self._steps[index] + self._phase[index])
+
+        if len(self._walk):
+
+            self._walk_values += self.rng.normal(0, 1, len(self._walk)) * self._amplitude[self._walk] * 0.05
+            values[self._walk] = self._walk_values
+
+        return values
+
+    def step(self)->np.ndarray:
+        r"""
+        Returns the next value of every tag, with noise, step changes and frozen segments applied.
+        """
+        count = len(self.tags)
+        values = self.signal(self.counter)
+        self.counter += 1
+        if self.step_probability:
+
+            steps = self.rng.random(count) < self.step_probability
+            self._offset[steps] += self.rng.choice((-1.0, 1.0), int(steps.sum())) * self.step_size * self.scale[steps]
+
+        values += self._offset
+        if self.noise:
+
+            values += self.rng.normal(0, 1, count) * self.noise * self.scale
+
+        if self._last is not None:
+
+            # Los segmentos congelados repiten el último valor publicado
+            frozen = self._frozen > 0
+            values[frozen] = self._last[frozen]
+            self._frozen[frozen] -= 1
+            if self.frozen_probability:
+
+                start = (~frozen) & (self.rng.random(count) < self.frozen_probability)
+                self._frozen[start] = max(0, self.frozen_length - 1)
+
+        elif self.frozen_probability:
+
+            self._frozen[self.rng.random(count) < self.frozen_probability] = max(0, self.frozen_length - 1)
+
+        self._last = values
+
+        return values
+
+    def definitions(self, node_namespaces:list=None, opcua_address:str="", **kwargs)->list:
+        r"""
+        Returns the `CVTEngine.set_tags` definitions of the generated tags.
+
+        **Parameters:**
+
+        * **node_namespaces** (list, optional): Node id of every tag.
+        * **opcua_address** (str, optional): OPC UA server of the node ids.
+        * **kwargs**: Extra `set_tag` arguments of every tag (e.g. `outlier_detection=True`).
+        """
+        return [
+            {
+                "name": name,
+                "unit": unit,
+                "data_type": "float",
+                "description": "Load generator",
+                "variable": variable,
+                "opcua_address": opcua_address if node_namespaces else "",
+                "node_namespace": node_namespaces[index] if node_namespaces else "",
+                **kwargs
+            } for index, (name, (variable, unit)) in enumerate(zip(self.tags, self.variables))
+        ]
+
+
+class CVTSink:
+    r"""
+    Writes the generated values into `CVTEngine`, the same way `DAS.update_tag_value` does for the
+    OPC UA notifications (UTC timestamps, sampled latency tracing).
+
+    **Parameters:**
+
+    * **tags** (list[str]): Tag names, in the order of the generator values.
+    """
+
+    def __init__(self, tags:list):
+
+        from .tags import CVTEngine
+        from .utils.tracing import Tracer
+        self.cvt = CVTEngine()
+        self.tracer = Tracer()
+        self.tags = list()
+        for name in tags:
+
+            tag = self.cvt.get_tag_by_name(name=name)
+            if tag is None:
+
+                raise KeyError(f"Tag {name} is not defined in the CVT")
+
+            self.tags.append(tag)
+
+    def write(self, values:np.ndarray, timestamp:datetime):
+        r"""
+        Sets the value of every tag.
+        """
+        set_value = self.cvt.set_value
+        for tag, value in zip(self.tags, values.tolist()):
+
+            self.tracer.start(tag, source_timestamp=timestamp)
+            try:
+                set_value(id=tag.id, value=value, timestamp=timestamp)
+            finally:
+                self.tracer.end()
+
+    def close(self):
+
+        pass
+
+
+class OPCUASink:
+    r"""
+    Local OPC UA server with one Double variable per tag (`ns=<idx>;s=<tag name>`) under the
+    `LoadGenerator` object; the generated timestamps are published as SourceTimestamp.
+
+    **Parameters:**
+
+    * **tags** (list[str]): Tag names, in the order of the generator values.
+    * **endpoint** (str): Server endpoint.
+    """
+
+    def __init__(self, tags:list, endpoint:str="opc.tcp://0.0.0.0:4841/loadgen/"):
+
+        from opcua import Server, ua
+        self.ua = ua
+        self.endpoint = endpoint
+        self.server = Server()
+        self.server.set_endpoint(endpoint)
+        self.server.set_server_name("PyAutomation load generator")
+        self.idx = self.server.register_namespace("urn:pyautomation:loadgen")
+        folder = self.server.get_objects_node().add_object(self.idx, "LoadGenerator")
+        self.nodes = [folder.add_variable(ua.NodeId(name, self.idx), name, 0.0) for name in tags]
+        self.node_namespaces = [node.nodeid.to_string() for node in self.nodes]
+        self.server.start()
+
+    def write(self, values:np.ndarray, timestamp:datetime):
+        r"""
+        Writes the value of every variable.
+        """
+        ua = self.ua
+        for node, value in zip(self.nodes, values.tolist()):
+
+            data_value = ua.DataValue(ua.Variant(value, ua.VariantType.Double))
+            data_value.SourceTimestamp = timestamp.replace(tzinfo=None)
+            data_value.ServerTimestamp = datetime.now(pytz.utc).replace(tzinfo=None)
+            node.set_value(data_value)
+
+    def close(self):
+
+        self.server.stop()
+
+
+def replay(generator:LoadGenerator, sink, steps:int=1000, period:float=1.0, speed:float=1.0, start:datetime=None, stop:threading.Event=None)->dict:
+    r"""
+    Feeds `steps` generator steps into a sink.
+
+    The values of step `n` are stamped at `start + n * period` (simulated time) and written at
+    `n * period / speed` seconds of real time; with `speed=0` they are written as fast as possible.
+
+    **Parameters:**
+
+    * **generator** (LoadGenerator): Values source.
+    * **sink** (CVTSink | OPCUASink): Values destination.
+    * **steps** (int): Steps to replay (0 replays until `stop` is set).
+    * **period** (float): Simulated seconds between steps.
+    * **speed** (float): Simulated seconds per real second.
+    * **start** (datetime, optional): Simulated time of the first step (UTC); now by default.
+    * **stop** (threading.Event, optional): Stops the replay when set.
+
+    **Returns:**
+
+    * **dict**: {tags, steps, updates, elapsed_s, simulated_s, speed, updates_per_sec, max_behind_ms}
+    """
+    start = start or datetime.now(pytz.utc)
+    if start.tzinfo is None:
+
+        start = pytz.utc.localize(start)
+
+    stop = stop or threading.Event()
+    started = time.perf_counter()
+    behind = 0.0
+    step = 0
+    while (not steps or step < steps) and not stop.is_set():
+
+        if speed:
+
+            delay = started + step * period / speed - time.perf_counter()
+            if delay > 0:
+
+                # Event.wait permite detener el replay durante la espera
+                if stop.wait(delay):
+
+                    break
+
+            else:
+
+                behind = max(behind, -delay)
+
+        sink.write(generator.step(), start + timedelta(seconds=step * period))
+        step += 1
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        "tags": len(generator),
+        "steps": step,
+        "updates": step * len(generator),
+        "elapsed_s": round(elapsed, 3),
+        "simulated_s": step * period,
+        "speed": round(step * period / elapsed, 2) if elapsed else None,
+        "updates_per_sec": round(step * len(generator) / elapsed) if elapsed else None,
+        "max_behind_ms": round(behind * 1000, 3)
+    }
+
+
+def write_mapping(file:str, generator:LoadGenerator, node_namespaces:list, opcua_address:str):
+    r"""
+    Writes the tag definitions (name, unit, variable, node namespace) of an OPC UA load test.
+    """
+    with open(file, "w", newline="") as f:
+
+        writer = csv.writer(f)
+        writer.writerow(["name", "unit", "data_type", "variable", "opcua_address", "node_namespace"])
+        for definition in generator.definitions(node_namespaces=node_namespaces, opcua_address=opcua_address):
+
+            writer.writerow([definition[key] for key in ("name", "unit", "data_type", "variable", "opcua_address", "node_namespace")])
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Synthetic load generator and replay tool")
+    parser.add_argument("sources", nargs="*", default=list(DEFAULT_FILES), help="CSV files and/or synthetic signals (sine, random_walk)")
+    parser.add_argument("--target", choices=("cvt", "opcua"), default="cvt")
+    parser.add_argument("--endpoint", default="opc.tcp://0.0.0.0:4841/loadgen/")
+    parser.add_argument("--tags", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=2400, help="Steps to replay (0: until interrupted)")
+    parser.add_argument("--period", type=float, default=1.0, help="Simulated seconds between steps")
+    parser.add_argument("--speed", type=float, default=10.0, help="Simulated seconds per real second (0: as fast as possible)")
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--step-probability", type=float, default=0.0)
+    parser.add_argument("--step-size", type=float, default=1.0)
+    parser.add_argument("--frozen-probability", type=float, default=0.0)
+    parser.add_argument("--frozen-length", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iad", action="store_true", help="Enables the IAD detectors of the CVT tags")
+    parser.add_argument("--mapping", help="Writes the OPC UA tag definitions to this CSV file")
+    args = parser.parse_args()
+    generator = LoadGenerator(
+        tags=args.tags,
+        sources=args.sources,
+        noise=args.noise,
+        step_probability=args.step_probability,
+        step_size=args.step_size,
+        frozen_probability=args.frozen_probability,
+        frozen_length=args.frozen_length,
+        seed=args.seed
+    )
+    if args.target == "opcua":
+
+        sink = OPCUASink(generator.tags, endpoint=args.endpoint)
+        if args.mapping:
+
+            write_mapping(args.mapping, generator, sink.node_namespaces, args.endpoint)
+
+    else:
+
+        from .core import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+        from .tags import CVTEngine
+        detectors = {"outlier_detection": True, "out_of_range_detection": True, "frozen_data_detection": True} if args.iad else dict()
+        CVTEngine().set_tags(generator.definitions(**detectors))
+        CVTEngine().set_iad(enabled=args.iad)
+        sink = CVTSink(generator.tags)
+
+    # El replay corre en un hilo para que Ctrl+C lo detenga y aun así se imprima el reporte
+    stop = threading.Event()
+    report = dict()
+    worker = threading.Thread(
+        target=lambda: report.update(replay(generator, sink, steps=args.steps, period=args.period, speed=args.speed, stop=stop)),
+        daemon=True
+    )
+    worker.start()
+    try:
+        while worker.is_alive():
+
+            worker.join(0.5)
+
+    except KeyboardInterrupt:
+        stop.set()
+        worker.join()
+    finally:
+        sink.close()
+
+    print(json.dumps(report, indent=2))
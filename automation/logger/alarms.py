@@ -5,7 +5,7 @@ This module implements the Alarms Logger, responsible for persisting alarm defin
 alarm status history, and summaries to the database.
 """
 from datetime import datetime
-from ..dbmodels import Alarms, AlarmSummary, AlarmTypes, AlarmStates
+from ..dbmodels import Alarms, AlarmSummary, AlarmTypes, AlarmStates, TagValue
 from .core import BaseEngine, BaseLogger
 from ..alarms.trigger import TriggerType
 from ..alarms.states import AlarmState
@@ -36,7 +36,8 @@ class AlarmsLogger(BaseLogger):
             
             return
         
-        self._db.create_tables(tables, safe=True)
+        # TagValue (particionado por tiempo) lo crea DataLogger, ver BaseLogger.create_tables
+        self._db.create_tables([table for table in tables if table is not TagValue], safe=True)
         self.__init_default_alarms_schema()
 
     @db_rollback
@@ -161,7 +162,8 @@ class AlarmsLogger(BaseLogger):
             greater_than_timestamp:datetime=None,
             less_than_timestamp:datetime=None,
             page:int=1,
-            limit:int=20
+            limit:int=20,
+            cursor:str=None
         ):
         r"""
         Filters alarm history based on various criteria.
@@ -175,6 +177,7 @@ class AlarmsLogger(BaseLogger):
         * **less_than_timestamp** (datetime): End time in UTC.
         * **page** (int): Pagination page.
         * **limit** (int): Entries per page.
+        * **cursor** (str, optional): Keyset pagination cursor.
 
         **Returns:**
 
@@ -199,7 +202,8 @@ class AlarmsLogger(BaseLogger):
             greater_than_timestamp=greater_than_timestamp,
             less_than_timestamp=less_than_timestamp,
             page=page,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
     
     @db_rollback
@@ -444,7 +448,8 @@ class AlarmsLoggerEngine(BaseEngine):
         greater_than_timestamp:datetime=None,
         less_than_timestamp:datetime=None,
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Thread-safe filtering of alarm summary.
@@ -463,6 +468,7 @@ class AlarmsLoggerEngine(BaseEngine):
         _query["parameters"]["less_than_timestamp"] = less_than_timestamp
         _query["parameters"]["page"] = page
         _query["parameters"]["limit"] = limit
+        _query["parameters"]["cursor"] = cursor
         
         return self.query(_query)
     
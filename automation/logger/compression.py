@@ -0,0 +1,266 @@
+r"""
+History compression (swinging door) for the tag logging path.
+
+The CVT dead band decides which updates reach the observers; this module decides which of the
+queued updates are written to `TagValue`. A sample is held back while the straight line from the
+last stored sample to it passes within the compression deviation of every sample held since
+(swinging door: the allowed slopes narrow with each sample). When a new sample falls outside the
+door, the held sample is stored; the last stored sample is also refreshed every max time
+(heartbeat). Linear interpolation between the stored samples reconstructs every dropped sample
+within the deviation.
+
+Defaults come from `AUTOMATION_HISTORY_DEVIATION` (display units, 0 = store every update) and
+`AUTOMATION_HISTORY_MAX_TIME` (seconds, 600 by default); both can be set per tag.
+"""
+import os, threading, time
+
+INFINITY = float("inf")
+
+
+def _is_number(value)->bool:
+
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class SwingingDoor:
+    r"""
+    Swinging door compression state of one tag.
+
+    **Parameters:**
+
+    * **deviation** (float): Compression deviation, in the units of the values.
+    * **max_time** (float): Maximum seconds between stored samples.
+
+    Usage:
+
+    ```python
+    >>> from automation.logger.compression import SwingingDoor
+    >>> door = SwingingDoor(deviation=0.5, max_time=3600)
+    >>> stored = list()
+    >>> for second, value in enumerate([10.0, 10.1, 10.2, 10.3, 10.4, 12.0, 12.0, 12.0]):
+    ...     stored.extend(point for point, _ in door.add({"value": value}, second))
+    >>> [point["value"] for point in stored]
+    [10.0, 10.4, 12.0]
+    >>> [point["value"] for point in door.flush(force=True)]
+    [12.0]
+
+    ```
+    """
+
+    __slots__ = ("deviation", "max_time", "archived", "held", "upper", "lower", "stored_at")
+
+    def __init__(self, deviation:float, max_time:float):
+
+        self.deviation = deviation
+        self.max_time = max_time
+        self.archived = None    # (timestamp, value) del último punto guardado
+        self.held = None        # (item, timestamp) del último punto recibido y no guardado
+        self.upper = INFINITY
+        self.lower = -INFINITY
+        self.stored_at = None   # time.monotonic() del último punto guardado
+
+    def __store(self, item:dict, timestamp:float)->tuple:
+
+        self.archived = (timestamp, item["value"])
+        self.held = None
+        self.upper, self.lower = INFINITY, -INFINITY
+        self.stored_at = time.monotonic()
+
+        return item, timestamp
+
+    def add(self, item:dict, timestamp:float)->list:
+        r"""
+        Processes a new sample.
+
+        **Parameters:**
+
+        * **item** (dict): Queued update ({tag, value, timestamp}).
+        * **timestamp** (float): Sample time in seconds.
+
+        **Returns:**
+
+        * **list**: [(item, timestamp)] samples to store, oldest first.
+        """
+        if self.archived is None:
+
+            return [self.__store(item, timestamp)]
+
+        archived_timestamp, archived_value = self.archived
+        if timestamp <= archived_timestamp:
+
+            # Muestra fuera de orden: se guarda tal cual, sin alterar la puerta
+            return [(item, timestamp)]
+
+        stored = list()
+        elapsed = timestamp - archived_timestamp
+        slope = (item["value"] - archived_value) / elapsed
+
+        if self.lower <= slope <= self.upper and elapsed <= self.max_time:
+
+            # La recta hasta el nuevo punto pasa a menos de `deviation` de todos los retenidos:
+            # la puerta se cierra un poco más y el punto queda retenido
+            self.upper = min(self.upper, (item["value"] + self.deviation - archived_value) / elapsed)
+            self.lower = max(self.lower, (item["value"] - self.deviation - archived_value) / elapsed)
+            self.held = (item, timestamp)
+
+            return stored
+
+        if self.held is not None:
+
+            # El punto retenido cierra el segmento y la puerta vuelve a abrirse desde él
+            stored.append(self.__store(*self.held))
+            archived_timestamp, archived_value = self.archived
+            elapsed = timestamp - archived_timestamp
+            if elapsed > 0 and elapsed <= self.max_time:
+
+                self.upper = (item["value"] + self.deviation - archived_value) / elapsed
+                self.lower = (item["value"] - self.deviation - archived_value) / elapsed
+                self.held = (item, timestamp)
+
+                return stored
+
+        stored.append(self.__store(item, timestamp))
+
+        return stored
+
+    def flush(self, force:bool=False)->list:
+        r"""
+        Stores the held sample when the last stored one is older than `max_time` (heartbeat for
+        tags without updates), or always with `force` (shutdown).
+
+        **Returns:**
+
+        * **list**: Items to store.
+        """
+        if self.held is None:
+
+            return list()
+
+        if force or time.monotonic() - self.stored_at >= self.max_time:
+
+            return [self.__store(*self.held)[0]]
+
+        return list()
+
+
+class HistoryCompressor:
+    r"""
+    Applies swinging door compression to the queued tag updates, with per-tag settings.
+
+    Only numeric values are compressed; other values are stored on every update.
+
+    **Parameters:**
+
+    * **deviation** (float, optional): Default compression deviation. `AUTOMATION_HISTORY_DEVIATION` or 0 (disabled).
+    * **max_time** (float, optional): Default max time in seconds. `AUTOMATION_HISTORY_MAX_TIME` or 600.
+    """
+
+    def __init__(self, deviation:float=None, max_time:float=None):
+
+        self.deviation = float(deviation if deviation is not None else os.environ.get('AUTOMATION_HISTORY_DEVIATION') or 0)
+        self.max_time = float(max_time if max_time is not None else os.environ.get('AUTOMATION_HISTORY_MAX_TIME') or 600)
+        self._settings = dict()     # tag -> (deviation, max_time)
+        self._doors = dict()
+        self._lock = threading.Lock()
+        self.received = 0
+        self.stored = 0
+
+    def configure(self, tag:str, deviation:float=None, max_time:float=None):
+        r"""
+        Sets the compression of a tag. None restores the default of that setting.
+        """
+        with self._lock:
+
+            settings = (
+                self.deviation if deviation is None else float(deviation),
+                self.max_time if max_time is None else float(max_time)
+            )
+            if self._settings.get(tag) != settings:
+
+                self._settings[tag] = settings
+                door = self._doors.get(tag)
+                if door:
+
+                    door.deviation, door.max_time = settings
+
+    def load(self, settings:dict):
+        r"""
+        Loads the per-tag settings {tag: (deviation, max_time)} stored in the database.
+        """
+        for tag, (deviation, max_time) in settings.items():
+
+            self.configure(tag, deviation=deviation, max_time=max_time)
+
+    def settings(self, tag:str)->tuple:
+        r"""
+        Returns the (deviation, max_time) of a tag.
+        """
+        return self._settings.get(tag, (self.deviation, self.max_time))
+
+    def filter(self, items:list)->list:
+        r"""
+        Returns the queued updates that must be stored.
+
+        **Parameters:**
+
+        * **items** (list): Updates ({tag, value, timestamp}) in arrival order.
+
+        **Returns:**
+
+        * **list**: Updates to write to the history.
+        """
+        result = list()
+        with self._lock:
+
+            for item in items:
+
+                self.received += 1
+                deviation, max_time = self.settings(item["tag"])
+                if deviation <= 0 or not _is_number(item["value"]):
+
+                    result.append(item)
+                    continue
+
+                door = self._doors.get(item["tag"])
+                if door is None:
+
+                    door = self._doors[item["tag"]] = SwingingDoor(deviation=deviation, max_time=max_time)
+
+                timestamp = item["timestamp"]
+                timestamp = timestamp.timestamp() if hasattr(timestamp, "timestamp") else float(timestamp)
+                result.extend(stored for stored, _ in door.add(item, timestamp))
+
+            result.extend(self.__flush(force=False))
+            self.stored += len(result)
+
+        return result
+
+    def flush(self, force:bool=False)->list:
+        r"""
+        Returns the held updates due by the max time heartbeat (all of them with `force`).
+        """
+        with self._lock:
+
+            result = self.__flush(force=force)
+            self.stored += len(result)
+
+        return result
+
+    def __flush(self, force:bool)->list:
+
+        result = list()
+        for door in self._doors.values():
+
+            result.extend(door.flush(force=force))
+
+        return result
+
+    def statistics(self)->dict:
+        r"""
+        Returns the received and stored update counters and the compression ratio.
+        """
+        return {
+            "received": self.received,
+            "stored": self.stored,
+            "ratio": round(self.received / self.stored, 2) if self.stored else None
+        }
@@ -3,7 +3,8 @@ from ..singleton import Singleton
 from ..dbmodels import (
     Variables, 
     Units,
-    DataTypes
+    DataTypes,
+    TagValue
     )
 from ..variables import VARIABLES, DATATYPES
 
@@ -97,11 +98,35 @@ class BaseLogger(Singleton):
             
             return
         
-        self._db.create_tables(tables, safe=True)
+        # TagValue se almacena particionado por tiempo (ver dbmodels/partitions.py)
+        self._db.create_tables([table for table in tables if table is not TagValue], safe=True)
+        self.__init_history_partitions(tables)
+        self.__init_text_search_indexes(tables)
         self.__init_default_variables_schema()
         self.__init_default_datatypes_schema()
         self.__init_default_roles_schema()
 
+    def __init_history_partitions(self, tables):
+        r"""
+        Creates the time partitioned storage of TagValue (view or parent table plus the current partition).
+        An existing SQLite table with history is only migrated with `AUTOMATION_HISTORY_MIGRATE=1`.
+        """
+        from ..dbmodels.partitions import HistoryPartitions
+        if TagValue in tables:
+
+            HistoryPartitions(TagValue).create()
+
+    def __init_text_search_indexes(self, tables):
+        r"""
+        Creates the text search index (FTS5 / pg_trgm) of the tables that declare `__search_fields__`.
+        """
+        from ..dbmodels.search import TextSearchIndex
+        for table in tables:
+
+            if getattr(table, "__search_fields__", None):
+
+                TextSearchIndex(table).create()
+
     def __init_default_roles_schema(self):
         r"""
         Initializes default user roles in the database.
@@ -149,6 +174,12 @@ class BaseLogger(Singleton):
             
             return
 
+        from ..dbmodels.partitions import HistoryPartitions
+        if TagValue in tables:
+
+            HistoryPartitions(TagValue).drop_all()
+            tables = [table for table in tables if table is not TagValue]
+
         self._db.drop_tables(tables, safe=True)
 
 class BaseEngine(Singleton):
@@ -4,12 +4,16 @@
 This module implements the Data Logger, responsible for persisting tag values (time-series data)
 and managing tag configurations in the database.
 """
-import pytz, logging, math
-from peewee import fn, SQL
+import pytz, logging, math, os
+from peewee import fn, SQL, SqliteDatabase, MySQLDatabase, Expression
 from collections import defaultdict
 from datetime import datetime, timedelta
 from ..tags.tag import Tag
-from ..dbmodels import Tags, TagValue, Units, Segment, Variables
+from ..dbmodels import Tags, TagValue, TagHistoryCompression, Units, Segment, Variables
+from ..dbmodels.partitions import HistoryPartitions
+from ..dbmodels.rollups import TagRollup, TagRollupCursor
+from ..dbmodels.archive import HistoryArchive
+from ..dbmodels.core import encode_cursor, decode_cursor
 from ..modules.users.users import User
 from ..tags.cvt import CVTEngine
 from .core import BaseLogger, BaseEngine
@@ -31,6 +35,7 @@ class DataLogger(BaseLogger):
 
         super(DataLogger, self).__init__()
         self.tag_engine = CVTEngine()
+        self.archive = HistoryArchive()
 
     @db_rollback
     def set_tag(
@@ -206,7 +211,11 @@ class DataLogger(BaseLogger):
         
         trend = Tags.read_by_name(tag)
         unit = Units.read_by_unit(unit=trend.display_unit.unit)
-        TagValue.create(tag=trend, value=value, timestamp=timestamp, unit=unit)
+        rows = [{"tag": trend, "value": value, "timestamp": timestamp, "unit": unit}]
+        with self._db.atomic():
+
+            HistoryPartitions(TagValue).insert_many(rows)
+            TagRollup.add(rows)
 
     @db_rollback
     def write_tags(self, tags:list):
@@ -216,6 +225,10 @@ class DataLogger(BaseLogger):
         **Parameters:**
 
         * **tags** (list): List of dictionaries containing {'tag': name, 'value': val, 'timestamp': ts}.
+
+        **Returns:**
+
+        * **bool|None**: True if the values were written.
         """
         if not self.is_history_logged:
 
@@ -239,18 +252,22 @@ class DataLogger(BaseLogger):
                     'unit': unit
                 })
         
-        TagValue.insert_many(_tags).execute()
+        with self._db.atomic():
+
+            HistoryPartitions(TagValue).insert_many(_tags)
+            # Rollups de 1 min / 1 h / 1 día usados por read_trends y read_tabular_data
+            TagRollup.add(_tags)
+
+        return True
 
     @db_rollback
     def read_trends(self, start:str, stop:str, timezone:str, tags):
         r"""
         Reads historical data for charting/trending.
         
-        Supports automatic downsampling based on the requested time span:
-        - > 1 week: Daily averages
-        - > 2 days: Hourly averages
-        - > 2 hours: Minute averages
-        - Otherwise: Raw data
+        Supports automatic downsampling based on the requested time span: the span is split in at most
+        2000 buckets per tag. Buckets of 1 minute or more are averaged from the coarsest rollup table
+        (1 minute, 1 hour, 1 day) that fits the bucket; shorter spans return raw data.
 
         **Parameters:**
 
@@ -316,7 +333,14 @@ class DataLogger(BaseLogger):
         ts_epoch = TagValue.timestamp
         ts_tz = fn.to_timestamp(ts_epoch)
 
-        if not use_raw:
+        # Con buckets de 1 minuto o más se leen los rollups en vez de agregar filas crudas
+        rollup = None if use_raw else TagRollup.for_resolution(bucket_seconds, since=start_ts)
+
+        use_rollup = bool(rollup) and self.__rollups_cover(start_ts)
+
+        if use_rollup:
+            self.__read_rollup_trends(rollup, start_ts, stop_ts, bucket_seconds, timezone, tags, result)
+        elif not use_raw:
             # Postgres 17 (vanilla) soporta date_bin(interval, ts, origin) para bucketing arbitrario.
             # Esto evita armar SQL manual con format() (no soportado por peewee.SQL).
             if bucket_seconds >= 86400 and bucket_seconds % 86400 == 0:
@@ -395,6 +419,10 @@ class DataLogger(BaseLogger):
                     result[tag_name]["unit"] = entry.get("tag_value_unit")
                 if "variable" not in result[tag_name]:
                     result[tag_name]["variable"] = entry.get("variable_name")
+
+        if not use_rollup:
+            # El histórico archivado ya no está en la tabla (los rollups sí lo incluyen)
+            self.__read_archive_trends(start_ts, stop_ts, 0 if use_raw else bucket_seconds, timezone, tags, result)
         
         # Asegurar que todos los tags solicitados existan en el resultado (aunque no haya data).
         for tag in tags:
@@ -402,11 +430,226 @@ class DataLogger(BaseLogger):
         
         return result
 
+    def __read_rollup_trends(self, rollup, start_ts:float, stop_ts:float, bucket_seconds:int, timezone:str, tags:list, result:dict):
+        r"""
+        Fills `result` with bucket averages computed from a rollup table.
+
+        The bucket is rounded up to a multiple of the rollup size, so each rollup row falls in exactly
+        one bucket and the average is exact: sum(value_sum) / sum(samples).
+        """
+        seconds = rollup.__seconds__
+        bin_seconds = int(math.ceil(bucket_seconds / float(seconds))) * seconds
+        first_bucket = int(start_ts) - int(start_ts) % seconds
+        # Inicio del bucket por división entera (el operador % de peewee es LIKE/GLOB; MySQL usa DIV)
+        division = "DIV" if isinstance(self.get_db(), MySQLDatabase) else "/"
+        bucket = Expression(rollup.bucket, division, bin_seconds) * bin_seconds
+        target_timezone = pytz.timezone(timezone)
+
+        query = (
+            rollup.select(
+                Tags.name.alias("name"),
+                # Alias distinto de la columna: SQLite resuelve GROUP BY "bucket" a la columna
+                bucket.alias("bucket_start"),
+                (fn.SUM(rollup.value_sum) / fn.SUM(rollup.samples)).alias("value"),
+                Units.unit.alias("tag_value_unit"),
+                Variables.name.alias("variable_name"),
+            )
+            .join(Tags, on=(rollup.tag == Tags.id))
+            .join(Units, on=(Tags.unit == Units.id))
+            .join(Variables, on=(Units.variable_id == Variables.id))
+            .where((rollup.bucket.between(first_bucket, stop_ts)) & (Tags.name.in_(tags)))
+            .group_by(Tags.name, bucket, Units.unit, Variables.name)
+            .order_by(bucket)
+            .dicts()
+        )
+
+        for entry in query:
+            tag_name = entry["name"]
+            bucket_dt = entry["bucket_start"]
+            if not isinstance(bucket_dt, datetime):
+                bucket_dt = datetime.fromtimestamp(int(bucket_dt), pytz.UTC)
+            elif bucket_dt.tzinfo is None:
+                bucket_dt = pytz.UTC.localize(bucket_dt)
+            result[tag_name]["values"].append({
+                "x": bucket_dt.astimezone(target_timezone).strftime(self.tag_engine.DATETIME_FORMAT),
+                "y": entry["value"]
+            })
+            if "unit" not in result[tag_name]:
+                result[tag_name]["unit"] = entry.get("tag_value_unit")
+            if "variable" not in result[tag_name]:
+                result[tag_name]["variable"] = entry.get("variable_name")
+
+        return result
+
+    def __read_archive_trends(self, start_ts:float, stop_ts:float, bucket_seconds:int, timezone:str, tags:list, result:dict):
+        r"""
+        Prepends to `result` the archived samples of the tags in the range: raw, or averaged in
+        buckets of `bucket_seconds` aligned to epoch (as `date_bin` does).
+        """
+        import numpy as np
+        query = (Tags
+            .select(Tags.id, Tags.name.alias("name"), Units.unit.alias("tag_value_unit"), Variables.name.alias("variable_name"))
+            .join(Units, on=(Tags.unit == Units.id))
+            .join(Variables, on=(Units.variable_id == Variables.id))
+            .where(Tags.name.in_(tags))
+            .dicts())
+        target_timezone = pytz.timezone(timezone)
+
+        for entry in query:
+            timestamps, values = self.archive.read(entry["id"], start_ts, stop_ts)
+            if not len(timestamps):
+                continue
+
+            if bucket_seconds > 1:
+                starts, positions, counts = np.unique(timestamps - timestamps % bucket_seconds, return_index=True, return_counts=True)
+                timestamps, values = starts, np.add.reduceat(values, positions) / counts
+
+            tag_name = entry["name"]
+            # El archivo contiene el histórico más antiguo: va antes de los valores de la tabla
+            result[tag_name]["values"][:0] = [
+                {
+                    "x": datetime.fromtimestamp(timestamp, pytz.UTC).astimezone(target_timezone).strftime(self.tag_engine.DATETIME_FORMAT),
+                    "y": value
+                }
+                for timestamp, value in zip(timestamps.tolist(), values.tolist())
+            ]
+            if "unit" not in result[tag_name]:
+                result[tag_name]["unit"] = entry.get("tag_value_unit")
+            if "variable" not in result[tag_name]:
+                result[tag_name]["variable"] = entry.get("variable_name")
+
+        return result
+
+    @db_rollback
+    def read_values(self, tag:str, start:float, stop:float, after:tuple=None, limit:int=100000)->dict:
+        r"""
+        Reads a chunk of raw historical values of a tag in chronological order (keyset pagination).
+
+        Intended for bulk processing (e.g. batch IAD): values are returned as NumPy arrays and
+        timestamps as epoch seconds, without per-row model instantiation.
+
+        **Parameters:**
+
+        * **tag** (str): Tag name.
+        * **start** (float): Start epoch timestamp (UTC).
+        * **stop** (float): Stop epoch timestamp (UTC).
+        * **after** (tuple, optional): (timestamp, id) of the last row of the previous chunk.
+        * **limit** (int): Maximum rows in the chunk.
+
+        **Returns:**
+
+        * **dict**: {timestamps: np.ndarray, values: np.ndarray, last: (timestamp, id) | None}
+        """
+        import numpy as np
+        empty = {"timestamps": np.empty(0), "values": np.empty(0), "last": None}
+        if not self.check_connectivity():
+
+            return empty
+
+        _tag = Tags.get_or_none(Tags.name == tag)
+        if not _tag:
+
+            return empty
+
+        timestamp = fn.COALESCE(TagValue.timestamp, 0).coerce(False)
+        query = (
+            TagValue
+            .select(TagValue.id, timestamp, TagValue.value)
+            .where((TagValue.tag == _tag.id) & (TagValue.timestamp.between(start, stop)))
+        )
+        if after:
+
+            last_timestamp, last_id = after
+            query = query.where(
+                (TagValue.timestamp > last_timestamp) | 
+                ((TagValue.timestamp == last_timestamp) & (TagValue.id > last_id))
+            )
+
+        rows = list(query.order_by(TagValue.timestamp, TagValue.id).limit(limit).tuples())
+        # Muestras archivadas (id 0: van antes que las de la tabla con el mismo timestamp)
+        archive_start = start if not after else max(start, math.floor(after[0]) + 1)
+        timestamps, values = self.archive.read(_tag.id, archive_start, stop, limit=limit)
+        if len(timestamps):
+
+            archived = list(zip([0] * len(timestamps), timestamps.tolist(), values.tolist()))
+            rows = sorted(rows + archived, key=lambda row: (row[1], row[0]))[:limit]
+
+        if not rows:
+
+            return empty
+
+        ids, timestamps, values = zip(*rows)
+
+        return {
+            "timestamps": np.asarray(timestamps, dtype=np.float64),
+            "values": np.asarray(values, dtype=np.float64),
+            "last": (timestamps[-1], ids[-1]) if len(rows) == limit else None
+        }
+
+    def __read_archive_table(self, start_ts:float, stop_ts:float, tags:list)->tuple:
+        r"""
+        Returns the archived samples of the tags in the range as `read_table` rows, newest first.
+
+        Archived rows take `-tag_id` as id: they sort after the table rows with the same timestamp
+        and keep the (timestamp, id) keyset unique.
+
+        **Returns:**
+
+        * **tuple**: (timestamps: np.ndarray, ids: np.ndarray, values: np.ndarray, tags: {tag_id: (name, unit)})
+        """
+        import numpy as np
+        query = (Tags
+            .select(Tags.id, Tags.name.alias("name"), Units.unit.alias("tag_value_unit"))
+            .join(Units, on=(Tags.unit == Units.id))
+            .where(Tags.name.in_(tags))
+            .dicts())
+        timestamps, ids, values, names = list(), list(), list(), dict()
+
+        for entry in query:
+            _timestamps, _values = self.archive.read(entry["id"], start_ts, stop_ts)
+            if not len(_timestamps):
+                continue
+
+            timestamps.append(_timestamps)
+            ids.append(np.full(len(_timestamps), -entry["id"], dtype=np.int64))
+            values.append(_values)
+            names[entry["id"]] = (entry["name"], entry["tag_value_unit"])
+
+        if not timestamps:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), names
+
+        timestamps, ids, values = np.concatenate(timestamps), np.concatenate(ids), np.concatenate(values)
+        order = np.lexsort((ids, timestamps))[::-1]
+
+        return timestamps[order], ids[order], values[order], names
+
+    @staticmethod
+    def __archive_rows(archived:tuple, first:int, last:int)->list:
+        r"""
+        Builds the `read_table` rows `[first, last)` of the archived samples.
+        """
+        timestamps, ids, values, names = archived
+
+        return [
+            {
+                "id": _id,
+                "name": names[-_id][0],
+                "value": value,
+                "timestamp": datetime.fromtimestamp(timestamp, pytz.UTC).replace(tzinfo=None),
+                "tag_value_unit": names[-_id][1]
+            }
+            for timestamp, _id, value in zip(timestamps[first:last].tolist(), ids[first:last].tolist(), values[first:last].tolist())
+        ]
+
     @db_rollback
-    def read_table(self, start:str, stop:str, timezone:str, tags:list, page:int=1, limit:int=20):
+    def read_table(self, start:str, stop:str, timezone:str, tags:list, page:int=1, limit:int=20, cursor:str=None):
         r"""
         Retrieves historical data in a paginated table format.
 
+        Archived history (see `apply_retention`) is merged with the table. The archive holds the
+        history older than the table, so with OFFSET pagination its rows follow the table rows;
+        the keyset cursor merges both by (timestamp, id).
+
         **Parameters:**
 
         * **start** (str): Start datetime string.
@@ -415,6 +658,7 @@ class DataLogger(BaseLogger):
         * **tags** (list): List of tag names.
         * **page** (int): Page number.
         * **limit** (int): Records per page.
+        * **cursor** (str, optional): Keyset pagination cursor over (timestamp, id); "" for the first page. When given, `page` is ignored.
 
         **Returns:**
 
@@ -435,14 +679,68 @@ class DataLogger(BaseLogger):
 
         # Base query
         query = (TagValue
-                .select(Tags.name, TagValue.value, TagValue.timestamp,
+                .select(TagValue.id, Tags.name, TagValue.value, TagValue.timestamp,
                         Units.unit.alias('tag_value_unit'))
                 .join(Tags)
                 .join(Units, on=(Tags.unit == Units.id))
                 .where((TagValue.timestamp.between(start_dt, stop_dt)) & (Tags.name.in_(tags)))
                 .order_by(TagValue.timestamp.desc()))
 
-        total_records = query.count()
+        utc_timezone = pytz.timezone('UTC')
+
+        def serialize(entry:dict)->dict:
+
+            ts_val = entry['timestamp']
+            if isinstance(ts_val, (int, float)):
+                dt_object = datetime.fromtimestamp(ts_val, pytz.UTC)
+            else:
+                # Assuming naive datetime in UTC (based on read_trends using 'UTC' timezone to localize)
+                dt_object = utc_timezone.localize(ts_val) if ts_val.tzinfo is None else ts_val
+
+            return {
+                "timestamp": dt_object.astimezone(_timezone).strftime(DATETIME_FORMAT),
+                "tag_name": entry['name'],
+                "value": f"{entry['value']} {entry['tag_value_unit']}"
+            }
+
+        archived = self.__read_archive_table(start_dt, stop_dt, tags)
+        archived_records = len(archived[0])
+
+        if cursor is not None:
+            # Keyset sobre (timestamp, id): el costo no depende de la profundidad de la página
+            result = TagValue.paginate_by_keyset(
+                query.dicts(),
+                keys=(TagValue.timestamp, TagValue.id),
+                cursor=cursor,
+                limit=limit,
+                serializer=None if archived_records else serialize
+            )
+            if not archived_records:
+                return result
+
+            pagination = result["pagination"]
+            limit = pagination["limit"]
+            timestamps, ids = archived[0], archived[1]
+            values = decode_cursor(cursor)
+            first = 0
+            if values:
+                # Muestras archivadas con (timestamp, id) < cursor: un sufijo del orden descendente
+                _timestamp = pytz.UTC.localize(values[0]).timestamp() if isinstance(values[0], datetime) else values[0]
+                first = int(((timestamps > _timestamp) | ((timestamps == _timestamp) & (ids >= values[1]))).sum())
+
+            rows = result["data"] + self.__archive_rows(archived, first, first + limit + 1)
+            rows.sort(key=lambda row: (row["timestamp"], row["id"]), reverse=True)
+            has_next = pagination["has_next"] or len(rows) > limit
+            rows = rows[:limit]
+            pagination["next_cursor"] = encode_cursor([rows[-1]["timestamp"], rows[-1]["id"]]) if has_next else None
+            pagination["has_next"] = has_next
+            pagination["total_records"] += archived_records
+            pagination["total_pages"] = max(math.ceil(pagination["total_records"] / limit), 1)
+
+            return {"data": [serialize(row) for row in rows], "pagination": pagination}
+
+        live_records = query.count()
+        total_records = live_records + archived_records
         
         # Safe pagination
         if limit <= 0: limit = 20
@@ -454,26 +752,13 @@ class DataLogger(BaseLogger):
         has_next = page < total_pages
         has_prev = page > 1
 
-        paginated_query = query.paginate(page, limit).dicts()
-        
-        data = []
-        utc_timezone = pytz.timezone('UTC')
-        
-        for entry in paginated_query:
-            ts_val = entry['timestamp']
-            if isinstance(ts_val, (int, float)):
-                dt_object = datetime.fromtimestamp(ts_val, pytz.UTC)
-            else:
-                # Assuming naive datetime in UTC (based on read_trends using 'UTC' timezone to localize)
-                dt_object = utc_timezone.localize(ts_val) if ts_val.tzinfo is None else ts_val
-                
-            formatted_ts = dt_object.astimezone(_timezone).strftime(DATETIME_FORMAT)
-            
-            data.append({
-                "timestamp": formatted_ts,
-                "tag_name": entry['name'],
-                "value": f"{entry['value']} {entry['tag_value_unit']}"
-            })
+        offset = (page - 1) * limit
+        data = [serialize(entry) for entry in query.paginate(page, limit).dicts()] if offset < live_records else list()
+
+        if len(data) < limit and archived_records:
+            # Las muestras archivadas siguen a las de la tabla
+            first = max(offset - live_records, 0)
+            data.extend(serialize(row) for row in self.__archive_rows(archived, first, first + limit - len(data)))
 
         return {
             "data": data,
@@ -554,6 +839,14 @@ class DataLogger(BaseLogger):
                 (TagValue.value.is_null(False))
             )
             .scalar())
+
+        # El histórico archivado también cuenta para el rango con datos
+        tag_ids = [tag.id for tag in Tags.select(Tags.id).where(Tags.name.in_(tags))]
+        archived = self.archive.span(tag_ids)
+        if archived:
+            if isinstance(max_ts, datetime):
+                max_ts = (utc_timezone.localize(max_ts) if max_ts.tzinfo is None else max_ts).timestamp()
+            max_ts = archived[1] if max_ts is None else max(float(max_ts), archived[1])
         
         if max_ts is not None:
             if isinstance(max_ts, datetime):
@@ -578,7 +871,7 @@ class DataLogger(BaseLogger):
                 (TagValue.timestamp <= start_dt)
             )
             .limit(1)
-            .count() > 0)
+            .count() > 0) or bool(archived and archived[0] <= start_ts)
         
         if not has_history:
             # 2. If no history, find the first actual data point within the requested range
@@ -592,6 +885,12 @@ class DataLogger(BaseLogger):
                     (TagValue.value.is_null(False))
                 )
                 .scalar())
+
+            first_archived = self.archive.first_after(tag_ids, start_ts) if archived else None
+            if first_archived is not None and first_archived <= stop_ts:
+                if isinstance(min_ts, datetime):
+                    min_ts = (utc_timezone.localize(min_ts) if min_ts.tzinfo is None else min_ts).timestamp()
+                min_ts = first_archived if min_ts is None else min(float(min_ts), first_archived)
             
             if min_ts is None:
                 # No data in range and no history
@@ -631,82 +930,21 @@ class DataLogger(BaseLogger):
         # For DESC order: calculate timestamps from stop backwards
         # Page 1 starts at stop_ts and goes backwards
         page_end_ts = stop_ts - (start_index * sample_time)  # Most recent timestamp for this page
-        page_start_ts = stop_ts - ((end_index - 1) * sample_time)  # Oldest timestamp for this page
-        
-        # Query data needed for this page plus context for forward fill
-        
-        data_points = []
         
-        # 2. Get all changes within the page window (for forward fill calculation)
-        page_start_dt = datetime.fromtimestamp(page_start_ts, pytz.UTC)
-        page_end_dt = datetime.fromtimestamp(page_end_ts, pytz.UTC)
-
-        changes_query = (TagValue
-            .select(Tags.name, TagValue.value, TagValue.timestamp)
-            .join(Tags)
-            .where(
-                (Tags.name.in_(tags)) & 
-                (TagValue.timestamp >= page_start_dt) & 
-                (TagValue.timestamp <= page_end_dt) &
-                (TagValue.value.is_null(False))
-            )
-            .order_by(TagValue.timestamp.asc())
-            .dicts())
-            
-        # Organize changes by timestamp
-        changes_by_ts = defaultdict(dict)
-        for change in changes_query:
-            ts_val = change['timestamp']
-            if isinstance(ts_val, datetime):
-                if ts_val.tzinfo is None:
-                    ts_val = utc_timezone.localize(ts_val)
-                ts = ts_val.timestamp()
-            else:
-                ts = float(ts_val)
-            
-            changes_by_ts[ts][change['name']] = change['value']
-            
-        # 3. Generate tabular data in DESC order (most recent first)
-        # Generate all timestamps for this page in DESC order
+        # Generate all timestamps for this page in DESC order (most recent first)
         num_rows = end_index - start_index
-        timestamps_desc = []
-        for i in range(num_rows):
-            step_ts = page_end_ts - (i * sample_time)
-            timestamps_desc.append(step_ts)
-        
-        # For each timestamp in DESC order, get the value using forward fill
+        timestamps_desc = [page_end_ts - (i * sample_time) for i in range(num_rows)]
+
         # Forward fill: use the most recent value <= timestamp
+        filled = self.__forward_fill(tags, timestamps_desc, sample_time)
+
+        data_points = []
         for step_ts in timestamps_desc:
             step_dt = datetime.fromtimestamp(step_ts, pytz.UTC)
-            
-            # Get values for each tag at this timestamp (forward fill)
-            row_values = []
-            has_data = False
-            
-            # Timestamp column
-            formatted_ts = step_dt.astimezone(_timezone).strftime(DATETIME_FORMAT)
-            row_values.append(formatted_ts)
-            
-            # Get value for each tag (most recent value <= step_ts)
-            for tag_name in tags:
-                last_val_query = (TagValue
-                    .select(TagValue.value)
-                    .join(Tags)
-                    .where((Tags.name == tag_name) & (TagValue.timestamp <= step_dt))
-                    .order_by(TagValue.timestamp.desc())
-                    .limit(1)
-                    .dicts())
-                
-                entry = list(last_val_query)
-                if entry:
-                    val = entry[0]['value']
-                    row_values.append(val)
-                    if val is not None:
-                        has_data = True
-                else:
-                    row_values.append(None)
-            
-            if has_data:
+            row_values = [step_dt.astimezone(_timezone).strftime(DATETIME_FORMAT)]
+            row_values.extend(filled[tag_name].get(step_ts) for tag_name in tags)
+
+            if any(value is not None for value in row_values[1:]):
                 data_points.append(row_values)
         
         # Data points are already in DESC order (most recent first)
@@ -725,6 +963,141 @@ class DataLogger(BaseLogger):
             }
         }
 
+    def __forward_fill(self, tags:list, steps:list, sample_time:int)->dict:
+        r"""
+        Returns the last value at or before each step of every tag: {tag_name: {step: value}}.
+
+        With a rollup no coarser than `sample_time`, the value comes from the `value_last` of the step's
+        bucket (or of the previous bucket with data); raw history is only read when the step falls
+        inside a bucket that has later values.
+        """
+        filled = defaultdict(dict)
+        if not steps:
+
+            return filled
+
+        tag_ids = {tag.name: tag.id for tag in Tags.select(Tags.id, Tags.name).where(Tags.name.in_(tags))}
+        rollup = TagRollup.for_resolution(sample_time, since=min(steps))
+        if rollup and not self.__rollups_cover(min(steps)):
+
+            rollup = None
+
+        for tag_name, tag_id in tag_ids.items():
+
+            if rollup is None:
+
+                for step in steps:
+                    filled[tag_name][step] = self.__last_raw_value(tag_id, step)
+
+                continue
+
+            seconds = rollup.__seconds__
+            first_bucket = round(min(steps)) - round(min(steps)) % seconds
+            query = (rollup
+                .select(rollup.bucket, rollup.value_last, rollup.last_timestamp)
+                .where((rollup.tag == tag_id) & (rollup.bucket.between(first_bucket, max(steps))))
+                .tuples())
+            buckets = {rollup.bucket.db_value(bucket): (value, rollup.last_timestamp.db_value(last)) for bucket, value, last in query}
+            # Último valor anterior al primer bucket de la página (una búsqueda por índice)
+            previous = (rollup
+                .select(rollup.value_last)
+                .where((rollup.tag == tag_id) & (rollup.bucket < first_bucket))
+                .order_by(rollup.bucket.desc())
+                .limit(1)
+                .scalar())
+            ordered = sorted(buckets)
+            index = 0
+
+            for step in sorted(steps):
+
+                # Los timestamps se guardan en segundos enteros
+                point = round(step)
+                bucket = point - point % seconds
+                while index < len(ordered) and ordered[index] < bucket:
+                    previous = buckets[ordered[index]][0]
+                    index += 1
+
+                if bucket in buckets:
+
+                    value, last_timestamp = buckets[bucket]
+                    if last_timestamp > point:
+                        # El bucket tiene valores posteriores al paso: se busca el último valor crudo <= paso
+                        value = self.__last_raw_value(tag_id, step, since=bucket)
+                        value = previous if value is None else value
+
+                    filled[tag_name][step] = value
+
+                else:
+
+                    filled[tag_name][step] = previous
+
+        return filled
+
+    def __last_raw_value(self, tag_id:int, step:float, since:float=None):
+        r"""
+        Returns the last raw value of a tag at or before `step` (and at or after `since`), from the
+        table or, for older history, from the archive.
+        """
+        condition = (TagValue.tag == tag_id) & (TagValue.timestamp <= datetime.fromtimestamp(step, pytz.UTC))
+        if since is not None:
+            condition &= TagValue.timestamp >= datetime.fromtimestamp(since, pytz.UTC)
+        value = TagValue.select(TagValue.value).where(condition).order_by(TagValue.timestamp.desc()).limit(1).scalar()
+        if value is None:
+            # El histórico más antiguo puede estar en el archivo
+            archived = self.archive.last(tag_id, step, since=since)
+            value = archived[1] if archived else None
+        return value
+
+    @db_rollback
+    def read_last_value(self, tag:str, timestamp:float):
+        r"""
+        Reads the last historical value of a tag at or before a timestamp.
+
+        **Parameters:**
+
+        * **tag** (str): Tag name.
+        * **timestamp** (float): Epoch timestamp (UTC).
+
+        **Returns:**
+
+        * **float | None**: Last value, or None if the tag has no history up to `timestamp`.
+        """
+        if not self.check_connectivity():
+
+            return None
+
+        _tag = Tags.get_or_none(Tags.name == tag)
+        if not _tag:
+
+            return None
+
+        return self.__last_raw_value(_tag.id, timestamp)
+
+    def __rollups_cover(self, start_ts:float)->bool:
+        r"""
+        Checks that the rollups include all the raw history from `start_ts` (the backfill of
+        older history may still be running).
+        """
+        cursor = TagRollupCursor.get_or_none(TagRollupCursor.id == 1)
+        if cursor is None:
+
+            return False
+
+        if cursor.completed:
+
+            return True
+
+        pending = (TagValue
+            .select(TagValue.id)
+            .where(
+                (TagValue.timestamp >= datetime.fromtimestamp(start_ts, pytz.UTC)) &
+                (TagValue.timestamp < cursor.pending_before)
+            )
+            .limit(1)
+            .exists())
+
+        return not pending
+
     def _agregate_data_every_seconds(self, query, result, seconds:int, timezone:str="UTC"):
         r"""
         Downsamples data by averaging values within specific time buckets.
@@ -777,6 +1150,198 @@ class DataLogger(BaseLogger):
 
         return Segment.read_all()
 
+    @db_rollback
+    def apply_retention(self, days:float=0, max_size_mb:float=0, archive_days:float=0, tables:tuple=())->list:
+        r"""
+        Expires historical tag values by dropping whole time partitions.
+
+        **Parameters:**
+
+        * **days** (float): Partitions (and archive chunks) older than this many days are dropped (0 keeps all).
+        * **max_size_mb** (float): SQLite only. While the data in the database file exceeds this
+          size, the oldest data is freed first (0 disables it): a closed partition is copied to
+          `db/backups` and dropped, or the oldest day of one of `tables` is deleted. The partition of
+          the current period and the records of the last day are never deleted.
+        * **archive_days** (float): Partitions older than this many days are moved to the compressed
+          archive (0 disables it).
+        * **tables** (tuple): (model, timestamp field) pairs that also count toward `max_size_mb`
+          (e.g. AlarmSummary, Events and Logs).
+
+        The rollup buckets older than the retention of their level are deleted as well.
+
+        **Returns:**
+
+        * **list**: Names of the dropped (or archived) partitions.
+        """
+        if not self.check_connectivity():
+
+            return list()
+
+        history = HistoryPartitions(TagValue)
+        dropped = list()
+        # La partición del siguiente periodo se crea por adelantado, fuera del camino de escritura
+        history.ensure([history.key(datetime.now(pytz.utc) + timedelta(days=1))])
+
+        if archive_days:
+
+            dropped.extend(self.__archive_before(history, datetime.now(pytz.utc) - timedelta(days=archive_days)))
+
+        if days:
+
+            cutoff = datetime.now(pytz.utc) - timedelta(days=days)
+            dropped.extend(history.drop_before(cutoff))
+            self.archive.drop_before(cutoff.timestamp())
+
+        # Los rollups tienen su propia retención por nivel y también ocupan la base SQLite
+        purged = TagRollup.purge_expired()
+        if purged:
+
+            logging.getLogger("pyautomation").info(f"Retention: {purged} rollup buckets deleted")
+
+        db = self.get_db()
+        if max_size_mb and isinstance(db, SqliteDatabase) and db.database != ":memory:":
+
+            # Nunca se borra la partición actual (la que recibe las escrituras) ni las creadas por adelantado
+            partitions = history.closed()
+            resolution = TagValue.timestamp.resolution
+            while self.__sqlite_data_size_mb(db) > max_size_mb:
+
+                # Se libera lo más antiguo: una partición de TagValue o un día de las otras tablas
+                now = datetime.now(pytz.utc).timestamp()
+                candidates = [(partitions[0][1] / resolution, None, None)] if partitions else list()
+                for model, field in tables:
+
+                    first = model.select(fn.MIN(field).coerce(False)).scalar()
+                    if first is not None and first / field.resolution < now - 86400:
+
+                        candidates.append((first / field.resolution, model, field))
+
+                if not candidates:
+
+                    break
+
+                first, model, field = min(candidates, key=lambda candidate: candidate[0])
+                if model is not None:
+
+                    cutoff = datetime.fromtimestamp(min(first + 86400, now - 86400), pytz.utc)
+                    deleted = model.purge_before(field, cutoff)
+                    logging.getLogger("pyautomation").info(f"Size limit: {deleted} {model.__name__} records deleted")
+                    continue
+
+                name = partitions.pop(0)[0]
+                folder = os.path.join(os.path.dirname(db.database), "backups")
+                os.makedirs(folder, exist_ok=True)
+                database_name = os.path.splitext(os.path.basename(db.database))[0]
+                backup_file = os.path.join(folder, f"{database_name}_{name}.db")
+                history.drop(name, backup=backup_file)
+                logging.getLogger("pyautomation").info(f"Backup creado: {backup_file}")
+                dropped.append(name)
+
+        return dropped
+
+    def __archive_before(self, history:HistoryPartitions, cutoff:datetime)->list:
+        r"""
+        Moves the history older than `cutoff` to the archive: whole partitions are archived and
+        dropped; a partially aged legacy partition (or an unpartitioned table) is archived up to
+        `cutoff` and purged in batches.
+        """
+        limit = TagValue.timestamp.db_value(cutoff)
+        stop = limit // TagValue.timestamp.resolution
+        archived = list()
+        partitions = history.partitions()
+        if not partitions:
+
+            # Tabla única (MySQL, o PostgreSQL sin particionar)
+            if self.archive.archive(TagValue, stop=stop):
+
+                TagValue.purge_before(TagValue.timestamp, cutoff)
+
+            return archived
+
+        # La partición actual y las creadas por adelantado nunca se archivan completas
+        closed = [item[0] for item in history.closed()]
+        for name, start, _stop in partitions:
+
+            model = history.partition_model(name)
+            if name in closed and _stop <= limit:
+
+                rows = self.archive.archive(model)
+                history.drop(name)
+                archived.append(name)
+                logging.getLogger("pyautomation").info(f"History partition {name} archived ({rows} values)")
+
+            elif name == history.legacy_table and start < limit:
+
+                if self.archive.archive(model, stop=stop):
+
+                    model.purge_before(model.timestamp, cutoff)
+
+        return archived
+
+    @db_rollback
+    def set_history_compression(self, tag:str, deviation:float=None, max_time:float=None):
+        r"""
+        Stores the history compression settings of a tag.
+
+        **Parameters:**
+
+        * **tag** (str): Tag name.
+        * **deviation** (float, optional): Compression deviation in display units (None = default, 0 = disabled).
+        * **max_time** (float, optional): Maximum seconds between stored samples (None = default).
+
+        **Returns:**
+
+        * **TagHistoryCompression|None**: Settings record, None if the tag does not exist.
+        """
+        if not self.check_connectivity():
+
+            return None
+
+        _tag = Tags.get_or_none(Tags.name == tag)
+        if not _tag:
+
+            return None
+
+        return TagHistoryCompression.set(tag=_tag, deviation=deviation, max_time=max_time)
+
+    @db_rollback
+    def get_history_compression(self)->dict:
+        r"""
+        Returns the history compression settings of the tags: {tag_name: (deviation, max_time)}.
+        """
+        if not self.check_connectivity():
+
+            return dict()
+
+        return TagHistoryCompression.read_all_by_tag_name()
+
+    @db_rollback
+    def backfill_rollups(self, budget:float=1.0)->bool:
+        r"""
+        Folds history written before the rollup tables existed into them, for at most `budget` seconds.
+
+        **Returns:**
+
+        * **bool**: True when the rollups include all the raw history.
+        """
+        if not self.check_connectivity():
+
+            return False
+
+        return TagRollup.backfill(budget=budget)
+
+    @staticmethod
+    def __sqlite_data_size_mb(db)->float:
+        r"""
+        Size of the used pages of a SQLite database; pages of dropped tables go to the freelist
+        and are reused, so they don't count.
+        """
+        page_count = db.execute_sql("PRAGMA page_count").fetchone()[0]
+        freelist_count = db.execute_sql("PRAGMA freelist_count").fetchone()[0]
+        page_size = db.execute_sql("PRAGMA page_size").fetchone()[0]
+
+        return (page_count - freelist_count) * page_size / 1024 / 1024
+
 
 class DataLoggerEngine(BaseEngine):
     r"""
@@ -930,6 +1495,10 @@ class DataLoggerEngine(BaseEngine):
         **Parameters:**
 
         * **tags** (list): List of tag value dictionaries.
+
+        **Returns:**
+
+        * **bool|None**: True if the values were written.
         """
         _query = dict()
         _query["action"] = "write_tags"
@@ -959,6 +1528,49 @@ class DataLoggerEngine(BaseEngine):
         _query["parameters"]["tags"] = tags
         return self.query(_query)
 
+    def read_values(self, tag:str, start:float, stop:float, after:tuple=None, limit:int=100000):
+        r"""
+        Reads a chunk of raw historical values of a tag (thread-safe).
+
+        See `DataLogger.read_values` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "read_values"
+        _query["parameters"] = dict()
+        _query["parameters"]["tag"] = tag
+        _query["parameters"]["start"] = start
+        _query["parameters"]["stop"] = stop
+        _query["parameters"]["after"] = after
+        _query["parameters"]["limit"] = limit
+        return self.query(_query)
+
+    def read_last_value(self, tag:str, timestamp:float):
+        r"""
+        Reads the last historical value of a tag at or before a timestamp (thread-safe).
+        """
+        _query = dict()
+        _query["action"] = "read_last_value"
+        _query["parameters"] = dict()
+        _query["parameters"]["tag"] = tag
+        _query["parameters"]["timestamp"] = timestamp
+        return self.query(_query)
+
+    def read_table(self, start:str, stop:str, timezone:str, tags:list, page:int=1, limit:int=20, cursor:str=None):
+        r"""
+        Reads raw historical values as a paginated table (thread-safe).
+        """
+        _query = dict()
+        _query["action"] = "read_table"
+        _query["parameters"] = dict()
+        _query["parameters"]["start"] = start
+        _query["parameters"]["stop"] = stop
+        _query["parameters"]["timezone"] = timezone
+        _query["parameters"]["tags"] = tags
+        _query["parameters"]["page"] = page
+        _query["parameters"]["limit"] = limit
+        _query["parameters"]["cursor"] = cursor
+        return self.query(_query)
+
     def read_tabular_data(self, start:str, stop:str, timezone:str, tags:list, sample_time:int, page:int=1, limit:int=20):
         r"""
         Reads tabular data (thread-safe).
@@ -983,3 +1595,64 @@ class DataLoggerEngine(BaseEngine):
         _query["action"] = "read_segments"
         _query["parameters"] = dict()
         return self.query(_query)
+
+    def set_history_compression(self, tag:str, deviation:float=None, max_time:float=None):
+        r"""
+        Stores the history compression settings of a tag (thread-safe).
+
+        **Parameters:**
+
+        * **tag** (str): Tag name.
+        * **deviation** (float, optional): Compression deviation in display units.
+        * **max_time** (float, optional): Maximum seconds between stored samples.
+        """
+        _query = dict()
+        _query["action"] = "set_history_compression"
+        _query["parameters"] = dict()
+        _query["parameters"]["tag"] = tag
+        _query["parameters"]["deviation"] = deviation
+        _query["parameters"]["max_time"] = max_time
+        return self.query(_query)
+
+    def get_history_compression(self):
+        r"""
+        Returns the history compression settings of the tags (thread-safe).
+        """
+        _query = dict()
+        _query["action"] = "get_history_compression"
+        _query["parameters"] = dict()
+        return self.query(_query)
+
+    def backfill_rollups(self, budget:float=1.0):
+        r"""
+        Folds older raw history into the rollup tables (thread-safe).
+
+        **Parameters:**
+
+        * **budget** (float): Maximum time in seconds.
+        """
+        _query = dict()
+        _query["action"] = "backfill_rollups"
+        _query["parameters"] = dict()
+        _query["parameters"]["budget"] = budget
+        return self.query(_query)
+
+    def apply_retention(self, days:float=0, max_size_mb:float=0, archive_days:float=0, tables:tuple=()):
+        r"""
+        Archives aged and drops expired history partitions (thread-safe).
+
+        **Parameters:**
+
+        * **days** (float): Retention in days (0 keeps all).
+        * **max_size_mb** (float): SQLite size limit in MB (0 disables it).
+        * **archive_days** (float): Age in days after which history is archived (0 disables it).
+        * **tables** (tuple): (model, timestamp field) pairs that also count toward the size limit.
+        """
+        _query = dict()
+        _query["action"] = "apply_retention"
+        _query["parameters"] = dict()
+        _query["parameters"]["days"] = days
+        _query["parameters"]["max_size_mb"] = max_size_mb
+        _query["parameters"]["archive_days"] = archive_days
+        _query["parameters"]["tables"] = tables
+        return self.query(_query)
@@ -96,7 +96,8 @@ class EventsLogger(BaseLogger):
         less_than_timestamp:datetime=None,
         timezone:str="UTC",
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Filters events based on multiple criteria.
@@ -114,6 +115,7 @@ class EventsLogger(BaseLogger):
         * **timezone** (str): Timezone.
         * **page** (int): Page number.
         * **limit** (int): Records per page.
+        * **cursor** (str, optional): Keyset pagination cursor.
 
         **Returns:**
 
@@ -138,7 +140,8 @@ class EventsLogger(BaseLogger):
             less_than_timestamp=less_than_timestamp,
             timezone=timezone,
             page=page,
-            limit=limit
+            limit=limit,
+            cursor=cursor
             )
 
     def get_summary(self)->tuple[list, str]:
@@ -221,7 +224,8 @@ class EventsLoggerEngine(BaseEngine):
         less_than_timestamp:datetime=None,
         timezone:str='UTC',
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Thread-safe event filtering.
@@ -240,6 +244,7 @@ class EventsLoggerEngine(BaseEngine):
         _query["parameters"]["timezone"] = timezone
         _query["parameters"]["page"] = page
         _query["parameters"]["limit"] = limit
+        _query["parameters"]["cursor"] = cursor
         
         return self.query(_query)
 
@@ -0,0 +1,262 @@
+r"""
+Streaming export of tag history.
+
+History is read from the datalogger in keyset chunks (`read_values`, the same cursor used by the
+batch IAD scan) and written out chunk by chunk as CSV text or Parquet row groups, so the memory
+used by an export does not depend on the requested range.
+
+* **Raw**: one row per logged sample (timestamp, tag, value), tag by tag in chronological order.
+* **Resampled**: one row every `sample_time` seconds with the last value of each tag at or
+  before that time (forward fill), as in `read_tabular_data` but in ascending order.
+
+Parquet output needs the optional `pyarrow` package.
+"""
+import csv, io, math
+from datetime import datetime
+import numpy as np
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+FORMATS = ("csv", "parquet")
+
+
+def parquet_available()->bool:
+    r"""
+    Checks if `pyarrow` is installed (Parquet output).
+    """
+    try:
+
+        import pyarrow.parquet
+
+    except ImportError:
+
+        return False
+
+    return True
+
+
+def iter_values(read_values, tag:str, start:float, stop:float, chunk_size:int):
+    r"""
+    Iterates the raw history of a tag.
+
+    **Parameters:**
+
+    * **read_values** (callable): `read_values(tag, start, stop, after, limit)` of the datalogger.
+    * **tag** (str): Tag name.
+    * **start** (float): Start epoch timestamp (UTC).
+    * **stop** (float): Stop epoch timestamp (UTC).
+    * **chunk_size** (int): Rows per chunk.
+
+    **Returns:**
+
+    * **generator**: (timestamps, values) NumPy arrays in chronological order.
+    """
+    after = None
+    while True:
+
+        chunk = read_values(tag=tag, start=start, stop=stop, after=after, limit=chunk_size)
+        if not chunk or not len(chunk["timestamps"]):
+
+            return
+
+        yield chunk["timestamps"], chunk["values"]
+        after = chunk["last"]
+        if after is None:
+
+            return
+
+
+def raw_chunks(read_values, tags:list, start:float, stop:float, chunk_size:int=10000):
+    r"""
+    Iterates the raw history of the tags.
+
+    **Returns:**
+
+    * **generator**: (timestamps, [tag names, values]) per chunk.
+    """
+    for tag in tags:
+
+        for timestamps, values in iter_values(read_values, tag, start, stop, chunk_size):
+
+            yield timestamps, [[tag] * len(timestamps), values]
+
+
+def resampled_chunks(read_values, read_last_value, tags:list, start:float, stop:float, sample_time:float, chunk_size:int=10000):
+    r"""
+    Iterates the history of the tags resampled every `sample_time` seconds (forward fill).
+
+    Each chunk covers `chunk_size` steps; the raw samples of a chunk are read with the keyset
+    cursor and reduced to the last value at or before each step as they arrive, so at most one
+    raw chunk per tag is held in memory. Steps without data in any tag are skipped.
+
+    **Parameters:**
+
+    * **read_values** (callable): `read_values(tag, start, stop, after, limit)` of the datalogger.
+    * **read_last_value** (callable): `read_last_value(tag, timestamp)` of the datalogger.
+    * **tags** (list): Tag names.
+    * **start** (float): Start epoch timestamp (UTC), first step.
+    * **stop** (float): Stop epoch timestamp (UTC).
+    * **sample_time** (float): Seconds between steps.
+    * **chunk_size** (int): Steps (and raw rows) per chunk.
+
+    **Returns:**
+
+    * **generator**: (steps, [values of each tag]) NumPy arrays, NaN where a tag has no value yet.
+
+    ```python
+    >>> import numpy as np
+    >>> from automation.logger.export import resampled_chunks
+    >>> history = {"FT-01": (np.array([3.0, 7.0, 8.0]), np.array([1.0, 2.0, 3.0]))}
+    >>> def read_values(tag, start, stop, after, limit):
+    ...     timestamps, values = history[tag]
+    ...     mask = (timestamps >= start) & (timestamps <= stop)
+    ...     return {"timestamps": timestamps[mask], "values": values[mask], "last": None}
+    >>> chunks = resampled_chunks(read_values, lambda tag, timestamp: None, ["FT-01"], 0, 10, 2, chunk_size=4)
+    >>> [(steps.tolist(), columns[0].tolist()) for steps, columns in chunks]
+    [([4.0, 6.0], [1.0, 1.0]), ([8.0, 10.0], [3.0, 3.0])]
+
+    ```
+    """
+    if sample_time <= 0 or stop < start:
+
+        return
+
+    total = math.floor((stop - start) / sample_time) + 1
+    # Último valor de cada tag hasta el paso anterior al chunk
+    carry = dict()
+    for tag in tags:
+
+        value = read_last_value(tag=tag, timestamp=start)
+        carry[tag] = np.nan if value is None else value
+
+    lower = start
+    for first in range(0, total, chunk_size):
+
+        steps = start + sample_time * np.arange(first, min(first + chunk_size, total), dtype=np.float64)
+        columns = list()
+        for tag in tags:
+
+            column = np.full(len(steps), carry[tag], dtype=np.float64)
+            # Los timestamps se guardan en segundos enteros: las muestras <= lower ya están en carry
+            for timestamps, values in iter_values(read_values, tag, math.floor(lower) + 1, steps[-1], chunk_size):
+
+                index = np.searchsorted(timestamps, steps, side="right") - 1
+                mask = index >= 0
+                column[mask] = values[index[mask]]
+                carry[tag] = values[-1]
+
+            columns.append(column)
+
+        lower = steps[-1]
+        keep = ~np.all(np.isnan(np.vstack(columns)), axis=0) if columns else np.zeros(len(steps), dtype=bool)
+        if keep.any():
+
+            yield steps[keep], [column[keep] for column in columns]
+
+
+def to_csv(chunks, names:list, timezone)->str:
+    r"""
+    Serializes chunks as CSV text, one string per chunk (the first one with the header).
+
+    **Parameters:**
+
+    * **chunks** (iterable): (timestamps, columns) from `raw_chunks` or `resampled_chunks`.
+    * **names** (list): Column names, timestamp first.
+    * **timezone** (tzinfo): Timezone of the timestamps.
+
+    **Returns:**
+
+    * **generator**: CSV text chunks.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue()
+
+    for timestamps, columns in chunks:
+
+        buffer.seek(0)
+        buffer.truncate()
+        _timestamps = [datetime.fromtimestamp(timestamp, timezone).strftime(DATETIME_FORMAT) for timestamp in timestamps.tolist()]
+        _columns = [
+            [None if value != value else value for value in (column.tolist() if isinstance(column, np.ndarray) else column)]
+            for column in columns
+        ]
+        writer.writerows(zip(_timestamps, *_columns))
+        yield buffer.getvalue()
+
+
+class _Sink(io.RawIOBase):
+    r"""
+    Write-only file that keeps the bytes written since the last `drain`.
+    """
+
+    def __init__(self):
+
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self)->bool:
+
+        return True
+
+    def write(self, data)->int:
+
+        self._buffer += data
+        self._position += len(data)
+
+        return len(data)
+
+    def tell(self)->int:
+
+        return self._position
+
+    def drain(self)->bytes:
+
+        data = bytes(self._buffer)
+        self._buffer.clear()
+
+        return data
+
+
+def to_parquet(chunks, names:list, timezone:str, strings:tuple=())->bytes:
+    r"""
+    Serializes chunks as a Parquet file, one row group per chunk.
+
+    **Parameters:**
+
+    * **chunks** (iterable): (timestamps, columns) from `raw_chunks` or `resampled_chunks`.
+    * **names** (list): Column names, timestamp first.
+    * **timezone** (str): Timezone name of the timestamp column.
+    * **strings** (tuple): Indexes of the text columns (the rest are float64).
+
+    **Returns:**
+
+    * **generator**: Bytes of the file, as each row group is written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [(names[0], pa.timestamp("us", tz=timezone))] +
+        [(name, pa.string() if index in strings else pa.float64()) for index, name in enumerate(names[1:])]
+    )
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+
+        for timestamps, columns in chunks:
+
+            arrays = [pa.array(np.round(timestamps * 1e6).astype(np.int64), type=schema.field(0).type)]
+            arrays.extend(
+                pa.array(column, type=schema.field(index + 1).type, from_pandas=True)
+                for index, column in enumerate(columns)
+            )
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+
+    finally:
+
+        writer.close()
+
+    yield sink.drain()
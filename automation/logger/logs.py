@@ -99,7 +99,8 @@ class LogsLogger(BaseLogger):
         less_than_timestamp:datetime=None,
         timezone:str='UTC',
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Filters logs by various criteria with pagination.
@@ -115,6 +116,7 @@ class LogsLogger(BaseLogger):
         * **less_than_timestamp** (datetime): End time.
         * **timezone** (str): Timezone.
         * **page**, **limit**: Pagination control.
+        * **cursor** (str, optional): Keyset pagination cursor.
         """
         if not self.is_history_logged:
 
@@ -145,7 +147,8 @@ class LogsLogger(BaseLogger):
             less_than_timestamp=less_than_timestamp,
             timezone=timezone,
             page=page,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
 
     @db_rollback  
@@ -226,7 +229,8 @@ class LogsLoggerEngine(BaseEngine):
         less_than_timestamp:datetime=None,
         timezone:str='UTC',
         page:int=1,
-        limit:int=20
+        limit:int=20,
+        cursor:str=None
         ):
         r"""
         Thread-safe log filtering with pagination.
@@ -245,6 +249,7 @@ class LogsLoggerEngine(BaseEngine):
         _query["parameters"]["timezone"] = timezone
         _query["parameters"]["page"] = page
         _query["parameters"]["limit"] = limit
+        _query["parameters"]["cursor"] = cursor
         
         return self.query(_query)
 
@@ -29,6 +29,19 @@ class AlarmManager(Singleton):
         self._alarms:dict[Alarm] = dict()
         self._tag_queue = queue.Queue()
         self.tag_engine = CVTEngine()
+        self._version = 0
+
+    def get_version(self)->int:
+        r"""
+        Retrieves a counter that changes every time an alarm is created, updated or deleted.
+
+        Useful to cache alarm handles (e.g. by name) and look them up again only when definitions change.
+
+        **Returns:**
+
+        * **int**: Definitions version.
+        """
+        return self._version
 
     def get_queue(self)->queue.Queue:
         r"""
@@ -118,6 +131,7 @@ class AlarmManager(Singleton):
         )
         alarm.set_socketio(sio=sio)
         self._alarms[alarm.identifier] = alarm
+        self._version += 1
 
         return alarm, f"Alarm creation successful"
 
@@ -200,6 +214,7 @@ class AlarmManager(Singleton):
             trigger_value=trigger_value
             )
         self._alarms[id] = alarm
+        self._version += 1
 
     @logging_error_handler
     @set_event(message=f"Deleted", classification="Alarm", priority=3, criticity=5)
@@ -215,6 +230,7 @@ class AlarmManager(Singleton):
         if id in self._alarms:
 
             alarm = self._alarms.pop(id)
+            self._version += 1
             alarm.remove_from_service(user=user)
 
         return alarm, f"Alarm: {alarm.name} - Tag: {alarm.tag}"
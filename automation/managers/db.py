@@ -22,6 +22,11 @@ from ..dbmodels import (
     Segment,
     Tags, 
     TagValue, 
+    TagRollupMinute,
+    TagRollupHour,
+    TagRollupDay,
+    TagRollupCursor,
+    TagHistoryCompression,
     AlarmTypes,
     AlarmStates, 
     Alarms,  
@@ -74,6 +79,11 @@ class DBManager(Singleton):
             DataTypes, 
             Tags, 
             TagValue, 
+            TagRollupMinute,
+            TagRollupHour,
+            TagRollupDay,
+            TagRollupCursor,
+            TagHistoryCompression,
             AlarmTypes,
             AlarmStates, 
             Alarms,
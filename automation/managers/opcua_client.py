@@ -10,6 +10,7 @@ from ..logger.datalogger import DataLoggerEngine
 from ..tags import CVTEngine
 from ..utils.decorators import logging_error_handler
 from ..opcua.subscription import DAS
+from ..opcua.health import prometheus_text
 
 class OPCUAClientManager:
     r"""
@@ -27,10 +28,7 @@ class OPCUAClientManager:
         self.logger = DataLoggerEngine()
         self.cvt = CVTEngine()
         self.das = DAS()
-        # Cache in-memory para evitar re-browse costoso al abrir repetidamente dropdowns de Tags
-        # key: (client_name, mode, max_depth, max_nodes) -> {"ts": float, "data": list}
-        self._opcua_variables_cache = {}
-        self._opcua_variables_cache_ttl_s = 300
+        self._clients_by_address = dict()
 
     @logging_error_handler
     def discovery(self, host:str='127.0.0.1', port:int=4840)->list[dict]:
@@ -495,11 +493,9 @@ class OPCUAClientManager:
                             return {"Objects": tree[root_key]}, 200
                     return tree, 200
 
-                # "generic" (default): browse robusto desde Objects folder
-                objects_nodeid = client.get_objects_node()
-                objects_node = client.get_node(objects_nodeid)
-                children = client.browse_tree_generic(
-                    objects_node,
+                # "generic" (default): desde el modelo en memoria del address space (Browse por lotes)
+                client.address_space.watch_model_changes()
+                children = client.address_space.tree(
                     max_depth=int(max_depth),
                     max_nodes=int(max_nodes),
                     include_properties=bool(include_properties),
@@ -544,9 +540,8 @@ class OPCUAClientManager:
         mode_l = (mode or "generic").strip().lower()
 
         def _browse_children_generic():
-            node = client.get_node(NodeId.from_string(node_id))
-            children = client.browse_children_generic(
-                node,
+            children = client.address_space.children(
+                NodeId.from_string(node_id).to_string(),
                 max_nodes=int(max_nodes),
                 include_properties=bool(include_properties),
                 include_property_values=bool(include_property_values),
@@ -662,32 +657,12 @@ class OPCUAClientManager:
         mode_l = (mode or "generic").strip().lower()
 
         def _generic():
-            cache_key = (client_name, mode_l, int(max_depth), int(max_nodes))
-            now = time.time()
-            cached = self._opcua_variables_cache.get(cache_key)
-            if cached and (now - cached.get("ts", 0)) < self._opcua_variables_cache_ttl_s:
-                return {"data": cached.get("data", [])}, 200
-
-            objects_nodeid = client.get_objects_node()
-            objects_node = client.get_node(objects_nodeid)
-            variables = client.browse_variables_generic(
-                objects_node,
+            # El modelo en memoria del address space evita re-browse al abrir los dropdowns de Tags
+            client.address_space.watch_model_changes()
+            variables = client.address_space.variables(
                 max_depth=int(max_depth),
                 max_nodes=int(max_nodes),
             )
-            # guardar cache (evitar crecimiento infinito)
-            self._opcua_variables_cache[cache_key] = {"ts": now, "data": variables}
-            if len(self._opcua_variables_cache) > 12:
-                # remover el más viejo
-                oldest_key = None
-                oldest_ts = None
-                for k, v in self._opcua_variables_cache.items():
-                    ts = v.get("ts", 0)
-                    if oldest_ts is None or ts < oldest_ts:
-                        oldest_ts = ts
-                        oldest_key = k
-                if oldest_key is not None:
-                    self._opcua_variables_cache.pop(oldest_key, None)
             return {"data": variables}, 200
 
         if mode_l == "generic":
@@ -698,9 +673,15 @@ class OPCUAClientManager:
                     return {"data": []}, 500
                 mode_l = "legacy"
 
-        # Legacy: mejor esfuerzo. Si falla, reusar generic.
+        # Legacy: mejor esfuerzo, browse nodo por nodo sin el modelo en memoria.
         try:
-            return _generic()
+            objects_node = client.get_node(client.get_objects_node())
+            variables = client.browse_variables_generic(
+                objects_node,
+                max_depth=int(max_depth),
+                max_nodes=int(max_nodes),
+            )
+            return {"data": variables}, 200
         except Exception:
             return {"data": []}, 500
 
@@ -740,12 +721,59 @@ class OPCUAClientManager:
 
         * **Client**: The connected client object or None.
         """
+        # Caché dirección -> cliente: se valida en O(1) (el cliente puede haber sido renombrado o quitado)
+        client = self._clients_by_address.get(opcua_address)
+        if client is not None and self._clients.get(client.name) is client and client._server_url == opcua_address:
+            return client if client.is_connected() else None
+
+        self._clients_by_address.pop(opcua_address, None)
         for client_name, client in self._clients.items():
-            if opcua_address == client.serialize()["server_url"]:
+            if opcua_address == client._server_url:
                 if client.is_connected():
+                    self._clients_by_address[opcua_address] = client
                     return client
         return None
     
+    @logging_error_handler
+    def get_write_metrics(self)->dict:
+        r"""
+        Returns the write latency metrics of every client.
+
+        **Returns:**
+
+        * **dict**: {client_name: {count, errors, last_ms, mean_ms, p50_ms, p95_ms, max_ms}}
+        """
+        return {client_name: client.write_metrics.summary() for client_name, client in self._clients.items()}
+
+    @logging_error_handler
+    def get_health(self)->dict:
+        r"""
+        Returns the session and subscription health of every client.
+
+        **Returns:**
+
+        * **dict**: {client_name: {connected, connects, reconnects, subscriptions, monitored_items, publishes,
+          publish_rate, keepalives, keepalive_misses, notifications, notification_lag, reads, writes}}
+        """
+        return {
+            client_name: {
+                "connected": client.is_connected(),
+                **client.health.snapshot(),
+                "writes": client.write_metrics.summary()
+            } for client_name, client in list(self._clients.items())
+        }
+
+    @logging_error_handler
+    def get_prometheus_metrics(self, reconnection:dict=None)->str:
+        r"""
+        Returns the health of every client in the Prometheus text format.
+
+        **Parameters:**
+
+        * **reconnection** (dict, optional): Status of the reconnection supervisor.
+        """
+        return prometheus_text(dict(self._clients), reconnection=reconnection)
+
     @logging_error_handler
     def get_client_name_by_address(self, opcua_address:str)->str|None:
         r"""
@@ -798,7 +826,10 @@ class OPCUAClientManager:
 
             if opcua_address==client.serialize()["server_url"]:
                 if client.is_connected():
-                    return self.get_node_attributes(client_name=client_name, namespaces=[namespace])
+                    start = time.perf_counter()
+                    result = self.get_node_attributes(client_name=client_name, namespaces=[namespace])
+                    client.health.read(time.perf_counter() - start, success=bool(result))
+                    return result
     
     @logging_error_handler 
     def get_node_attributes(self, client_name:str, namespaces:list)->list:
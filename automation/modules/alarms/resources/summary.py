@@ -18,7 +18,8 @@ alarms_summary_filter_model = api.model("alarms_summary_filter_model",{
     'less_than_timestamp': fields.DateTime(required=False, default=datetime.now(pytz.utc).astimezone(TIMEZONE), description=f'End time for filtering - DateTime Format: {app.cvt.DATETIME_FORMAT}'),
     'timezone': fields.String(required=False, default=_TIMEZONE, description='Timezone for the query'),
     'page': fields.Integer(required=False, default=1, description='Page number for pagination'),
-    'limit': fields.Integer(required=False, default=20, description='Items per page')
+    'limit': fields.Integer(required=False, default=20, description='Items per page'),
+    'cursor': fields.String(required=False, description='Keyset pagination cursor: "" for the first page, then pagination.next_cursor. Overrides page')
 })
 
     
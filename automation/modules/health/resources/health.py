@@ -1,10 +1,19 @@
-from flask_restx import Namespace, Resource
+import json
+from flask import Response, request
+from flask_restx import Namespace, Resource, fields
 from .... import PyAutomation
 from ....extensions.api import api
+from ....extensions import _api as Api
 
 ns = Namespace("Health", description="Service health and readiness checks")
 app = PyAutomation()
 
+tracing_model = api.model("tracing_model", {
+    'sample_every': fields.Integer(required=False, min=0, description='Traces one out of every N tag updates (0 disables the tracing)'),
+    'group_by': fields.String(required=False, description='Tag attribute used to group the histograms (segment, variable, opcua_client_name...)'),
+    'reset': fields.Boolean(required=False, default=False, description='Drops the collected histograms and traces')
+})
+
 
 @ns.route("/ping")
 class HealthPingResource(Resource):
@@ -25,3 +34,75 @@ class HealthPingResource(Resource):
         }, 200
 
 
+
+
+@ns.route("/opcua")
+class HealthOPCUAResource(Resource):
+    @api.doc(description="Session and subscription health of the OPC UA clients.")
+    @api.response(200, "Success")
+    def get(self):
+        """
+        Returns per OPC UA client: publish rate, notification lag, keep-alive misses,
+        monitored items, polled reads, writes and reconnection state.
+        """
+        return app.get_opcua_health() or dict(), 200
+
+
+@ns.route("/metrics")
+class HealthMetricsResource(Resource):
+    @api.doc(description="OPC UA health metrics in the Prometheus text format.")
+    @api.response(200, "Success")
+    def get(self):
+        """
+        Prometheus scrape endpoint (text exposition format 0.0.4).
+        """
+        return Response(app.get_opcua_prometheus_metrics() or "", mimetype="text/plain; version=0.0.4")
+
+
+@ns.route("/tracing")
+class HealthTracingResource(Resource):
+    @api.doc(security="apikey", description="Per stage latency histograms of the sampled tag updates.", params={"group": "Tag group"})
+    @api.response(200, "Success")
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Returns, per tag group and stage (opcua, cvt.lock, filters.iad, tag.set_value, notify.*,
+        cvt.snapshot, socketio.emit, das.buffer, logger.queue, db.write), the latency since the
+        previous stage and the age since the SourceTimestamp.
+        """
+        return app.get_latency_tracing(group=request.args.get("group")), 200
+
+    @api.doc(security="apikey", description="Configures the latency tracing.")
+    @api.response(200, "Success")
+    @Api.token_required(auth=True)
+    @ns.expect(tracing_model)
+    def put(self):
+        """
+        Changes the sampling rate or the group attribute of the latency tracing.
+        """
+        data = api.payload or dict()
+
+        return app.set_latency_tracing(
+            sample_every=data.get("sample_every"),
+            group_by=data.get("group_by"),
+            reset=bool(data.get("reset", False))
+        ), 200
+
+
+@ns.route("/tracing/export")
+class HealthTracingExportResource(Resource):
+    @api.doc(security="apikey", description="Sampled traces as JSON lines.", params={"limit": "Maximum number of traces"})
+    @api.response(200, "Success")
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Downloads the last sampled traces, one JSON object per line, for offline analysis.
+        """
+        limit = request.args.get("limit", type=int)
+        traces = app.export_latency_traces(limit=limit) or list()
+
+        return Response(
+            "".join(json.dumps(trace) + "\n" for trace in traces),
+            mimetype="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=traces.jsonl"}
+        )
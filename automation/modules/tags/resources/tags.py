@@ -1,5 +1,6 @@
 import pytz
 from datetime import datetime, timedelta
+from flask import Response, stream_with_context
 from flask_restx import Namespace, Resource, fields, reqparse
 from .... import PyAutomation
 from ....extensions.api import api
@@ -23,7 +24,8 @@ query_table_model = api.model("query_table_model",{
     'less_than_timestamp': fields.DateTime(required=True, default=datetime.now(pytz.utc).astimezone(TIMEZONE), description='End DateTime'),
     'timezone': fields.String(required=True, default=_TIMEZONE, description='Timezone for the query'),
     'page': fields.Integer(required=False, default=1, description='Page number'),
-    'limit': fields.Integer(required=False, default=20, description='Items per page')
+    'limit': fields.Integer(required=False, default=20, description='Items per page'),
+    'cursor': fields.String(required=False, description='Keyset pagination cursor: "" for the first page, then pagination.next_cursor. Overrides page')
 })
 
 query_tabular_data_model = api.model("query_tabular_data_model",{
@@ -36,11 +38,34 @@ query_tabular_data_model = api.model("query_tabular_data_model",{
     'limit': fields.Integer(required=False, default=20, description='Items per page')
 })
 
+export_history_model = api.model("export_history_model", {
+    'tags':  fields.List(fields.String(), required=True, description='List of tag names to export'),
+    'greater_than_timestamp': fields.DateTime(required=True, default=datetime.now(pytz.utc).astimezone(TIMEZONE) - timedelta(days=1), description='Start DateTime'),
+    'less_than_timestamp': fields.DateTime(required=True, default=datetime.now(pytz.utc).astimezone(TIMEZONE), description='End DateTime'),
+    'timezone': fields.String(required=True, default=_TIMEZONE, description='Timezone for the query and the exported timestamps'),
+    'sample_time': fields.Integer(required=False, description='Resampling interval in seconds (forward fill). Omit for raw samples'),
+    'format': fields.String(required=False, default='csv', description='csv or parquet')
+})
+
+iad_scan_model = api.model("iad_scan_model", {
+    'tag': fields.String(required=True, description='Tag name to scan'),
+    'greater_than_timestamp': fields.DateTime(required=True, default=datetime.now(pytz.utc).astimezone(TIMEZONE) - timedelta(days=1), description='Start DateTime'),
+    'less_than_timestamp': fields.DateTime(required=True, default=datetime.now(pytz.utc).astimezone(TIMEZONE), description='End DateTime'),
+    'timezone': fields.String(required=True, default=_TIMEZONE, description='Timezone for the query'),
+    'algorithms': fields.List(fields.String(), required=False, description='frozen_data, outlier, out_of_range (all by default)'),
+    'low': fields.Float(required=False, description='Lower instrument range (out_of_range)'),
+    'high': fields.Float(required=False, description='Upper instrument range (out_of_range)')
+})
+
 write_value_model = api.model("write_value_model", {
     'tag_name': fields.String(required=True, description='Tag Name'),
     'value': fields.Raw(required=True, description='Value to write (float, int, bool, str)')
 })
 
+write_values_model = api.model("write_values_model", {
+    'values': fields.List(fields.Nested(write_value_model), required=True, description='Values to write [{tag_name, value}]')
+})
+
 create_tag_model = api.model("create_tag_model", {
     'name': fields.String(required=True, description='Unique tag name'),
     'unit': fields.String(required=True, description='Engineering unit'),
@@ -214,6 +239,123 @@ class TagsNamesCollection(Resource):
         names = args.get('names')
         return app.get_tags_by_names(names=names or []), 200
     
+@ns.route('/snapshot')
+class TagsSnapshotCollection(Resource):
+
+    parser = reqparse.RequestParser()
+    parser.add_argument('names', type=str, action='append', location='args', help='List of tag names to retrieve')
+
+    @api.doc(security='apikey', description="Retrieves current tag values from the shared-memory snapshot published by the acquisition process.")
+    @api.response(200, "Success")
+    @ns.expect(parser)
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Get tags snapshot.
+
+        Retrieves current value, quality and timestamp of tags without going through the acquisition process,
+        so it can be served by any API worker. Returns all published tags when no names are provided.
+        """
+        args = self.parser.parse_args()
+        names = args.get('names')
+        data = list()
+        for record in app.read_tag_snapshot(names=names) or list():
+
+            timestamp = record['timestamp']
+            if timestamp:
+
+                timestamp = timestamp.astimezone(TIMEZONE).strftime("%m/%d/%Y, %H:%M:%S.%f")
+
+            record['timestamp'] = timestamp
+            data.append(record)
+
+        return {'data': data}, 200
+
+@ns.route('/values')
+class TagsValuesCollection(Resource):
+
+    parser = reqparse.RequestParser()
+    parser.add_argument('names', type=str, action='append', location='args', help='List of tag names to retrieve')
+    parser.add_argument('since', type=int, location='args', help='Only tags changed after this sequence number')
+
+    @api.doc(security='apikey', description="Retrieves current tag values from the columnar store of the CVT.")
+    @api.response(200, "Success")
+    @ns.expect(parser)
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Get tag values.
+
+        Retrieves current value, quality and timestamp (epoch seconds) of the tags in one read.
+        Pass the returned sequence as `since` to get only the tags changed after this read.
+        """
+        args = self.parser.parse_args()
+        result = app.get_tag_values(names=args.get('names'), since=args.get('since'))
+        if result is None:
+
+            return {'message': "Could not read tag values"}, 400
+
+        return result, 200
+
+@ns.route('/values/frame')
+class TagsValuesFrameResource(Resource):
+
+    parser = reqparse.RequestParser()
+    parser.add_argument('names', type=str, action='append', location='args', help='List of tag names to retrieve')
+    parser.add_argument('since', type=int, location='args', help='Only tags changed after this sequence number')
+
+    @api.doc(security='apikey', description="Retrieves current tag values as a compact binary frame (application/octet-stream).")
+    @api.response(200, "Success")
+    @ns.expect(parser)
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Get tag values frame.
+
+        Header (40 bytes, little endian): magic 'PYAUTCVT', version, count, generation, sequence, creation time.
+        Records (25 bytes): slot, value, timestamp, quality, data type. Map slots to names with /values/index,
+        which only has to be fetched again when the generation changes.
+        """
+        args = self.parser.parse_args()
+        frame = app.get_tag_values_frame(names=args.get('names'), since=args.get('since'))
+        if frame is None:
+
+            return {'message': "Could not read tag values"}, 400
+
+        return Response(frame, mimetype="application/octet-stream")
+
+@ns.route('/values/index')
+class TagsValuesIndexResource(Resource):
+
+    @api.doc(security='apikey', description="Retrieves the slot -> tag name map of the binary values frames.")
+    @api.response(200, "Success")
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Get tag values frame index.
+        """
+        index = app.get_tag_values_frame_index()
+        if index is None:
+
+            return {'message': "Could not read tag values index"}, 400
+
+        return index, 200
+
+@ns.route('/stale')
+class TagsStaleCollection(Resource):
+
+    @api.doc(security='apikey', description="Retrieves the tags whose samples stopped arriving.")
+    @api.response(200, "Success")
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Get stale tags.
+
+        Polled tags (scan time > 100 ms) are stale after several scan periods without samples; their quality is
+        UncertainLastUsableValue until the next sample arrives.
+        """
+        return {'data': app.get_stale_tags() or list()}, 200
+
 @ns.route('/query_trends')
 class QueryTrendsResource(Resource):
 
@@ -277,6 +419,7 @@ class QueryTableResource(Resource):
         tags = api.payload['tags']
         page = api.payload.get('page', 1)
         limit = api.payload.get('limit', 20)
+        cursor = api.payload.get('cursor')
 
         if "timezone" in api.payload:
             timezone = api.payload["timezone"]
@@ -296,7 +439,7 @@ class QueryTableResource(Resource):
         less_than_timestamp = api.payload['less_than_timestamp']
         stop = less_than_timestamp.replace("T", " ").split(separator, 1)[0] + '.00'
         
-        result = app.get_tags_tables(start, stop, timezone, tags, page, limit)
+        result = app.get_tags_tables(start, stop, timezone, tags, page, limit, cursor)
         
         return result, 200
     
@@ -352,6 +495,114 @@ class GetTabularDataResource(Resource):
         
         return result, 200
 
+@ns.route('/export')
+class ExportHistoryResource(Resource):
+
+    @api.doc(security='apikey', description="Streams tag history as CSV or Parquet.")
+    @api.response(200, "Success")
+    @api.response(400, "Invalid parameters or Timezone")
+    @api.response(404, "Tag not found")
+    @Api.token_required(auth=True)
+    @ns.expect(export_history_model)
+    def post(self):
+        """
+        Export history.
+
+        Streams the history of the tags in chunks, without loading the whole range in memory.
+        Without sample_time the raw samples are exported (timestamp, tag, value); with sample_time
+        one row per interval with a column per tag (forward fill). Parquet needs pyarrow.
+        """
+        from ....logger.export import FORMATS, parquet_available
+        timezone = api.payload.get("timezone", _TIMEZONE)
+        tags = api.payload['tags']
+        sample_time = api.payload.get('sample_time')
+        format = api.payload.get('format') or 'csv'
+
+        if timezone not in pytz.all_timezones:
+
+            return f"Invalid Timezone", 400
+
+        if sample_time is not None and (not isinstance(sample_time, int) or sample_time <= 0):
+
+            return {'message': 'sample_time must be a positive integer greater than 0'}, 400
+
+        if format not in FORMATS:
+
+            return {'message': f"Invalid format {format}. Available formats: {list(FORMATS)}"}, 400
+
+        if format == 'parquet' and not parquet_available():
+
+            return {'message': 'Parquet export requires pyarrow'}, 400
+
+        for tag in tags:
+
+            if not app.get_tag_by_name(name=tag):
+
+                return f"{tag} not exist into db", 404
+
+        separator = '.'
+        start = api.payload['greater_than_timestamp'].replace("T", " ").split(separator, 1)[0] + '.00'
+        stop = api.payload['less_than_timestamp'].replace("T", " ").split(separator, 1)[0] + '.00'
+        chunks = app.export_history(start, stop, timezone, tags, sample_time=sample_time, format=format)
+        mimetype = 'application/vnd.apache.parquet' if format == 'parquet' else 'text/csv'
+
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=history.{format}"}
+        )
+
+@ns.route('/iad_scan')
+class IADScanResource(Resource):
+
+    @api.doc(security='apikey', description="Runs Instrument Anomaly Detection over a tag's history.")
+    @api.response(200, "Success")
+    @api.response(400, "Invalid parameters or Timezone")
+    @api.response(404, "Tag not found")
+    @Api.token_required(auth=True)
+    @ns.expect(iad_scan_model)
+    def post(self):
+        """
+        IAD scan.
+
+        Evaluates frozen data, outlier and out of range detection over the historical values of a tag
+        and returns the anomaly intervals per algorithm. The conditions are the ones of the online
+        detectors (outliers use the same EWMA).
+        """
+        from ....iad.batch import ALGORITHMS
+        timezone = api.payload.get("timezone", _TIMEZONE)
+        tag = api.payload['tag']
+        algorithms = api.payload.get('algorithms') or list(ALGORITHMS)
+
+        if timezone not in pytz.all_timezones:
+
+            return f"Invalid Timezone", 400
+
+        for algorithm in algorithms:
+
+            if algorithm not in ALGORITHMS:
+
+                return {'message': f"Invalid algorithm {algorithm}. Available algorithms: {list(ALGORITHMS)}"}, 400
+
+        if not app.get_tag_by_name(name=tag):
+
+            return f"{tag} not exist into db", 404
+
+        separator = '.'
+        start = api.payload['greater_than_timestamp'].replace("T", " ").split(separator, 1)[0] + '.00'
+        stop = api.payload['less_than_timestamp'].replace("T", " ").split(separator, 1)[0] + '.00'
+        result = app.scan_iad(
+            tag=tag,
+            start=start,
+            stop=stop,
+            timezone=timezone,
+            algorithms=algorithms,
+            low=api.payload.get('low'),
+            high=api.payload.get('high')
+        )
+
+        return result, 200
+
 @ns.route('/write_value')
 class WriteValueResource(Resource):
 
@@ -414,6 +665,67 @@ class WriteValueResource(Resource):
         final_status = 200 if opcua_status in (200, None) else 207  # 207 = Multi-Status
         return result, final_status
 
+@ns.route('/write_values')
+class WriteValuesResource(Resource):
+
+    @api.doc(security='apikey', description="Writes several tag values (one OPC UA Write call per server).")
+    @api.response(200, "Success (CVT and OPC UA if applicable)")
+    @api.response(207, "Partial Success")
+    @api.response(404, "Tag not found")
+    @Api.token_required(auth=True)
+    @ns.expect(write_values_model)
+    def post(self):
+        """
+        Write tag values.
+
+        Writes the values to the Current Value Table (CVT). The values of tags mapped to OPC UA
+        nodes are written to each server with a single Write service call.
+
+        Authorized Roles: {0}
+        """
+        values = api.payload['values']
+        tags = list()
+        for item in values:
+
+            tag = app.cvt.get_tag_by_name(name=item['tag_name'])
+            if not tag:
+
+                return {'message': f"Tag {item['tag_name']} does not exist", 'success': False}, 404
+
+            tags.append(tag)
+
+        results = list()
+        writes = list()
+        timestamp = datetime.now(pytz.utc).astimezone(TIMEZONE)
+        for tag, item in zip(tags, values):
+
+            result = {'tag': tag.name, 'value': item['value'], 'cvt_success': True, 'opcua_success': None, 'opcua_detail': None}
+            try:
+
+                app.cvt.set_value(id=tag.id, value=item['value'], timestamp=timestamp)
+
+            except Exception as err:
+
+                result.update({'cvt_success': False, 'message': f'Error writing to CVT: {str(err)}'})
+
+            if result['cvt_success'] and tag.node_namespace and tag.opcua_address:
+
+                writes.append((len(results), {'opcua_address': tag.opcua_address, 'node_namespace': tag.node_namespace, 'value': item['value']}))
+
+            results.append(result)
+
+        if writes:
+
+            opcua_results, _ = app.write_opcua_values([write for _, write in writes])
+            for (index, _), opcua_result in zip(writes, opcua_results):
+
+                results[index]['opcua_success'] = opcua_result['success']
+                results[index]['opcua_detail'] = opcua_result
+
+        success = all(result['cvt_success'] and result['opcua_success'] is not False for result in results)
+
+        return {'values': results, 'success': success}, 200 if success else 207
+
 @ns.route('/add')
 class AddTagResource(Resource):
 
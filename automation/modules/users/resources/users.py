@@ -10,6 +10,7 @@ from ....extensions.api import api
 from ....extensions import _api as Api
 from ....modules.users.users import Users as CVTUsers
 from ....dbmodels.users import Users
+from ....modules.users.token_cache import token_cache
 
 DATETIME_FORMAT = "%m/%d/%Y, %H:%M:%S"
 ns = Namespace('Users', description='User Management and Authentication')
@@ -599,4 +600,19 @@ class CreateTPTResource(Resource):
         except Exception as err:
             logger = logging.getLogger("pyautomation")
             logger.error(f"Error creating TPT: {str(err)}")
-            return {'message': f'Error creating token: {str(err)}'}, 500
\ No newline at end of file
+            return {'message': f'Error creating token: {str(err)}'}, 500
+
+@ns.route('/token_cache')
+class TokenCacheResource(Resource):
+
+    @api.doc(security='apikey', description="Returns the API token verification cache metrics.")
+    @api.response(200, "Success")
+    @Api.token_required(auth=True)
+    @Api.auth_role_level(1)
+    def get(self):
+        """
+        Token cache stats.
+
+        Returns size, hit rate, evictions, expirations and invalidations of the token verification cache.
+        """
+        return token_cache.get_stats(), 200
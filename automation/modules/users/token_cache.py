@@ -0,0 +1,266 @@
+import logging, os, threading, time
+from collections import OrderedDict
+from ...singleton import Singleton
+
+
+class TokenCache(Singleton):
+    r"""
+    Bounded TTL cache of validated API tokens.
+
+    Maps a token to the identity resolved when it was validated (username, role name and role level),
+    so authenticated requests with a cached token don't touch the database or decode a JWT again.
+
+    Entries expire after `ttl` seconds and the least recently used entry is evicted when the cache
+    holds `max_size` tokens. Logout, password changes, role changes and user deletion must invalidate
+    the affected entries explicitly.
+
+    The cache lives in each process, so with several API workers (e.g. gunicorn) an invalidation only
+    removes the entries of the worker that handled it. To revoke the token in the other workers too,
+    every shared invalidation (logout, password, role and user deletion) replaces a shared revocation marker file (`AUTOMATION_TOKEN_REVOCATION_PATH` or
+    `./db/token_revocation`); a worker that sees a new marker drops all its cached tokens, which are
+    then validated against the database again. Workers on other hosts don't share the marker: for them
+    a revoked token stays valid for at most `ttl` seconds. A new login only drops the previous token of
+    the user in the worker that handled it; in the other workers it expires after `ttl` seconds.
+
+    Usage:
+
+    ```python
+    >>> import os, shutil, tempfile
+    >>> from automation.modules.users.token_cache import TokenCache
+    >>> cache = TokenCache()
+    >>> marker, cache.marker = cache.marker, os.path.join(tempfile.mkdtemp(), "token_revocation")
+    >>> cache.clear()
+    >>> _ = cache.put(token="abc", username="jdoe", role_name="operator", role_level=10)
+    >>> cache.get(token="abc")["role_level"]
+    10
+    >>> cache.invalidate_user(username="jdoe")
+    1
+    >>> cache.get(token="abc") is None
+    True
+    >>> shutil.rmtree(os.path.dirname(cache.marker))
+    >>> cache.marker = marker
+    >>> cache.clear()
+
+    ```
+    """
+
+    def __init__(self, ttl:float=None, max_size:int=None, marker:str=None):
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.ttl = float(ttl or os.environ.get('AUTOMATION_TOKEN_CACHE_TTL') or 60.0)
+        self.max_size = int(max_size or os.environ.get('AUTOMATION_TOKEN_CACHE_SIZE') or 1024)
+        self.marker = marker or os.environ.get('AUTOMATION_TOKEN_REVOCATION_PATH') or os.path.join(".", "db", "token_revocation")
+        self._marker_version = self.__marker_version()
+        self.__reset_stats()
+
+    def __marker_version(self)->tuple|None:
+
+        try:
+
+            stat = os.stat(self.marker)
+
+        except OSError:
+
+            return None
+
+        # El marcador se reemplaza (archivo nuevo) en cada revocación: cambia el inode aunque el mtime no
+        return stat.st_ino, stat.st_mtime_ns
+
+    def __check_marker(self):
+        r"""
+        Drops every cached token if another worker revoked tokens since the last check (lock held).
+        """
+        version = self.__marker_version()
+        if version != self._marker_version:
+
+            self._marker_version = version
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def __revoke(self):
+        r"""
+        Replaces the revocation marker so the other workers drop their cached tokens (lock held).
+        """
+        try:
+
+            folder = os.path.dirname(self.marker)
+            if folder:
+
+                os.makedirs(folder, exist_ok=True)
+
+            temporary = f"{self.marker}.{os.getpid()}.tmp"
+            with open(temporary, "w") as file:
+
+                file.write(f"{time.time()}\n")
+
+            os.replace(temporary, self.marker)
+            self._marker_version = self.__marker_version()
+
+        except OSError as err:
+
+            logging.getLogger("pyautomation").warning(f"Token revocation marker {self.marker} not updated: {err}")
+
+    def __reset_stats(self):
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, token:str)->dict|None:
+        r"""
+        Returns the cached identity of a token, or None if it is unknown or expired.
+
+        **Parameters:**
+
+        * **token** (str): API token (X-API-KEY or Authorization header).
+
+        **Returns:**
+
+        * **dict|None**: {"username", "role_name", "role_level", "third_party"}
+        """
+        with self._lock:
+
+            self.__check_marker()
+            entry = self._entries.get(token)
+
+            if entry is None:
+
+                self._misses += 1
+                return None
+
+            if entry["expires"] <= time.monotonic():
+
+                del self._entries[token]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self._hits += 1
+
+            return entry["identity"]
+
+    def put(self, token:str, username:str=None, role_name:str=None, role_level:int=None, third_party:bool=False, ttl:float=None):
+        r"""
+        Stores a validated token.
+
+        **Parameters:**
+
+        * **token** (str): API token.
+        * **username** (str): Owner of the token, None for third party tokens.
+        * **role_name** (str): Role name resolved for the token.
+        * **role_level** (int): Role level resolved for the token.
+        * **third_party** (bool): True if the token is a Third Party Token (JWT).
+        * **ttl** (float, optional): Overrides the default time to live, in seconds.
+
+        **Returns:**
+
+        * **dict**: The cached identity.
+        """
+        identity = {
+            "username": username,
+            "role_name": role_name,
+            "role_level": role_level,
+            "third_party": third_party
+        }
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+
+            self._entries[token] = {"identity": identity, "expires": expires}
+            self._entries.move_to_end(token)
+
+            while len(self._entries) > self.max_size:
+
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return identity
+
+    def invalidate(self, token:str, shared:bool=True)->bool:
+        r"""
+        Removes a single token (e.g. on logout), here and in the other workers.
+
+        **Parameters:**
+
+        * **token** (str): API token.
+        * **shared** (bool): Also revoke it in the other workers (rewrites the revocation marker,
+          so they drop their whole cache).
+
+        **Returns:**
+
+        * **bool**: True if the token was cached.
+        """
+        with self._lock:
+
+            if shared:
+
+                self.__revoke()
+
+            if self._entries.pop(token, None) is not None:
+
+                self._invalidations += 1
+                return True
+
+            return False
+
+    def invalidate_user(self, username:str)->int:
+        r"""
+        Removes every token owned by a user (password change, role change or deletion),
+        here and in the other workers.
+
+        **Returns:**
+
+        * **int**: Number of removed tokens.
+        """
+        with self._lock:
+
+            self.__revoke()
+            tokens = [token for token, entry in self._entries.items() if entry["identity"]["username"] == username]
+
+            for token in tokens:
+
+                del self._entries[token]
+
+            self._invalidations += len(tokens)
+
+            return len(tokens)
+
+    def clear(self):
+        r"""
+        Removes every cached token and resets the statistics.
+        """
+        with self._lock:
+
+            self._entries.clear()
+            self._marker_version = self.__marker_version()
+            self.__reset_stats()
+
+    def get_stats(self)->dict:
+        r"""
+        Returns cache effectiveness metrics.
+
+        **Returns:**
+
+        * **dict**: size, max_size, ttl, hits, misses, hit_rate, evictions, expirations and invalidations.
+        """
+        with self._lock:
+
+            lookups = self._hits + self._misses
+
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations
+            }
+
+token_cache = TokenCache()
@@ -1,7 +1,7 @@
 import secrets
-from werkzeug.security import generate_password_hash, check_password_hash
 from ...singleton import Singleton
 from .roles import Role, Roles
+from .token_cache import token_cache
 
 
 
@@ -90,14 +90,17 @@ class Auth:
         user.logout()
     
     def encode(self, value:str)->str:
+        from werkzeug.security import generate_password_hash
 
         return generate_password_hash(value)
 
     def decode_password(self, user:User, password:str)->str:
+        from werkzeug.security import check_password_hash
 
         return check_password_hash(user.password, password)
     
     def decode_token(self, user:User, token:str)->str:
+        from werkzeug.security import check_password_hash
 
         return check_password_hash(user.token, token)
     
@@ -188,6 +191,8 @@ class Users(Singleton):
         r"""
         Documentation here
         """        
+        token_cache.invalidate(token=token)
+
         if token in self.active_users:
 
             user = self.active_users.pop(token)
@@ -326,6 +331,7 @@ class Users(Singleton):
         return False
     
     def encode(self, value:str)->str:
+        from werkzeug.security import generate_password_hash
 
         return generate_password_hash(value)
     
@@ -352,12 +358,14 @@ class Users(Singleton):
             return None, f"Role {new_role_name} not found"
         
         user.role = new_role
+        token_cache.invalidate_user(username=username)
         
         return user, f"Role updated successfully for {username}"
     
     def _delete_all(self):
         
         self.__reset()
+        token_cache.clear()
 
     def serialize(self):
         r"""
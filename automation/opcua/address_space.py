@@ -0,0 +1,418 @@
+r"""
+In-memory model of the address space of an OPC UA server.
+
+`Client.browse_tree_generic` and friends walk the server node by node (one Browse per node plus
+one Read per attribute). The address space cache instead browses a whole level of the tree with
+one Browse request (BrowseNext for the continuation points) and takes display name and node class
+from the returned references, so the HMI tree and the variables list are answered from memory
+after the first walk.
+
+Entries are refreshed incrementally: a node is browsed again when it is traversed after `ttl`
+seconds, or right away after a GeneralModelChangeEvent of the server names it.
+"""
+import logging, threading, time
+from opcua import ua
+
+OBJECTS_FOLDER = ua.NodeId(ua.ObjectIds.ObjectsFolder).to_string()
+HAS_PROPERTY = ua.NodeId(ua.ObjectIds.HasProperty)
+
+
+class AddressSpace:
+    r"""
+    Address space cache of one OPC UA client.
+
+    **Parameters:**
+
+    * **client** (Client): Connected OPC UA client.
+    * **ttl** (float): Seconds before a browsed node is browsed again.
+    * **batch_size** (int): Nodes per Browse/Read request (the server may lower it with BadTooManyOperations).
+    """
+
+    def __init__(self, client, ttl:float=300, batch_size:int=500):
+
+        self.client = client
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self._nodes = dict()        # nodeid -> {title, NodeClass, property, children: [nodeid] | None, browsed_at}
+        self._lock = threading.RLock()
+        self._subscription = None
+        self.requests = 0           # Browse/BrowseNext/Read enviados (diagnóstico)
+
+    def clear(self):
+        r"""
+        Drops every cached node (new session or server restart).
+        """
+        with self._lock:
+
+            self._nodes.clear()
+
+        self._subscription = None
+
+    def invalidate(self, nodeids:list=None):
+        r"""
+        Marks nodes to be browsed again on their next traversal (all of them when `nodeids` is None).
+        """
+        with self._lock:
+
+            for nodeid in (self._nodes if nodeids is None else nodeids):
+
+                entry = self._nodes.get(nodeid)
+                if entry:
+
+                    entry["browsed_at"] = None
+
+    def __entry(self, nodeid:str)->dict:
+
+        return self._nodes.setdefault(nodeid, {"title": nodeid, "NodeClass": "Unknown", "property": False, "children": None, "browsed_at": None})
+
+    def __is_fresh(self, entry:dict, now:float)->bool:
+
+        return entry["browsed_at"] is not None and now - entry["browsed_at"] < self.ttl
+
+    def __send(self, request, items:list)->list:
+        r"""
+        Sends `items` in batches of `batch_size`, halving the batch while the server answers
+        BadTooManyOperations.
+        """
+        results = list()
+        index = 0
+        while index < len(items):
+
+            batch = items[index:index + self.batch_size]
+            try:
+
+                results.extend(request(batch))
+                self.requests += 1
+
+            except ua.UaStatusCodeError as err:
+
+                if err.code == ua.StatusCodes.BadTooManyOperations and self.batch_size > 1:
+
+                    self.batch_size = max(1, self.batch_size // 2)
+                    continue
+
+                raise
+
+            index += len(batch)
+
+        return results
+
+    def __browse_batch(self, nodeids:list)->list:
+
+        parameters = ua.BrowseParameters()
+        parameters.RequestedMaxReferencesPerNode = 0
+        for nodeid in nodeids:
+
+            description = ua.BrowseDescription()
+            description.NodeId = ua.NodeId.from_string(nodeid)
+            description.BrowseDirection = ua.BrowseDirection.Forward
+            description.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HierarchicalReferences)
+            description.IncludeSubtypes = True
+            description.NodeClassMask = 0
+            description.ResultMask = ua.BrowseResultMask.All
+            parameters.NodesToBrowse.append(description)
+
+        results = self.client.uaclient.browse(parameters)
+        references = [list(result.References) if result.StatusCode.is_good() else list() for result in results]
+        # BrowseNext hasta agotar los puntos de continuación
+        pending = {index: result.ContinuationPoint for index, result in enumerate(results) if result.ContinuationPoint}
+        while pending:
+
+            parameters = ua.BrowseNextParameters()
+            parameters.ReleaseContinuationPoints = False
+            parameters.ContinuationPoints = list(pending.values())
+            self.requests += 1
+            _results = self.client.uaclient.browse_next(parameters)
+            _pending = dict()
+            for index, result in zip(list(pending), _results):
+
+                if result.StatusCode.is_good():
+
+                    references[index].extend(result.References)
+                    if result.ContinuationPoint:
+
+                        _pending[index] = result.ContinuationPoint
+
+            pending = _pending
+
+        return references
+
+    def browse(self, nodeids:list):
+        r"""
+        Browses the nodes that are not cached or are stale, with batched Browse requests.
+        """
+        with self._lock:
+
+            now = time.time()
+            nodeids = [nodeid for nodeid in dict.fromkeys(nodeids) if not self.__is_fresh(self.__entry(nodeid), now)]
+            if not nodeids:
+
+                return
+
+            references = self.__send(self.__browse_batch, nodeids)
+            for nodeid, _references in zip(nodeids, references):
+
+                children = list()
+                for reference in _references:
+
+                    child = reference.NodeId.to_string()
+                    entry = self.__entry(child)
+                    entry["title"] = reference.DisplayName.Text or reference.BrowseName.Name or "Unnamed Node"
+                    entry["NodeClass"] = reference.NodeClass.name
+                    entry["property"] = reference.ReferenceTypeId == HAS_PROPERTY
+                    children.append(child)
+
+                entry = self.__entry(nodeid)
+                entry["children"] = children
+                entry["browsed_at"] = now
+
+    def read_values(self, nodeids:list)->dict:
+        r"""
+        Reads the Value attribute of several nodes with batched Read requests.
+
+        **Returns:**
+
+        * **dict**: {nodeid: value} (None for bad status).
+        """
+        def request(batch:list)->list:
+
+            parameters = ua.ReadParameters()
+            for nodeid in batch:
+
+                item = ua.ReadValueId()
+                item.NodeId = ua.NodeId.from_string(nodeid)
+                item.AttributeId = ua.AttributeIds.Value
+                parameters.NodesToRead.append(item)
+
+            return self.client.uaclient.read(parameters)
+
+        results = self.__send(request, list(nodeids))
+
+        return {
+            nodeid: result.Value.Value if result.StatusCode.is_good() and result.Value is not None else None
+            for nodeid, result in zip(nodeids, results)
+        }
+
+    def __children(self, nodeid:str, include_properties:bool)->list:
+
+        entry = self._nodes.get(nodeid)
+        children = entry["children"] if entry and entry["children"] else list()
+        if include_properties:
+
+            return children
+
+        return [child for child in children if not self._nodes[child]["property"]]
+
+    def __node(self, nodeid:str, include_properties:bool)->dict:
+
+        entry = self._nodes[nodeid]
+
+        return {
+            "title": entry["title"],
+            "key": nodeid,
+            "NodeClass": entry["NodeClass"],
+            "children": [],
+            "has_children": bool(self.__children(nodeid, include_properties))
+        }
+
+    def __attach_values(self, nodes:list, include_property_values:bool):
+
+        if not include_property_values:
+
+            return
+
+        properties = [node for node in nodes if self._nodes[node["key"]]["property"]]
+        values = self.read_values([node["key"] for node in properties])
+        for node in properties:
+
+            node["value"] = self.client._to_jsonable(values.get(node["key"]))
+
+    def tree(
+        self,
+        root:str=OBJECTS_FOLDER,
+        *,
+        max_depth:int=10,
+        max_nodes:int=50_000,
+        include_properties:bool=True,
+        include_property_values:bool=False
+        )->list:
+        r"""
+        Returns the tree under `root` in the format of `Client.browse_tree_generic`
+        (title/key/NodeClass/children/has_children), browsing one level per request.
+        """
+        with self._lock:
+
+            self.browse([root])
+            visited = {root}
+            levels = [[(root, None)]]
+            nodes = dict()
+            count = 0
+            # Recorrido por niveles: cada nivel se navega con un solo Browse (por lotes)
+            for depth in range(max_depth + 1):
+
+                level = list()
+                for parent, _ in levels[-1]:
+
+                    for child in self.__children(parent, include_properties):
+
+                        if count >= max_nodes:
+
+                            break
+
+                        if child in visited:
+
+                            continue
+
+                        visited.add(child)
+                        count += 1
+                        level.append((child, parent))
+
+                if not level:
+
+                    break
+
+                self.browse([child for child, _ in level])
+                for child, parent in level:
+
+                    nodes[child] = self.__node(child, include_properties)
+                    if parent in nodes:
+
+                        nodes[parent]["children"].append(nodes[child])
+
+                levels.append(level)
+
+            self.__attach_values(list(nodes.values()), include_property_values)
+
+            return [nodes[child] for child, _ in levels[1]] if len(levels) > 1 else list()
+
+    def children(self, nodeid:str, *, max_nodes:int=5_000, include_properties:bool=True, include_property_values:bool=False)->list:
+        r"""
+        Returns the direct children of a node (lazy loading of the HMI tree).
+        """
+        with self._lock:
+
+            self.browse([nodeid])
+            children = self.__children(nodeid, include_properties)[:max_nodes]
+            self.browse(children)
+            nodes = [self.__node(child, include_properties) for child in children]
+            self.__attach_values(nodes, include_property_values)
+
+            return nodes
+
+    def variables(self, root:str=OBJECTS_FOLDER, *, max_depth:int=20, max_nodes:int=50_000)->list:
+        r"""
+        Returns the Variable nodes under `root` as [{namespace, displayName}], in the format of
+        `Client.browse_variables_generic` (the nodes below a variable are not visited).
+        """
+        with self._lock:
+
+            result = list()
+            visited = {root}
+            level = [root]
+            count = 0
+            for depth in range(max_depth + 1):
+
+                self.browse(level)
+                _level = list()
+                for parent in level:
+
+                    for child in self.__children(parent, True):
+
+                        if count >= max_nodes:
+
+                            break
+
+                        if child in visited:
+
+                            continue
+
+                        visited.add(child)
+                        count += 1
+                        entry = self._nodes[child]
+                        if entry["NodeClass"] == ua.NodeClass.Variable.name:
+
+                            result.append({"namespace": child, "displayName": entry["title"]})
+
+                        else:
+
+                            _level.append(child)
+
+                if not _level:
+
+                    break
+
+                level = _level
+
+            return result
+
+    def watch_model_changes(self, period:int=1000)->bool:
+        r"""
+        Subscribes to the model change events of the server to invalidate the changed nodes.
+
+        **Returns:**
+
+        * **bool**: False when the server does not publish them (the cache relies on `ttl`).
+        """
+        if self._subscription is not None:
+
+            return True
+
+        try:
+
+            subscription = self.client.create_subscription(period, self)
+            subscription.subscribe_events(
+                self.client.get_server_node(),
+                [ua.ObjectIds.BaseModelChangeEventType, ua.ObjectIds.GeneralModelChangeEventType]
+            )
+            self._subscription = subscription
+
+        except Exception as err:
+
+            logging.getLogger("pyautomation").info(f"Model change events not available in {self.client.name}: {err}")
+
+            return False
+
+        return True
+
+    def event_notification(self, event):
+        r"""
+        Subscription handler: invalidates the nodes affected by a model change event, and their
+        parents. Events without details, or about nodes not cached yet (e.g. a new node),
+        invalidate every node.
+        """
+        changes = getattr(event, "Changes", None)
+        affected = list()
+        with self._lock:
+
+            for change in changes or list():
+
+                nodeid = change.Affected.to_string()
+                if nodeid not in self._nodes:
+
+                    changes = None
+                    break
+
+                # Un nodo agregado o borrado cambia los hijos de quien lo referencia
+                affected.append(nodeid)
+                affected.extend(parent for parent, entry in self._nodes.items() if entry["children"] and nodeid in entry["children"])
+
+        self.invalidate(affected if changes else None)
+
+    def status_change_notification(self, status):
+        r"""
+        Subscription handler: the subscription was lost, the cache falls back to `ttl`.
+        """
+        self._subscription = None
+
+    def statistics(self)->dict:
+        r"""
+        Returns the cached and browsed node counters and the requests sent.
+        """
+        with self._lock:
+
+            return {
+                "nodes": len(self._nodes),
+                "browsed": sum(1 for entry in self._nodes.values() if entry["children"] is not None),
+                "requests": self.requests,
+                "watching_model_changes": self._subscription is not None
+            }
@@ -0,0 +1,275 @@
+r"""
+Session and subscription health of the OPC UA clients.
+
+Every `Client` owns a `ClientHealth`; its subscriptions are `MonitoredSubscription`, which count
+publish responses, keep-alives and notifications, and record the notification lag
+(receive time - SourceTimestamp) before dispatching to the handler.
+"""
+import time, weakref
+from collections import deque
+from datetime import datetime, timezone
+from opcua import ua
+from opcua.common.subscription import Subscription
+from .metrics import Histogram
+
+
+class MonitoredSubscription(Subscription):
+    r"""
+    Subscription that reports every publish response to the `ClientHealth` of its client.
+
+    A keep-alive is counted as missed when no publish response arrives within 1.5 keep-alive
+    intervals (publishing interval * max keep-alive count).
+    """
+
+    def __init__(self, server, params, handler, health):
+
+        # Antes de super(): la primera respuesta puede llegar durante la creación
+        self._health = health
+        self._keepalive_interval = params.RequestedPublishingInterval * params.RequestedMaxKeepAliveCount / 1000
+        self._last_publish = time.monotonic()
+        health.subscriptions.add(self)
+        super(MonitoredSubscription, self).__init__(server, params, handler)
+
+    def pending_keepalive_misses(self, now:float)->int:
+        r"""
+        Keep-alives missed since the last publish response.
+        """
+        if not self._keepalive_interval:
+
+            return 0
+
+        return max(0, int((now - self._last_publish) / self._keepalive_interval - 0.5))
+
+    def publish_callback(self, publishresult):
+
+        now = time.monotonic()
+        missed = self.pending_keepalive_misses(now)
+        self._last_publish = now
+        self._health.publish(publishresult.NotificationMessage.NotificationData, missed, now)
+        super(MonitoredSubscription, self).publish_callback(publishresult)
+
+
+class ClientHealth:
+    r"""
+    Counters and latency histograms of one OPC UA client session.
+
+    The counters are plain integers updated from the receiving thread of the client, so the
+    per-notification overhead is one subtraction and one histogram increment.
+
+    **Parameters:**
+
+    * **client_name** (str): OPC UA client name.
+    """
+
+    def __init__(self, client_name:str):
+
+        self.client_name = client_name
+        self.connects = 0
+        self.reconnects = 0
+        self.publishes = 0
+        self.keepalives = 0
+        self.keepalive_misses = 0
+        self.notifications = 0
+        self.read_errors = 0
+        self.notification_lag = Histogram()
+        self.reads = Histogram()
+        self.subscriptions = weakref.WeakSet()
+        self._publish_times = deque(maxlen=64)
+
+    def connected(self):
+        r"""
+        Records a new session; the subscriptions of the previous one are discarded.
+        """
+        self.connects += 1
+        if self.connects > 1:
+
+            self.reconnects += 1
+
+        self.subscriptions = weakref.WeakSet()
+        self._publish_times.clear()
+
+    def publish(self, notifications:list, missed:int=0, now:float=None):
+        r"""
+        Records one publish response.
+
+        **Parameters:**
+
+        * **notifications** (list): NotificationData of the response (empty on keep-alives).
+        * **missed** (int): Keep-alives missed before this response.
+        * **now** (float): Monotonic receive time.
+        """
+        self.publishes += 1
+        self.keepalive_misses += missed
+        self._publish_times.append(now if now is not None else time.monotonic())
+        if not notifications:
+
+            self.keepalives += 1
+            return
+
+        # SourceTimestamp llega como datetime UTC sin zona horaria
+        received = datetime.now(timezone.utc).replace(tzinfo=None)
+        for notification in notifications:
+
+            if not isinstance(notification, ua.DataChangeNotification):
+
+                continue
+
+            for item in notification.MonitoredItems:
+
+                self.notifications += 1
+                timestamp = item.Value.SourceTimestamp or item.Value.ServerTimestamp
+                if timestamp is None:
+
+                    continue
+
+                if timestamp.tzinfo is not None:
+
+                    timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+                # Relojes desincronizados pueden dar atrasos negativos
+                self.notification_lag.observe(max(0.0, (received - timestamp).total_seconds()))
+
+    def read(self, seconds:float, success:bool=True):
+        r"""
+        Records one polled read (DAQ path).
+        """
+        self.reads.observe(seconds)
+        if not success:
+
+            self.read_errors += 1
+
+    def publish_rate(self):
+        r"""
+        Publish responses per second over the last 64 responses; None with less than two.
+        """
+        times = list(self._publish_times)
+        if len(times) < 2 or times[-1] == times[0]:
+
+            return None
+
+        return round((len(times) - 1) / (times[-1] - times[0]), 3)
+
+    def snapshot(self)->dict:
+        r"""
+        Returns the health counters of the client.
+
+        **Returns:**
+
+        * **dict**: {connects, reconnects, subscriptions, monitored_items, publishes, publish_rate,
+          keepalives, keepalive_misses, notifications, notification_lag, reads}
+        """
+        now = time.monotonic()
+        subscriptions = list(self.subscriptions)
+
+        return {
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "subscriptions": len(subscriptions),
+            "monitored_items": sum(len(subscription._monitoreditems_map) for subscription in subscriptions),
+            "publishes": self.publishes,
+            "publish_rate": self.publish_rate(),
+            "keepalives": self.keepalives,
+            "keepalive_misses": self.keepalive_misses + sum(subscription.pending_keepalive_misses(now) for subscription in subscriptions),
+            "notifications": self.notifications,
+            "notification_lag": self.notification_lag.summary(),
+            "reads": {**self.reads.summary(), "errors": self.read_errors}
+        }
+
+
+def _label(value)->str:
+
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value)->str:
+
+    if value is None:
+
+        return "NaN"
+
+    if value == float("inf"):
+
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def prometheus_text(clients:dict, reconnection:dict=None)->str:
+    r"""
+    Renders the health of the OPC UA clients in the Prometheus text exposition format (0.0.4).
+
+    **Parameters:**
+
+    * **clients** (dict): {client_name: Client}.
+    * **reconnection** (dict, optional): Status of the reconnection supervisor.
+
+    **Returns:**
+
+    * **str**: Metrics text.
+
+    Usage:
+
+    ```python
+    >>> from automation.opcua.health import ClientHealth, prometheus_text
+    >>> class Client:
+    ...     def __init__(self, name):
+    ...         self.health = ClientHealth(name)
+    ...     def is_connected(self):
+    ...         return False
+    >>> text = prometheus_text({"PLC": Client("PLC")})
+    >>> print("\n".join(line for line in text.splitlines() if line.startswith("pyautomation_opcua_connected")))
+    pyautomation_opcua_connected{client="PLC"} 0
+
+    ```
+    """
+    reconnection = reconnection or dict()
+    gauges = (
+        ("connected", "gauge", "1 if the client session is open.", lambda client, health, state: int(client.is_connected())),
+        ("reconnects_total", "counter", "Sessions created again after the first one.", lambda client, health, state: health["reconnects"]),
+        ("subscriptions", "gauge", "Active subscriptions.", lambda client, health, state: health["subscriptions"]),
+        ("monitored_items", "gauge", "Monitored items of the active subscriptions.", lambda client, health, state: health["monitored_items"]),
+        ("publishes_total", "counter", "Publish responses received.", lambda client, health, state: health["publishes"]),
+        ("publish_rate", "gauge", "Publish responses per second (last 64).", lambda client, health, state: health["publish_rate"]),
+        ("keepalives_total", "counter", "Keep-alive publish responses received.", lambda client, health, state: health["keepalives"]),
+        ("keepalive_misses_total", "counter", "Keep-alive publish responses missed.", lambda client, health, state: health["keepalive_misses"]),
+        ("notifications_total", "counter", "Data change notifications received.", lambda client, health, state: health["notifications"]),
+        ("read_errors_total", "counter", "Failed polled reads.", lambda client, health, state: health["reads"]["errors"]),
+        ("writes_total", "counter", "Written values.", lambda client, health, state: client.write_metrics.count if hasattr(client, "write_metrics") else None),
+        ("write_errors_total", "counter", "Rejected written values.", lambda client, health, state: client.write_metrics.errors if hasattr(client, "write_metrics") else None),
+        ("time_to_recover_seconds", "gauge", "Duration of the last reconnection.", lambda client, health, state: state.get("last_time_to_recover_s"))
+    )
+    histograms = (
+        ("notification_lag_seconds", "Receive time minus SourceTimestamp of the notifications.", "notification_lag"),
+        ("read_latency_seconds", "Latency of the polled reads.", "reads")
+    )
+    snapshots = {client_name: (client, client.health.snapshot()) for client_name, client in clients.items()}
+    lines = list()
+    for name, kind, description, getter in gauges:
+
+        lines.append(f"# HELP pyautomation_opcua_{name} {description}")
+        lines.append(f"# TYPE pyautomation_opcua_{name} {kind}")
+        for client_name, (client, health) in snapshots.items():
+
+            value = getter(client, health, reconnection.get(client_name, dict()))
+            if value is None:
+
+                continue
+
+            lines.append(f'pyautomation_opcua_{name}{{client="{_label(client_name)}"}} {_number(value)}')
+
+    for name, description, attribute in histograms:
+
+        lines.append(f"# HELP pyautomation_opcua_{name} {description}")
+        lines.append(f"# TYPE pyautomation_opcua_{name} histogram")
+        for client_name, (client, _) in snapshots.items():
+
+            histogram = getattr(client.health, attribute)
+            label = _label(client_name)
+            for bound, count in histogram.cumulative():
+
+                lines.append(f'pyautomation_opcua_{name}_bucket{{client="{label}",le="{_number(bound)}"}} {count}')
+
+            lines.append(f'pyautomation_opcua_{name}_sum{{client="{label}"}} {_number(float(histogram.sum))}')
+            lines.append(f'pyautomation_opcua_{name}_count{{client="{label}"}} {histogram.count}')
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,77 @@
+r"""
+Latency metrics of the OPC UA client operations.
+"""
+import threading
+from collections import deque
+import numpy as np
+from ..utils.metrics import Histogram
+
+
+class LatencyMetrics:
+    r"""
+    Counters and latency percentiles of an operation (e.g. writes of a client), computed over the
+    last `size` samples.
+
+    **Parameters:**
+
+    * **size** (int): Samples kept for the percentiles.
+
+    Usage:
+
+    ```python
+    >>> from automation.opcua.metrics import LatencyMetrics
+    >>> metrics = LatencyMetrics()
+    >>> for seconds in (0.002, 0.004, 0.003):
+    ...     metrics.record(seconds)
+    >>> metrics.record(0.010, success=False)
+    >>> summary = metrics.summary()
+    >>> summary["count"], summary["errors"], summary["last_ms"], summary["max_ms"]
+    (4, 1, 10.0, 10.0)
+
+    ```
+    """
+
+    def __init__(self, size:int=1000):
+
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.last = None
+
+    def record(self, seconds:float, success:bool=True):
+        r"""
+        Records the latency of one operation, in seconds.
+        """
+        with self._lock:
+
+            self._samples.append(seconds)
+            self.count += 1
+            self.last = seconds
+            if not success:
+
+                self.errors += 1
+
+    def summary(self)->dict:
+        r"""
+        Returns {count, errors, last_ms, mean_ms, p50_ms, p95_ms, max_ms}; latencies are None
+        before the first operation.
+        """
+        with self._lock:
+
+            samples = np.asarray(self._samples, dtype=np.float64) * 1000
+            result = {"count": self.count, "errors": self.errors, "last_ms": None if self.last is None else round(self.last * 1000, 3)}
+
+        if not len(samples):
+
+            return {**result, "mean_ms": None, "p50_ms": None, "p95_ms": None, "max_ms": None}
+
+        p50, p95 = np.percentile(samples, [50, 95])
+
+        return {
+            **result,
+            "mean_ms": round(float(samples.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "max_ms": round(float(samples.max()), 3)
+        }
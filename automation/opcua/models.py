@@ -3,8 +3,12 @@ from opcua import ua
 from datetime import datetime
 # import sched
 from opcua.ua.uatypes import NodeId, datatype_to_varianttype
+from opcua.ua.ua_binary import variant_to_binary
 import re, uuid, logging, time
 from ..utils import _colorize_message
+from .address_space import AddressSpace
+from .metrics import LatencyMetrics
+from .health import ClientHealth, MonitoredSubscription
 import json
 from enum import Enum
 
@@ -24,6 +28,10 @@ class Client(OPCClient):
         self._client = None
         self._is_open = False
         self._opc_ua_tree = dict()
+        self.address_space = AddressSpace(self)
+        self._node_metadata = dict()    # namespace -> {node_class, writable, variant_type}
+        self.write_metrics = LatencyMetrics()
+        self.health = ClientHealth(client_name)
         # self.scheduler = sched.scheduler(time.time, time.sleep) 
         # self.token_renewal_interval = 30 # Cada 10 minutos
         super(Client, self).__init__(url, timeout)
@@ -60,6 +68,10 @@ class Client(OPCClient):
             # Now you're connected again!
             self._is_open = True
             self._id = str(uuid.uuid4())
+            # Nueva sesión: el modelo del address space se vuelve a navegar
+            self.address_space.clear()
+            self._node_metadata = dict()
+            self.health.connected()
             result = {
                 'message': 'Successful connection',
                 'url': self._server_url,
@@ -109,10 +121,10 @@ class Client(OPCClient):
                     # Revolver tokens de seguridad para asegurar la validez 
                     # self.revolve_security_tokens()
                     app.sio.emit("on.opcua.connected", data={"message": f"Conneted to {self._server_url}"})
-                    tags = app.get_tags()
-                    for tag in tags:
-                        _tag = app.cvt.get_tag(id=tag["id"])
-                        app.subscribe_opcua(tag=_tag, opcua_address=tag['opcua_address'], node_namespace=tag['node_namespace'], scan_time=tag['scan_time'], reload=True)
+                    # Solo se vuelven a crear los monitored items de este cliente
+                    from ..workers.reconnection import client_namespaces
+                    from .subscription import DAS
+                    DAS().resubscribe(self, self.name, client_namespaces(app.cvt, self))
                         
                     logging.critical(f"Reconnected to {self._server_url}") 
                     print(_colorize_message(f"[{str_date}] [INFO] Reconnected to OPCUA server {self._server_url}", "INFO"))
@@ -127,6 +139,8 @@ class Client(OPCClient):
         self._server_url = None
         self._client = None
         self._opc_ua_tree = dict()
+        self.address_space.clear()
+        self._node_metadata = dict()
 
     def disconnect(self):
         r"""
@@ -284,59 +298,251 @@ class Client(OPCClient):
 
         return result
 
+    def get_nodes_metadata(self, namespaces:list)->dict:
+        r"""
+        Returns the node class, write permission and data type of several nodes.
+
+        The nodes not cached yet are read with a single Read request (NodeClass, AccessLevel,
+        UserAccessLevel and DataType of every node) and cached for the session.
+
+        **Parameters:**
+
+        * **namespaces** (list): Node namespaces (e.g. ["ns=2;i=1234"]).
+
+        **Returns:**
+
+        * **dict**: {namespace: {node_class, writable, variant_type} | None if the node does not exist}
+        """
+        attributes = (ua.AttributeIds.NodeClass, ua.AttributeIds.AccessLevel, ua.AttributeIds.UserAccessLevel, ua.AttributeIds.DataType)
+        namespaces = list(dict.fromkeys(namespaces))
+        missing = list()
+        for namespace in namespaces:
+
+            if namespace in self._node_metadata:
+
+                continue
+
+            try:
+
+                missing.append((namespace, NodeId.from_string(namespace)))
+
+            except Exception:
+
+                continue
+
+        for index in range(0, len(missing), 250):
+
+            batch = missing[index:index + 250]
+            parameters = ua.ReadParameters()
+            for _, node_id in batch:
+
+                for attribute in attributes:
+
+                    item = ua.ReadValueId()
+                    item.NodeId = node_id
+                    item.AttributeId = attribute
+                    parameters.NodesToRead.append(item)
+
+            results = self.uaclient.read(parameters)
+            for position, (namespace, _) in enumerate(batch):
+
+                node_class, access_level, user_access_level, data_type = results[position * 4:position * 4 + 4]
+                if not node_class.StatusCode.is_good():
+
+                    continue
+
+                # Bit CurrentWrite en AccessLevel y UserAccessLevel
+                mask = 1 << ua.AccessLevel.CurrentWrite.value
+                writable = all(
+                    result.StatusCode.is_good() and bool(result.Value.Value & mask)
+                    for result in (access_level, user_access_level)
+                )
+                variant_type = None
+                if data_type.StatusCode.is_good():
+
+                    _data_type = data_type.Value.Value
+                    # Solo los tipos escalares concretos que `_cast` sabe convertir (Boolean..String, ns=0;i=1..12).
+                    # Los abstractos (BaseDataType, Number, Integer...) y el resto quedan en None: python-opcua infiere el tipo
+                    if _data_type.NamespaceIndex == 0 and isinstance(_data_type.Identifier, int) and 0 < _data_type.Identifier <= 12:
+
+                        variant_type = datatype_to_varianttype(_data_type)
+
+                self._node_metadata[namespace] = {
+                    "node_class": node_class.Value.Value.name,
+                    "writable": writable,
+                    "variant_type": variant_type
+                }
+
+        return {namespace: self._node_metadata.get(namespace) for namespace in namespaces}
+
+    @staticmethod
+    def _cast(value, variant_type:ua.VariantType|None):
+        r"""
+        Converts a value to the Python type of an OPC UA variant type.
+        """
+        if variant_type is None:
+
+            return value
+
+        if variant_type == ua.VariantType.Boolean:
+
+            return bool(value)
+
+        if variant_type in (ua.VariantType.Float, ua.VariantType.Double):
+
+            return float(value)
+
+        if variant_type in (
+            ua.VariantType.SByte, ua.VariantType.Byte, ua.VariantType.Int16, ua.VariantType.UInt16,
+            ua.VariantType.Int32, ua.VariantType.UInt32, ua.VariantType.Int64, ua.VariantType.UInt64
+        ):
+
+            if isinstance(value, float) and not value.is_integer():
+
+                raise ValueError(f"{value} is not an integer")
+
+            return int(value)
+
+        if variant_type == ua.VariantType.String:
+
+            return str(value)
+
+        return value
+
+    def write_values(self, values:list)->tuple:
+        r"""
+        Escribe varios valores en nodos variables del servidor OPC UA con una sola llamada al
+        servicio Write.
+
+        Clase, permisos y tipo de dato de los nodos se toman del caché de metadatos (una lectura
+        por nodo y sesión); cada valor se convierte al tipo de dato del nodo.
+
+        **Parameters:**
+
+        * **values** (list): [(node_namespace, value)].
+
+        **Returns:**
+
+        * **tuple**: ([{message, namespace, value, success, latency_ms}] en el orden de `values`, status_code):
+          200 si todas las escrituras fueron exitosas, 207 si algunas, 400 si ninguna, 500 por error de comunicación.
+        """
+        def failure(namespace, message:str)->dict:
+
+            return {'message': message, 'namespace': namespace, 'success': False}
+
+        if not self.is_connected():
+
+            return [failure(namespace, 'Cliente no conectado al servidor') for namespace, _ in values], 400
+
+        started = time.perf_counter()
+        results = [None] * len(values)
+        writes = list()
+        try:
+
+            metadata = self.get_nodes_metadata([namespace for namespace, _ in values])
+            for index, (namespace, value) in enumerate(values):
+
+                _metadata = metadata.get(namespace)
+                if _metadata is None:
+
+                    results[index] = failure(namespace, 'El nodo no existe en el servidor')
+
+                elif _metadata["node_class"].lower() != 'variable':
+
+                    results[index] = failure(namespace, f'El nodo no es de tipo Variable, es {_metadata["node_class"]}')
+
+                elif not _metadata["writable"]:
+
+                    results[index] = failure(namespace, 'El nodo no tiene permisos de escritura')
+
+                else:
+
+                    variant_type = _metadata["variant_type"]
+                    try:
+
+                        if isinstance(value, (list, tuple)):
+
+                            # Los arreglos se escriben sin convertir sus elementos
+                            variant = ua.Variant(list(value), variant_type)
+
+                        else:
+
+                            variant = ua.Variant(self._cast(value, variant_type), variant_type)
+
+                        # Un valor que no se puede codificar solo falla su propia escritura, no el lote
+                        variant_to_binary(variant)
+
+                    except Exception as err:
+
+                        type_name = variant_type.name if variant_type is not None else "del nodo"
+                        results[index] = failure(namespace, f'Valor incompatible con el tipo {type_name}: {err}')
+                        continue
+
+                    item = ua.WriteValue()
+                    item.NodeId = NodeId.from_string(namespace)
+                    item.AttributeId = ua.AttributeIds.Value
+                    item.Value = ua.DataValue(variant)
+                    item.Value.SourceTimestamp = datetime.utcnow()
+                    writes.append((index, item))
+
+            statuses = list()
+            for position in range(0, len(writes), 500):
+
+                parameters = ua.WriteParameters()
+                parameters.NodesToWrite = [item for _, item in writes[position:position + 500]]
+                statuses.extend(self.uaclient.write(parameters))
+
+        except Exception as err:
+
+            logger = logging.getLogger("pyautomation")
+            logger.error(f"Error escribiendo valores en {self._server_url}: {err}")
+            latency = time.perf_counter() - started
+            for _ in values:
+
+                self.write_metrics.record(latency, success=False)
+
+            return [failure(namespace, f'Error al escribir valor: {str(err)}') for namespace, _ in values], 500
+
+        for (index, _), status in zip(writes, statuses):
+
+            namespace, value = values[index]
+            if status.is_good():
+
+                results[index] = {'message': 'Valor escrito exitosamente', 'namespace': namespace, 'value': value, 'success': True}
+
+            else:
+
+                # Los metadatos pudieron cambiar en el servidor: se vuelven a leer en la próxima escritura
+                self._node_metadata.pop(namespace, None)
+                results[index] = failure(namespace, f'Error al escribir valor: {status.name}')
+
+        latency = time.perf_counter() - started
+        for result in results:
+
+            result['latency_ms'] = round(latency * 1000, 3)
+            self.write_metrics.record(latency, success=result['success'])
+
+        succeeded = sum(1 for result in results if result['success'])
+        if succeeded == len(results):
+
+            return results, 200
+
+        return results, 207 if succeeded else 400
+
     def write_value(self, node_namespace: str, value):
         r"""
         Escribe un valor en un nodo variable del servidor OPC UA
         
         Args:
             node_namespace: Namespace del nodo en formato string (ej: "ns=2;i=1234")
-            value: Valor a escribir (el tipo debe ser compatible con el nodo)
+            value: Valor a escribir (el tipo se convierte al tipo de dato del nodo)
         
         Returns:
             tuple: (dict con resultado, status_code)
         """
-        try:
-            if not self.is_connected():
-                return {
-                    'message': 'Cliente no conectado al servidor',
-                    'namespace': node_namespace,
-                    'success': False
-                }, 400
-            
-            _node = self.get_node(NodeId.from_string(node_namespace))
-            
-            # Verificar que es un nodo variable
-            if _node.get_node_class().name.lower() != 'variable':
-                return {
-                    'message': f'El nodo no es de tipo Variable, es {_node.get_node_class().name}',
-                    'namespace': node_namespace,
-                    'success': False
-                }, 400
-            
-            # Verificar permisos de escritura
-            access_level = _node.get_access_level()
-            user_access_level = _node.get_user_access_level()
-            
-            # Escribir el valor
-            _node.set_value(value)
-            
-            result = {
-                'message': 'Valor escrito exitosamente',
-                'namespace': node_namespace,
-                'value': value,
-                'success': True
-            }
-            return result, 200
-            
-        except Exception as err:
-            logger = logging.getLogger("pyautomation")
-            logger.error(f"Error escribiendo valor en {node_namespace}: {err}")
-            result = {
-                'message': f'Error al escribir valor: {str(err)}',
-                'namespace': node_namespace,
-                'success': False
-            }
-            return result, 500
+        results, status = self.write_values([(node_namespace, value)])
+
+        return results[0], status
 
     @staticmethod
     def find_servers(hostname, port):
@@ -412,6 +618,31 @@ class Client(OPCClient):
             }
             return result, 400
 
+    def create_subscription(self, period, handler, keepalive_count:int=10):
+        r"""
+        Creates a subscription whose publish responses are recorded in `health`.
+
+        **Parameters:**
+
+        * **period** (float | CreateSubscriptionParameters): Publishing interval in milliseconds.
+        * **handler**: Object with the `datachange_notification` (and optionally event) methods.
+        * **keepalive_count** (int): Publishing intervals without data before the server sends a
+          keep-alive, so missed keep-alives can be detected.
+        """
+        if isinstance(period, ua.CreateSubscriptionParameters):
+
+            return MonitoredSubscription(self.uaclient, period, handler, self.health)
+
+        params = ua.CreateSubscriptionParameters()
+        params.RequestedPublishingInterval = period
+        params.RequestedLifetimeCount = max(10000, keepalive_count * 3)
+        params.RequestedMaxKeepAliveCount = keepalive_count
+        params.MaxNotificationsPerPublish = 10000
+        params.PublishingEnabled = True
+        params.Priority = 0
+
+        return MonitoredSubscription(self.uaclient, params, handler, self.health)
+
     def is_connected(self):
         r"""
         Documentation here
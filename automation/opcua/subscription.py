@@ -1,12 +1,15 @@
-import pytz
+import pytz, logging
 from datetime import datetime
 from math import ceil
+from opcua import ua
 from ..singleton import Singleton
 from ..tags.cvt import CVTEngine
 from ..tags import Tag
+from ..tags.quality import GOOD, quality_of
 from ..buffer import Buffer
 from ..models import StringType
 from ..logger.datalogger import DataLoggerEngine
+from ..utils.tracing import Tracer
 
 
 class SubHandler(Singleton):
@@ -116,7 +119,7 @@ class SubHandlerServer(Singleton):
         if tag:
             if tag.get_value()!=val:
 
-                val = tag.value.convert_value(value=val, from_unit=tag.get_unit(), to_unit=tag.get_display_unit())
+                val = tag.convert_to_display_unit(val)
                 if tag.manufacturer==MANUFACTURER and tag.segment==SEGMENT:      
                     self.app.cvt.set_value(id=tag.id, value=val, timestamp=timestamp)
                 elif not MANUFACTURER and not SEGMENT:
@@ -145,6 +148,7 @@ class DAS(Singleton):
         self.cvt = CVTEngine()
         self.logger = DataLoggerEngine()
         self.buffer = dict()
+        self.tracer = Tracer()
 
     def restart_buffer(self, tag:Tag):
         r"""
@@ -205,6 +209,74 @@ class DAS(Singleton):
         except Exception:
             pass
 
+    def subscribe_many(self, subscription, client, client_name:str, nodes:list, batch_size:int=500)->int:
+        r"""
+        Subscribes several nodes of the same client in batches.
+
+        Every batch needs three round trips (display names, monitored items creation and
+        initial values) instead of three per node.
+
+        **Parameters:**
+
+        * **subscription**: Subscription created with `client.create_subscription`.
+        * **client** (Client): OPC UA client owning the nodes.
+        * **client_name** (str): OPC UA client name.
+        * **nodes** (list): Nodes to subscribe.
+        * **batch_size** (int): Nodes per request.
+
+        **Returns:**
+
+        * **int**: Number of nodes subscribed.
+        """
+        monitored_items = self.monitored_items.setdefault(client_name, dict())
+        subscribed = 0
+        for start in range(0, len(nodes), batch_size):
+
+            batch = nodes[start:start + batch_size]
+            results = client.uaclient.get_attributes([node.nodeid for node in batch], ua.AttributeIds.DisplayName)
+            display_names = [
+                result.Value.Value.Text if result.Value and result.Value.Value else node.nodeid.to_string()
+                for node, result in zip(batch, results)
+            ]
+            pending = [(node, display_name) for node, display_name in zip(batch, display_names) if display_name not in monitored_items]
+            if not pending:
+
+                continue
+
+            handles = subscription.subscribe_data_change([node for node, _ in pending])
+            for (node, display_name), handle in zip(pending, handles):
+
+                if isinstance(handle, ua.StatusCode):
+
+                    continue
+
+                monitored_items[display_name] = {
+                    "subscription": subscription,
+                    "monitored_item": handle,
+                    "server": client_name,
+                    "namespace": node.nodeid.to_string()
+                }
+                subscribed += 1
+
+            ## Valores iniciales en una sola lectura
+            try:
+                values = client.get_values([node for node, _ in pending])
+            except Exception:
+                values = list()
+
+            for (node, _), val in zip(pending, values):
+
+                if val is None:
+
+                    continue
+
+                try:
+                    self.update_tag_value(node=node, val=val)
+                except Exception:
+                    pass
+
+        return subscribed
+
     def unsubscribe(self, client_name:str, node_id):
         r"""
         Documentation here
@@ -224,9 +296,44 @@ class DAS(Singleton):
                 subscription = monitored_item["subscription"] 
                 monitored_item["monitored_item"] = subscription.subscribe_data_change(client.get_node(node_id))
 
-    def update_tag_value(self, node, val, timestamp=None):
+    def resubscribe(self, client, client_name:str, namespaces:list=None, batch_size:int=500)->int:
         r"""
-        Update tag value in CVT and buffer
+        Creates again the monitored items of one client after a reconnection (the subscriptions
+        of the previous session are lost), with one subscription and batched requests. The
+        monitored items of the other clients are not touched.
+
+        **Parameters:**
+
+        * **client** (Client): Reconnected OPC UA client.
+        * **client_name** (str): OPC UA client name.
+        * **namespaces** (list, optional): Node namespaces to subscribe besides the previous ones.
+        * **batch_size** (int): Nodes per request.
+
+        **Returns:**
+
+        * **int**: Number of monitored items created.
+        """
+        previous = self.monitored_items.pop(client_name, dict())
+        namespaces = list(dict.fromkeys([item["namespace"] for item in previous.values()] + list(namespaces or list())))
+        if not namespaces:
+
+            return 0
+
+        nodes = list()
+        for namespace in namespaces:
+
+            try:
+                nodes.append(client.get_node(namespace))
+            except Exception:
+                logging.warning(f"Invalid node namespace {namespace} in OPC UA client {client_name}")
+
+        subscription = client.create_subscription(1000, self)
+
+        return self.subscribe_many(subscription=subscription, client=client, client_name=client_name, nodes=nodes, batch_size=batch_size)
+
+    def update_tag_value(self, node, val, timestamp=None, quality:int=GOOD):
+        r"""
+        Update tag value (and its OPC UA quality) in CVT and buffer
         """
         from .. import SEGMENT, MANUFACTURER, TIMEZONE
         
@@ -238,22 +345,28 @@ class DAS(Singleton):
         tag = self.cvt.get_tag_by_node_namespace(node_namespace=namespace)
         
         if tag:
-            tag_name = tag.get_name()
-            val = tag.value.convert_value(value=val, from_unit=tag.get_unit(), to_unit=tag.get_display_unit())
-            if tag.manufacturer==MANUFACTURER and tag.segment==SEGMENT:      
-                val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp)
-            elif not MANUFACTURER and not SEGMENT:
-                val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp)
-            timestamp = timestamp.astimezone(TIMEZONE)
-            if tag_name in self.buffer:
-                self.buffer[tag_name]["timestamp"](timestamp)
-                self.buffer[tag_name]["values"](val)
+            self.tracer.start(tag, source_timestamp=timestamp)
+            try:
+                tag_name = tag.get_name()
+                if val is not None:
+                    val = tag.convert_to_display_unit(val)
+                if tag.manufacturer==MANUFACTURER and tag.segment==SEGMENT:      
+                    val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp, quality=quality)
+                elif not MANUFACTURER and not SEGMENT:
+                    val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp, quality=quality)
+                timestamp = timestamp.astimezone(TIMEZONE)
+                if tag_name in self.buffer and val is not None:
+                    self.buffer[tag_name]["timestamp"](timestamp)
+                    self.buffer[tag_name]["values"](val)
+                    self.tracer.stamp("das.buffer")
+            finally:
+                self.tracer.end()
 
     def datachange_notification(self, node, val, data):
         r"""
         Documentation here
         """
-        timestamp = data.monitored_item.Value.SourceTimestamp
-        self.update_tag_value(node, val, timestamp)      
+        data_value = data.monitored_item.Value
+        self.update_tag_value(node, val, data_value.SourceTimestamp, quality=quality_of(data_value))      
         
         
\ No newline at end of file
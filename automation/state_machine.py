@@ -1,4 +1,4 @@
-import logging, secrets, pytz
+import logging, secrets, pytz, time
 from datetime import datetime
 from opcua import Server, ua, Node
 from hashlib import blake2b
@@ -13,6 +13,7 @@ from .buffer import Buffer
 from .models import StringType, IntegerType, FloatType, BooleanType, ProcessType
 from .tags.cvt import CVTEngine, Tag
 from .tags.tag import MachineObserver
+from .tags.quality import quality_of
 from .opcua.subscription import DAS
 from .modules.users.users import User
 from .utils.decorators import set_event, validate_types, logging_error_handler
@@ -1233,19 +1234,26 @@ class DAQ(StateMachineCore):
             values = self.opcua_client_manager.get_node_value_by_opcua_address(opcua_address=opcua_address, namespace=namespace)
             if values:
                 data_value = values[0][0]["DataValue"]
-                value = data_value.Value.Value
+                value = data_value.Value.Value if data_value.Value is not None else None
+                quality = quality_of(data_value)
                 timestamp = data_value.SourceTimestamp
                 if not timestamp:
                     timestamp = datetime.now(pytz.utc)
                 timestamp = timestamp.replace(tzinfo=pytz.UTC)
-                val = tag.value.convert_value(value=value, from_unit=tag.get_unit(), to_unit=tag.get_display_unit())
-                if tag.manufacturer==MANUFACTURER and tag.segment==SEGMENT:      
-                    val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp)
-                elif not MANUFACTURER and not SEGMENT:
-                    val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp)
-                timestamp = timestamp.astimezone(TIMEZONE)
-                self.das.buffer[tag_name]["timestamp"](timestamp)
-                self.das.buffer[tag_name]["values"](val)
+                self.das.tracer.start(tag, source_timestamp=timestamp)
+                try:
+                    val = tag.convert_to_display_unit(value) if value is not None else None
+                    if tag.manufacturer==MANUFACTURER and tag.segment==SEGMENT:      
+                        val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp, quality=quality)
+                    elif not MANUFACTURER and not SEGMENT:
+                        val = self.cvt.set_value(id=tag.id, value=val, timestamp=timestamp, quality=quality)
+                    timestamp = timestamp.astimezone(TIMEZONE)
+                    if val is not None:
+                        self.das.buffer[tag_name]["timestamp"](timestamp)
+                        self.das.buffer[tag_name]["values"](val)
+                        self.das.tracer.stamp("das.buffer")
+                finally:
+                    self.das.tracer.end()
 
         super().while_running()
 
@@ -1276,6 +1284,13 @@ class OPCUAServer(StateMachineCore):
         self.machine = Machine()
         self.my_folders = dict()
         self.port = AUTOMATION_OPCUA_SERVER_PORT
+        # Mapas precomputados entidad -> nodos del servidor y últimos valores publicados
+        self._tag_nodes = dict()
+        self._alarm_nodes = dict()
+        self._engine_nodes = dict()
+        self._published = dict()
+        self.cycle_time = None
+        self.cycle_times = Buffer(size=100)
 
         if isinstance(name, StringType):
 
@@ -1310,9 +1325,14 @@ class OPCUAServer(StateMachineCore):
 
         # SET
         self.server.start()
+        self._tag_nodes.clear()
+        self._alarm_nodes.clear()
+        self._engine_nodes.clear()
+        self._published.clear()
         self.__set_cvt()
         self.__set_alarms()
         self.__set_engines()
+        self.cvt.track_changes(name=self.name.value)
         
         logging.getLogger('opcua').setLevel(logging.ERROR)
 
@@ -1328,16 +1348,54 @@ class OPCUAServer(StateMachineCore):
         r"""
         Executed in Run state.
         
-        Continuously updates the values of tags, alarms, and engines in the OPC UA address space.
+        Updates the values of tags, alarms, and engines in the OPC UA address space. Only values
+        that changed since the last cycle are written.
         """
+        start = time.perf_counter()
         self.__update_tags()
         self.__update_alarms()
         self.__update_engines()
+        self.cycle_time = time.perf_counter() - start
+        self.cycle_times(self.cycle_time)
+
+    def get_cycle_stats(self)->dict:
+        r"""
+        Gets publishing cycle time statistics of the last cycles.
+
+        **Returns:**
+
+        * **dict**: last, mean and max cycle time in milliseconds, cycles measured and published nodes.
+        """
+        cycle_times = list(self.cycle_times)
+        if not cycle_times:
+
+            return {"last": None, "mean": None, "max": None, "cycles": 0, "nodes": len(self._published)}
+
+        return {
+            "last": round(self.cycle_time * 1000, 3),
+            "mean": round(sum(cycle_times) / len(cycle_times) * 1000, 3),
+            "max": round(max(cycle_times) * 1000, 3),
+            "cycles": len(cycle_times),
+            "nodes": len(self._published)
+        }
+
+    def __publish(self, node, value):
+        r"""
+        Writes a value into a node only if it changed since the last write.
+        """
+        key = node.nodeid
+        if key in self._published and self._published[key] == value:
+
+            return
+
+        node.set_value(value)
+        self._published[key] = value
 
     def while_resetting(self):
         r"""
         Executed in Reset state. Transitions back to Starting to restart the server.
         """
+        self.cvt.untrack_changes(name=self.name.value)
         self.server.stop()
         self.send("reset_to_start")
 
@@ -1414,6 +1472,10 @@ class OPCUAServer(StateMachineCore):
                             browse_name = prop.get_attribute(ua.AttributeIds.BrowseName)
                             browse_name.Value.Value.Name = "" 
 
+                self._engine_nodes[engine_name] = [
+                    (prop, prop.get_display_name().Text) for prop in getattr(self, var_name).get_properties()
+                ]
+
     def __set_alarms(self):
         r"""
         Initializes OPC UA nodes for all defined alarms.
@@ -1469,6 +1531,10 @@ class OPCUAServer(StateMachineCore):
                         browse_name = prop.get_attribute(ua.AttributeIds.BrowseName)
                         browse_name.Value.Value.Name = ""  
 
+                self._alarm_nodes[alarm.identifier] = [
+                    (prop, prop.get_display_name().Text) for prop in getattr(self, var_name).get_properties()
+                ]
+
     def __set_cvt(self):
         r"""
         Initializes OPC UA nodes for all CVT tags.
@@ -1486,6 +1552,7 @@ class OPCUAServer(StateMachineCore):
                     
                     self.my_folders[segment] = self.objects.add_folder(self.idx, segment)
             
+            tag_id = tag['id']
             tag_name = tag['name']
             display_unit = tag["display_unit"]
             data_type = tag["data_type"]
@@ -1546,94 +1613,71 @@ class OPCUAServer(StateMachineCore):
                     browse_name = prop.get_attribute(ua.AttributeIds.BrowseName)
                     browse_name.Value.Value.Name = "" 
 
+            self._tag_nodes[tag_id] = getattr(self, var_name)
+
     def __update_tags(self):
         r"""
-        Updates the values of CVT tags in the OPC UA address space.
+        Updates the values of CVT tags changed since the last cycle in the OPC UA address space.
         """
-        for tag in self.cvt.get_tags():
-            
-            segment = "CVT"
-            value = tag["value"]
+        changes = [tag_id for tag_id in self.cvt.pop_changes(name=self.name.value) or list() if tag_id in self._tag_nodes]
+        if not changes:
 
-            if tag['segment']:
+            return
 
-                segment = tag['segment']
+        # Una sola consulta al CVT para todos los tags cambiados (almacén columnar)
+        values = self.cvt.serialize_values(ids=changes) or dict()
+        for row in values.get("data", list()):
 
-            var_name = f"{segment}_{tag['name']}"
-            if hasattr(self, var_name):
+            value = row["value"]
+            if value is None:
 
-                _tag = getattr(self, var_name)
+                continue
 
-                if isinstance(value, (float, int)):
-                    
-                    _tag.set_value(round(value, 4))
+            # Los nodos numéricos se crean como Double
+            if isinstance(value, (float, int)):
 
-                else:
+                value = round(float(value), 4)
 
-                    _tag.set_value(value)
+            self.__publish(self._tag_nodes[row["id"]], value)
 
     def __update_alarms(self):
         r"""
         Updates the state of alarms in the OPC UA address space.
         """
-        alarms = self.alarm_manager.get_alarms()
-        segment = "Alarms"
-        for _, alarm in alarms.items():
+        for identifier, alarm in self.alarm_manager.get_alarms().items():
 
-            alarm_name = alarm.name
+            props = self._alarm_nodes.get(identifier)
+            if not props:
 
-            if alarm.tag.segment:
+                continue
 
-                segment = alarm.tag.segment
-                segment = f"{segment}.alarms"
+            for prop, display_name in props:
 
-            var_name = f"{segment}.{alarm_name}"
-            if hasattr(self, var_name):
-                    
-                var = getattr(self, var_name)
-                props = var.get_properties()
+                if display_name.startswith("setpoint"):
 
-                for prop in props:
-                    
-                    display_name = prop.get_display_name().Text                   
+                    attr = getattr(alarm.alarm_setpoint, display_name.replace("setpoint.", ""))
 
-                    if display_name.startswith("setpoint"):
-                        display_name = display_name.replace("setpoint.", "")
-                        attr = getattr(alarm.alarm_setpoint, display_name)
-                        prop.set_value(attr)
+                else:
 
-                    else:
-                        attr = getattr(alarm.state, display_name)
-                        prop.set_value(attr)
+                    attr = getattr(alarm.state, display_name)
+
+                self.__publish(prop, attr)
 
     def __update_engines(self):
         r"""
         Updates the state of engines in the OPC UA address space.
         """
-        segment = "Engines"
-        engines = self.machine.machine_manager.get_machines()
-
-        for engine, _, _ in engines:
-
-            engine = engine.serialize()
-            engine_name = engine["name"]
+        for engine, _, _ in self.machine.machine_manager.get_machines():
 
-            if engine["segment"]:
+            props = self._engine_nodes.get(engine.name.value)
+            if not props:
 
-                segment = engine["segment"]
-                segment = f"{segment}.engines"
+                continue
 
-            var_name = f"{segment}.{engine_name}"
-            if hasattr(self, var_name):
-                    
-                var = getattr(self, var_name)
-                props = var.get_properties()
+            engine = engine.serialize()
+            for prop, display_name in props:
 
-                for prop in props:
-                    
-                    display_name = prop.get_display_name().Text                
-                    attr = engine[display_name]
-                    prop.set_value(attr)
+                self.__publish(prop, engine[display_name])
 
     def __load_saved_access_type(self, node, var_name):
         from .core import PyAutomation
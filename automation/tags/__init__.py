@@ -1,2 +1,3 @@
 from .cvt import CVT, CVTEngine
-from .tag import Tag, TagObserver
\ No newline at end of file
+from .tag import Tag, TagObserver
+from .snapshot import TagSnapshot, TagSnapshotReader
\ No newline at end of file
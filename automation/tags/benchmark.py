@@ -0,0 +1,86 @@
+r"""
+Memory benchmark for the Tag representation.
+
+Creates `--tags` tags (as `CVT.set_tag` does, with the metadata strings coming from separate
+objects, e.g. database rows) and reports the memory allocated per tag after creation and after
+`--updates` value updates, and the time of a full garbage collection with the tags alive.
+
+**Usage:**
+
+```
+python -m automation.tags.benchmark
+python -m automation.tags.benchmark --tags 50000 --updates 10
+```
+"""
+import argparse, gc, json, time, tracemalloc
+from datetime import datetime
+from .tag import Tag
+
+
+def allocated(snapshot, base)->int:
+    r"""
+    Bytes allocated between two tracemalloc snapshots.
+    """
+    return sum(stat.size_diff for stat in snapshot.compare_to(base, "filename"))
+
+
+def run(tags:int=20000, updates:int=10)->dict:
+    r"""
+    Runs the benchmark.
+
+    **Parameters:**
+
+    * **tags** (int): Tags created.
+    * **updates** (int): Value updates of every tag.
+
+    **Returns:**
+
+    * **dict**: Bytes per tag after creation and after the updates, and full GC time (ms).
+    """
+    # Cadenas nuevas por tag, como las que llegan de la base de datos o de la API
+    metadata = [
+        {key: "".join(value) for key, value in (("unit", "Pa"), ("variable", "Pressure"), ("data_type", "float"), ("segment", "Area-1"), ("manufacturer", "ACME"))}
+        for _ in range(tags)
+    ]
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    _tags = [
+        Tag(
+            name=f"PT-{index:05d}",
+            description="",
+            opcua_address="opc.tcp://127.0.0.1:4840",
+            node_namespace=f"ns=2;s=PT-{index:05d}",
+            **metadata[index]
+        ) for index in range(tags)
+    ]
+    created = tracemalloc.take_snapshot()
+    timestamp = datetime.now()
+    for tag in _tags:
+
+        for value in range(updates):
+
+            tag.set_value(float(value), timestamp)
+
+    updated = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    gc.collect()
+    gc_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "tags": tags,
+        "updates": updates,
+        "bytes_per_tag_created": round(allocated(created, base) / tags),
+        "bytes_per_tag_updated": round(allocated(updated, base) / tags),
+        "gc_ms": round(gc_ms, 2)
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Tag memory benchmark")
+    parser.add_argument("--tags", type=int, default=20000)
+    parser.add_argument("--updates", type=int, default=10, help="Value updates per tag")
+    args = parser.parse_args()
+    print(json.dumps(run(tags=args.tags, updates=args.updates), indent=2))
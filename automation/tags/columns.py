@@ -0,0 +1,392 @@
+r"""
+Columnar store of the current values of the Current Value Table (CVT).
+
+The CVT keeps one `Tag` object per tag; reading the whole table means one attribute lookup,
+unit conversion and dict per tag. This store keeps the current value (display unit), timestamp,
+quality and data type of every tag in NumPy arrays indexed by a slot assigned to the tag, next
+to the tag objects, so whole-table reads are array copies and slices.
+
+Every update stamps the slot with a store-wide sequence number: `read(since=sequence)` returns
+only the tags changed after a previous read.
+
+The binary frame (`frame`) carries the values of the whole CVT in a compact layout
+(little endian):
+
+* **Header** (40 bytes): magic, version, count, generation, sequence, creation time.
+* **Records** (``count`` x 25 bytes): slot, value, timestamp, quality, data type.
+
+The slot -> name map (`index`) only changes when the header generation changes.
+"""
+import math, struct, time
+import numpy as np
+from .snapshot import DATA_TYPES, GOOD
+
+MAGIC = b"PYAUTCVT"
+VERSION = 1
+FRAME_HEADER = struct.Struct("<8sIIQQd")
+FRAME_RECORD = np.dtype([
+    ("slot", "<u4"),
+    ("value", "<f8"),
+    ("timestamp", "<f8"),
+    ("quality", "<u4"),
+    ("data_type", "u1")
+])
+_DATA_TYPES = {code: data_type for data_type, code in DATA_TYPES.items()}
+
+
+def parse_frame(data:bytes)->tuple[dict, np.ndarray]:
+    r"""
+    Parses a binary frame built by `ColumnStore.frame`.
+
+    **Parameters:**
+
+    * **data** (bytes): Frame.
+
+    **Returns:**
+
+    * **tuple**: (header {version, count, generation, sequence, created}, structured array of records)
+    """
+    magic, version, count, generation, sequence, created = FRAME_HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+
+        raise ValueError("Not a CVT values frame")
+
+    records = np.frombuffer(data, dtype=FRAME_RECORD, count=count, offset=FRAME_HEADER.size)
+    header = {"version": version, "count": count, "generation": generation, "sequence": sequence, "created": created}
+
+    return header, records
+
+
+class ColumnStore:
+    r"""
+    Current value, timestamp, quality and data type of the tags in NumPy columns.
+
+    String values can not live in a float column: their column value is NaN and the string is
+    kept aside, so `serialize` still returns it.
+
+    **Parameters:**
+
+    * **capacity** (int): Initial number of slots; the columns double when they are full.
+
+    Usage:
+
+    ```python
+    >>> from datetime import datetime, timezone
+    >>> from automation.tags.columns import ColumnStore, parse_frame
+    >>> store = ColumnStore()
+    >>> store.register(id="a1", name="PT-01", data_type="float")
+    0
+    >>> store.register(id="b2", name="XV-01", data_type="bool")
+    1
+    >>> store.update(id="a1", value=10.5, timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    >>> sequence = store.sequence
+    >>> store.update(id="b2", value=True, timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    >>> [(row["name"], row["value"]) for row in store.serialize()]
+    [('PT-01', 10.5), ('XV-01', True)]
+    >>> [row["name"] for row in store.serialize(since=sequence)]
+    ['XV-01']
+    >>> header, records = parse_frame(store.frame())
+    >>> header["count"], records["value"].tolist(), store.index()["names"][records["slot"][0]]
+    (2, [10.5, 1.0], 'PT-01')
+
+    ```
+    """
+
+    def __init__(self, capacity:int=1024):
+
+        self._slots = dict()
+        self._free = list()
+        self._text = dict()
+        self.ids = list()
+        self.names = list()
+        self.generation = 0
+        self.sequence = 0
+        self.values = np.full(capacity, np.nan)
+        self.timestamps = np.full(capacity, np.nan)
+        self.quality = np.zeros(capacity, dtype=np.uint32)
+        self.data_types = np.zeros(capacity, dtype=np.uint8)
+        self.sequences = np.zeros(capacity, dtype=np.uint64)
+        self.used = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+
+        return len(self._slots)
+
+    def __grow(self):
+
+        capacity = len(self.values) * 2
+        for column, fill in (("values", np.nan), ("timestamps", np.nan), ("quality", 0), ("data_types", 0), ("sequences", 0), ("used", False)):
+
+            old = getattr(self, column)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, column, new)
+
+    def __touch(self, slot:int):
+
+        self.sequence += 1
+        self.sequences[slot] = self.sequence
+
+    def register(self, id:str, name:str, data_type:str="float")->int:
+        r"""
+        Assigns a slot to a tag (no-op if it already has one).
+
+        **Parameters:**
+
+        * **id** (str): Tag ID.
+        * **name** (str): Tag name.
+        * **data_type** (str): 'float', 'int', 'bool' or 'str'.
+
+        **Returns:**
+
+        * **int**: Slot index.
+        """
+        slot = self._slots.get(id)
+        if slot is not None:
+
+            return slot
+
+        if self._free:
+
+            slot = self._free.pop()
+            self.ids[slot] = id
+            self.names[slot] = name
+
+        else:
+
+            slot = len(self.ids)
+            if slot == len(self.values):
+
+                self.__grow()
+
+            self.ids.append(id)
+            self.names.append(name)
+
+        self._slots[id] = slot
+        self.values[slot] = np.nan
+        self.timestamps[slot] = np.nan
+        self.quality[slot] = GOOD
+        self.data_types[slot] = DATA_TYPES.get(data_type, DATA_TYPES["float"])
+        self.used[slot] = True
+        self.generation += 1
+        self.__touch(slot)
+
+        return slot
+
+    def unregister(self, id:str):
+        r"""
+        Releases the slot of a tag.
+        """
+        slot = self._slots.pop(id, None)
+        if slot is None:
+
+            return
+
+        self.ids[slot] = None
+        self.names[slot] = None
+        self.used[slot] = False
+        self._text.pop(slot, None)
+        self._free.append(slot)
+        self.generation += 1
+
+    def rename(self, id:str, name:str):
+        r"""
+        Changes the name of a registered tag.
+        """
+        slot = self._slots.get(id)
+        if slot is not None and self.names[slot] != name:
+
+            self.names[slot] = name
+            self.generation += 1
+            self.__touch(slot)
+
+    def set_data_type(self, id:str, data_type:str):
+        r"""
+        Changes the data type of a registered tag.
+        """
+        slot = self._slots.get(id)
+        if slot is not None:
+
+            self.data_types[slot] = DATA_TYPES.get(data_type, DATA_TYPES["float"])
+            self.__touch(slot)
+
+    def update(self, id:str, value, timestamp=None, quality:int=GOOD):
+        r"""
+        Writes the current value of a tag.
+
+        **Parameters:**
+
+        * **id** (str): Tag ID.
+        * **value** (float|int|bool|str): Value in display unit.
+        * **timestamp** (datetime, optional): Value timestamp.
+        * **quality** (int, optional): OPC UA StatusCode value. Defaults to Good (0).
+        """
+        slot = self._slots.get(id)
+        if slot is None:
+
+            return
+
+        if isinstance(value, str):
+
+            self._text[slot] = value
+            value = math.nan
+
+        elif value is None:
+
+            value = math.nan
+
+        self.values[slot] = value
+        self.timestamps[slot] = timestamp.timestamp() if timestamp is not None else math.nan
+        self.quality[slot] = quality
+        self.__touch(slot)
+
+    def set_quality(self, id:str, quality:int):
+        r"""
+        Changes the quality of the current value of a tag.
+        """
+        slot = self._slots.get(id)
+        if slot is not None and self.quality[slot] != quality:
+
+            self.quality[slot] = quality
+            self.__touch(slot)
+
+    def select(self, ids:list=None, since:int=None)->np.ndarray:
+        r"""
+        Returns the slots in use, in slot order.
+
+        **Parameters:**
+
+        * **ids** (list, optional): Only these tags (unknown IDs are ignored).
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **numpy.ndarray**: Slot indexes.
+        """
+        if ids is None:
+
+            slots = np.flatnonzero(self.used[:len(self.ids)])
+
+        else:
+
+            slots = np.array(sorted(self._slots[id] for id in ids if id in self._slots), dtype=np.int64)
+
+        if since is not None:
+
+            slots = slots[self.sequences[slots] > since]
+
+        return slots
+
+    def read(self, ids:list=None, since:int=None)->dict:
+        r"""
+        Returns a copy of the columns of the selected tags.
+
+        **Parameters:**
+
+        * **ids** (list, optional): Only these tags.
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **dict**: {sequence, slots, ids, names, values, timestamps (epoch seconds), quality, data_types}
+        """
+        slots = self.select(ids=ids, since=since)
+
+        return {
+            "sequence": self.sequence,
+            "slots": slots,
+            "ids": [self.ids[slot] for slot in slots.tolist()],
+            "names": [self.names[slot] for slot in slots.tolist()],
+            "values": self.values[slots],
+            "timestamps": self.timestamps[slots],
+            "quality": self.quality[slots],
+            "data_types": self.data_types[slots]
+        }
+
+    def serialize(self, ids:list=None, since:int=None)->list[dict]:
+        r"""
+        Serializes the current values of the selected tags.
+
+        **Parameters:**
+
+        * **ids** (list, optional): Only these tags.
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **list[dict]**: {id, name, value, timestamp (epoch seconds), quality}; NaN values and
+          timestamps are None, int and bool values keep their type.
+        """
+        slots = self.select(ids=ids, since=since)
+        values = self.values[slots]
+        timestamps = self.timestamps[slots]
+        data_types = self.data_types[slots]
+        missing = np.isnan(values).tolist()
+        no_timestamp = np.isnan(timestamps).tolist()
+        integer = (data_types == DATA_TYPES["int"]).tolist()
+        boolean = (data_types == DATA_TYPES["bool"]).tolist()
+        text = self._text
+        result = list()
+        for position, (slot, value, timestamp, quality) in enumerate(zip(slots.tolist(), values.tolist(), timestamps.tolist(), self.quality[slots].tolist())):
+
+            if missing[position]:
+
+                value = text.get(slot)
+
+            elif integer[position]:
+
+                value = int(value)
+
+            elif boolean[position]:
+
+                value = bool(value)
+
+            result.append({
+                "id": self.ids[slot],
+                "name": self.names[slot],
+                "value": value,
+                "timestamp": None if no_timestamp[position] else timestamp,
+                "quality": quality
+            })
+
+        return result
+
+    def frame(self, ids:list=None, since:int=None)->bytes:
+        r"""
+        Builds the binary frame of the selected tags (see the module layout).
+
+        **Parameters:**
+
+        * **ids** (list, optional): Only these tags.
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **bytes**: Frame; parse it with `parse_frame`.
+        """
+        slots = self.select(ids=ids, since=since)
+        records = np.empty(len(slots), dtype=FRAME_RECORD)
+        records["slot"] = slots
+        records["value"] = self.values[slots]
+        records["timestamp"] = self.timestamps[slots]
+        records["quality"] = self.quality[slots]
+        records["data_type"] = self.data_types[slots]
+        header = FRAME_HEADER.pack(MAGIC, VERSION, len(slots), self.generation, self.sequence, time.time())
+
+        return header + records.tobytes()
+
+    def index(self)->dict:
+        r"""
+        Returns the slot -> name map of the frames.
+
+        **Returns:**
+
+        * **dict**: {generation, names: {slot: name}, data_types: {slot: data type}}
+        """
+        slots = self.select().tolist()
+
+        return {
+            "generation": self.generation,
+            "names": {slot: self.names[slot] for slot in slots},
+            "data_types": {slot: _DATA_TYPES.get(int(self.data_types[slot]), "float") for slot in slots}
+        }
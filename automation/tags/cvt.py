@@ -1,4 +1,4 @@
-import threading, copy, logging
+import threading, copy, logging, time
 from datetime import datetime
 from ..singleton import Singleton
 from ..models import FloatType, StringType, IntegerType, BooleanType
@@ -6,9 +6,16 @@ from ..modules.users.users import User
 from ..modules.users.users import User
 from ..utils.decorators import set_event, logging_error_handler
 from ..filter import filter
-# from ..iad import iad_outlier, iad_frozen_data, iad_out_of_range
-from .tag import Tag
-from flask_socketio import SocketIO
+from ..iad import iad_outlier, iad_frozen_data, iad_out_of_range, reset as reset_iad, rename as rename_iad
+from .tag import Tag, tracer, intern, DATETIME_FORMAT
+from .snapshot import TagSnapshot, SnapshotError
+from .columns import ColumnStore
+from .quality import StalenessIndex, QualityAlarms, STALE, GOOD, severity, quality_name
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # flask_socketio arrastra flask/werkzeug/jinja2; solo se usa para anotaciones
+    from flask_socketio import SocketIO
 
 class CVT:
     """
@@ -29,10 +36,25 @@ class CVT:
         
         self._tags = dict()
         self.data_types = ["float", "int", "bool", "str"]
-        self.sio:SocketIO|None = None
+        self.sio:'SocketIO|None' = None
+        self.snapshot:TagSnapshot|None = None
+        # Detección de anomalías (IAD) en set_value: opt-in, ver set_iad
+        self.iad = False
+        # Tags que no caben en el snapshot (lleno o nombre muy largo): no se reintenta en cada valor
+        self._unpublished = set()
+        self._changes = dict()
+        # Valores actuales en columnas NumPy (lecturas de toda la tabla)
+        self.columns = ColumnStore()
+        # Calidad OPC UA: índice de vencimientos (datos congelados) y alarmas de calidad
+        self.staleness = StalenessIndex()
+        self.quality_alarms = QualityAlarms()
+        # Índices secundarios -> id del tag
+        self._names = dict()
+        self._display_names = dict()
+        self._node_namespaces = dict()
 
     @logging_error_handler
-    def set_socketio(self, sio:SocketIO):
+    def set_socketio(self, sio:'SocketIO'):
         r"""
         Sets the SocketIO instance for real-time updates.
 
@@ -40,7 +62,173 @@ class CVT:
 
         * **sio** (SocketIO): The SocketIO server instance.
         """
-        self.sio:SocketIO = sio
+        self.sio:'SocketIO' = sio
+
+    @logging_error_handler
+    def set_snapshot(self, snapshot:TagSnapshot|None):
+        r"""
+        Sets the shared-memory snapshot where tag values are published for other processes.
+
+        Tags already defined in the CVT are published immediately.
+
+        **Parameters:**
+
+        * **snapshot** (TagSnapshot|None): Snapshot writer. None disables publishing.
+        """
+        self.snapshot = snapshot
+        self._unpublished.clear()
+        if snapshot:
+
+            for tag in self._tags.values():
+
+                self.publish_snapshot(tag=tag)
+
+    @logging_error_handler
+    def track_changes(self, name:str):
+        r"""
+        Registers a consumer of tag changes (dirty tracking).
+
+        Every tag set, updated or written after this call is reported once by `pop_changes`.
+        All current tags are reported as changed on the first `pop_changes`.
+
+        **Parameters:**
+
+        * **name** (str): Consumer name (e.g. 'opcua_server').
+        """
+        self._changes[name] = set(self._tags.keys())
+
+    @logging_error_handler
+    def untrack_changes(self, name:str):
+        r"""
+        Removes a consumer of tag changes.
+
+        **Parameters:**
+
+        * **name** (str): Consumer name.
+        """
+        self._changes.pop(name, None)
+
+    @logging_error_handler
+    def pop_changes(self, name:str)->list:
+        r"""
+        Returns the IDs of the tags changed since the last call for a consumer and clears them.
+
+        **Parameters:**
+
+        * **name** (str): Consumer name registered with `track_changes`.
+
+        **Returns:**
+
+        * **list**: Changed tag IDs (still defined in the CVT).
+        """
+        changes = self._changes.get(name)
+        if not changes:
+
+            return list()
+
+        self._changes[name] = set()
+
+        return [id for id in changes if id in self._tags]
+
+    def __index(self, tag:Tag):
+
+        self._names[tag.get_name()] = tag.id
+        if tag.get_display_name():
+            self._display_names[tag.get_display_name()] = tag.id
+        if tag.get_node_namespace():
+            self._node_namespaces[tag.get_node_namespace()] = tag.id
+
+    def __unindex(self, tag:Tag):
+
+        for index, key in (
+            (self._names, tag.get_name()),
+            (self._display_names, tag.get_display_name()),
+            (self._node_namespaces, tag.get_node_namespace())
+        ):
+            if key and index.get(key)==tag.id:
+                index.pop(key)
+
+    def __mark_changed(self, id:str):
+
+        for changes in self._changes.values():
+
+            changes.add(id)
+
+    def __publish_columns(self, tag:Tag):
+
+        value = tag.value.value if tag.data_type == "str" else tag.get_value()
+        self.columns.update(id=tag.id, value=value, timestamp=tag.timestamp, quality=tag.quality)
+
+    def __schedule_staleness(self, tag:Tag):
+
+        # Solo los tags leídos por DAQ (scan time > 100 ms) reciben muestras periódicas; los de DAS
+        # (suscripción por cambio) no notifican mientras el valor no cambia
+        if tag.scan_time and tag.scan_time > 100:
+
+            self.staleness.schedule(id=tag.id, period=tag.scan_time / 1000)
+
+        else:
+
+            self.staleness.remove(id=tag.id)
+
+    def __quality_changed(self, tag:Tag):
+
+        from .. import TIMEZONE
+        try:
+
+            self.quality_alarms.evaluate(tag_name=tag.name, quality=tag.quality)
+
+        except Exception as err:
+
+            logging.error(f"Error evaluating quality alarm of {tag.name}: {err}")
+
+        if self.sio:
+
+            self.sio.emit("on.tag.quality", data={
+                "id": tag.id,
+                "name": tag.name,
+                "quality": tag.quality,
+                "quality_name": quality_name(tag.quality),
+                "severity": severity(tag.quality),
+                "timestamp": datetime.now(TIMEZONE).strftime(DATETIME_FORMAT)
+            })
+
+    def __ids(self, names:list=None)->list|None:
+
+        if names is None:
+
+            return None
+
+        return [self._names[name] for name in names if name in self._names]
+
+    @logging_error_handler
+    def publish_snapshot(self, tag:Tag):
+        r"""
+        Publishes the current value of a tag into the shared-memory snapshot, if any.
+
+        A tag that can not be registered (snapshot full or name too long) is logged once and left
+        unpublished until it is renamed or the snapshot is replaced.
+
+        **Parameters:**
+
+        * **tag** (Tag): Tag to publish.
+        """
+        if self.snapshot and tag.id not in self._unpublished:
+
+            try:
+
+                self.snapshot.publish(
+                    name=tag.name,
+                    value=tag.get_value() if tag.data_type != "str" else None,
+                    timestamp=tag.timestamp,
+                    quality=tag.quality,
+                    data_type=tag.data_type
+                )
+
+            except SnapshotError as err:
+
+                self._unpublished.add(tag.id)
+                logging.warning(f"Tag {tag.name} is not published in the snapshot: {err}")
 
     @set_event(message=f"Created", classification="Tag", priority=1, criticity=1)
     def set_tag(
@@ -145,9 +333,29 @@ class CVT:
             id=id
         )
         self._tags[tag.id] = tag
+        self.__index(tag)
+        self.columns.register(id=tag.id, name=tag.name, data_type=tag.data_type)
+        self.__publish_columns(tag)
+        self.__schedule_staleness(tag)
+        self.publish_snapshot(tag=tag)
+        self.__mark_changed(tag.id)
 
         return tag, message
 
+    def set_tags(self, tags:list[dict])->list[tuple]:
+        r"""
+        Creates and registers several tags in one call (bulk load).
+
+        **Parameters:**
+
+        * **tags** (list[dict]): `set_tag` keyword arguments of every tag.
+
+        **Returns:**
+
+        * **list[tuple]**: (Tag object or None, message) for every tag, in the same order.
+        """
+        return [self.set_tag(**tag) for tag in tags]
+
     @set_event(message=f"Updated", classification="Tag", priority=1, criticity=3)
     def update_tag(
         self, 
@@ -183,7 +391,17 @@ class CVT:
             return None, message
         
         tag = self._tags[id]
+        self.__unindex(tag)
         if "name" in kwargs:
+            if self.snapshot:
+                try:
+                    self.snapshot.rename(name=tag.name, new_name=kwargs["name"])
+                except SnapshotError:
+                    # Nombre demasiado largo: el slot queda libre y publish_snapshot lo reporta
+                    pass
+            self._unpublished.discard(tag.id)
+            rename_iad(tag_name=tag.name, new_name=kwargs["name"])
+            self.quality_alarms.forget(tag_name=tag.name)
             tag.set_name(name=kwargs["name"])
         if "unit" in kwargs:
             tag.set_unit(unit=kwargs["unit"])
@@ -210,12 +428,13 @@ class CVT:
         if "scan_time" in kwargs:
             if isinstance(kwargs["scan_time"], int):
                 tag.set_scan_time(scan_time=kwargs["scan_time"])
+                self.__schedule_staleness(tag)
         if "dead_band" in kwargs:
             tag.set_dead_band(dead_band=kwargs["dead_band"])
         if "segment" in kwargs:
-            tag.segment = kwargs["segment"]
+            tag.segment = intern(kwargs["segment"])
         if "manufacturer" in kwargs:
-            tag.manufacturer = kwargs["manufacturer"]
+            tag.manufacturer = intern(kwargs["manufacturer"])
         if "kp" in kwargs:
             tag.set_kp(kp=kwargs["kp"])
         if "gaussian_filter" in kwargs:
@@ -234,6 +453,11 @@ class CVT:
             tag.gaussian_filter_threshold = kwargs['gaussian_filter_threshold']
         
         self._tags[id] = tag
+        self.__index(tag)
+        self.columns.rename(id=id, name=tag.name)
+        self.columns.set_data_type(id=id, data_type=tag.data_type)
+        self.__publish_columns(tag)
+        self.__mark_changed(id)
 
         return tag, f"Tag: {tag.name}"
 
@@ -252,6 +476,14 @@ class CVT:
         * **tuple**: (Deleted Tag object, Status message).
         """
         tag = self._tags.pop(id)
+        self.__unindex(tag)
+        self.columns.unregister(id=id)
+        self.staleness.remove(id=id)
+        self.quality_alarms.forget(tag_name=tag.name)
+        if self.snapshot:
+            self.snapshot.unregister(name=tag.name)
+        self._unpublished.discard(id)
+        reset_iad(tag_name=tag.name, keep_range=False)
         return tag, f"Tag: {tag.name}"
 
     @logging_error_handler
@@ -267,13 +499,7 @@ class CVT:
 
         * **Tag**: The Tag object if found, else None.
         """
-        for _id, tag in self._tags.items():
-
-            if _id==id:
-                
-                return tag
-
-        return None
+        return self._tags.get(id)
     
     @logging_error_handler
     def get_unit_by_tag(self, tag:str)->Tag|None:
@@ -451,13 +677,12 @@ class CVT:
 
         * **Tag**: Tag object or None.
         """
-        for _, tag in self._tags.items():
-            
-            if tag.get_name()==name:
-                
-                return tag
+        id = self._names.get(name)
+        if id is None:
 
-        return None
+            return None
+
+        return self._tags.get(id)
     
     @logging_error_handler
     def get_tag_by_display_name(self, display_name:str)->Tag|None:
@@ -472,13 +697,12 @@ class CVT:
 
         * **Tag**: Tag object or None.
         """
-        for _, tag in self._tags.items():
+        id = self._display_names.get(display_name)
+        if id is None:
 
-            if tag.get_display_name()==display_name:
-                
-                return tag
+            return None
 
-        return None
+        return self._tags.get(id)
 
     @logging_error_handler
     def get_tag_by_node_namespace(self, node_namespace:str)->Tag|None:
@@ -493,13 +717,12 @@ class CVT:
 
         * **Tag**: Tag object or None.
         """
-        for _, tag in self._tags.items():
+        id = self._node_namespaces.get(node_namespace)
+        if id is None:
 
-            if tag.get_node_namespace()==node_namespace:
-                
-                return tag
+            return None
 
-        return None
+        return self._tags.get(id)
     
     @logging_error_handler
     def get_value(self, id:str)->str|float|int|bool:
@@ -585,10 +808,10 @@ class CVT:
     
     @logging_error_handler
     @filter
-    # @iad_frozen_data
-    # @iad_out_of_range
-    # @iad_outlier
-    def set_value(self, id:str, value, timestamp:datetime):
+    @iad_frozen_data
+    @iad_out_of_range
+    @iad_outlier
+    def set_value(self, id:str, value, timestamp:datetime, quality:int=GOOD):
         """
         Sets a new value for a tag.
 
@@ -597,15 +820,24 @@ class CVT:
         **Parameters:**
 
         * **id** (str): Tag ID.
-        * **value**: New value.
+        * **value**: New value. None (a sample without usable value) only updates the quality.
         * **timestamp** (datetime): Timestamp of the value.
+        * **quality** (int, optional): OPC UA StatusCode value of the sample. Defaults to Good (0).
 
         **Returns:**
 
         * **value**: The value that was set (or filtered).
         """
         from .. import TIMEZONE
+        tracer.stamp("filters.iad")
         tag = self._tags[id]
+        # Cualquier muestra recibida renueva el vencimiento del tag
+        self.staleness.touch(id=id)
+        if value is None:
+
+            self.set_quality(id=id, quality=quality)
+
+            return value
         
         # Deadband Logic Wrapper for CVT
         
@@ -614,18 +846,136 @@ class CVT:
             try:
                 current_value = tag.value.value
                 if abs(value - current_value) < tag.dead_band:
+                    self.set_quality(id=id, quality=quality)
                     return value
             except Exception as e:
                 logging.error(f"Error in deadband logic: {e}")
 
+        quality_changed = tag.quality != quality
+        tag.quality = quality
         tag.set_value(value=value, timestamp=timestamp)
+        self.__publish_columns(tag)
+        self.publish_snapshot(tag=tag)
+        self.__mark_changed(id)
+        tracer.stamp("cvt.snapshot")
+        if quality_changed:
+
+            self.__quality_changed(tag)
+
         if self.sio:
             timestamp = timestamp.astimezone(TIMEZONE)
             self._tags[id].timestamp = timestamp
             self.sio.emit("on.tag", data=self._tags[id].serialize())
+            tracer.stamp("socketio.emit")
 
         return value
 
+    @logging_error_handler
+    def set_quality(self, id:str, quality:int)->bool:
+        r"""
+        Sets the quality of the current value of a tag, keeping the value.
+
+        A change updates the columnar store and the snapshot, drives the `alarm.quality.<tag_name>`
+        alarm (if defined) and emits `on.tag.quality` through Socket.IO.
+
+        **Parameters:**
+
+        * **id** (str): Tag ID.
+        * **quality** (int): OPC UA StatusCode value (0 = Good).
+
+        **Returns:**
+
+        * **bool**: True if the quality changed.
+        """
+        tag = self._tags[id]
+        if tag.quality == quality:
+
+            return False
+
+        tag.quality = quality
+        self.columns.set_quality(id=id, quality=quality)
+        self.publish_snapshot(tag=tag)
+        self.__mark_changed(id)
+        self.__quality_changed(tag)
+
+        return True
+
+    @logging_error_handler
+    def set_iad(self, enabled:bool):
+        r"""
+        Enables or disables the Instrument Anomaly Detection (IAD) of `set_value`.
+
+        Disabled by default: when enabled, the frozen data, out of range and outlier detectors run on
+        every sample of the tags with the corresponding detection flag and drive their `alarm.iad.<tag>`
+        alarms. Disabling it discards the detector states (instrument ranges are kept).
+
+        **Parameters:**
+
+        * **enabled** (bool): True to run the IAD detectors.
+        """
+        self.iad = bool(enabled)
+        if not self.iad:
+
+            reset_iad()
+
+    @logging_error_handler
+    def set_staleness(self, factor:float=None, min_period:float=None):
+        r"""
+        Configures the staleness detection.
+
+        **Parameters:**
+
+        * **factor** (float, optional): Missed scan periods before a tag is stale.
+        * **min_period** (float, optional): Lower bound (s) of the expected period between samples.
+        """
+        if factor is not None:
+
+            self.staleness.factor = factor
+
+        if min_period is not None:
+
+            self.staleness.min_period = min_period
+
+    @logging_error_handler
+    def check_staleness(self, now:float=None)->float:
+        r"""
+        Marks the tags whose samples stopped arriving as stale (quality UncertainLastUsableValue).
+
+        Only polled tags (scan time > 100 ms, read by DAQ) are monitored: a tag is stale after
+        `factor` scan periods without samples, and its quality comes back with its next sample.
+        Tags subscribed by DAS only notify changes, so a constant value would look stale.
+
+        **Parameters:**
+
+        * **now** (float, optional): Current `time.monotonic()` time.
+
+        **Returns:**
+
+        * **float**: Seconds until the next deadline (inf if no tag is monitored).
+        """
+        for id in self.staleness.expired(now=now):
+
+            if id in self._tags:
+
+                self.set_quality(id=id, quality=STALE)
+
+        if now is None:
+
+            now = time.monotonic()
+
+        return max(0.0, self.staleness.next_deadline() - now)
+
+    @logging_error_handler
+    def get_stale_tags(self)->list:
+        r"""
+        Gets the names of the stale tags.
+
+        **Returns:**
+
+        * **list**: Tag names.
+        """
+        return [self._tags[id].name for id in self.staleness.stale() if id in self._tags]
+
     @logging_error_handler
     def set_data_type(self, data_type):
         r"""
@@ -704,32 +1054,18 @@ class CVT:
         * **tuple**: (Has Duplicates bool, Message str).
         """
 
-        for _, _tag in self._tags.items():
+        if name and name in self._names:
 
-            if name:
+            return True, f"Duplicated Tag Name: {name}"
 
-                if _tag.get_name()==name:
+        if display_name and display_name in self._display_names:
 
-                    return True, f"Duplicated Tag Name: {name}"
-                
-            if display_name:
-            
-                if _tag.get_display_name()==display_name:
+            return True, f"Duplicated Display Name: {display_name}"
 
-                    return True, f"Duplicated Display Name: {display_name}"
-                
-            if node_namespace:
-            
-                if _tag.get_node_namespace()==node_namespace:
-                    
-                    if tag:
-                    
-                        if _tag.get_opcua_address()==tag.get_opcua_address():
+        if node_namespace and node_namespace in self._node_namespaces:
+
+            return True, f"Duplicated Node Namespace: {node_namespace}"
 
-                            return True, f"Duplicated Node Namespace: {node_namespace}"
-                        
-                    return True, f"Duplicated Node Namespace: {node_namespace}"
-            
         return False, f"Valid Tag Name: {name} - Display Name: {display_name}"
 
     @logging_error_handler
@@ -766,6 +1102,70 @@ class CVT:
 
             return tag.serialize()
 
+    @logging_error_handler
+    def read_values(self, names:list=None, since:int=None)->dict:
+        r"""
+        Reads the current values of the tags from the columnar store (NumPy arrays).
+
+        **Parameters:**
+
+        * **names** (list, optional): Tag names. All tags if not provided.
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **dict**: {sequence, slots, ids, names, values, timestamps (epoch seconds), quality, data_types}
+        """
+        return self.columns.read(ids=self.__ids(names), since=since)
+
+    @logging_error_handler
+    def serialize_values(self, names:list=None, ids:list=None, since:int=None)->dict:
+        r"""
+        Serializes the current values of the tags from the columnar store.
+
+        **Parameters:**
+
+        * **names** (list, optional): Tag names. All tags if neither names nor ids are provided.
+        * **ids** (list, optional): Tag IDs.
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **dict**: {sequence, data: [{id, name, value, timestamp (epoch seconds), quality}]}
+        """
+        if ids is None:
+
+            ids = self.__ids(names)
+
+        return {"sequence": self.columns.sequence, "data": self.columns.serialize(ids=ids, since=since)}
+
+    @logging_error_handler
+    def get_values_frame(self, names:list=None, since:int=None)->bytes:
+        r"""
+        Returns the current values of the tags as a compact binary frame (see `automation.tags.columns`).
+
+        **Parameters:**
+
+        * **names** (list, optional): Tag names. All tags if not provided.
+        * **since** (int, optional): Only tags changed after this sequence number.
+
+        **Returns:**
+
+        * **bytes**: Frame.
+        """
+        return self.columns.frame(ids=self.__ids(names), since=since)
+
+    @logging_error_handler
+    def get_values_frame_index(self)->dict:
+        r"""
+        Returns the slot -> tag name map of the binary frames.
+
+        **Returns:**
+
+        * **dict**: {generation, names: {slot: name}, data_types: {slot: data type}}
+        """
+        return self.columns.index()
+
 
 class CVTEngine(Singleton):
     """
@@ -854,6 +1254,19 @@ class CVTEngine(Singleton):
         _query["parameters"]["id"] = id
         _query["parameters"]["user"] = user
         return self.__query(_query)
+
+    @logging_error_handler
+    def set_tags(self, tags:list[dict])->list[tuple]:
+        r"""
+        Thread-safe method to create several tags holding the lock once.
+
+        See `CVT.set_tags` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "set_tags"
+        _query["parameters"] = dict()
+        _query["parameters"]["tags"] = tags
+        return self.__query(_query)
     
     @logging_error_handler
     def update_tag(
@@ -1051,7 +1464,57 @@ class CVTEngine(Singleton):
         return self.__query(_query)
     
     @logging_error_handler
-    def set_value(self, id:str, value, timestamp:datetime):
+    def track_changes(self, name:str):
+        r"""
+        Thread-safe method to register a consumer of tag changes.
+
+        See `CVT.track_changes` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "track_changes"
+        _query["parameters"] = dict()
+        _query["parameters"]["name"] = name
+        return self.__query(_query)
+
+    @logging_error_handler
+    def untrack_changes(self, name:str):
+        r"""
+        Thread-safe method to remove a consumer of tag changes.
+        """
+        _query = dict()
+        _query["action"] = "untrack_changes"
+        _query["parameters"] = dict()
+        _query["parameters"]["name"] = name
+        return self.__query(_query)
+
+    @logging_error_handler
+    def pop_changes(self, name:str)->list:
+        r"""
+        Thread-safe method to get and clear the tags changed for a consumer.
+
+        See `CVT.pop_changes` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "pop_changes"
+        _query["parameters"] = dict()
+        _query["parameters"]["name"] = name
+        return self.__query(_query)
+
+    @logging_error_handler
+    def set_snapshot(self, snapshot:TagSnapshot|None):
+        r"""
+        Thread-safe method to set the shared-memory snapshot writer.
+
+        See `CVT.set_snapshot` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "set_snapshot"
+        _query["parameters"] = dict()
+        _query["parameters"]["snapshot"] = snapshot
+        return self.__query(_query)
+
+    @logging_error_handler
+    def set_value(self, id:str, value, timestamp:datetime, quality:int=GOOD):
         r"""
         Thread-safe method to set a tag value.
         """
@@ -1063,6 +1526,68 @@ class CVTEngine(Singleton):
         _query["parameters"]["id"] = id
         _query["parameters"]["value"] = value
         _query["parameters"]["timestamp"] = timestamp
+        _query["parameters"]["quality"] = quality
+        return self.__query(_query)
+
+    @logging_error_handler
+    def set_quality(self, id:str, quality:int)->bool:
+        r"""
+        Thread-safe method to set the quality of a tag value.
+
+        See `CVT.set_quality` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "set_quality"
+        _query["parameters"] = dict()
+        _query["parameters"]["id"] = id
+        _query["parameters"]["quality"] = quality
+        return self.__query(_query)
+
+    @logging_error_handler
+    def set_iad(self, enabled:bool):
+        r"""
+        Thread-safe switch of the Instrument Anomaly Detection (IAD).
+
+        See `CVT.set_iad` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "set_iad"
+        _query["parameters"] = dict()
+        _query["parameters"]["enabled"] = enabled
+        return self.__query(_query)
+
+    @logging_error_handler
+    def set_staleness(self, factor:float=None, min_period:float=None):
+        r"""
+        Thread-safe configuration of the staleness detection.
+
+        See `CVT.set_staleness` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "set_staleness"
+        _query["parameters"] = dict()
+        _query["parameters"]["factor"] = factor
+        _query["parameters"]["min_period"] = min_period
+        return self.__query(_query)
+
+    @logging_error_handler
+    def check_staleness(self)->float:
+        r"""
+        Thread-safe staleness check.
+
+        See `CVT.check_staleness`.
+        """
+        _query = dict()
+        _query["action"] = "check_staleness"
+        return self.__query(_query)
+
+    @logging_error_handler
+    def get_stale_tags(self)->list:
+        r"""
+        Thread-safe list of the stale tags.
+        """
+        _query = dict()
+        _query["action"] = "get_stale_tags"
         return self.__query(_query)
     
     @logging_error_handler
@@ -1140,6 +1665,58 @@ class CVTEngine(Singleton):
         _query["parameters"]["name"] = name
         return self.__query(_query)
 
+    @logging_error_handler
+    def read_values(self, names:list[str]=None, since:int=None)->dict:
+        r"""
+        Thread-safe columnar read of the current values.
+
+        See `CVT.read_values` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "read_values"
+        _query["parameters"] = dict()
+        _query["parameters"]["names"] = names
+        _query["parameters"]["since"] = since
+        return self.__query(_query)
+
+    @logging_error_handler
+    def serialize_values(self, names:list[str]=None, ids:list[str]=None, since:int=None)->dict:
+        r"""
+        Thread-safe serialization of the current values.
+
+        See `CVT.serialize_values` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "serialize_values"
+        _query["parameters"] = dict()
+        _query["parameters"]["names"] = names
+        _query["parameters"]["ids"] = ids
+        _query["parameters"]["since"] = since
+        return self.__query(_query)
+
+    @logging_error_handler
+    def get_values_frame(self, names:list[str]=None, since:int=None)->bytes:
+        r"""
+        Thread-safe binary frame of the current values.
+
+        See `CVT.get_values_frame` for parameters.
+        """
+        _query = dict()
+        _query["action"] = "get_values_frame"
+        _query["parameters"] = dict()
+        _query["parameters"]["names"] = names
+        _query["parameters"]["since"] = since
+        return self.__query(_query)
+
+    @logging_error_handler
+    def get_values_frame_index(self)->dict:
+        r"""
+        Thread-safe slot -> tag name map of the binary frames.
+        """
+        _query = dict()
+        _query["action"] = "get_values_frame_index"
+        return self.__query(_query)
+
     @logging_error_handler
     def __query(self, query:dict)->dict:
 
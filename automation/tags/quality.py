@@ -0,0 +1,327 @@
+r"""
+OPC UA quality of the tag values and staleness index.
+
+The quality of a tag is the OPC UA StatusCode value of its last sample (0 = Good). The severity
+is in the two most significant bits: 00 Good, 01 Uncertain, 10/11 Bad.
+
+A polled tag whose samples stop arriving (e.g. a polling that keeps failing) is *stale*: its
+last value is no longer current. Tags subscribed by exception (data change) are not monitored:
+a constant value sends no samples. `StalenessIndex`
+keeps one deadline per monitored tag in a heap ordered by time, so detecting the stale tags costs
+O(log N) per expired entry instead of a periodic scan of every tag:
+
+* **touch** (every sample): moves the deadline of the tag forward in O(1); the heap entry is not
+  touched and is only pushed again, with the new deadline, when it reaches the top of the heap.
+* **expired**: pops the entries whose deadline passed. A tag is stale when its current deadline
+  passed; it is not queued again until its next sample.
+"""
+import heapq, math, time
+from .snapshot import GOOD
+
+UNCERTAIN = 0x40000000
+BAD = 0x80000000
+UNCERTAIN_LAST_USABLE_VALUE = 0x40900000
+BAD_NO_COMMUNICATION = 0x80310000
+STALE = UNCERTAIN_LAST_USABLE_VALUE
+_SEVERITY_MASK = 0xC0000000
+_NAMES = {
+    GOOD: "Good",
+    UNCERTAIN: "Uncertain",
+    BAD: "Bad",
+    UNCERTAIN_LAST_USABLE_VALUE: "UncertainLastUsableValue",
+    BAD_NO_COMMUNICATION: "BadNoCommunication"
+}
+
+
+def severity(quality:int)->str:
+    r"""
+    Severity of an OPC UA StatusCode value.
+
+    ```python
+    >>> from automation.tags.quality import severity, STALE
+    >>> severity(0), severity(STALE), severity(0x80340000)
+    ('Good', 'Uncertain', 'Bad')
+
+    ```
+    """
+    if quality is None:
+
+        return "Good"
+
+    bits = quality & _SEVERITY_MASK
+    if bits == 0:
+
+        return "Good"
+
+    if bits == UNCERTAIN:
+
+        return "Uncertain"
+
+    return "Bad"
+
+
+def is_good(quality:int)->bool:
+    r"""
+    True if the severity of the StatusCode value is Good.
+    """
+    return severity(quality) == "Good"
+
+
+def quality_name(quality:int)->str:
+    r"""
+    Symbolic name of an OPC UA StatusCode value (e.g. 'BadNoCommunication').
+    """
+    name = _NAMES.get(quality)
+    if name is None:
+
+        try:
+
+            from opcua.ua.status_codes import get_name_and_doc
+            name, _ = get_name_and_doc(quality)
+
+        except Exception:
+
+            name = f"{severity(quality)} (0x{quality:08X})"
+
+    return name
+
+
+def quality_of(status_code)->int:
+    r"""
+    StatusCode value of an `opcua` StatusCode (or DataValue), Good if not available.
+
+    **Parameters:**
+
+    * **status_code** (StatusCode|DataValue|int|None): Quality information received with a sample.
+    """
+    status_code = getattr(status_code, "StatusCode", status_code)
+    if status_code is None:
+
+        return GOOD
+
+    return int(getattr(status_code, "value", status_code))
+
+
+class StalenessIndex:
+    r"""
+    Deadline heap of the tags expected to update periodically.
+
+    The deadline of a tag is its last sample plus `factor` times its expected period. Times are
+    `time.monotonic()` seconds.
+
+    **Parameters:**
+
+    * **factor** (float): Missed periods before a tag is stale.
+    * **min_period** (float): Lower bound of the expected period (s), e.g. the publishing
+      interval of the subscriptions.
+
+    Usage:
+
+    ```python
+    >>> from automation.tags.quality import StalenessIndex
+    >>> index = StalenessIndex(factor=2, min_period=0.0)
+    >>> index.schedule(id="a1", period=1.0, now=0.0)
+    >>> index.schedule(id="b2", period=5.0, now=0.0)
+    >>> index.touch(id="a1", now=1.5)
+    False
+    >>> index.expired(now=3.0)
+    []
+    >>> index.expired(now=4.0)
+    ['a1']
+    >>> index.is_stale("a1"), index.next_deadline()
+    (True, 10.0)
+    >>> index.touch(id="a1", now=4.5)
+    True
+
+    ```
+    """
+
+    def __init__(self, factor:float=3.0, min_period:float=1.0):
+
+        self.factor = factor
+        self.min_period = min_period
+        self._heap = list()
+        self._periods = dict()
+        self._deadlines = dict()
+        self._versions = dict()
+        self._counter = 0
+        self._stale = set()
+
+    def __len__(self):
+
+        return len(self._periods)
+
+    def __push(self, id:str, deadline:float):
+
+        heapq.heappush(self._heap, (deadline, self._versions[id], id))
+
+    def schedule(self, id:str, period:float, now:float=None):
+        r"""
+        Starts (or restarts, with a new period) monitoring a tag.
+
+        **Parameters:**
+
+        * **id** (str): Tag ID.
+        * **period** (float): Expected seconds between samples.
+        * **now** (float, optional): Current monotonic time.
+        """
+        if now is None:
+
+            now = time.monotonic()
+
+        period = max(period, self.min_period)
+        self._periods[id] = period
+        # Las entradas anteriores del tag quedan obsoletas (versión distinta). El contador es
+        # único para todos los tags y nunca se reinicia, aunque el tag se quite y se vuelva a agregar
+        self._counter += 1
+        self._versions[id] = self._counter
+        self._stale.discard(id)
+        deadline = self._deadlines[id] = now + self.factor * period
+        self.__push(id, deadline)
+
+    def remove(self, id:str):
+        r"""
+        Stops monitoring a tag; its heap entry is discarded when it reaches the top.
+        """
+        self._periods.pop(id, None)
+        self._deadlines.pop(id, None)
+        self._versions.pop(id, None)
+        self._stale.discard(id)
+
+    def touch(self, id:str, now:float=None)->bool:
+        r"""
+        Records a sample of a tag.
+
+        **Returns:**
+
+        * **bool**: True if the tag was stale.
+        """
+        period = self._periods.get(id)
+        if period is None:
+
+            return False
+
+        if now is None:
+
+            now = time.monotonic()
+
+        deadline = self._deadlines[id] = now + self.factor * period
+        if id in self._stale:
+
+            self._stale.discard(id)
+            self.__push(id, deadline)
+
+            return True
+
+        return False
+
+    def expired(self, now:float=None)->list:
+        r"""
+        Pops the tags whose deadline passed.
+
+        **Returns:**
+
+        * **list**: IDs of the tags that became stale.
+        """
+        if now is None:
+
+            now = time.monotonic()
+
+        heap = self._heap
+        result = list()
+        while heap and heap[0][0] <= now:
+
+            _, version, id = heapq.heappop(heap)
+            if self._versions.get(id) != version:
+
+                continue
+
+            deadline = self._deadlines[id]
+            if deadline > now:
+
+                # Llegaron muestras después de encolar la entrada
+                self.__push(id, deadline)
+
+            else:
+
+                self._stale.add(id)
+                result.append(id)
+
+        return result
+
+    def next_deadline(self)->float:
+        r"""
+        Earliest deadline in the heap (may belong to a discarded entry); inf if empty.
+        """
+        return self._heap[0][0] if self._heap else math.inf
+
+    def is_stale(self, id:str)->bool:
+        r"""
+        True if the tag is stale.
+        """
+        return id in self._stale
+
+    def stale(self)->list:
+        r"""
+        IDs of the stale tags.
+        """
+        return list(self._stale)
+
+
+class QualityAlarms:
+    r"""
+    Cached handles of the `alarm.quality.<tag_name>` alarms.
+
+    A tag with a quality alarm defined drives it from its quality: the alarm goes abnormal when
+    the quality is not Good (description: the StatusCode name) and back to normal when it is.
+    The handles are looked up again only when the alarm manager definitions change.
+    """
+
+    def __init__(self):
+
+        self._alarms = dict()
+        self._version = None
+
+    def get_alarm(self, tag_name:str):
+        r"""
+        Gets the `alarm.quality.<tag_name>` alarm, None if not defined.
+        """
+        from ..managers.alarms import AlarmManager
+        alarm_manager = AlarmManager()
+        version = alarm_manager.get_version()
+        if version != self._version:
+
+            self._alarms.clear()
+            self._version = version
+
+        if tag_name not in self._alarms:
+
+            self._alarms[tag_name] = alarm_manager.get_alarm_by_name(name=f"alarm.quality.{tag_name}")
+
+        return self._alarms[tag_name]
+
+    def forget(self, tag_name:str):
+        r"""
+        Discards the cached handle of a tag (renamed or deleted).
+        """
+        self._alarms.pop(tag_name, None)
+
+    def evaluate(self, tag_name:str, quality:int):
+        r"""
+        Updates the quality alarm of a tag, if defined.
+        """
+        alarm = self.get_alarm(tag_name)
+        if not alarm:
+
+            return
+
+        is_active = alarm.state.alarm_status.lower() == "active"
+        if not is_good(quality) and not is_active:
+
+            alarm.description = quality_name(quality)
+            alarm.abnormal_condition()
+
+        elif is_good(quality) and is_active:
+
+            alarm.description = ""
+            alarm.normal_condition()
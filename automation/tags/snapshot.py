@@ -0,0 +1,418 @@
+r"""
+Shared-memory snapshot of the Current Value Table (CVT).
+
+The CVT lives inside the acquisition process, so API workers spawned by a
+pre-fork server (e.g. gunicorn with several workers) cannot see it. This module
+publishes the current value, quality and timestamp of every tag into a fixed
+layout, mmap-backed file that any process on the same host can map read-only.
+
+Layout (little endian):
+
+* **Header** (32 bytes): magic, version, capacity, generation.
+* **Records** (``capacity`` x 96 bytes): sequence, name, value, timestamp, quality, data type.
+
+Every record is protected by a sequence counter (seqlock): the writer makes it odd
+before updating the record and even afterwards, readers retry while the counter is
+odd or changed during the read. The header generation is bumped whenever a slot is
+assigned or released, so readers only rebuild their name index when needed.
+"""
+import mmap, os, struct, threading, math, time
+from datetime import datetime, timezone
+
+MAGIC = b"PYAUTSNP"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQ8x")
+RECORD = struct.Struct("<Q64sddIB3x")
+NAME_SIZE = 64
+GOOD = 0
+DATA_TYPES = {"float": 0, "int": 1, "bool": 2, "str": 3}
+_DATA_TYPES = {code: data_type for data_type, code in DATA_TYPES.items()}
+
+
+class SnapshotError(Exception):
+    r"""
+    Raised when a snapshot file can not be created, mapped or is full.
+    """
+    pass
+
+
+class TagSnapshot:
+    r"""
+    Writer side of the shared-memory tag snapshot.
+
+    Only the acquisition process (the one running PyAutomation workers) must own a writer.
+
+    **Parameters:**
+
+    * **path** (str): Snapshot file path.
+    * **capacity** (int): Maximum number of tags the snapshot can hold.
+
+    **Usage Example**:
+
+    .. code-block:: python
+
+        >>> import os, tempfile
+        >>> from datetime import datetime
+        >>> from automation.tags.snapshot import TagSnapshot, TagSnapshotReader
+        >>> path = os.path.join(tempfile.mkdtemp(), "cvt.snapshot")
+        >>> snapshot = TagSnapshot(path=path, capacity=8)
+        >>> snapshot.publish(name="PT-01", value=10.5, timestamp=datetime(2024, 1, 1))
+        >>> reader = TagSnapshotReader(path=path)
+        >>> reader.read(name="PT-01")["value"]
+        10.5
+        >>> reader.close(); snapshot.close()
+    """
+
+    def __init__(self, path:str, capacity:int=1024):
+
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._slots = dict()
+        self._free = list(range(capacity - 1, -1, -1))
+        self._generation = 0
+        size = HEADER.size + RECORD.size * capacity
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+
+            os.makedirs(folder)
+
+        # Se crea un archivo nuevo y se reemplaza atómicamente, así los lectores que tengan
+        # mapeado el archivo de una ejecución anterior nunca lo ven truncado
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+
+            f.truncate(size)
+
+        self._file = open(tmp_path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, capacity, self._generation)
+        self._mm.flush()
+        os.replace(tmp_path, path)
+
+    def __offset(self, slot:int)->int:
+
+        return HEADER.size + slot * RECORD.size
+
+    def __bump_generation(self):
+
+        self._generation += 1
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, self.capacity, self._generation)
+
+    def register(self, name:str)->int:
+        r"""
+        Assigns a record slot to a tag.
+
+        **Parameters:**
+
+        * **name** (str): Tag name.
+
+        **Returns:**
+
+        * **int**: Slot index.
+        """
+        with self._lock:
+
+            if name in self._slots:
+
+                return self._slots[name]
+
+            if not self._free:
+
+                raise SnapshotError(f"Snapshot is full ({self.capacity} tags)")
+
+            encoded = name.encode("utf-8")
+            if len(encoded) > NAME_SIZE:
+
+                raise SnapshotError(f"Tag name {name} is longer than {NAME_SIZE} bytes")
+
+            slot = self._free.pop()
+            RECORD.pack_into(self._mm, self.__offset(slot), 0, encoded, math.nan, 0.0, GOOD, DATA_TYPES["float"])
+            self._slots[name] = slot
+            self.__bump_generation()
+
+            return slot
+
+    def unregister(self, name:str):
+        r"""
+        Releases the slot assigned to a tag.
+
+        **Parameters:**
+
+        * **name** (str): Tag name.
+        """
+        with self._lock:
+
+            slot = self._slots.pop(name, None)
+            if slot is None:
+
+                return
+
+            RECORD.pack_into(self._mm, self.__offset(slot), 0, b"", math.nan, 0.0, GOOD, DATA_TYPES["float"])
+            self._free.append(slot)
+            self.__bump_generation()
+
+    def rename(self, name:str, new_name:str):
+        r"""
+        Renames a registered tag keeping its slot and last value.
+
+        A new name longer than `NAME_SIZE` bytes releases the slot and raises `SnapshotError`.
+
+        **Parameters:**
+
+        * **name** (str): Current tag name.
+        * **new_name** (str): New tag name.
+        """
+        encoded = new_name.encode("utf-8")
+        if len(encoded) > NAME_SIZE:
+
+            self.unregister(name=name)
+            raise SnapshotError(f"Tag name {new_name} is longer than {NAME_SIZE} bytes")
+
+        with self._lock:
+
+            slot = self._slots.pop(name, None)
+            if slot is None:
+
+                return
+
+            offset = self.__offset(slot)
+            seq, _, value, timestamp, quality, data_type = RECORD.unpack_from(self._mm, offset)
+            RECORD.pack_into(self._mm, offset, seq, encoded, value, timestamp, quality, data_type)
+            self._slots[new_name] = slot
+            self.__bump_generation()
+
+    def publish(self, name:str, value, timestamp:datetime=None, quality:int=GOOD, data_type:str="float"):
+        r"""
+        Writes the current value of a tag into its record.
+
+        String values can not be stored in the fixed layout, so only their timestamp and quality are published.
+
+        **Parameters:**
+
+        * **name** (str): Tag name. It is registered on first publish.
+        * **value** (float|int|bool|str): Current value in display unit.
+        * **timestamp** (datetime, optional): Value timestamp. Defaults to now.
+        * **quality** (int, optional): OPC UA StatusCode value. Defaults to Good (0).
+        * **data_type** (str, optional): 'float', 'int', 'bool' or 'str'.
+        """
+        slot = self._slots.get(name)
+        if slot is None:
+
+            slot = self.register(name)
+
+        if isinstance(value, (int, float)) and data_type != "str":
+
+            value = float(value)
+
+        else:
+
+            value = math.nan
+
+        if timestamp is None:
+
+            timestamp = datetime.now()
+
+        offset = self.__offset(slot)
+        with self._lock:
+
+            seq = struct.unpack_from("<Q", self._mm, offset)[0] + 1
+            struct.pack_into("<Q", self._mm, offset, seq)
+            RECORD.pack_into(
+                self._mm,
+                offset,
+                seq,
+                name.encode("utf-8"),
+                value,
+                timestamp.timestamp(),
+                quality,
+                DATA_TYPES.get(data_type, DATA_TYPES["float"])
+            )
+            struct.pack_into("<Q", self._mm, offset, seq + 1)
+
+    def get_names(self)->list:
+        r"""
+        Gets the names of the tags registered in the snapshot.
+
+        **Returns:**
+
+        * **list**: Tag names.
+        """
+        return list(self._slots.keys())
+
+    def close(self):
+        r"""
+        Unmaps and closes the snapshot file.
+        """
+        self._mm.close()
+        self._file.close()
+
+
+class TagSnapshotReader:
+    r"""
+    Read-only side of the shared-memory tag snapshot, intended for API workers.
+
+    **Parameters:**
+
+    * **path** (str): Snapshot file path published by a `TagSnapshot` writer.
+    * **retries** (int): Maximum attempts to get a consistent record while it is being written.
+    """
+
+    def __init__(self, path:str, retries:int=100):
+
+        self.path = path
+        self.retries = retries
+        self.__open()
+
+    def __open(self):
+
+        self._file = open(self.path, "rb")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.capacity, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+
+            self.close()
+            raise SnapshotError(f"{self.path} is not a valid tag snapshot")
+
+        self._generation = None
+        self._index = dict()
+
+    def __generation(self)->int:
+
+        return HEADER.unpack_from(self._mm, 0)[3]
+
+    def __refresh_index(self):
+
+        # El proceso de adquisición se reinició y publicó un archivo nuevo
+        if os.stat(self.path).st_ino != self._inode:
+
+            self.close()
+            self.__open()
+
+        generation = self.__generation()
+        if generation == self._generation:
+
+            return
+
+        index = dict()
+        for slot in range(self.capacity):
+
+            name = self.__read_slot(slot)["name"]
+            if name:
+
+                index[name] = slot
+
+        self._index = index
+        self._generation = generation
+
+    def __read_slot(self, slot:int)->dict|None:
+
+        offset = HEADER.size + slot * RECORD.size
+        for _ in range(self.retries):
+
+            record = RECORD.unpack_from(self._mm, offset)
+            seq = record[0]
+            if seq % 2 == 0 and struct.unpack_from("<Q", self._mm, offset)[0] == seq:
+
+                break
+
+            time.sleep(0)
+
+        else:
+
+            raise SnapshotError(f"Unable to get a consistent read of slot {slot}")
+
+        _, name, value, timestamp, quality, data_type = record
+        data_type = _DATA_TYPES.get(data_type, "float")
+        if math.isnan(value):
+
+            value = None
+
+        elif data_type == "int":
+
+            value = int(value)
+
+        elif data_type == "bool":
+
+            value = bool(value)
+
+        return {
+            "name": name.rstrip(b"\x00").decode("utf-8"),
+            "value": value,
+            "quality": quality,
+            "timestamp": datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp else None,
+            "data_type": data_type
+        }
+
+    def read(self, name:str)->dict|None:
+        r"""
+        Reads the current record of a tag.
+
+        **Parameters:**
+
+        * **name** (str): Tag name.
+
+        **Returns:**
+
+        * **dict|None**: name, value, quality, timestamp (UTC) and data_type; None if the tag is not published.
+        """
+        self.__refresh_index()
+
+        return self.__read(name=name)
+
+    def __read(self, name:str)->dict|None:
+
+        slot = self._index.get(name)
+        if slot is None:
+
+            return None
+
+        record = self.__read_slot(slot)
+        if record["name"] != name:
+
+            # El slot fue reasignado entre el refresco del índice y la lectura
+            self._generation = None
+            self.__refresh_index()
+            slot = self._index.get(name)
+            if slot is None:
+
+                return None
+
+            record = self.__read_slot(slot)
+
+        return record
+
+    def read_many(self, names:list[str]=None)->list[dict]:
+        r"""
+        Reads the current record of several tags.
+
+        **Parameters:**
+
+        * **names** (list[str], optional): Tag names. All published tags if not provided.
+
+        **Returns:**
+
+        * **list[dict]**: Records of the tags found.
+        """
+        self.__refresh_index()
+        if names is None:
+
+            names = list(self._index.keys())
+
+        result = list()
+        for name in names:
+
+            record = self.__read(name=name)
+            if record:
+
+                result.append(record)
+
+        return result
+
+    def close(self):
+        r"""
+        Unmaps and closes the snapshot file.
+        """
+        self._mm.close()
+        self._file.close()
@@ -1,7 +1,9 @@
-import secrets, logging
+import secrets, logging, sys
 from datetime import datetime
 from ..utils import Observer
 from ..utils.decorators import logging_error_handler
+from ..utils.units import ConversionPlan
+from ..utils.tracing import Tracer
 from ..buffer import Buffer
 from ..variables import (
     Temperature,
@@ -20,8 +22,25 @@ from ..variables import (
     Volume
 )
 from .filter import GaussianFilter
+from .snapshot import GOOD
 
 DATETIME_FORMAT = "%m/%d/%Y, %H:%M:%S.%f"
+tracer = Tracer()
+
+
+def intern(value):
+    r"""
+    Returns the shared (interned) copy of a string; other values are returned unchanged.
+
+    Units, variables, segments and similar metadata repeat across thousands of tags; interning
+    keeps one copy of each string and makes their comparisons identity checks.
+    """
+    if isinstance(value, str):
+
+        return sys.intern(value)
+
+    return value
+
 
 class Tag:
     r"""
@@ -29,8 +48,47 @@ class Tag:
 
     A Tag holds the current value, timestamp, quality, and metadata of a variable.
     It supports unit conversion, deadband filtering, and notifying observers upon value changes.
+
+    The attributes live in `__slots__` (no per-instance `__dict__`), the repeated metadata
+    strings are interned, and the Gaussian filter and the value/timestamp buffers are created
+    on first use, so a tag that is defined but never updated or filtered stays small.
     """
 
+    __slots__ = (
+        "id",
+        "name",
+        "data_type",
+        "description",
+        "variable",
+        "display_name",
+        "display_unit",
+        "unit",
+        "value",
+        "opcua_client_name",
+        "_opcua_address",
+        "node_namespace",
+        "scan_time",
+        "dead_band",
+        "timestamp",
+        "quality",
+        "process_filter",
+        "gaussian_filter",
+        "gaussian_filter_threshold",
+        "gaussian_filter_r_value",
+        "outlier_detection",
+        "out_of_range_detection",
+        "frozen_data_detection",
+        "manufacturer",
+        "segment",
+        "kp",
+        "_filter",
+        "_values",
+        "_timestamps",
+        "_observers",
+        "_conversion_plan",
+        "__weakref__"
+    )
+
     def __init__(
             self,
             name:str,
@@ -89,16 +147,16 @@ class Tag:
         if id:
             self.id = id
         self.name = name
-        self.data_type = data_type
+        self.data_type = intern(data_type)
         self.description = description
-        self.variable = variable
+        self.variable = intern(variable)
         self.display_name = name
         if display_name:
             self.display_name = display_name
-        self.display_unit = unit
+        self.display_unit = intern(unit)
         if display_unit:
-            self.display_unit = display_unit
-        self.unit=unit
+            self.display_unit = intern(display_unit)
+        self.unit = intern(unit)
         if variable.lower()=="temperature":
             self.value = Temperature(value=0.0, unit=self.unit)
         elif variable.lower()=="length":
@@ -128,8 +186,8 @@ class Tag:
         elif variable.lower()=="volume":
             self.value = Volume(value=0.0, unit=self.unit)
 
-        self.values = Buffer()
-        self.timestamps = Buffer()
+        self._values = None
+        self._timestamps = None
         # opcua_client_name almacena el nombre del cliente OPC UA
         # Si opcua_address es una URL, se intentará resolver el nombre del cliente
         # Si opcua_address es un nombre de cliente, se usará directamente
@@ -140,15 +198,16 @@ class Tag:
             # Si opcua_address parece ser una URL (contiene "opc.tcp://"), intentar resolver el cliente
             if "opc.tcp://" in opcua_address:
                 # Se resolverá dinámicamente cuando se necesite
-                self._opcua_address = opcua_address
+                self._opcua_address = intern(opcua_address)
             else:
                 # Si no es una URL, asumir que es un nombre de cliente
-                self.opcua_client_name = opcua_address
+                self.opcua_client_name = intern(opcua_address)
                 self._opcua_address = None
         self.node_namespace = node_namespace
         self.scan_time = scan_time
         self.dead_band = dead_band
         self.timestamp = timestamp
+        self.quality = GOOD
         self.process_filter = process_filter
         self.gaussian_filter = gaussian_filter
         self.gaussian_filter_threshold = gaussian_filter_threshold
@@ -156,11 +215,46 @@ class Tag:
         self.outlier_detection = outlier_detection
         self.out_of_range_detection = out_of_range_detection
         self.frozen_data_detection = frozen_data_detection
-        self.manufacturer = manufacturer
-        self.segment = segment
+        self.manufacturer = intern(manufacturer)
+        self.segment = intern(segment)
         self.kp = kp
-        self.filter = GaussianFilter()
-        self._observers = set()
+        self._filter = None
+        # Tupla vacía compartida: la mayoría de los tags tienen pocos observadores
+        self._observers = ()
+        self._conversion_plan = None
+
+    @property
+    def filter(self)->GaussianFilter:
+        r"""
+        Gaussian (Kalman) filter of the tag, created on first use.
+        """
+        if self._filter is None:
+
+            self._filter = GaussianFilter()
+
+        return self._filter
+
+    @property
+    def values(self)->Buffer:
+        r"""
+        Last values of the tag (display unit), created on the first update.
+        """
+        if self._values is None:
+
+            self._values = Buffer()
+
+        return self._values
+
+    @property
+    def timestamps(self)->Buffer:
+        r"""
+        Timestamps of the last values, created on the first update.
+        """
+        if self._timestamps is None:
+
+            self._timestamps = Buffer()
+
+        return self._timestamps
 
     def set_name(self, name:str):
         r"""
@@ -202,6 +296,7 @@ class Tag:
         self.timestamp = timestamp
         self.values(self.get_value())
         self.timestamps(timestamp.strftime(DATETIME_FORMAT))
+        tracer.stamp("tag.set_value")
         self.notify()
 
     def set_display_name(self, name:str):
@@ -223,7 +318,7 @@ class Tag:
 
         * **data_type** (str): 'float', 'int', 'bool', or 'str'.
         """
-        self.data_type = data_type
+        self.data_type = intern(data_type)
 
     def set_variable(self, variable:str):
         r"""
@@ -234,7 +329,8 @@ class Tag:
         * **variable** (str): Variable type (e.g., 'Temperature').
         """
 
-        self.variable = variable
+        self.variable = intern(variable)
+        self._conversion_plan = None
         if variable.lower()=="temperature":
             self.value = Temperature(value=0.0, unit=self.unit)
         elif variable.lower()=="length":
@@ -264,6 +360,50 @@ class Tag:
         elif variable.lower()=="volume":
             self.value = Volume(value=0.0, unit=self.unit)
 
+    def get_conversion_plan(self)->ConversionPlan:
+        r"""
+        Gets the cached conversion plan from the base unit to the display unit.
+
+        The plan is resolved once and reset whenever the unit, display unit or variable changes.
+
+        **Returns:**
+
+        * **ConversionPlan**: Callable with precomputed scale/offset.
+        """
+        if self._conversion_plan is None:
+
+            self._conversion_plan = self.value.conversion_plan(from_unit=self.unit, to_unit=self.display_unit)
+
+        return self._conversion_plan
+
+    def convert_to_display_unit(self, value:float|int|bool)->float:
+        r"""
+        Converts a raw value (in base unit) to the display unit using the cached conversion plan.
+
+        **Parameters:**
+
+        * **value** (float|int|bool): Value in base unit.
+
+        **Returns:**
+
+        * **float**: Value in display unit.
+        """
+        return self.get_conversion_plan()(value)
+
+    def convert_array_to_display_unit(self, values):
+        r"""
+        Vectorized version of `convert_to_display_unit` for NumPy batches.
+
+        **Parameters:**
+
+        * **values** (array-like): Values in base unit.
+
+        **Returns:**
+
+        * **numpy.ndarray**: Values in display unit.
+        """
+        return self.get_conversion_plan().convert_array(values)
+
     def set_opcua_address(self, opcua_address:str):
         r"""
         Sets the OPC UA server address associated with this tag.
@@ -279,12 +419,12 @@ class Tag:
         if opcua_address:
             if "opc.tcp://" in opcua_address:
                 # Es una URL, almacenarla directamente
-                self._opcua_address = opcua_address
+                self._opcua_address = intern(opcua_address)
                 # No limpiar opcua_client_name aquí, puede estar establecido por separado
             else:
                 # No es una URL, asumir que es un nombre de cliente
                 # La URL se resolverá cuando se establezca el nombre del cliente
-                self.opcua_client_name = opcua_address
+                self.opcua_client_name = intern(opcua_address)
                 # No limpiar _opcua_address aquí, mantener la URL actual si existe
         else:
             self._opcua_address = None
@@ -299,10 +439,10 @@ class Tag:
         * **client_name** (str): Nombre del cliente OPC UA.
         * **opcua_address** (str, optional): URL del cliente OPC UA. Si se proporciona, se almacena.
         """
-        self.opcua_client_name = client_name
+        self.opcua_client_name = intern(client_name)
         # Si se proporciona la URL, almacenarla para mantener compatibilidad con suscripciones
         if opcua_address:
-            self._opcua_address = opcua_address
+            self._opcua_address = intern(opcua_address)
         # Si no se proporciona URL pero hay nombre, mantener _opcua_address si ya existe
         # (se actualizará cuando se resuelva desde el manager)
     
@@ -324,7 +464,8 @@ class Tag:
 
         * **unit** (str): Unit symbol.
         """
-        self.unit = unit
+        self.unit = intern(unit)
+        self._conversion_plan = None
 
     def set_display_unit(self, unit:str): 
         r"""
@@ -334,7 +475,8 @@ class Tag:
 
         * **unit** (str): Unit symbol.
         """
-        self.display_unit = unit
+        self.display_unit = intern(unit)
+        self._conversion_plan = None
 
     def set_node_namespace(self, node_namespace:str):
         r"""
@@ -396,6 +538,26 @@ class Tag:
         """
         return self.timestamp
 
+    def set_quality(self, quality:int):
+        r"""
+        Sets the quality of the current value.
+
+        **Parameters:**
+
+        * **quality** (int): OPC UA StatusCode value (0 = Good).
+        """
+        self.quality = quality
+
+    def get_quality(self)->int:
+        r"""
+        Gets the quality of the current value.
+
+        **Returns:**
+
+        * **int**: OPC UA StatusCode value (0 = Good).
+        """
+        return self.quality
+
     def get_scan_time(self):
         r"""
         Gets the configured scan time.
@@ -564,7 +726,8 @@ class Tag:
         * **observer** (Observer): The observer instance to attach.
         """
         observer._subject = self
-        self._observers.add(observer)
+        if observer not in self._observers:
+            self._observers += (observer,)
 
     def detach(self, observer:Observer):
         r"""
@@ -575,15 +738,18 @@ class Tag:
         * **observer** (Observer): The observer instance to detach.
         """
         observer._subject = None
-        self._observers.discard(observer)
+        self._observers = tuple(_observer for _observer in self._observers if _observer is not observer)
 
     def notify(self):
         r"""
         Notifies all attached observers of a change.
         """
+        trace = tracer.current()
         for observer in self._observers:
             
             observer.update()
+            if trace is not None:
+                tracer.stamp_trace(trace, f"notify.{observer.stage}")
 
     def serialize(self):
         r"""
@@ -603,8 +769,9 @@ class Tag:
             "id": self.get_id(),
             "value": self.get_value(),
             "timestamp": timestamp,
-            "values": list(self.values),
-            "timestamps": list(self.timestamps),
+            "quality": self.quality,
+            "values": list(self._values or ()),
+            "timestamps": list(self._timestamps or ()),
             "name": self.name,
             "unit": self.get_unit(),
             "display_unit": self.get_display_unit(),
@@ -634,6 +801,8 @@ class TagObserver(Observer):
     
     Useful for asynchronous processing of tag changes.
     """
+    stage = "queue"
+
     def __init__(self, tag_queue):
 
         super(TagObserver, self).__init__()
@@ -648,6 +817,10 @@ class TagObserver(Observer):
         result["tag"] = self._subject.name
         result["value"] = self._subject.value.convert(self._subject.get_display_unit())
         result["timestamp"] = self._subject.timestamp
+        trace = tracer.current()
+        if trace is not None:
+            # La traza sigue en el hilo que consume la cola (logger)
+            result["trace"] = trace
         self._tag_queue.put(result, block=False)
 
 
@@ -659,6 +832,7 @@ class MachineObserver(Observer):
 
         super(MachineObserver, self).__init__()
         self.machine = machine
+        self.stage = type(machine).__name__.lower()
 
     def update(self):
 
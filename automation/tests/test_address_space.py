@@ -0,0 +1,115 @@
+import socket, unittest
+from types import SimpleNamespace
+from opcua import Server
+from ..opcua.models import Client
+
+
+def free_port()->int:
+
+    with socket.socket() as sock:
+
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestAddressSpace(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        url = f"opc.tcp://127.0.0.1:{free_port()}/test/"
+        cls.server = Server()
+        cls.server.set_endpoint(url)
+        idx = cls.server.register_namespace("urn:pyautomation:test")
+        cls.plant = cls.server.get_objects_node().add_folder(idx, "Plant")
+        # 20 unidades x 10 variables, cada variable con una propiedad
+        for unit in range(20):
+
+            _unit = cls.plant.add_object(idx, f"Unit{unit:02d}")
+            for number in range(10):
+
+                variable = _unit.add_variable(idx, f"Unit{unit:02d}.PT{number}", float(number))
+                variable.add_property(idx, "EngineeringUnits", "kPa")
+
+        cls.idx = idx
+        cls.server.start()
+        cls.client = Client(url, client_name="test")
+        cls.client.connect()
+        cls.root = cls.plant.nodeid.to_string()
+
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+
+        cls.client.disconnect()
+        cls.server.stop()
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+
+        self.client.address_space.clear()
+        self.client.address_space.requests = 0
+
+        return super().setUp()
+
+    def test_tree_matches_node_by_node_browse(self):
+
+        expected = self.client.browse_tree_generic(self.client.get_node(self.root), max_depth=10)
+        tree = self.client.address_space.tree(self.root, max_depth=10)
+        self.assertEqual(tree, expected)
+        # Un Browse por nivel (raíz, unidades, variables, propiedades)
+        self.assertLessEqual(self.client.address_space.requests, 5)
+
+        with self.subTest("Second request is answered from memory"):
+
+            self.client.address_space.requests = 0
+            self.assertEqual(self.client.address_space.tree(self.root, max_depth=10), expected)
+            self.assertEqual(self.client.address_space.requests, 0)
+
+        with self.subTest("Children and property values"):
+
+            unit = tree[0]["children"][0]["key"]
+            children = self.client.address_space.children(unit, include_property_values=True)
+            expected = self.client.browse_children_generic(self.client.get_node(unit))
+            self.assertEqual([{key: value for key, value in child.items() if key != "value"} for child in children], expected)
+            self.assertEqual(children[0]["value"], "kPa")
+
+    def test_variables_match_node_by_node_browse(self):
+
+        expected = self.client.browse_variables_generic(self.client.get_node(self.root))
+        variables = self.client.address_space.variables(self.root)
+        self.assertEqual(len(variables), 200)
+        self.assertEqual(sorted(variables, key=lambda item: item["namespace"]), sorted(expected, key=lambda item: item["namespace"]))
+
+    def test_incremental_refresh(self):
+
+        address_space = self.client.address_space
+        before = len(address_space.variables(self.root))
+        unit = self.plant.get_children()[0]
+        added = unit.add_variable(self.idx, "Unit00.PT99", 0.0)
+        try:
+
+            # Sin invalidación el modelo en memoria no cambia
+            self.assertEqual(len(address_space.variables(self.root)), before)
+
+            address_space.requests = 0
+            address_space.event_notification(SimpleNamespace(Changes=[SimpleNamespace(Affected=unit.nodeid)]))
+            self.assertEqual(len(address_space.variables(self.root)), before + 1)
+            # Solo se vuelven a navegar la unidad afectada y su carpeta (un Browse por nivel)
+            self.assertEqual(address_space.requests, 2)
+
+            with self.subTest("Entries older than the ttl are browsed again"):
+
+                self.server.delete_nodes([added])
+                added = None
+                address_space.ttl = 0
+                self.assertEqual(len(address_space.variables(self.root)), before)
+
+        finally:
+
+            address_space.ttl = 300
+            if added is not None:
+
+                self.server.delete_nodes([added])
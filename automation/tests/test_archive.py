@@ -0,0 +1,224 @@
+import random, shutil, tempfile, unittest
+from collections import defaultdict
+from datetime import datetime, timedelta
+import numpy as np
+from peewee import SqliteDatabase
+from ..dbmodels import Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor
+from ..dbmodels.archive import HistoryArchive, encode, decode
+from ..dbmodels.partitions import HistoryPartitions
+from ..logger.datalogger import DataLogger, DATETIME_FORMAT
+
+MODELS = [Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor]
+
+
+class TestHistoryArchive(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db = SqliteDatabase(":memory:")
+        self.ctx = self.db.bind_ctx(MODELS)
+        self.ctx.__enter__()
+        self.db.create_tables([model for model in MODELS if model is not TagValue])
+        Variables.insert(name="Pressure").execute()
+        Units.insert(name="Pascal", unit="Pa", variable_id=1).execute()
+        DataTypes.insert(name="float").execute()
+        for name in ("PT-01", "PT-02"):
+
+            Tags.insert(identifier=name, name=name, unit=1, data_type=1, display_name=name, display_unit=1).execute()
+
+        self.history = HistoryPartitions(TagValue, period="day")
+        self.history.create()
+        # 8 días de muestras irregulares hasta ahora, en segundos enteros
+        rng = random.Random(3)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.rows = list()
+        for tag in (1, 2):
+
+            timestamp = self.now - timedelta(days=8)
+            while timestamp < self.now:
+
+                self.rows.append({"tag": tag, "unit": 1, "value": round(rng.gauss(50, 10), 2), "timestamp": timestamp})
+                timestamp += timedelta(seconds=rng.randint(60, 900))
+
+        self.history.insert_many(self.rows)
+        self.folder = tempfile.mkdtemp()
+        self.logger = DataLogger()
+        self._previous = (self.logger._db, self.logger.is_history_logged, self.logger.archive)
+        self.logger.set_db(self.db)
+        self.logger.set_is_history_logged(True)
+        self.logger.archive = HistoryArchive(self.folder)
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.logger.set_db(self._previous[0])
+        self.logger.set_is_history_logged(self._previous[1])
+        self.logger.archive = self._previous[2]
+        self.history.drop_all()
+        self.ctx.__exit__(None, None, None)
+        self.db.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+        return super().tearDown()
+
+    def epoch(self, timestamp:datetime)->int:
+
+        return int((timestamp - datetime(1970, 1, 1)).total_seconds())
+
+    def test_codec_round_trip(self):
+
+        rng = np.random.default_rng(7)
+        timestamps = np.cumsum(rng.choice([1, 1, 1, 2, 59, 3600, 5 ** 20], size=5000)) - 10 ** 6
+        values = np.round(rng.normal(0, 1000, size=5000), 3)
+        values[rng.random(5000) < 0.3] = 0.0
+        values[10] = np.nan
+        _timestamps, _values = decode(encode(timestamps, values))
+        self.assertEqual(_timestamps.tolist(), timestamps.tolist())
+        self.assertTrue(np.array_equal(_values.view(np.uint64), values.view(np.uint64)))
+
+        with self.subTest("Regular sampling costs about one bit per timestamp"):
+
+            chunk = encode(np.arange(0, 86400), np.full(86400, 1.5))
+            self.assertLess(len(chunk), 86400 / 8 * 2 + 64)
+
+    def test_archive_partitions(self):
+
+        live = TagValue.select().count()
+        archived = self.logger.apply_retention(archive_days=3)
+        self.assertTrue(archived)
+        self.assertTrue(all(name not in [item[0] for item in self.history.partitions()] for name in archived))
+        cutoff = self.epoch(self.now - timedelta(days=3))
+        remaining = TagValue.select().count()
+        self.assertLess(remaining, live)
+        self.assertEqual(sum(len(self.logger.archive.read(tag, 0, cutoff)[0]) for tag in (1, 2)) + remaining, live)
+
+        with self.subTest("The index is rebuilt from the file names"):
+
+            archive = HistoryArchive(self.folder)
+            self.assertEqual(archive.index(), self.logger.archive.index())
+
+        with self.subTest("Chunks written by another process"):
+
+            reader = HistoryArchive(self.folder, ttl=3600)
+            chunks = len(reader.chunks(1))
+            HistoryArchive(self.folder).write(3, [cutoff - 10, cutoff - 5], [1.0, 2.0])
+            self.assertEqual(reader.read(3, 0, cutoff)[1].tolist(), [1.0, 2.0])
+            # Un chunk nuevo de un tag existente no cambia la carpeta raíz: se ve al vencer el ttl
+            HistoryArchive(self.folder).write(1, [1, 2], [3.0, 4.0])
+            self.assertEqual(len(reader.chunks(1)), chunks)
+            reader.ttl = 0
+            self.assertEqual(len(reader.chunks(1)), chunks + 1)
+
+        with self.subTest("Expired chunks are deleted with the retention"):
+
+            self.logger.apply_retention(days=6)
+            span = self.logger.archive.span([1, 2])
+            self.assertGreaterEqual(span[0], self.epoch(self.now - timedelta(days=7)))
+
+    def test_current_partition_is_kept(self):
+
+        # Corte posterior a la última muestra: todo venció, pero la partición actual recibe escrituras
+        today = self.history.name(self.history.key(self.now))
+        rows = self.history.partition_model(today).select().count()
+        archived = self.logger.apply_retention(days=1e-6, archive_days=1e-6)
+        self.assertNotIn(today, archived)
+        names = [name for name, _, _ in self.history.partitions()]
+        self.assertEqual(names[0], today)
+        self.assertEqual(self.history.partition_model(today).select().count(), rows)
+
+    def test_read_values_merges_archive(self):
+
+        self.logger.apply_retention(archive_days=3)
+        start, stop = self.epoch(self.now - timedelta(days=5)), self.epoch(self.now)
+        expected = sorted(
+            (self.epoch(row["timestamp"]), row["value"]) for row in self.rows
+            if row["tag"] == 2 and start <= self.epoch(row["timestamp"]) <= stop
+        )
+        timestamps, values, after = list(), list(), None
+        while True:
+
+            chunk = self.logger.read_values("PT-02", start, stop, after=after, limit=97)
+            timestamps.extend(chunk["timestamps"].tolist())
+            values.extend(chunk["values"].tolist())
+            after = chunk["last"]
+            if after is None:
+
+                break
+
+        self.assertEqual(list(zip(timestamps, values)), expected)
+
+    def test_read_tabular_data_merges_archive(self):
+
+        self.logger.apply_retention(archive_days=3)
+        start, stop = self.now - timedelta(days=6, seconds=13), self.now - timedelta(days=2)
+        tabular = self.logger.read_tabular_data(
+            start.strftime(DATETIME_FORMAT), stop.strftime(DATETIME_FORMAT), "UTC", ["PT-01", "PT-02"], sample_time=3600, page=1, limit=200
+        )
+        self.assertEqual(len(tabular["values"]), 97)
+
+        for row in tabular["values"]:
+
+            step = datetime.strptime(row[0], DATETIME_FORMAT)
+            for tag, value in zip((1, 2), row[1:]):
+
+                previous = [item for item in self.rows if item["tag"] == tag and item["timestamp"] <= step]
+                self.assertEqual(value, max(previous, key=lambda item: item["timestamp"])["value"])
+
+    def test_read_table_merges_archive(self):
+
+        self.logger.apply_retention(archive_days=3)
+        start, stop = self.now - timedelta(days=5), self.now
+        expected = sorted(
+            (row["timestamp"].strftime(DATETIME_FORMAT), name, f"{row['value']} Pa")
+            for row in self.rows for name in ["PT-0%d" % row["tag"]] if start <= row["timestamp"] <= stop
+        )
+        args = (start.strftime(DATETIME_FORMAT), stop.strftime(DATETIME_FORMAT), "UTC", ["PT-01", "PT-02"])
+
+        pages = dict()
+        page, table = 1, {"pagination": {"has_next": True}}
+        pages["offset"] = list()
+        while table["pagination"]["has_next"]:
+
+            table = self.logger.read_table(*args, page=page, limit=97)
+            self.assertEqual(table["pagination"]["total_records"], len(expected))
+            pages["offset"].extend(table["data"])
+            page += 1
+
+        cursor, pages["cursor"] = "", list()
+        while cursor is not None:
+
+            table = self.logger.read_table(*args, limit=97, cursor=cursor)
+            self.assertEqual(table["pagination"]["total_records"], len(expected))
+            pages["cursor"].extend(table["data"])
+            cursor = table["pagination"]["next_cursor"]
+
+        for name, rows in pages.items():
+
+            with self.subTest(name):
+
+                timestamps = [datetime.strptime(row["timestamp"], DATETIME_FORMAT) for row in rows]
+                self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+                self.assertEqual(sorted((row["timestamp"], row["tag_name"], row["value"]) for row in rows), expected)
+
+    def test_archive_trends(self):
+
+        self.logger.apply_retention(archive_days=3)
+        start, stop = self.epoch(self.now - timedelta(days=5)), self.epoch(self.now - timedelta(days=4))
+        result = self.logger._DataLogger__read_archive_trends(start, stop, 3600, "UTC", ["PT-01"], defaultdict(lambda: {"values": []}))
+        values = result["PT-01"]["values"]
+        self.assertEqual(result["PT-01"]["unit"], "Pa")
+
+        bins = dict()
+        for row in self.rows:
+
+            timestamp = self.epoch(row["timestamp"])
+            if row["tag"] == 1 and start <= timestamp <= stop:
+
+                bins.setdefault(timestamp - timestamp % 3600, list()).append(row["value"])
+
+        self.assertEqual(len(values), len(bins))
+        first = min(bins)
+        self.assertEqual(values[0]["x"], datetime.utcfromtimestamp(first).strftime("%m/%d/%Y, %H:%M:%S.%f"))
+        self.assertAlmostEqual(values[0]["y"], sum(bins[first]) / len(bins[first]), places=6)
+
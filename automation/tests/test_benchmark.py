@@ -0,0 +1,33 @@
+import unittest
+from .. import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_report(self):
+
+        report = benchmark.run(tags=5, rate=20.0, duration=0.5, updates=200, rows=500, repeat=1)
+        self.assertEqual(set(report["results"]), set(benchmark.SECTIONS))
+        self.assertIn("commit", report["environment"])
+        results = report["results"]
+        self.assertEqual(results["opcua"]["received"], results["opcua"]["sent"])
+        self.assertGreater(results["cvt"]["updates_per_sec"], 0)
+        self.assertGreater(results["alarms"]["evaluations_per_sec"], 0)
+        self.assertGreater(results["socketio"]["emit_us"], 0)
+        self.assertEqual(results["history"]["rows"], 500)
+        # 500 filas más sus índices y rollups ocupan más que las páginas de un archivo WAL sin volcar
+        self.assertGreater(results["history"]["db_bytes"], 64 * 1024)
+        self.assertGreater(results["queries"]["trend_ms"], 0)
+
+        with self.subTest("Same report has no regressions"):
+
+            self.assertEqual(benchmark.compare(report, report), list())
+
+    def test_compare(self):
+
+        baseline = {"results": {"history": {"rows": 10, "rows_per_sec": 1000, "db_bytes": 100}, "queries": {"trend_ms": 10.0}}}
+        report = {"results": {"history": {"rows": 20, "rows_per_sec": 1500, "db_bytes": 900}, "queries": {"trend_ms": 12.5}, "cvt": {"update_us": 5.0}}}
+        self.assertEqual(benchmark.compare(report, baseline, tolerance=0.2), [
+            {"metric": "queries.trend_ms", "baseline": 10.0, "current": 12.5, "change": 0.25}
+        ])
+        self.assertEqual(benchmark.compare(report, baseline, tolerance=0.3), list())
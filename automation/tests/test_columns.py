@@ -0,0 +1,97 @@
+import unittest
+from datetime import datetime, timezone
+from ..tags.cvt import CVT
+from ..tags.columns import ColumnStore, parse_frame, FRAME_HEADER, FRAME_RECORD
+
+
+class TestColumnStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.cvt = CVT()
+        self.pressure, _ = self.cvt.set_tag(name="PT-01", unit="Pa", data_type="float", description="", variable="Pressure")
+        self.valve, _ = self.cvt.set_tag(name="XV-01", unit="adim", data_type="bool", description="", variable="Adimentional")
+        self.level, _ = self.cvt.set_tag(name="LT-01", unit="m", data_type="float", description="", variable="Length")
+
+        return super().setUp()
+
+    def test_read_values(self):
+
+        timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.cvt.set_value(id=self.pressure.id, value=101.5, timestamp=timestamp)
+        self.cvt.set_value(id=self.valve.id, value=True, timestamp=timestamp)
+        self.cvt.set_value(id=self.level.id, value=2.5, timestamp=timestamp)
+        result = self.cvt.serialize_values()
+        values = {row["name"]: row["value"] for row in result["data"]}
+        self.assertEqual(values, {"PT-01": 101.5, "XV-01": True, "LT-01": 2.5})
+        self.assertEqual({row["timestamp"] for row in result["data"]}, {timestamp.timestamp()})
+        self.assertEqual([row["value"] for row in result["data"]], [self.cvt.get_value(id=tag.id) for tag in (self.pressure, self.valve, self.level)])
+
+        with self.subTest("Display unit"):
+
+            self.cvt.update_tag(id=self.level.id, display_unit="cm")
+            self.assertEqual(self.cvt.serialize_values(names=["LT-01"])["data"][0]["value"], 250.0)
+
+        with self.subTest("Changes since a previous read"):
+
+            sequence = self.cvt.serialize_values(names=list())["sequence"]
+            self.cvt.set_value(id=self.pressure.id, value=102.0, timestamp=timestamp)
+            changed = self.cvt.serialize_values(since=sequence)
+            self.assertEqual([row["name"] for row in changed["data"]], ["PT-01"])
+            self.assertEqual(self.cvt.serialize_values(since=changed["sequence"])["data"], list())
+
+        with self.subTest("By name"):
+
+            columns = self.cvt.read_values(names=["XV-01", "UNKNOWN"])
+            self.assertEqual(columns["names"], ["XV-01"])
+            self.assertEqual(columns["values"].tolist(), [1.0])
+
+    def test_frame(self):
+
+        self.cvt.set_value(id=self.pressure.id, value=5.0, timestamp=datetime.now(timezone.utc))
+        frame = self.cvt.get_values_frame()
+        self.assertEqual(len(frame), FRAME_HEADER.size + 3 * FRAME_RECORD.itemsize)
+        header, records = parse_frame(frame)
+        index = self.cvt.get_values_frame_index()
+        self.assertEqual(header["generation"], index["generation"])
+        values = {index["names"][slot]: value for slot, value in zip(records["slot"].tolist(), records["value"].tolist())}
+        self.assertEqual(values["PT-01"], 5.0)
+        self.assertEqual(index["data_types"][records["slot"][1]], "bool")
+
+        with self.assertRaises(ValueError):
+
+            parse_frame(b"X" * FRAME_HEADER.size)
+
+    def test_lifecycle(self):
+
+        generation = self.cvt.columns.generation
+        self.cvt.update_tag(id=self.pressure.id, name="PT-02")
+        self.assertEqual(self.cvt.columns.generation, generation + 1)
+        self.assertEqual(self.cvt.read_values(names=["PT-02"])["ids"], [self.pressure.id])
+        slot = self.cvt.columns.select(ids=[self.valve.id])[0]
+        self.cvt.delete_tag(id=self.valve.id, user=None)
+        self.assertEqual(len(self.cvt.columns), 2)
+        self.assertNotIn("XV-01", [row["name"] for row in self.cvt.serialize_values()["data"]])
+        tag, _ = self.cvt.set_tag(name="XV-02", unit="adim", data_type="bool", description="", variable="Adimentional")
+        # El slot liberado se reutiliza
+        self.assertEqual(self.cvt.columns.select(ids=[tag.id])[0], slot)
+
+    def test_grow(self):
+
+        store = ColumnStore(capacity=2)
+        for index in range(5):
+
+            store.register(id=str(index), name=f"T-{index}")
+            store.update(id=str(index), value=float(index))
+
+        self.assertEqual(len(store.values), 8)
+        self.assertEqual(store.read()["values"].tolist(), [0.0, 1.0, 2.0, 3.0, 4.0])
+        store.set_quality(id="3", quality=0x80000000)
+        self.assertEqual(store.serialize(ids=["3"])[0]["quality"], 0x80000000)
+
+        with self.subTest("String values"):
+
+            store.register(id="mode", name="MODE-01", data_type="str")
+            store.update(id="mode", value="AUTO")
+            self.assertEqual(store.serialize(ids=["mode"])[0]["value"], "AUTO")
+            self.assertTrue(store.read(ids=["mode"])["values"][0] != store.read(ids=["mode"])["values"][0])
@@ -0,0 +1,106 @@
+import math, random, unittest
+from datetime import datetime, timedelta
+import numpy as np
+from peewee import SqliteDatabase
+from ..dbmodels import Variables, Units, DataTypes, Tags, TagHistoryCompression
+from ..logger.compression import HistoryCompressor
+from ..logger.datalogger import DataLogger
+
+MODELS = [Variables, Units, DataTypes, Tags, TagHistoryCompression]
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+class TestHistoryCompression(unittest.TestCase):
+
+    def signal(self, seconds:int=7200, seed:int=5)->list:
+
+        # Rampa lenta + escalón + oscilación con ruido, 1 muestra por segundo
+        rng = random.Random(seed)
+        items = list()
+        for second in range(seconds):
+
+            value = 50.0 + second * 0.001 + (10.0 if second > seconds // 2 else 0.0)
+            value += 2.0 * math.sin(second / 300.0) + rng.gauss(0, 0.05)
+            items.append({"tag": "PT-01", "value": round(value, 3), "timestamp": START + timedelta(seconds=second)})
+
+        return items
+
+    def compress(self, items:list, deviation:float, max_time:float)->tuple:
+
+        compressor = HistoryCompressor(deviation=deviation, max_time=max_time)
+        stored = list()
+        for index in range(0, len(items), 10):
+
+            stored.extend(compressor.filter(items[index:index + 10]))
+
+        stored.extend(compressor.flush(force=True))
+
+        return compressor, stored
+
+    def test_reconstruction_within_deviation(self):
+
+        items = self.signal()
+        compressor, stored = self.compress(items, deviation=0.25, max_time=600)
+        self.assertGreaterEqual(compressor.statistics()["ratio"], 10)
+        self.assertEqual(stored[0], items[0])
+        self.assertEqual(stored[-1], items[-1])
+
+        times = np.array([(item["timestamp"] - START).total_seconds() for item in stored])
+        values = np.array([item["value"] for item in stored])
+        self.assertTrue(np.all(np.diff(times) > 0))
+        rebuilt = np.interp([(item["timestamp"] - START).total_seconds() for item in items], times, values)
+        error = np.abs(rebuilt - np.array([item["value"] for item in items]))
+        self.assertLessEqual(error.max(), 0.25 + 1e-9)
+
+        with self.subTest("Max time heartbeat"):
+
+            self.assertLessEqual(np.diff(times).max(), 600)
+
+    def test_flat_signal_heartbeat(self):
+
+        items = [{"tag": "FT-01", "value": 3.0, "timestamp": START + timedelta(seconds=second)} for second in range(3600)]
+        _, stored = self.compress(items, deviation=0.1, max_time=300)
+        times = [(item["timestamp"] - START).total_seconds() for item in stored]
+        self.assertEqual(len(stored), 13)
+        self.assertLessEqual(max(np.diff(times)), 300)
+
+    def test_passthrough(self):
+
+        compressor = HistoryCompressor(deviation=0.0, max_time=600)
+        items = self.signal(seconds=100)
+        self.assertEqual(compressor.filter(items), items)
+
+        with self.subTest("Non numeric values are not compressed"):
+
+            compressor.configure("XV-01", deviation=1.0)
+            items = [{"tag": "XV-01", "value": bool(second % 2), "timestamp": START + timedelta(seconds=second)} for second in range(10)]
+            self.assertEqual(compressor.filter(items), items)
+
+    def test_settings_in_database(self):
+
+        db = SqliteDatabase(":memory:")
+        with db.bind_ctx(MODELS):
+
+            db.create_tables(MODELS)
+            Variables.insert(name="Pressure").execute()
+            Units.insert(name="Pascal", unit="Pa", variable_id=1).execute()
+            DataTypes.insert(name="float").execute()
+            Tags.insert(identifier="PT-01", name="PT-01", unit=1, data_type=1, display_name="PT-01", display_unit=1).execute()
+            logger = DataLogger()
+            previous = logger._db
+            logger.set_db(db)
+            try:
+
+                self.assertIsNone(logger.set_history_compression("PT-99", deviation=1.0))
+                logger.set_history_compression("PT-01", deviation=0.5)
+                logger.set_history_compression("PT-01", deviation=0.25, max_time=120)
+                self.assertEqual(logger.get_history_compression(), {"PT-01": (0.25, 120.0)})
+
+                compressor = HistoryCompressor(deviation=0, max_time=600)
+                compressor.load(logger.get_history_compression())
+                self.assertEqual(compressor.settings("PT-01"), (0.25, 120.0))
+                self.assertEqual(compressor.settings("PT-02"), (0.0, 600.0))
+
+            finally:
+
+                logger.set_db(previous)
@@ -51,6 +51,20 @@ class TestCore(unittest.TestCase):
             
             self.assertEqual(self.app.cvt.get_value(id=tag2.id), value)
 
+        # DIRTY TRACKING
+        self.app.cvt.track_changes(name="test")
+        with self.subTest("Test all tags changed on first pop"):
+
+            self.assertTrue({tag1.id, tag2.id}.issubset(self.app.cvt.pop_changes(name="test")))
+            self.assertEqual(self.app.cvt.pop_changes(name="test"), [])
+
+        self.app.cvt.set_value(id=tag1.id, value=10, timestamp=datetime.now())
+        with self.subTest("Test only written tags changed"):
+
+            self.assertEqual(self.app.cvt.pop_changes(name="test"), [tag1.id])
+
+        self.app.cvt.untrack_changes(name="test")
+
         # UPDATE TAGS
         name = "TT"
         updated_tag, _ = self.app.update_tag(id=tag2.id, name=name)
@@ -259,6 +273,31 @@ class TestCore(unittest.TestCase):
         self.app.delete_alarm(id=alarm_HH.identifier)
         self.app.delete_tag(id=tag.id)
 
+    def test_load_db_to_cvt(self):
+
+        tag, _ = self.app.create_tag(name="P3", unit="Pa", variable="Pressure", display_name="PT-03")
+        alarm, _ = self.app.create_alarm(name="alarm_P3_H", tag=tag.name, alarm_type="HIGH", trigger_value=10.0)
+
+        # Simula un reinicio: se quita el tag de memoria y se recarga desde la base de datos
+        self.app.cvt.delete_tag(id=tag.id)
+        self.app.load_db_to_cvt()
+        self.app.load_db_to_alarm_manager()
+        with self.subTest("Test tag reloaded with its indexes"):
+
+            reloaded = self.app.cvt.get_tag_by_name(name="P3")
+            self.assertEqual(reloaded.id, tag.id)
+            self.assertEqual(self.app.cvt.get_tag_by_display_name(display_name="PT-03").id, tag.id)
+
+        with self.subTest("Test startup report"):
+
+            report = self.app.get_startup_report()
+            self.assertGreaterEqual(report["cvt"]["loaded"], 1)
+            self.assertEqual(set(report["cvt"]["phases"]), {"read", "cvt", "subscribe"})
+            self.assertGreaterEqual(report["alarms"]["loaded"], 1)
+
+        self.app.delete_alarm(id=alarm.identifier)
+        self.app.delete_tag(id=tag.id)
+
     def test_linear_referencing_geospatial(self):
         # Precondition: segment must exist in DB
         segment = Segment.create(name="SEG-A", manufacturer="MANU-A")
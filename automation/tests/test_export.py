@@ -0,0 +1,117 @@
+import csv, io, random, shutil, tempfile, unittest
+from datetime import datetime, timedelta
+import pytz
+from peewee import SqliteDatabase
+from ..dbmodels import Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor
+from ..dbmodels.archive import HistoryArchive
+from ..dbmodels.partitions import HistoryPartitions
+from ..logger.datalogger import DataLogger, DATETIME_FORMAT
+from ..logger.export import raw_chunks, resampled_chunks, to_csv, to_parquet, parquet_available
+
+MODELS = [Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor]
+
+
+class TestExportHistory(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db = SqliteDatabase(":memory:")
+        self.ctx = self.db.bind_ctx(MODELS)
+        self.ctx.__enter__()
+        self.db.create_tables([model for model in MODELS if model is not TagValue])
+        Variables.insert(name="Pressure").execute()
+        Units.insert(name="Pascal", unit="Pa", variable_id=1).execute()
+        DataTypes.insert(name="float").execute()
+        for name in ("PT-01", "PT-02"):
+
+            Tags.insert(identifier=name, name=name, unit=1, data_type=1, display_name=name, display_unit=1).execute()
+
+        self.history = HistoryPartitions(TagValue, period="day")
+        self.history.create()
+        # 4 días de muestras irregulares hasta ahora; PT-02 empieza un día después
+        rng = random.Random(11)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.rows = list()
+        for tag, days in ((1, 4), (2, 3)):
+
+            timestamp = self.now - timedelta(days=days)
+            while timestamp < self.now:
+
+                self.rows.append({"tag": tag, "unit": 1, "value": round(rng.gauss(50, 10), 2), "timestamp": timestamp})
+                timestamp += timedelta(seconds=rng.randint(30, 600))
+
+        self.history.insert_many(self.rows)
+        self.folder = tempfile.mkdtemp()
+        self.logger = DataLogger()
+        self._previous = (self.logger._db, self.logger.is_history_logged, self.logger.archive)
+        self.logger.set_db(self.db)
+        self.logger.set_is_history_logged(True)
+        self.logger.archive = HistoryArchive(self.folder)
+        # La mitad más antigua queda en el archivo
+        self.logger.apply_retention(archive_days=2)
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.logger.set_db(self._previous[0])
+        self.logger.set_is_history_logged(self._previous[1])
+        self.logger.archive = self._previous[2]
+        self.history.drop_all()
+        self.ctx.__exit__(None, None, None)
+        self.db.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+        return super().tearDown()
+
+    def epoch(self, timestamp:datetime)->int:
+
+        return int((timestamp - datetime(1970, 1, 1)).total_seconds())
+
+    def test_raw_csv(self):
+
+        start, stop = self.epoch(self.now - timedelta(days=3, hours=5)), self.epoch(self.now)
+        chunks = list(raw_chunks(self.logger.read_values, ["PT-01", "PT-02"], start, stop, chunk_size=50))
+        self.assertLessEqual(max(len(timestamps) for timestamps, _ in chunks), 50)
+
+        rows = list(csv.reader(io.StringIO("".join(to_csv(iter(chunks), ["timestamp", "tag", "value"], pytz.UTC)))))
+        self.assertEqual(rows[0], ["timestamp", "tag", "value"])
+        expected = [
+            [row["timestamp"].strftime(DATETIME_FORMAT), f"PT-0{row['tag']}", str(row["value"])]
+            for row in sorted(self.rows, key=lambda row: (row["tag"], row["timestamp"]))
+            if start <= self.epoch(row["timestamp"]) <= stop
+        ]
+        self.assertEqual(rows[1:], expected)
+
+    def test_resampled_matches_tabular_data(self):
+
+        start, stop = self.now - timedelta(days=3, hours=12), self.now - timedelta(hours=1)
+        tabular = self.logger.read_tabular_data(
+            start.strftime(DATETIME_FORMAT), stop.strftime(DATETIME_FORMAT), "UTC", ["PT-01", "PT-02"], sample_time=900, page=1, limit=1000
+        )
+        chunks = resampled_chunks(
+            self.logger.read_values, self.logger.read_last_value, ["PT-01", "PT-02"],
+            self.epoch(start), self.epoch(stop), 900, chunk_size=64
+        )
+        rows = list(csv.reader(io.StringIO("".join(to_csv(chunks, ["timestamp", "PT-01", "PT-02"], pytz.UTC)))))[1:]
+        self.assertEqual(len(rows), len(tabular["values"]))
+
+        for row, expected in zip(rows, reversed(tabular["values"])):
+
+            self.assertEqual(row[0], expected[0])
+            self.assertEqual([float(value) if value else None for value in row[1:]], expected[1:])
+
+        with self.subTest("Steps before the first sample of a tag are empty"):
+
+            self.assertEqual(rows[0][2], "")
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_parquet(self):
+
+        import pyarrow.parquet as pq
+        start, stop = self.epoch(self.now - timedelta(days=3)), self.epoch(self.now)
+        chunks = raw_chunks(self.logger.read_values, ["PT-01"], start, stop, chunk_size=100)
+        data = b"".join(to_parquet(chunks, ["timestamp", "tag", "value"], "UTC", strings=(0,)))
+        table = pq.read_table(io.BytesIO(data))
+        expected = [row["value"] for row in sorted(self.rows, key=lambda row: row["timestamp"]) if row["tag"] == 1 and start <= self.epoch(row["timestamp"]) <= stop]
+        self.assertEqual(table.column("value").to_pylist(), expected)
@@ -0,0 +1,184 @@
+import unittest, os, random
+from datetime import datetime, timezone
+import numpy as np
+from .. import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+from ..iad import detectors
+from ..iad.statistics import RollingStatistics, EWMAStatistics
+from ..iad.detectors import FrozenDataDetector, OutlierDetector, OutOfRangeDetector
+from ..iad.benchmark import read_columns, legacy_frozen_data, replay
+from ..iad.batch import scan, frozen_data_mask, outlier_mask
+from ..tags.cvt import CVT
+
+
+class TestIAD(unittest.TestCase):
+
+    def setUp(self) -> None:
+        file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SA_L1L_D_WL_SS_V2_01.csv")
+        self.columns = read_columns(file)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        
+        return super().tearDown()
+
+    def test_rolling_statistics(self):
+
+        values = self.columns["LAST_TRANSMITTER_PRESSURE"]
+        statistics = RollingStatistics(size=10)
+        for counter, value in enumerate(values):
+
+            statistics.update(value)
+            if counter % 97 == 0 and counter >= 10:
+
+                with self.subTest(f"Sample {counter}"):
+
+                    window = np.array(values[counter - 9:counter + 1])
+                    self.assertAlmostEqual(statistics.mean, window.mean(), delta=1e-6)
+                    self.assertAlmostEqual(statistics.std, window.std(), delta=1e-3)
+
+    def test_rolling_statistics_long_run(self):
+
+        # Offset grande y muchas muestras entre recálculos: el error de redondeo no debe impedir
+        # detectar datos congelados (10000 + 10 muestras: la última dispara el recálculo)
+        # Semilla con deriva visible (std ~1e-3) si no hubiera recálculo
+        generator = random.Random(3)
+        statistics = RollingStatistics(size=10, resync=1001)
+        detector = FrozenDataDetector()
+        for _ in range(10_000):
+
+            statistics.update(2e6 + generator.uniform(-2000.0, 2000.0))
+
+        for _ in range(10):
+
+            statistics.update(2e6 + 123.456)
+
+        self.assertLess(statistics.std, 1e-6)
+        self.assertAlmostEqual(statistics.mean, 2e6 + 123.456, delta=1e-6)
+        detector.statistics = statistics
+        self.assertTrue(detector.update(2e6 + 123.456))
+
+    def test_ewma_statistics(self):
+
+        statistics = EWMAStatistics(alpha=0.2)
+        for value in [5.0] * 50:
+
+            statistics.update(value)
+
+        self.assertEqual(statistics.mean, 5.0)
+        self.assertEqual(statistics.variance, 0.0)
+
+    def test_frozen_data_matches_previous_algorithm(self):
+
+        for column in ("LAST_TRANSMITTER_MASS_FLOW", "LEAKED_FLOW"):
+
+            with self.subTest(column):
+
+                values = self.columns[column]
+                self.assertEqual(replay(FrozenDataDetector(), values), legacy_frozen_data(values))
+
+    def test_outlier(self):
+
+        detector = OutlierDetector()
+        values = [100.0 + 0.5 * (-1) ** i for i in range(50)]
+        for value in values:
+
+            self.assertFalse(detector.update(value) or False)
+
+        self.assertTrue(detector.update(150.0))
+
+    def test_out_of_range(self):
+
+        detector = OutOfRangeDetector(low=0.0, high=10.0)
+        self.assertFalse(detector.update(5.0))
+        self.assertTrue(detector.update(-1.0))
+        self.assertTrue(detector.update(11.0))
+        self.assertTrue(detector.update(float("nan")))
+
+    def test_batch_frozen_data_matches_online_detector(self):
+
+        values = self.columns["LAST_TRANSMITTER_MASS_FLOW"]
+        detector = FrozenDataDetector()
+        online = [bool(detector.update(value)) for value in values]
+        self.assertEqual(frozen_data_mask(np.array(values)).tolist(), online)
+
+    def test_batch_outlier_matches_online_detector(self):
+
+        values = np.array(self.columns["LAST_TRANSMITTER_MASS_FLOW"])
+        detector = OutlierDetector()
+        online = [bool(detector.update(value)) for value in values]
+        self.assertTrue(any(online))
+        self.assertEqual(outlier_mask(values).tolist(), online)
+
+        with self.subTest("EWMA carried across chunks"):
+
+            statistics = EWMAStatistics(alpha=0.05)
+            chunks = [outlier_mask(values[i:i + 7], statistics=statistics) for i in range(0, len(values), 7)]
+            self.assertEqual(np.concatenate(chunks).tolist(), online)
+            self.assertEqual(statistics.count, detector.statistics.count)
+            self.assertAlmostEqual(statistics.mean, detector.statistics.mean, delta=1e-9)
+
+    def test_batch_scan_chunks(self):
+
+        values = np.array(self.columns["LEAKED_FLOW"])
+        timestamps = np.arange(len(values), dtype=float)
+        expected = scan([(timestamps, values)], high=0.001)
+        for chunk_size in (7, 100, 1000):
+
+            with self.subTest(f"Chunk size {chunk_size}"):
+
+                chunks = [
+                    (timestamps[i:i + chunk_size], values[i:i + chunk_size]) 
+                    for i in range(0, len(values), chunk_size)
+                ]
+                self.assertEqual(scan(chunks, high=0.001), expected)
+
+
+class TestCVTIAD(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.cvt = CVT()
+        self.tag, _ = self.cvt.set_tag(name="PT-01", unit="Pa", data_type="float", description="", variable="Pressure", out_of_range_detection=True)
+        detectors.set_range("PT-01", low=0.0, high=10.0)
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        detectors.reset(keep_range=False)
+
+        return super().tearDown()
+
+    def anomaly(self, tag_name:str):
+
+        state = detectors.states.get(tag_name)
+
+        return state.anomalies.get(detectors.OUT_OF_RANGE) if state else None
+
+    def test_opt_in(self):
+
+        self.cvt.set_value(id=self.tag.id, value=11.0, timestamp=datetime.now(timezone.utc))
+        self.assertIsNone(self.anomaly("PT-01"))
+        self.cvt.set_iad(enabled=True)
+        self.cvt.set_value(id=self.tag.id, value=12.0, timestamp=datetime.now(timezone.utc))
+        self.assertTrue(self.anomaly("PT-01"))
+
+        with self.subTest("Disabling discards the states but keeps the range"):
+
+            self.cvt.set_iad(enabled=False)
+            self.assertEqual(detectors.states, dict())
+            self.assertEqual(detectors.get_range("PT-01"), (0.0, 10.0))
+
+    def test_range_follows_the_tag(self):
+
+        self.cvt.set_iad(enabled=True)
+        self.cvt.update_tag(id=self.tag.id, name="PT-02")
+        self.assertEqual(detectors.get_range("PT-01"), (None, None))
+        self.assertEqual(detectors.get_range("PT-02"), (0.0, 10.0))
+        self.cvt.set_value(id=self.tag.id, value=-1.0, timestamp=datetime.now(timezone.utc))
+        self.assertTrue(self.anomaly("PT-02"))
+
+        with self.subTest("Deleting the tag drops its range"):
+
+            self.cvt.delete_tag(id=self.tag.id, user=None)
+            self.assertEqual(detectors.get_range("PT-02"), (None, None))
@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+import subprocess
+import unittest
+
+# Módulos pesados que no deben cargarse al importar los subpaquetes livianos
+HEAVY_MODULES = ("flask", "flask_socketio", "flask_restx", "werkzeug", "jinja2", "peewee", "opcua")
+# Presupuesto acumulado de importación (microsegundos) según `python -X importtime`: opt-in,
+# el tiempo depende de la máquina (p. ej. AUTOMATION_IMPORT_BUDGET_US=400000)
+IMPORT_BUDGET_US = int(os.environ.get("AUTOMATION_IMPORT_BUDGET_US") or 0)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def import_profile(module:str)->tuple:
+    r"""
+    Imports `module` in a fresh interpreter with `-X importtime`.
+
+    **Returns:**
+
+    * **tuple**: (cumulative import time in microseconds, set of loaded module names)
+    """
+    code = f"import sys, {module}; print(','.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    cumulative = 0
+    pattern = re.compile(rf"^import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*{re.escape(module)}$")
+    for line in result.stderr.splitlines():
+
+        match = pattern.match(line)
+        if match:
+            cumulative = int(match.group(1))
+
+    modules = set(result.stdout.strip().splitlines()[-1].split(","))
+
+    return cumulative, modules
+
+
+class TestImports(unittest.TestCase):
+
+    def assert_lightweight(self, module:str):
+
+        cumulative, modules = import_profile(module)
+        loaded = sorted(name for name in HEAVY_MODULES if name in modules)
+
+        self.assertEqual(loaded, [], f"{module} imports heavy subsystems: {loaded}")
+        self.assertGreater(cumulative, 0)
+        if IMPORT_BUDGET_US:
+
+            self.assertLess(cumulative, IMPORT_BUDGET_US, f"{module} took {cumulative} us to import")
+
+    def test_import_tags(self):
+
+        self.assert_lightweight("automation.tags")
+
+    def test_import_variables(self):
+
+        self.assert_lightweight("automation.variables")
+
+    def test_lazy_attributes(self):
+
+        _, modules = import_profile("automation")
+        self.assertNotIn("automation.core", modules)
+        self.assertNotIn("flask", modules)
+
+        import automation
+        self.assertIn("PyAutomation", dir(automation))
+        with self.assertRaises(AttributeError):
+
+            automation.NotDefined
@@ -0,0 +1,96 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+from opcua import Client
+from ..iad.benchmark import DEFAULT_FILES, read_columns
+from ..loadgen import LoadGenerator, CVTSink, OPCUASink, replay
+from ..tags import CVTEngine
+from .test_address_space import free_port
+
+
+class TestLoadGenerator(unittest.TestCase):
+
+    def test_recorded_series(self):
+
+        columns = read_columns(DEFAULT_FILES[0])
+        generator = LoadGenerator(tags=len(columns) + 1, sources=DEFAULT_FILES[:1])
+        first, second = generator.step(), generator.step()
+        self.assertEqual(generator.tags[0], "LG-LAST_TRANSMITTER_PRESSURE-0000")
+        self.assertEqual(generator.tags[-1], "LG-LAST_TRANSMITTER_PRESSURE-0001")
+        self.assertEqual(generator.variables[0], ("Pressure", "Pa"))
+        self.assertEqual(first[:len(columns)].tolist(), [values[0] for values in columns.values()])
+        self.assertEqual(second[:len(columns)].tolist(), [values[1] for values in columns.values()])
+        # La copia empieza en otra posición del archivo
+        self.assertEqual(first[-1], columns["LAST_TRANSMITTER_PRESSURE"][7919 % len(columns["LAST_TRANSMITTER_PRESSURE"])])
+
+    def test_disturbances(self):
+
+        def values(**kwargs):
+
+            generator = LoadGenerator(tags=200, sources=["sine"], seed=3, **kwargs)
+            return np.array([generator.step() for _ in range(300)]), generator
+
+        clean, generator = values()
+        with self.subTest("Noise"):
+
+            noisy, _ = values(noise=0.1)
+            error = (noisy - clean) / generator.scale
+            self.assertAlmostEqual(error.std(), 0.1, delta=0.01)
+
+        with self.subTest("Step changes"):
+
+            stepped, _ = values(step_probability=0.01, step_size=2.0)
+            offsets = np.round((stepped - clean) / generator.scale, 6)
+            self.assertTrue(set(np.unique(offsets)) <= set(np.arange(-20.0, 21.0, 2.0)))
+            self.assertGreater(np.count_nonzero(offsets[-1]), 100)
+
+        with self.subTest("Frozen segments"):
+
+            frozen, _ = values(noise=0.1, frozen_probability=0.01, frozen_length=20)
+            repeated = (np.diff(frozen, axis=0) == 0).sum()
+            self.assertGreater(repeated, 200 * 300 * 0.05)
+            self.assertEqual((np.diff(noisy, axis=0) == 0).sum(), 0)
+
+        with self.subTest("Reproducible"):
+
+            again, _ = values(noise=0.1, frozen_probability=0.01, frozen_length=20)
+            self.assertTrue((again == frozen).all())
+
+    def test_replay_into_cvt(self):
+
+        generator = LoadGenerator(tags=["LG-PT-01", "LG-PT-02"], sources=["random_walk"])
+        CVTEngine().set_tags(generator.definitions(outlier_detection=True))
+        start = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        report = replay(generator, CVTSink(generator.tags), steps=50, period=60.0, speed=0, start=start)
+        self.assertEqual((report["steps"], report["updates"], report["simulated_s"]), (50, 100, 3000.0))
+        tag = CVTEngine().get_tag_by_name(name="LG-PT-02")
+        self.assertEqual(tag.value.value, generator._last[1])
+        self.assertEqual(tag.timestamp, start + timedelta(minutes=49))
+
+        with self.subTest("Undefined tags"):
+
+            with self.assertRaises(KeyError):
+
+                CVTSink(["LG-UNDEFINED"])
+
+    def test_replay_into_opcua(self):
+
+        url = f"opc.tcp://127.0.0.1:{free_port()}/loadgen/"
+        generator = LoadGenerator(tags=3, sources=["sine"])
+        sink = OPCUASink(generator.tags, endpoint=url)
+        client = Client(url)
+        try:
+            client.connect()
+            start = datetime(2024, 1, 1, tzinfo=pytz.utc)
+            report = replay(generator, sink, steps=20, period=0.5, speed=100, start=start)
+            self.assertEqual(report["updates"], 60)
+            self.assertGreaterEqual(report["elapsed_s"], 0.09)
+            self.assertEqual(sink.node_namespaces[0], f"ns={sink.idx};s=LG-SINE-0000")
+            value = client.get_node(sink.node_namespaces[2]).get_data_value()
+            self.assertEqual(value.Value.Value, generator._last[2])
+            self.assertEqual(value.SourceTimestamp, datetime(2024, 1, 1, 0, 0, 9, 500000))
+
+        finally:
+            client.disconnect()
+            sink.close()
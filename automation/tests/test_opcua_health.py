@@ -0,0 +1,122 @@
+import time, unittest
+from opcua import Server
+from .. import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+from ..opcua.models import Client
+from ..managers import OPCUAClientManager
+from .test_address_space import free_port
+
+
+class Handler:
+
+    def __init__(self):
+
+        self.values = list()
+
+    def datachange_notification(self, node, val, data):
+
+        self.values.append(val)
+
+
+class TestOpcuaHealth(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        cls.url = f"opc.tcp://127.0.0.1:{free_port()}/test/"
+        cls.server = Server()
+        cls.server.set_endpoint(cls.url)
+        idx = cls.server.register_namespace("urn:pyautomation:test")
+        plant = cls.server.get_objects_node().add_object(idx, "Plant")
+        cls.node = plant.add_variable(idx, "TT-01.PV", 0.0)
+        cls.server.start()
+        cls.client = Client(cls.url, client_name="health")
+        cls.client.connect()
+
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+
+        cls.client.disconnect()
+        cls.server.stop()
+
+        return super().tearDownClass()
+
+    def wait_for(self, condition, timeout:float=5.0):
+
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+
+            time.sleep(0.02)
+
+        self.assertTrue(condition())
+
+    def test_subscription_counters(self):
+
+        handler = Handler()
+        health = self.client.health
+        subscription = self.client.create_subscription(50, handler, keepalive_count=2)
+        try:
+            subscription.subscribe_data_change(self.client.get_node(self.node.nodeid))
+            for value in range(1, 6):
+
+                self.node.set_value(float(value))
+                time.sleep(0.06)
+
+            self.wait_for(lambda: 5.0 in handler.values)
+            snapshot = health.snapshot()
+            self.assertEqual(snapshot["subscriptions"], 1)
+            self.assertEqual(snapshot["monitored_items"], 1)
+            self.assertGreaterEqual(snapshot["notifications"], len(handler.values))
+            self.assertGreaterEqual(snapshot["publishes"], 2)
+            self.assertEqual(snapshot["notification_lag"]["count"], snapshot["notifications"])
+            self.assertLess(snapshot["notification_lag"]["p95_ms"], 1000)
+
+            with self.subTest("Keep-alives without data changes"):
+
+                self.wait_for(lambda: health.keepalives > 0)
+                self.assertIsNotNone(health.snapshot()["publish_rate"])
+
+            with self.subTest("Missed keep-alives"):
+
+                # Sin respuestas durante 4 intervalos de keep-alive (0.1 s)
+                subscription._last_publish = time.monotonic() - 0.4
+                self.assertGreaterEqual(health.snapshot()["keepalive_misses"], 3)
+
+        finally:
+            subscription.delete()
+
+    def test_reconnect_counter(self):
+
+        client = Client(self.url, client_name="health-reconnect")
+        try:
+            client.connect()
+            client.create_subscription(1000, Handler())
+            self.assertEqual((client.health.connects, client.health.reconnects), (1, 0))
+            client.disconnect()
+            client.connect()
+            snapshot = client.health.snapshot()
+            self.assertEqual((snapshot["connects"], snapshot["reconnects"]), (2, 1))
+            # Las suscripciones de la sesión anterior no se cuentan
+            self.assertEqual(snapshot["subscriptions"], 0)
+
+        finally:
+            client.disconnect()
+
+    def test_polled_reads_and_prometheus(self):
+
+        manager = OPCUAClientManager()
+        manager._clients["health"] = self.client
+        before = self.client.health.reads.count
+        values = manager.get_node_value_by_opcua_address(opcua_address=self.url, namespace=self.node.nodeid.to_string())
+        self.assertTrue(values)
+        self.assertEqual(self.client.health.reads.count, before + 1)
+        self.assertIn("writes", manager.get_health()["health"])
+
+        text = manager.get_prometheus_metrics(reconnection={"health": {"last_time_to_recover_s": 1.5}})
+        lines = text.splitlines()
+        self.assertIn('pyautomation_opcua_connected{client="health"} 1', lines)
+        self.assertIn('pyautomation_opcua_time_to_recover_seconds{client="health"} 1.5', lines)
+        self.assertIn("# TYPE pyautomation_opcua_notification_lag_seconds histogram", lines)
+        self.assertIn(f'pyautomation_opcua_read_latency_seconds_count{{client="health"}} {self.client.health.reads.count}', lines)
+        self.assertIn(f'pyautomation_opcua_read_latency_seconds_bucket{{client="health",le="+Inf"}} {self.client.health.reads.count}', lines)
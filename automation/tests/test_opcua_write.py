@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import patch
+from opcua import Server, ua
+from ..opcua.models import Client
+from .test_address_space import free_port
+
+
+class TestOpcuaWrite(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        url = f"opc.tcp://127.0.0.1:{free_port()}/test/"
+        cls.server = Server()
+        cls.server.set_endpoint(url)
+        idx = cls.server.register_namespace("urn:pyautomation:test")
+        plant = cls.server.get_objects_node().add_object(idx, "Plant")
+        cls.nodes = {
+            "setpoint": plant.add_variable(idx, "FIC-01.SP", 0.0),
+            "count": plant.add_variable(idx, "FIC-01.N", ua.Variant(0, ua.VariantType.Int32)),
+            "float": plant.add_variable(idx, "FIC-01.OUT", ua.Variant(0.0, ua.VariantType.Float)),
+            "readonly": plant.add_variable(idx, "FIC-01.PV", 0.0),
+            # DataType abstracto (BaseDataType, i=24) y arreglo de Double
+            "any": plant.add_variable(idx, "FIC-01.ANY", 0.0, datatype=ua.NodeId(ua.ObjectIds.BaseDataType)),
+            "array": plant.add_variable(idx, "FIC-01.CURVE", [0.0, 0.0, 0.0])
+        }
+        for name in ("setpoint", "count", "float", "any", "array"):
+
+            cls.nodes[name].set_writable()
+
+        cls.plant = plant
+        cls.server.start()
+        cls.client = Client(url, client_name="test")
+        cls.client.connect()
+
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+
+        cls.client.disconnect()
+        cls.server.stop()
+
+        return super().tearDownClass()
+
+    def namespace(self, name:str)->str:
+
+        return self.nodes[name].nodeid.to_string()
+
+    def test_batch_write(self):
+
+        values = [(self.namespace("setpoint"), 12.5), (self.namespace("count"), 7.0), (self.namespace("float"), 3)]
+        with patch.object(self.client.uaclient, "write", wraps=self.client.uaclient.write) as write, \
+             patch.object(self.client.uaclient, "read", wraps=self.client.uaclient.read) as read:
+
+            results, status = self.client.write_values(values)
+            self.assertEqual(status, 200)
+            self.assertEqual(write.call_count, 1)
+            self.assertEqual(read.call_count, 1)
+
+            with self.subTest("Node metadata is cached"):
+
+                self.client.write_values(values)
+                self.assertEqual(write.call_count, 2)
+                self.assertEqual(read.call_count, 1)
+
+        self.assertTrue(all(result["success"] and result["latency_ms"] >= 0 for result in results))
+        self.assertEqual(self.nodes["setpoint"].get_value(), 12.5)
+        # El valor se convierte al tipo de dato del nodo
+        self.assertEqual(self.nodes["count"].get_data_value().Value.VariantType, ua.VariantType.Int32)
+        self.assertEqual(self.nodes["count"].get_value(), 7)
+        self.assertEqual(self.nodes["float"].get_data_value().Value.VariantType, ua.VariantType.Float)
+
+    def test_abstract_data_type_and_arrays(self):
+
+        values = [
+            (self.namespace("any"), 5.5),
+            (self.namespace("array"), [1.0, 2.0, 3]),
+            (self.namespace("setpoint"), 2.0)
+        ]
+        results, status = self.client.write_values(values)
+        self.assertEqual(status, 200, results)
+        self.assertEqual(self.nodes["any"].get_value(), 5.5)
+        self.assertEqual(self.nodes["array"].get_value(), [1.0, 2.0, 3.0])
+        self.assertEqual(self.nodes["setpoint"].get_value(), 2.0)
+
+        with self.subTest("A value that can not be encoded only fails its own write"):
+
+            results, status = self.client.write_values([(self.namespace("array"), ["a", 1.0]), (self.namespace("setpoint"), 3.0)])
+            self.assertEqual(status, 207)
+            self.assertEqual([result["success"] for result in results], [False, True])
+            self.assertEqual(self.nodes["setpoint"].get_value(), 3.0)
+
+    def test_rejected_writes(self):
+
+        values = [
+            (self.namespace("readonly"), 1.0),
+            (self.plant.nodeid.to_string(), 1.0),
+            ("ns=2;i=99999", 1.0),
+            (self.namespace("count"), 2.5),
+            (self.namespace("setpoint"), 4.0)
+        ]
+        results, status = self.client.write_values(values)
+        self.assertEqual(status, 207)
+        self.assertEqual([result["success"] for result in results], [False, False, False, False, True])
+        self.assertIn("permisos", results[0]["message"])
+        self.assertIn("Object", results[1]["message"])
+
+        with self.subTest("Single write keeps its interface"):
+
+            result, status = self.client.write_value(self.namespace("readonly"), 1.0)
+            self.assertEqual((status, result["success"]), (400, False))
+
+    def test_latency_metrics(self):
+
+        before = self.client.write_metrics.summary()["count"]
+        self.client.write_values([(self.namespace("setpoint"), 1.0), (self.namespace("readonly"), 1.0)])
+        summary = self.client.write_metrics.summary()
+        self.assertEqual(summary["count"], before + 2)
+        self.assertGreaterEqual(summary["errors"], 1)
+        self.assertLessEqual(summary["p50_ms"], summary["max_ms"])
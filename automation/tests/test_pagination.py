@@ -0,0 +1,115 @@
+import unittest
+from datetime import datetime, timedelta
+from peewee import SqliteDatabase
+from ..dbmodels.core import count_cache, encode_cursor, decode_cursor
+from ..dbmodels.users import Roles, Users
+from ..dbmodels.events import Events
+from ..dbmodels.logs import Logs
+from ..dbmodels.tags import TagValue
+
+MODELS = [Roles, Users, Events, Logs, TagValue]
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+class TestKeysetPagination(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db = SqliteDatabase(":memory:")
+        self.ctx = self.db.bind_ctx(MODELS)
+        self.ctx.__enter__()
+        self.db.create_tables(MODELS)
+        count_cache.clear()
+        Roles.insert(name="operator", level=10, identifier="0a1b2c3d").execute()
+        Users.insert(identifier="u1", username="user1", role=1, email="u1@mail.com", password="x").execute()
+        # Varios registros comparten timestamp para ejercitar el desempate por id
+        Events.insert_many([
+            {"timestamp": START + timedelta(seconds=i // 3), "message": f"event {i}", "user": 1} for i in range(47)
+        ]).execute()
+        TagValue.insert_many([
+            {"tag": 1, "unit": 1, "value": float(i), "timestamp": START + timedelta(seconds=i // 4)} for i in range(53)
+        ]).execute()
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.ctx.__exit__(None, None, None)
+        self.db.close()
+        count_cache.clear()
+
+        return super().tearDown()
+
+    def walk(self, fetch)->list:
+
+        ids, cursor, pages = list(), "", 0
+        while True:
+
+            result = fetch(cursor)
+            ids.extend(result["data"])
+            pages += 1
+            if not result["pagination"]["has_next"]:
+
+                break
+
+            cursor = result["pagination"]["next_cursor"]
+
+        return ids, pages, result["pagination"]
+
+    def test_cursor_roundtrip(self):
+
+        values = [START, 7]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+        self.assertIsNone(decode_cursor(""))
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+
+    def test_events_keyset_matches_offset(self):
+
+        offset_ids = list()
+        for page in range(1, 6):
+
+            result = Events.filter_by(page=page, limit=10)
+            offset_ids.extend(event["id"] for event in result["data"])
+
+        def fetch(cursor:str)->dict:
+
+            result = Events.filter_by(limit=10, cursor=cursor)
+            result["data"] = [event["id"] for event in result["data"]]
+
+            return result
+
+        keyset_ids, pages, pagination = self.walk(fetch)
+
+        self.assertEqual(keyset_ids, offset_ids)
+        self.assertEqual(pages, 5)
+        self.assertEqual(pagination["total_records"], 47)
+        self.assertTrue(pagination["has_prev"])
+
+    def test_tag_values_keyset_with_ties(self):
+
+        query = TagValue.select(TagValue.id, TagValue.timestamp).dicts()
+        ids, pages, pagination = self.walk(
+            lambda cursor: TagValue.paginate_by_keyset(
+                query,
+                keys=(TagValue.timestamp, TagValue.id),
+                cursor=cursor,
+                limit=7,
+                serializer=lambda row: row["id"]
+            )
+        )
+
+        expected = [row.id for row in TagValue.select().order_by(TagValue.timestamp.desc(), TagValue.id.desc())]
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(set(ids)), 53)
+        self.assertEqual((pages, pagination["total_pages"]), (8, 8))
+
+    def test_cached_total(self):
+
+        Events.filter_by(limit=10, cursor="")
+        Events.insert(timestamp=START, message="late event", user=1).execute()
+        result = Events.filter_by(limit=10, cursor="")
+        self.assertEqual(result["pagination"]["total_records"], 47)
+
+        count_cache.clear()
+        result = Events.filter_by(limit=10, cursor="")
+        self.assertEqual(result["pagination"]["total_records"], 48)
@@ -0,0 +1,167 @@
+import os, shutil, tempfile, unittest
+from datetime import datetime, timedelta
+from peewee import SqliteDatabase
+from .. import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+from ..dbmodels import TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor
+from ..logger.datalogger import DataLogger
+from ..dbmodels.core import count_cache
+from ..dbmodels.users import Roles, Users
+from ..dbmodels.events import Events
+from ..dbmodels.tags import TagValue
+from ..dbmodels import partitions
+from ..dbmodels.partitions import HistoryPartitions, VIEW, SINGLE
+
+MODELS = [Roles, Users, Events, TagValue]
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+class TestHistoryPartitions(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db = SqliteDatabase(":memory:")
+        self.ctx = self.db.bind_ctx(MODELS)
+        self.ctx.__enter__()
+        self.db.create_tables(MODELS)
+        count_cache.clear()
+        # Histórico previo a la partición: pasa a la partición legacy
+        TagValue.insert_many([
+            {"tag": 1, "unit": 1, "value": float(i), "timestamp": START - timedelta(days=3, minutes=i)} for i in range(10)
+        ]).execute()
+        self.history = HistoryPartitions(TagValue, period="day")
+        # La tabla existente solo se migra de forma explícita
+        with self.assertLogs("pyautomation", level="WARNING"):
+
+            self.assertEqual(self.history.create(), SINGLE)
+
+        self.assertEqual(self.history.migrate(), VIEW)
+        self.history.insert_many([
+            {"tag": 1 + i % 2, "unit": 1, "value": float(i), "timestamp": START + timedelta(hours=6 * i)} for i in range(20)
+        ])
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.ctx.__exit__(None, None, None)
+        self.db.close()
+        count_cache.clear()
+
+        return super().tearDown()
+
+    def test_rows_routed_by_day(self):
+
+        names = [name for name, _, _ in self.history.partitions()]
+        self.assertEqual(names[0], "tagvalue_legacy")
+        self.assertIn("tagvalue_p20240101", names)
+        self.assertIn("tagvalue_p20240105", names)
+        self.assertEqual(self.history.partition_model("tagvalue_p20240102").select().count(), 4)
+        self.assertEqual(self.history.key(START + timedelta(hours=23)), self.history.key(START))
+
+        with self.subTest("Week partitions start on monday"):
+
+            week = HistoryPartitions(TagValue, period="week")
+            self.assertEqual(week.name(week.key(datetime(2024, 1, 7, 23))), "tagvalue_p20240101")
+            self.assertEqual(week.name(week.key(datetime(2024, 1, 8))), "tagvalue_p20240108")
+
+    def test_reads_through_view(self):
+
+        self.assertEqual(TagValue.select().count(), 30)
+        query = TagValue.select(TagValue.value).where(
+            (TagValue.tag == 2) & TagValue.timestamp.between(START + timedelta(days=1), START + timedelta(days=2))
+        )
+        self.assertEqual(sorted(row.value for row in query), [5.0, 7.0])
+
+        with self.subTest("Keyset pagination across partitions"):
+
+            query = TagValue.select(TagValue.id, TagValue.timestamp).dicts()
+            result = TagValue.paginate_by_keyset(query, keys=(TagValue.timestamp, TagValue.id), limit=25)
+            self.assertEqual(len(result["data"]), 25)
+            self.assertEqual(result["data"][0]["timestamp"], START + timedelta(hours=6 * 19))
+
+    def test_retention_drops_partitions(self):
+
+        dropped = self.history.drop_before(START + timedelta(days=2))
+        self.assertEqual(dropped, ["tagvalue_legacy", "tagvalue_p20240101", "tagvalue_p20240102"])
+        self.assertEqual(TagValue.select().count(), 12)
+        self.assertIsNone(self.db.execute_sql("SELECT 1 FROM sqlite_master WHERE name='tagvalue_p20240101'").fetchone())
+
+        with self.subTest("Writes keep working after a drop"):
+
+            self.history.insert_many([{"tag": 1, "unit": 1, "value": 1.0, "timestamp": START + timedelta(days=10)}])
+            self.assertEqual(TagValue.select().count(), 13)
+
+    def test_closed_partitions(self):
+
+        now = START + timedelta(days=2, hours=1)
+        self.history.ensure([self.history.key(now + timedelta(days=1))])
+        names = [name for name, _, _ in self.history.closed(now=now)]
+        self.assertEqual(names, ["tagvalue_legacy", "tagvalue_p20240101", "tagvalue_p20240102"])
+
+        with self.subTest("The legacy partition is open while it has rows of the current period"):
+
+            self.assertEqual([name for name, _, _ in self.history.closed(now=START - timedelta(days=3))], list())
+
+    def test_migrated_view_with_period_none(self):
+
+        # Reinicio con AUTOMATION_HISTORY_PARTITION=none: la vista se sigue usando
+        partitions._states.pop(self.db, None)
+        history = HistoryPartitions(TagValue, period="none")
+        with self.assertLogs("pyautomation", level="WARNING"):
+
+            self.assertEqual(history.create(), VIEW)
+
+        history.insert_many([{"tag": 1, "unit": 1, "value": 1.0, "timestamp": START + timedelta(days=10)}])
+        self.assertEqual(TagValue.select().count(), 31)
+        self.assertEqual(len(history.drop_before(START + timedelta(days=2))), 3)
+
+    def test_size_limit_includes_other_tables(self):
+
+        folder = tempfile.mkdtemp()
+        db = SqliteDatabase(os.path.join(folder, "app.db"))
+        models = MODELS + [TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor]
+        logger = DataLogger()
+        previous = logger._db
+        try:
+
+            with db.bind_ctx(models):
+
+                db.create_tables(models)
+                history = HistoryPartitions(TagValue, period="day")
+                history.create()
+                history.insert_many([{"tag": 1, "unit": 1, "value": float(i), "timestamp": START + timedelta(days=i)} for i in range(3)])
+                Roles.insert(name="operator", level=10, identifier="0a1b2c3d").execute()
+                Users.insert(identifier="u1", username="user1", role=1, email="u1@mail.com", password="x").execute()
+                now = datetime.utcnow()
+                Events.insert_many(
+                    [{"timestamp": START - timedelta(days=5, hours=i), "message": "x" * 1000, "user": 1} for i in range(50)] +
+                    [{"timestamp": now, "message": "current", "user": 1}]
+                ).execute()
+                logger.set_db(db)
+                dropped = logger.apply_retention(max_size_mb=1e-6, tables=((Events, Events.timestamp),))
+                # Se libera todo salvo la partición actual y los registros del último día
+                self.assertEqual(dropped, ["tagvalue_p20240101", "tagvalue_p20240102", "tagvalue_p20240103"])
+                self.assertEqual([event.message for event in Events.select()], ["current"])
+                self.assertEqual(len(os.listdir(os.path.join(folder, "backups"))), 3)
+
+        finally:
+
+            logger.set_db(previous)
+            db.close()
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def test_purge_before(self):
+
+        Roles.insert(name="operator", level=10, identifier="0a1b2c3d").execute()
+        Users.insert(identifier="u1", username="user1", role=1, email="u1@mail.com", password="x").execute()
+        Events.insert_many([
+            {"timestamp": START + timedelta(hours=i), "message": f"event {i}", "user": 1} for i in range(30)
+        ]).execute()
+        self.assertEqual(Events.purge_before(Events.timestamp, START + timedelta(hours=12), batch=5), 12)
+        self.assertEqual(Events.select().count(), 18)
+
+    def test_single_table_mode(self):
+
+        history = HistoryPartitions(Events, period="none")
+        self.assertEqual(history.backend(), SINGLE)
+        self.assertEqual(history.ensure([0]), [])
@@ -0,0 +1,161 @@
+import time, unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from .. import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+from ..managers.alarms import AlarmManager
+from ..tags.cvt import CVT
+from ..tags.quality import StalenessIndex, STALE, BAD_NO_COMMUNICATION, GOOD, quality_of, quality_name
+
+
+class SocketIO:
+
+    def __init__(self):
+
+        self.events = list()
+
+    def emit(self, event, data):
+
+        self.events.append((event, data))
+
+
+class Alarm:
+
+    def __init__(self):
+
+        self.state = SimpleNamespace(alarm_status="Not Active")
+        self.description = ""
+
+    def abnormal_condition(self):
+
+        self.state.alarm_status = "Active"
+
+    def normal_condition(self):
+
+        self.state.alarm_status = "Not Active"
+
+
+class TestStalenessIndex(unittest.TestCase):
+
+    def test_deadlines(self):
+
+        index = StalenessIndex(factor=3, min_period=0.0)
+        for position in range(1000):
+
+            index.schedule(id=str(position), period=1.0 + position % 10, now=0.0)
+
+        # Muestras frecuentes: no se encola nada nuevo
+        for now in range(1, 100):
+
+            index.touch(id="0", now=float(now))
+
+        self.assertEqual(len(index._heap), 1000)
+        expired = index.expired(now=3.0)
+        self.assertEqual(len(expired), 99)
+        self.assertNotIn("0", expired)
+        self.assertEqual(index.expired(now=3.0), list())
+        self.assertEqual(len(index.expired(now=30.0)), 900)
+        self.assertEqual(len(index.stale()), 999)
+
+        with self.subTest("Recovery and removal"):
+
+            self.assertTrue(index.touch(id="1", now=30.0))
+            self.assertFalse(index.is_stale("1"))
+            index.remove(id="1")
+            self.assertEqual(index.expired(now=1000.0), ["0"])
+            self.assertFalse(index.touch(id="1", now=1000.0))
+
+    def test_remove_and_schedule_again(self):
+
+        index = StalenessIndex(factor=1, min_period=0.0)
+        index.schedule(id="a1", period=1.0, now=0.0)
+        index.remove(id="a1")
+        index.schedule(id="a1", period=5.0, now=0.0)
+        # La entrada anterior (deadline 1.0) no debe volver a ser válida
+        self.assertEqual(index.expired(now=2.0), list())
+        self.assertEqual(index.expired(now=5.0), ["a1"])
+        self.assertEqual(index.expired(now=100.0), list())
+
+    def test_reschedule(self):
+
+        index = StalenessIndex(factor=2, min_period=0.5)
+        index.schedule(id="a1", period=10.0, now=0.0)
+        index.schedule(id="a1", period=0.1, now=0.0)
+        self.assertEqual(index.expired(now=1.0), ["a1"])
+        self.assertEqual(index.expired(now=100.0), list())
+
+    def test_quality_of(self):
+
+        from opcua import ua
+        self.assertEqual(quality_of(ua.DataValue(ua.Variant(1.0))), GOOD)
+        self.assertEqual(quality_of(ua.StatusCode(BAD_NO_COMMUNICATION)), BAD_NO_COMMUNICATION)
+        self.assertEqual(quality_of(None), GOOD)
+        self.assertEqual(quality_name(0x80340000), "BadNodeIdUnknown")
+
+
+class TestTagQuality(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.cvt = CVT()
+        self.sio = SocketIO()
+        self.cvt.set_socketio(sio=self.sio)
+        self.cvt.set_staleness(factor=2, min_period=0.0)
+        self.tag, _ = self.cvt.set_tag(name="PT-01", unit="Pa", data_type="float", description="", variable="Pressure", scan_time=500)
+        self.alarm = Alarm()
+        self.cvt.quality_alarms._version = AlarmManager().get_version()
+        self.cvt.quality_alarms._alarms["PT-01"] = self.alarm
+
+        return super().setUp()
+
+    def qualities(self)->list:
+
+        return [data["quality"] for event, data in self.sio.events if event == "on.tag.quality"]
+
+    def test_status_code(self):
+
+        timestamp = datetime.now(timezone.utc)
+        self.cvt.set_value(id=self.tag.id, value=1.0, timestamp=timestamp)
+        self.assertEqual(self.qualities(), list())
+        self.cvt.set_value(id=self.tag.id, value=None, timestamp=timestamp, quality=BAD_NO_COMMUNICATION)
+        self.assertEqual(self.cvt.get_value(id=self.tag.id), 1.0)
+        self.assertEqual(self.tag.serialize()["quality"], BAD_NO_COMMUNICATION)
+        self.assertEqual(self.cvt.serialize_values()["data"][0]["quality"], BAD_NO_COMMUNICATION)
+        self.assertEqual(self.alarm.state.alarm_status, "Active")
+        self.assertEqual(self.alarm.description, "BadNoCommunication")
+        self.cvt.set_value(id=self.tag.id, value=2.0, timestamp=timestamp)
+        self.assertEqual(self.qualities(), [BAD_NO_COMMUNICATION, GOOD])
+        self.assertEqual(self.alarm.state.alarm_status, "Not Active")
+
+    def test_staleness(self):
+
+        start = time.monotonic()
+        self.cvt.set_value(id=self.tag.id, value=1.0, timestamp=datetime.now(timezone.utc))
+        delay = self.cvt.check_staleness(now=start)
+        self.assertGreater(delay, 0.9)
+        self.cvt.check_staleness(now=start + 1.5)
+        self.assertEqual(self.cvt.get_stale_tags(), ["PT-01"])
+        self.assertEqual(self.tag.quality, STALE)
+        self.assertEqual(self.qualities(), [STALE])
+        self.assertEqual(self.alarm.description, "UncertainLastUsableValue")
+
+        with self.subTest("Next sample"):
+
+            self.cvt.set_value(id=self.tag.id, value=1.0, timestamp=datetime.now(timezone.utc))
+            self.assertEqual(self.cvt.get_stale_tags(), list())
+            self.assertEqual(self.qualities(), [STALE, GOOD])
+
+        with self.subTest("Tags subscribed by DAS (scan time <= 100 ms)"):
+
+            tag, _ = self.cvt.set_tag(name="FT-01", unit="Pa", data_type="float", description="", variable="Pressure", scan_time=100)
+            self.cvt.set_value(id=tag.id, value=5.0, timestamp=datetime.now(timezone.utc))
+            self.cvt.check_staleness(now=time.monotonic() + 1000)
+            self.assertNotIn("FT-01", self.cvt.get_stale_tags())
+            self.assertEqual(tag.quality, GOOD)
+
+        with self.subTest("Tags without scan time"):
+
+            tag, _ = self.cvt.set_tag(name="PT-02", unit="Pa", data_type="float", description="", variable="Pressure")
+            self.cvt.check_staleness(now=start + 1000)
+            self.assertEqual(self.cvt.get_stale_tags(), ["PT-01"])
+            self.cvt.update_tag(id=self.tag.id, scan_time=0)
+            self.assertEqual(self.cvt.get_stale_tags(), list())
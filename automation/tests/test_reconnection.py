@@ -0,0 +1,201 @@
+import time, unittest
+from opcua import Server
+from ..opcua.models import Client
+from ..opcua.subscription import DAS
+from ..workers.reconnection import ReconnectionSupervisor, client_namespaces
+from .test_address_space import free_port
+
+
+class FakeClient:
+
+    def __init__(self, name:str, delay:float=0.0, up:bool=True):
+
+        self.name = name
+        self._server_url = f"opc.tcp://{name}:4840"
+        self.delay = delay
+        self.up = up
+        self.connected = True
+        self.attempts = 0
+        self.started = list()
+
+    def is_connected(self):
+
+        return self.connected
+
+    def connect(self):
+
+        self.started.append(time.monotonic())
+        self.attempts += 1
+        time.sleep(self.delay)
+        if not self.up:
+
+            return None, 400
+
+        self.connected = True
+
+        return None, 200
+
+
+class FakeManager:
+
+    def __init__(self, *clients):
+
+        self._clients = {client.name: client for client in clients}
+
+
+class TestReconnectionSupervisor(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.resubscribed = list()
+        self.events = list()
+
+        return super().setUp()
+
+    def supervisor(self, *clients, **kwargs)->ReconnectionSupervisor:
+
+        return ReconnectionSupervisor(
+            FakeManager(*clients),
+            resubscribe=lambda client: self.resubscribed.append(client.name) or 3,
+            notify=lambda event, message: self.events.append(event),
+            **kwargs
+        )
+
+    def wait(self, supervisor:ReconnectionSupervisor):
+
+        for future in list(supervisor._pending.values()):
+
+            future.result(timeout=5)
+
+    def test_parallel_attempts(self):
+
+        clients = [FakeClient(f"PLC{index}", delay=0.3) for index in range(4)]
+        supervisor = self.supervisor(*clients, max_workers=4)
+        for client in clients:
+
+            client.connected = False
+
+        start = time.monotonic()
+        supervisor.check()
+        self.wait(supervisor)
+        elapsed = time.monotonic() - start
+        # Los cuatro intentos corren a la vez: ~0.3 s en lugar de ~1.2 s
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(sorted(self.resubscribed), [client.name for client in clients])
+        status = supervisor.status()
+        self.assertTrue(all(item["connected"] and item["recoveries"] == 1 and item["resubscribed"] == 3 for item in status.values()))
+        self.assertGreaterEqual(status["PLC0"]["last_time_to_recover_s"], 0.3)
+        self.assertEqual(self.events.count("on.opcua.disconnected"), 4)
+        self.assertEqual(self.events.count("on.opcua.connected"), 4)
+
+    def test_dead_server_does_not_block_others(self):
+
+        dead = FakeClient("dead", delay=0.5, up=False)
+        alive = FakeClient("alive")
+        supervisor = self.supervisor(dead, alive)
+        dead.connected = alive.connected = False
+        supervisor.check()
+        supervisor._pending["alive"].result(timeout=5)
+        self.assertEqual(self.resubscribed, ["alive"])
+        self.assertFalse(supervisor._pending["dead"].done())
+        self.wait(supervisor)
+        self.assertFalse(supervisor.status()["dead"]["connected"])
+
+    def test_exponential_backoff(self):
+
+        client = FakeClient("PLC", up=False)
+        supervisor = self.supervisor(client, min_backoff=0.01, max_backoff=0.04)
+        client.connected = False
+        backoffs = list()
+        for _ in range(4):
+
+            supervisor.check()
+            self.wait(supervisor)
+            state = supervisor.status()["PLC"]
+            backoffs.append(state["backoff_s"])
+            # Antes de que venza el backoff no se intenta de nuevo
+            attempts = client.attempts
+            supervisor.check()
+            self.assertEqual(client.attempts, attempts)
+            time.sleep(state["backoff_s"] * 1.2 + 0.005)
+
+        self.assertEqual(backoffs, [0.01, 0.02, 0.04, 0.04])
+        self.assertEqual(supervisor.status()["PLC"]["last_error"], "Connection could not be established")
+
+        with self.subTest("Recovery resets the backoff"):
+
+            client.up = True
+            supervisor.check()
+            self.wait(supervisor)
+            state = supervisor.status()["PLC"]
+            self.assertTrue(state["connected"])
+            self.assertEqual(state["backoff_s"], 0.0)
+            self.assertEqual(state["attempts"], 5)
+            self.assertIsNone(state["down_for_s"])
+
+    def test_worker_loop(self):
+
+        client = FakeClient("PLC")
+        supervisor = self.supervisor(client, period=0.01)
+        supervisor.start()
+        try:
+            client.connected = False
+            deadline = time.monotonic() + 5
+            while not self.resubscribed and time.monotonic() < deadline:
+
+                time.sleep(0.01)
+
+        finally:
+            supervisor.stop()
+            supervisor.join(timeout=5)
+
+        self.assertEqual(self.resubscribed, ["PLC"])
+        self.assertFalse(supervisor.is_alive())
+
+    def test_client_namespaces(self):
+
+        class CVT:
+
+            def get_tags(self):
+
+                return [
+                    {"node_namespace": "ns=2;i=1", "scan_time": None, "opcua_client_name": "plc", "opcua_address": None},
+                    {"node_namespace": "ns=2;i=2", "scan_time": 100, "opcua_client_name": None, "opcua_address": "opc.tcp://PLC:4840"},
+                    {"node_namespace": "ns=2;i=3", "scan_time": 1000, "opcua_client_name": "PLC", "opcua_address": None},
+                    {"node_namespace": "ns=2;i=4", "scan_time": None, "opcua_client_name": "other", "opcua_address": None},
+                    {"node_namespace": None, "scan_time": None, "opcua_client_name": "PLC", "opcua_address": None}
+                ]
+
+        self.assertEqual(client_namespaces(CVT(), FakeClient("PLC")), ["ns=2;i=1", "ns=2;i=2"])
+
+
+class TestResubscribe(unittest.TestCase):
+
+    def test_resubscribe_one_client(self):
+
+        url = f"opc.tcp://127.0.0.1:{free_port()}/test/"
+        server = Server()
+        server.set_endpoint(url)
+        idx = server.register_namespace("urn:pyautomation:test")
+        plant = server.get_objects_node().add_object(idx, "Plant")
+        nodes = [plant.add_variable(idx, f"TT-{index:02d}.PV", float(index)) for index in range(3)]
+        server.start()
+        client = Client(url, client_name="reconnect")
+        das = DAS()
+        das.monitored_items["other"] = {"PT-01": {"namespace": "ns=2;i=1"}}
+        try:
+            client.connect()
+            self.assertEqual(das.resubscribe(client, "reconnect", [nodes[0].nodeid.to_string(), nodes[1].nodeid.to_string()]), 2)
+
+            with self.subTest("Previous monitored items are created again"):
+
+                self.assertEqual(das.resubscribe(client, "reconnect", [nodes[2].nodeid.to_string()]), 3)
+                self.assertEqual(sorted(das.monitored_items["reconnect"]), ["TT-00.PV", "TT-01.PV", "TT-02.PV"])
+
+            self.assertEqual(das.monitored_items["other"], {"PT-01": {"namespace": "ns=2;i=1"}})
+
+        finally:
+            das.monitored_items.pop("reconnect", None)
+            das.monitored_items.pop("other", None)
+            client.disconnect()
+            server.stop()
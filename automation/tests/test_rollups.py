@@ -0,0 +1,204 @@
+import random, unittest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest import mock
+from peewee import SqliteDatabase
+from .. import AUTOMATION_RETENTION_DAYS
+from ..dbmodels import Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor
+from ..dbmodels.rollups import TagRollup
+from ..logger.datalogger import DataLogger, DATETIME_FORMAT
+
+MODELS = [Variables, Units, DataTypes, Tags, TagValue, TagRollupMinute, TagRollupHour, TagRollupDay, TagRollupCursor]
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+class TestTagRollups(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db = SqliteDatabase(":memory:")
+        self.ctx = self.db.bind_ctx(MODELS)
+        self.ctx.__enter__()
+        self.db.create_tables(MODELS)
+        Variables.insert(name="Pressure").execute()
+        Units.insert(name="Pascal", unit="Pa", variable_id=1).execute()
+        DataTypes.insert(name="float").execute()
+        for name in ("PT-01", "PT-02"):
+
+            Tags.insert(identifier=name, name=name, unit=1, data_type=1, display_name=name, display_unit=1).execute()
+
+        # Muestras irregulares (cada 7-90 s) durante 3 días, insertadas desordenadas
+        rng = random.Random(1)
+        self.rows = list()
+        for tag in (1, 2):
+
+            timestamp = START
+            while timestamp < START + timedelta(days=3):
+
+                self.rows.append({"tag": tag, "unit": 1, "value": round(rng.uniform(0, 100), 3), "timestamp": timestamp})
+                timestamp += timedelta(seconds=rng.randint(7, 90))
+
+        rng.shuffle(self.rows)
+        TagValue.insert_many(self.rows).execute()
+        # Los datos son de 2024: los rollups se conservan sin límite
+        self.retention = mock.patch.dict(AUTOMATION_RETENTION_DAYS, {"TagRollupMinute": 0, "TagRollupHour": 0, "TagRollupDay": 0})
+        self.retention.start()
+        self.logger = DataLogger()
+        self._previous = (self.logger._db, self.logger.is_history_logged)
+        self.logger.set_db(self.db)
+        self.logger.set_is_history_logged(True)
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.logger.set_db(self._previous[0])
+        self.logger.set_is_history_logged(self._previous[1])
+        self.retention.stop()
+        self.ctx.__exit__(None, None, None)
+        self.db.close()
+
+        return super().tearDown()
+
+    def expected(self, seconds:int)->dict:
+
+        buckets = dict()
+        for row in sorted(self.rows, key=lambda row: row["timestamp"]):
+
+            timestamp = int((row["timestamp"] - datetime(1970, 1, 1)).total_seconds())
+            key = (row["tag"], timestamp - timestamp % seconds)
+            samples, total, low, high, _ = buckets.get(key, (0, 0.0, row["value"], row["value"], None))
+            buckets[key] = (samples + 1, total + row["value"], min(low, row["value"]), max(high, row["value"]), row["value"])
+
+        return buckets
+
+    def stored(self, model)->dict:
+
+        return {
+            (row.tag_id, TagValue.timestamp.db_value(row.bucket)): (row.samples, row.value_sum, row.value_min, row.value_max, row.value_last)
+            for row in model.select()
+        }
+
+    def assertRollups(self):
+
+        for model in TagRollup.levels():
+
+            with self.subTest(model=model.__name__):
+
+                expected, stored = self.expected(model.__seconds__), self.stored(model)
+                self.assertEqual(set(stored), set(expected))
+                for key, values in expected.items():
+
+                    self.assertEqual(stored[key][0], values[0])
+                    self.assertAlmostEqual(stored[key][1], values[1], places=6)
+                    self.assertEqual(stored[key][2:], values[2:])
+
+    def test_incremental_add(self):
+
+        # Instalación nueva: cada lote se escribe en TagValue y luego en los rollups
+        TagValue.delete().execute()
+        rows = list(self.rows)
+        for index in range(0, len(rows), 333):
+
+            TagValue.insert_many(rows[index:index + 333]).execute()
+            TagRollup.add(rows[index:index + 333])
+
+        self.assertRollups()
+
+    def test_backfill(self):
+
+        # Los últimos valores llegan por el escritor y el resto se recupera con el backfill
+        latest = [row for row in self.rows if row["timestamp"] >= START + timedelta(days=2, hours=12)]
+        TagRollup.add(latest)
+        while not TagRollup.backfill(budget=0.05, chunk=6 * 3600):
+
+            pass
+
+        self.assertRollups()
+
+    def test_backfill_with_late_writes(self):
+
+        latest = [row for row in self.rows if row["timestamp"] >= START + timedelta(days=2, hours=12)]
+        TagRollup.add(latest)
+        self.assertFalse(TagRollup.backfill(budget=0.0))
+        TagRollup.backfill(budget=0.01, chunk=6 * 3600)
+        # Escrituras tardías: una anterior al cursor (la recoge el backfill) y otra posterior
+        late = [
+            {"tag": 1, "unit": 1, "value": 1234.5, "timestamp": START + timedelta(minutes=30, seconds=3)},
+            {"tag": 2, "unit": 1, "value": -12.5, "timestamp": START + timedelta(days=2, hours=20, seconds=1)}
+        ]
+        TagValue.insert_many(late).execute()
+        TagRollup.add(late)
+        self.rows.extend(late)
+        while not TagRollup.backfill(budget=0.05, chunk=6 * 3600):
+
+            pass
+
+        self.assertTrue(TagRollupCursor.get().completed)
+        self.assertRollups()
+
+        with self.subTest("Writes after the backfill"):
+
+            late = [{"tag": 1, "unit": 1, "value": 7.0, "timestamp": START - timedelta(hours=1)}]
+            TagValue.insert_many(late).execute()
+            TagRollup.add(late)
+            self.rows.extend(late)
+            self.assertTrue(TagRollup.backfill())
+            self.assertRollups()
+
+    def test_purge_expired(self):
+
+        TagRollup.add(self.rows)
+        # A mitad de minuto: el tiempo que tarda la prueba no cambia los buckets borrados
+        cutoff = START + timedelta(days=2, seconds=30)
+        days = (datetime.utcnow() - cutoff).total_seconds() / 86400
+        with mock.patch.dict(AUTOMATION_RETENTION_DAYS, {"TagRollupMinute": days, "TagRollupHour": 0, "TagRollupDay": 0}):
+
+            limit = (cutoff - datetime(1970, 1, 1)).total_seconds()
+            self.assertEqual(TagRollup.purge_expired(), len([key for key in self.expected(60) if key[1] < limit]))
+            oldest = TagRollupMinute.select(TagRollupMinute.bucket).order_by(TagRollupMinute.bucket).first().bucket
+            self.assertGreaterEqual(oldest, cutoff - timedelta(seconds=30))
+            self.assertEqual(TagRollupHour.select().count(), len(self.expected(3600)))
+            start = (START - datetime(1970, 1, 1)).total_seconds()
+            self.assertIsNone(TagRollup.for_resolution(600, since=start))
+            self.assertIs(TagRollup.for_resolution(3600, since=start), TagRollupHour)
+            self.assertIs(TagRollup.for_resolution(600, since=start + 3 * 86400), TagRollupMinute)
+
+    def test_read_trends_from_rollups(self):
+
+        TagRollup.add(self.rows)
+        stop = START + timedelta(days=3)
+        result = self.logger.read_trends(START.strftime(DATETIME_FORMAT), stop.strftime(DATETIME_FORMAT), "UTC", ["PT-01"])
+        values = result["PT-01"]["values"]
+        # 3 días / 2000 puntos -> buckets de 130 s, redondeados a 3 minutos con el rollup de 1 minuto
+        self.assertEqual(len(values), 3 * 24 * 20)
+
+        bins = defaultdict(list)
+        for row in self.rows:
+
+            if row["tag"] == 1:
+
+                timestamp = int((row["timestamp"] - datetime(1970, 1, 1)).total_seconds())
+                bins[timestamp - timestamp % 180].append(row["value"])
+
+        first = min(bins)
+        self.assertEqual(values[0]["x"], datetime.utcfromtimestamp(first).strftime("%m/%d/%Y, %H:%M:%S.%f"))
+        self.assertAlmostEqual(values[0]["y"], sum(bins[first]) / len(bins[first]), places=6)
+        self.assertEqual(result["PT-01"]["unit"], "Pa")
+
+    def test_read_tabular_data_from_rollups(self):
+
+        TagRollup.add(self.rows)
+        start, stop = START + timedelta(hours=5, seconds=17), START + timedelta(days=1, hours=2, seconds=41)
+        tabular = self.logger.read_tabular_data(
+            start.strftime(DATETIME_FORMAT), stop.strftime(DATETIME_FORMAT), "UTC", ["PT-01", "PT-02"], sample_time=600, page=2, limit=30
+        )
+        self.assertEqual(len(tabular["values"]), 30)
+
+        for row in tabular["values"]:
+
+            step = datetime.strptime(row[0], DATETIME_FORMAT)
+            for tag, value in zip((1, 2), row[1:]):
+
+                previous = [item for item in self.rows if item["tag"] == tag and item["timestamp"] <= step]
+                self.assertEqual(value, max(previous, key=lambda item: item["timestamp"])["value"])
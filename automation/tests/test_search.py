@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime
+from peewee import SqliteDatabase, fn
+from ..dbmodels.core import count_cache
+from ..dbmodels.users import Roles, Users
+from ..dbmodels.events import Events
+from ..dbmodels.logs import Logs
+from ..dbmodels.search import TextSearchIndex, FTS5, LIKE
+
+MODELS = [Roles, Users, Events, Logs]
+MESSAGES = ("Pump P-101 started", "Valve XV-200 closed", "pump p-102 STOPPED", "Setpoint changed", "PV")
+
+
+class TestTextSearch(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db = SqliteDatabase(":memory:")
+        self.ctx = self.db.bind_ctx(MODELS)
+        self.ctx.__enter__()
+        self.db.create_tables(MODELS)
+        count_cache.clear()
+        Roles.insert(name="operator", level=10, identifier="0a1b2c3d").execute()
+        Users.insert(identifier="u1", username="user1", role=1, email="u1@mail.com", password="x").execute()
+        # Registros previos al índice: deben quedar indexados al crearlo
+        self.insert(MESSAGES[:2])
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.ctx.__exit__(None, None, None)
+        self.db.close()
+        count_cache.clear()
+
+        return super().tearDown()
+
+    def insert(self, messages):
+
+        Events.insert_many([
+            {"timestamp": datetime(2024, 1, 1), "message": message, "classification": "User", "user": 1} for message in messages
+        ]).execute()
+
+    def search(self, field:str, text:str)->list:
+
+        return sorted(event.id for event in Events.select().where(TextSearchIndex(Events).condition(field, text)))
+
+    def scan(self, field:str, text:str)->list:
+
+        return sorted(event.id for event in Events.select().where(fn.LOWER(getattr(Events, field)).contains(text.lower())))
+
+    def test_fts5_matches_like_scan(self):
+
+        index = TextSearchIndex(Events)
+        self.assertEqual(index.backend(), LIKE)
+        self.assertEqual(index.create(), FTS5)
+        self.insert(MESSAGES[2:])
+
+        for field, text in (("message", "pump"), ("message", "P-10"), ("message", "stopped"), ("message", "pv"), ("classification", "use"), ("message", "nothing")):
+
+            with self.subTest(field=field, text=text):
+
+                self.assertEqual(self.search(field, text), self.scan(field, text))
+
+        with self.subTest("UPDATE / DELETE"):
+
+            Events.update(message="Pump P-101 tripped").where(Events.id == 1).execute()
+            Events.delete().where(Events.id == 3).execute()
+            self.assertEqual(self.search("message", "tripped"), [1])
+            self.assertEqual(self.search("message", "pump"), [1])
+
+    def test_filter_by_uses_index(self):
+
+        TextSearchIndex(Events).create()
+        self.insert(MESSAGES[2:])
+        result = Events.filter_by(message="PUMP")
+        self.assertEqual(sorted(event["id"] for event in result["data"]), [1, 3])
+        self.assertEqual(Logs.filter_by(message="pump")["pagination"]["total_records"], 0)
+
+    def test_invalid_field(self):
+
+        with self.assertRaises(ValueError):
+
+            TextSearchIndex(Events).condition("user", "user1")
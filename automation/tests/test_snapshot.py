@@ -0,0 +1,108 @@
+import unittest, os, shutil, tempfile
+from datetime import datetime, timezone
+from .. import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+from ..tags import TagSnapshot, TagSnapshotReader
+from ..tags.cvt import CVT
+from ..tags.snapshot import SnapshotError, NAME_SIZE
+
+
+class TestTagSnapshot(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "cvt.snapshot")
+        self.snapshot = TagSnapshot(path=self.path, capacity=4)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.snapshot.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+        return super().tearDown()
+
+    def test_publish_and_read(self):
+
+        timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.snapshot.publish(name="PT-01", value=10.5, timestamp=timestamp)
+        self.snapshot.publish(name="XV-01", value=True, timestamp=timestamp, data_type="bool")
+        reader = TagSnapshotReader(path=self.path)
+
+        with self.subTest("Test float record"):
+
+            record = reader.read(name="PT-01")
+            self.assertEqual(record["value"], 10.5)
+            self.assertEqual(record["timestamp"], timestamp)
+            self.assertEqual(record["quality"], 0)
+
+        with self.subTest("Test bool record"):
+
+            self.assertIs(reader.read(name="XV-01")["value"], True)
+
+        with self.subTest("Test value update is visible"):
+
+            self.snapshot.publish(name="PT-01", value=11.0, timestamp=timestamp, quality=0x80000000)
+            record = reader.read(name="PT-01")
+            self.assertEqual(record["value"], 11.0)
+            self.assertEqual(record["quality"], 0x80000000)
+
+        with self.subTest("Test unregister and rename"):
+
+            self.snapshot.unregister(name="XV-01")
+            self.snapshot.rename(name="PT-01", new_name="PT-02")
+            self.assertIsNone(reader.read(name="XV-01"))
+            self.assertIsNone(reader.read(name="PT-01"))
+            self.assertEqual(reader.read(name="PT-02")["value"], 11.0)
+
+        with self.subTest("Test rename to a name longer than NAME_SIZE"):
+
+            with self.assertRaises(SnapshotError):
+
+                self.snapshot.rename(name="PT-02", new_name="P" * (NAME_SIZE + 1))
+
+            self.assertIsNone(reader.read(name="PT-02"))
+            self.assertNotIn("PT-02", self.snapshot.get_names())
+
+        with self.subTest("Test writer restart"):
+
+            self.snapshot.close()
+            self.snapshot = TagSnapshot(path=self.path, capacity=4)
+            self.snapshot.publish(name="TT-01", value=25, timestamp=timestamp, data_type="int")
+            self.assertEqual([record["name"] for record in reader.read_many()], ["TT-01"])
+
+        reader.close()
+
+    def test_cvt_snapshot_full(self):
+
+        self.snapshot.close()
+        self.snapshot = TagSnapshot(path=self.path, capacity=1)
+        cvt = CVT()
+        cvt.set_snapshot(snapshot=self.snapshot)
+        first, _ = cvt.set_tag(name="PT-01", unit="Pa", data_type="float", description="", variable="Pressure")
+        timestamp = datetime.now(timezone.utc)
+        with self.assertLogs(level="WARNING") as logs:
+
+            second, _ = cvt.set_tag(name="PT-02", unit="Pa", data_type="float", description="", variable="Pressure")
+            for value in range(10):
+
+                cvt.set_value(id=second.id, value=float(value), timestamp=timestamp)
+
+        # Se registra una sola vez y el tag queda sin publicar
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("PT-02", logs.output[0])
+        self.assertEqual(self.snapshot.get_names(), ["PT-01"])
+
+        with self.subTest("Test slot released"):
+
+            cvt.delete_tag(id=first.id, user=None)
+            cvt.update_tag(id=second.id, name="PT-03")
+            cvt.set_value(id=second.id, value=5.0, timestamp=timestamp)
+            self.assertEqual(self.snapshot.get_names(), ["PT-03"])
+
+        with self.subTest("Test rename to a name longer than NAME_SIZE"):
+
+            with self.assertLogs(level="WARNING") as logs:
+
+                cvt.update_tag(id=second.id, name="P" * (NAME_SIZE + 1))
+                cvt.set_value(id=second.id, value=6.0, timestamp=timestamp)
+
+            self.assertEqual(len(logs.records), 1)
+            self.assertEqual(self.snapshot.get_names(), list())
@@ -0,0 +1,72 @@
+import unittest
+from datetime import datetime
+from ..tags.tag import Tag, MachineObserver
+from ..tags.benchmark import run
+
+
+class Machine:
+
+    def __init__(self):
+
+        self.values = list()
+
+    def notify(self, tag, value, timestamp):
+
+        self.values.append(value.value)
+
+
+class TestCompactTag(unittest.TestCase):
+
+    def tag(self, name:str="PT-01")->Tag:
+
+        return Tag(name=name, unit="".join("Pa"), variable="".join("Pressure"), data_type="float", segment="".join("Area-1"))
+
+    def test_slots(self):
+
+        tag = self.tag()
+        self.assertFalse(hasattr(tag, "__dict__"))
+        with self.assertRaises(AttributeError):
+
+            tag.undefined_attribute = 1
+
+        with self.subTest("Interned metadata"):
+
+            other = self.tag(name="PT-02")
+            self.assertIs(tag.unit, other.unit)
+            self.assertIs(tag.segment, other.segment)
+            tag.set_display_unit("".join("kPa"))
+            other.set_display_unit("".join("kPa"))
+            self.assertIs(tag.display_unit, other.display_unit)
+
+    def test_lazy_members(self):
+
+        tag = self.tag()
+        self.assertIsNone(tag._filter)
+        self.assertIsNone(tag._values)
+        self.assertEqual(tag.serialize()["values"], list())
+        tag.set_value(1.5, datetime(2024, 1, 1))
+        tag.set_value(2.5, datetime(2024, 1, 1, 0, 0, 1))
+        self.assertIsNone(tag._filter)
+        self.assertEqual(tag.serialize()["values"], [2.5, 1.5])
+        self.assertEqual(tag.serialize()["timestamps"][0], "01/01/2024, 00:00:01.000000")
+        self.assertIs(tag.filter, tag.filter)
+
+    def test_observers(self):
+
+        tag = self.tag()
+        machine = Machine()
+        observer = MachineObserver(machine)
+        tag.attach(observer)
+        tag.attach(observer)
+        tag.set_value(3.0)
+        self.assertEqual(machine.values, [3.0])
+        tag.detach(observer)
+        tag.set_value(4.0)
+        self.assertEqual(machine.values, [3.0])
+        self.assertEqual(tag._observers, ())
+
+    def test_memory_per_tag(self):
+
+        report = run(tags=2000, updates=10)
+        self.assertLess(report["bytes_per_tag_created"], 1000)
+        self.assertLess(report["bytes_per_tag_updated"], 2500)
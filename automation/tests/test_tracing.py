@@ -0,0 +1,138 @@
+import queue, unittest
+from datetime import datetime, timedelta, timezone
+from .. import PyAutomation  # Carga el paquete completo antes de los managers (import circular)
+from ..tags.cvt import CVT
+from ..tags.tag import TagObserver, MachineObserver
+from ..utils.tracing import Tracer
+from ..workers.logger import LoggerWorker
+
+
+class Alarm:
+
+    def __init__(self):
+
+        self.values = list()
+
+    def notify(self, tag, value, timestamp):
+
+        self.values.append(value.value)
+
+
+class Writer:
+
+    def __init__(self, result):
+
+        self.result = result
+        self.tags = list()
+
+    def write_tags(self, tags):
+
+        self.tags.extend(tags)
+
+        return self.result
+
+
+class TestLatencyTracing(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.tracer = Tracer()
+        self.sample_every = self.tracer.sample_every
+        self.tracer.reset()
+        self.tracer.configure(sample_every=1, group_by="segment")
+        self.cvt = CVT()
+        self.tag, _ = self.cvt.set_tag(name="PT-01", unit="Pa", data_type="float", description="", variable="Pressure", segment="Area-1")
+        self.queue = queue.Queue()
+        self.alarm = Alarm()
+        self.tag.attach(TagObserver(self.queue))
+        self.tag.attach(MachineObserver(self.alarm))
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.tracer.configure(sample_every=self.sample_every)
+        self.tracer.reset()
+
+        return super().tearDown()
+
+    def update(self, value:float, delay:float=0.0):
+
+        timestamp = datetime.now(timezone.utc) - timedelta(seconds=delay)
+        trace = self.tracer.start(self.tag, source_timestamp=timestamp)
+        try:
+            self.cvt.set_value(id=self.tag.id, value=value, timestamp=timestamp)
+        finally:
+            self.tracer.end()
+
+        return trace
+
+    def test_stages(self):
+
+        trace = self.update(10.0, delay=0.25)
+        stages = [stage["stage"] for stage in trace.serialize()["stages"]]
+        self.assertEqual(stages[:3], ["cvt.lock", "filters.iad", "tag.set_value"])
+        self.assertEqual(sorted(stages[3:5]), ["notify.alarm", "notify.queue"])
+        self.assertEqual(stages[-1], "cvt.snapshot")
+        self.assertEqual(self.alarm.values, [10.0])
+        self.assertIsNone(self.tracer.current())
+
+        with self.subTest("Age since the SourceTimestamp"):
+
+            self.assertGreaterEqual(trace.serialize()["source_delay_ms"], 250)
+            ages = [stage["age_ms"] for stage in trace.serialize()["stages"]]
+            self.assertEqual(ages, sorted(ages))
+            self.assertGreaterEqual(ages[0], 250)
+
+        with self.subTest("Trace crosses the logger queue"):
+
+            item = self.queue.get(block=False)
+            self.assertIs(item["trace"], trace)
+            self.tracer.stamp_trace(item["trace"], "logger.queue")
+            self.tracer.stamp_trace(item["trace"], "db.write")
+            self.assertEqual([stage["stage"] for stage in self.tracer.export()[-1]["stages"]][-2:], ["logger.queue", "db.write"])
+
+        summary = self.tracer.summary()
+        self.assertEqual(list(summary), ["Area-1"])
+        self.assertEqual(summary["Area-1"]["opcua"]["count"], 1)
+        self.assertGreaterEqual(summary["Area-1"]["opcua"]["age_p50_ms"], 250)
+        self.assertEqual(summary["Area-1"]["db.write"]["count"], 1)
+        self.assertEqual(self.tracer.summary(group="other"), dict())
+
+    def test_logger_stamps_written_points(self):
+
+        worker = LoggerWorker(manager=None)
+        worker.logger = Writer(result=True)
+        worker.cvt = self.cvt
+        worker.compressor.configure("PT-01", deviation=1.0, max_time=600)
+        traces = [self.update(10.0 + value * 0.01) for value in range(3)]
+        tags = worker.compressor.filter(worker.get_tags_from_queue(self.queue))
+        # El primer punto se guarda; los siguientes caben en la puerta y quedan retenidos
+        self.assertEqual(len(tags), 1)
+        self.assertTrue(worker.write_tags(tags=tags))
+        self.assertNotIn("trace", worker.logger.tags[0])
+        stages = [[stage["stage"] for stage in trace.serialize()["stages"]] for trace in traces]
+        self.assertEqual([stages[-1] for stages in stages], ["db.write", "logger.queue", "logger.queue"])
+
+        with self.subTest("Failed write"):
+
+            worker.logger = Writer(result=None)
+            self.assertFalse(worker.write_tags(tags=worker.compressor.flush(force=True)))
+            self.assertEqual(traces[2].serialize()["stages"][-1]["stage"], "logger.queue")
+
+    def test_sampling(self):
+
+        self.tracer.configure(sample_every=3)
+        traces = [self.update(float(value)) for value in range(9)]
+        self.assertEqual(sum(trace is not None for trace in traces), 3)
+        self.assertEqual(len(self.tracer.export()), 3)
+        self.assertEqual(len(self.tracer.export(limit=2)), 2)
+        # Las actualizaciones no muestreadas no llevan traza a la cola
+        items = [self.queue.get(block=False) for _ in range(9)]
+        self.assertEqual(sum("trace" in item for item in items), 3)
+
+        with self.subTest("Disabled"):
+
+            self.tracer.configure(sample_every=0)
+            self.assertIsNone(self.update(1.0))
+            self.assertNotIn("trace", self.queue.get(block=False))
@@ -1,5 +1,5 @@
 import unittest
-from ..variables import (Pressure)
+from ..variables import (Pressure, Temperature)
 
 class TestConversions(unittest.TestCase):
 
@@ -19,3 +19,24 @@ class TestConversions(unittest.TestCase):
         expected = 146.959
 
         self.assertAlmostEqual(Pressure.convert_value(value, from_unit=from_unit, to_unit=to_unit), expected, delta=0.001)
+
+    def test_conversion_plans(self):
+
+        for variable in (Pressure, Temperature):
+
+            units = variable.Units.list()
+            for from_unit in units:
+
+                for to_unit in units:
+
+                    with self.subTest(f"{variable.__name__}: {from_unit} -> {to_unit}"):
+
+                        expected = variable.convert_value(25.0, from_unit=from_unit, to_unit=to_unit)
+                        plan = variable.conversion_plan(from_unit=from_unit, to_unit=to_unit)
+                        self.assertAlmostEqual(plan(25.0), expected, delta=abs(expected) * 1e-9 + 1e-9)
+                        self.assertIs(plan, variable.conversion_plan(from_unit=from_unit, to_unit=to_unit))
+                        self.assertAlmostEqual(
+                            variable.convert_array([25.0], from_unit=from_unit, to_unit=to_unit)[0], 
+                            expected, 
+                            delta=abs(expected) * 1e-9 + 1e-9
+                        )
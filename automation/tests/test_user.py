@@ -1,7 +1,10 @@
-import unittest
+import os, shutil, tempfile, unittest
+from peewee import SqliteDatabase
 from . import assert_dict_contains_subset
+from ..dbmodels.users import Roles as RolesModel, Users as UsersModel
 from ..modules.users.users import Users, User
 from ..modules.users.roles import roles, Role
+from ..modules.users.token_cache import TokenCache
 
 USERNAME = "user1"
 ROLE_NAME = "admin"
@@ -21,10 +24,18 @@ class TestUsers(unittest.TestCase):
         self.roles._delete_all()
         self.users = Users()
         self.users._delete_all()
+        # Marcador de revocación temporal: los tests no escriben ./db/token_revocation
+        self.folder = tempfile.mkdtemp()
+        self.marker = TokenCache().marker
+        TokenCache().marker = os.path.join(self.folder, "token_revocation")
+        TokenCache().clear()
 
         return super().setUp()
 
     def tearDown(self) -> None:
+        TokenCache().marker = self.marker
+        TokenCache().clear()
+        shutil.rmtree(self.folder, ignore_errors=True)
         delattr(self, "roles")
         delattr(self, "users")
         return super().tearDown()
@@ -153,3 +164,120 @@ class TestUsers(unittest.TestCase):
         self.users.login(password=PASSWORD, username=USERNAME)
         self.assertIsNone(self.users.get_active_user(token=user2.token))
 
+    def test_token_cache(self):
+
+        cache = TokenCache()
+        cache.clear()
+        ttl, max_size = cache.ttl, cache.max_size
+
+        try:
+
+            with self.subTest("HIT / MISS"):
+
+                cache.put(token="t1", username=USERNAME, role_name=ROLE_NAME, role_level=1)
+                self.assertEqual(cache.get(token="t1")["username"], USERNAME)
+                self.assertIsNone(cache.get(token="unknown"))
+                stats = cache.get_stats()
+                self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+            with self.subTest("TTL"):
+
+                cache.put(token="t2", username=USERNAME, ttl=0)
+                self.assertIsNone(cache.get(token="t2"))
+                self.assertEqual(cache.get_stats()["expirations"], 1)
+
+            with self.subTest("LRU EVICTION"):
+
+                cache.max_size = 2
+                cache.put(token="t3", username=USERNAME2)
+                cache.get(token="t1")
+                cache.put(token="t4", username=USERNAME2)
+                self.assertIsNone(cache.get(token="t3"))
+                self.assertIsNotNone(cache.get(token="t1"))
+
+            with self.subTest("INVALIDATE USER"):
+
+                self.assertEqual(cache.invalidate_user(username=USERNAME2), 1)
+                self.assertIsNone(cache.get(token="t4"))
+
+        finally:
+
+            cache.ttl, cache.max_size = ttl, max_size
+            cache.clear()
+
+    def test_token_cache_revocation_marker(self):
+
+        cache = TokenCache()
+
+        try:
+
+            cache.put(token="t1", username=USERNAME)
+            cache.invalidate(token="other")
+            # La revocación propia no vacía la caché de este worker
+            self.assertIsNotNone(cache.get(token="t1"))
+
+            with self.subTest("Revocation in another worker"):
+
+                with open(cache.marker + ".tmp", "w") as file:
+
+                    file.write("1\n")
+
+                os.replace(cache.marker + ".tmp", cache.marker)
+                self.assertIsNone(cache.get(token="t1"))
+
+        finally:
+
+            cache.clear()
+
+    def test_token_cache_invalidation(self):
+
+        cache = TokenCache()
+        role = Role(name=ROLE_NAME, level=0)
+        self.roles.add(role=role)
+        self.roles.add(role=Role(name="operator", level=10))
+        user, _ = self.users.signup(username=USERNAME, role_name=ROLE_NAME, email=EMAIL, password=PASSWORD, name=NAME, lastname=LASTNAME)
+        self.users.login(password=PASSWORD, username=USERNAME)
+        token = user.token
+
+        cache.put(token=token, username=USERNAME, role_name=ROLE_NAME, role_level=0)
+        self.users.update_role(username=USERNAME, new_role_name="operator")
+        self.assertIsNone(cache.get(token=token))
+
+        cache.put(token=token, username=USERNAME, role_name="operator", role_level=10)
+        self.users.logout(token=token)
+        self.assertIsNone(cache.get(token=token))
+        cache.clear()
+
+    def test_login_drops_previous_token(self):
+
+        cache = TokenCache()
+        db = SqliteDatabase(":memory:")
+        ctx = db.bind_ctx([RolesModel, UsersModel])
+        ctx.__enter__()
+        db.create_tables([RolesModel, UsersModel])
+
+        try:
+
+            role = Role(name=ROLE_NAME, level=0)
+            self.roles.add(role=role)
+            user, _ = self.users.signup(username=USERNAME, role_name=ROLE_NAME, email=EMAIL, password=PASSWORD, name=NAME, lastname=LASTNAME)
+            RolesModel.create(name=ROLE_NAME, level=0, identifier=role.identifier)
+            UsersModel.create(user=user)
+            record, _ = UsersModel.login(password=PASSWORD, username=USERNAME)
+            previous = record.token
+            cache.put(token=previous, username=USERNAME, role_name=ROLE_NAME, role_level=0)
+            cache.put(token="other", username=USERNAME2)
+
+            record, _ = UsersModel.login(password=PASSWORD, username=USERNAME)
+            self.assertNotEqual(record.token, previous)
+            self.assertEqual(UsersModel.get(username=USERNAME).token, record.token)
+            self.assertIsNone(cache.get(token=previous))
+            # Un login no revoca en los demás workers ni vacía la caché
+            self.assertFalse(os.path.exists(cache.marker))
+            self.assertIsNotNone(cache.get(token="other"))
+
+        finally:
+
+            ctx.__exit__(None, None, None)
+            db.close()
+            cache.clear()
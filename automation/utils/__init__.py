@@ -1,7 +1,5 @@
 import logging
 from .observer import Observer
-from ..variables import VARIABLES
-from ..alarms.states import ACTIONS
 
 def _colorize_message(message: str, level: str) -> str:
         """
@@ -94,6 +92,7 @@ def generate_dropdown_conditional():
     Documentation here
     """
     from .. import PyAutomation
+    from ..variables import VARIABLES
     app = PyAutomation()
     data = VARIABLES
     dropdown_conditional = []
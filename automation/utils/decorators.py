@@ -1,10 +1,14 @@
 import functools, logging, sys, datetime
 from ..modules.users.users import User, Users
-from ..logger.events import EventsLoggerEngine
 
 
-events_engine = EventsLoggerEngine()
-users = Users()
+def _get_events_engine():
+    r"""
+    Returns the events logger engine, importing the database layer on first use.
+    """
+    from ..logger.events import EventsLoggerEngine
+
+    return EventsLoggerEngine()
 
 def decorator(declared_decorator):
     """
@@ -56,7 +60,7 @@ def set_event(message:str, classification:str, priority:int, criticity:int, desc
 
                         _description = result[-1]
                     
-                    event, _ = events_engine.create(
+                    event, _ = _get_events_engine().create(
                         message=message,
                         description=_description,
                         classification=classification,
@@ -69,8 +73,8 @@ def set_event(message:str, classification:str, priority:int, criticity:int, desc
                         app.sio.emit("on.event", data=event.serialize())
         else:
             if force:
-                user = users.get_by_username(username="system")
-                event, _ = events_engine.create(
+                user = Users().get_by_username(username="system")
+                event, _ = _get_events_engine().create(
                     message=message,
                     description=description,
                     classification=classification,
@@ -0,0 +1,104 @@
+r"""
+Fixed-bucket histograms for the latency metrics.
+"""
+from bisect import bisect_left
+
+
+class Histogram:
+    r"""
+    Cumulative histogram with fixed buckets (Prometheus style). Observing a value is a binary
+    search and an increment, without locks: every histogram has a single writer thread (or the
+    writers are serialized by the owner).
+
+    **Parameters:**
+
+    * **buckets** (tuple): Ascending upper bounds of the buckets; values above the last one go to `+Inf`.
+
+    Usage:
+
+    ```python
+    >>> from automation.utils.metrics import Histogram
+    >>> histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    >>> for value in (0.005, 0.05, 0.05, 0.5, 2.0):
+    ...     histogram.observe(value)
+    >>> histogram.cumulative()
+    [(0.01, 1), (0.1, 3), (1.0, 4), (inf, 5)]
+    >>> histogram.quantile(0.5)
+    0.0775
+
+    ```
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, buckets:tuple=BUCKETS):
+
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value:float):
+        r"""
+        Records one value (seconds).
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self)->list:
+        r"""
+        Returns [(upper_bound, cumulative_count)], ending with `inf`.
+        """
+        result = list()
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), list(self.counts)):
+
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def quantile(self, q:float):
+        r"""
+        Estimates a quantile interpolating linearly inside its bucket (as `histogram_quantile`);
+        None without observations.
+        """
+        cumulative = self.cumulative()
+        total = cumulative[-1][1]
+        if not total:
+
+            return None
+
+        rank = q * total
+        lower, previous = 0.0, 0
+        for bound, count in cumulative:
+
+            if count >= rank:
+
+                if bound == float("inf"):
+
+                    # Fuera del último bucket solo se conoce la cota inferior
+                    return lower
+
+                return round(lower + (bound - lower) * (rank - previous) / (count - previous), 6)
+
+            lower, previous = bound, count
+
+        return lower
+
+    def summary(self)->dict:
+        r"""
+        Returns {count, mean_ms, p50_ms, p95_ms}; latencies are None without observations.
+        """
+        count = self.count
+        if not count:
+
+            return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None}
+
+        return {
+            "count": count,
+            "mean_ms": round(self.sum / count * 1000, 3),
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3)
+        }
@@ -12,6 +12,9 @@ class Observer(metaclass=abc.ABCMeta):
     changes in a subject.
     """
 
+    # Nombre de la etapa en las trazas de latencia
+    stage = "observer"
+
     def __init__(self):
         self._subject = None
         self._observer_state = None
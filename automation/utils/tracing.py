@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""pyautomation/utils/tracing.py
+
+This module implements the sampled end-to-end latency tracing of the tag updates.
+
+One out of every `AUTOMATION_TRACE_SAMPLE_EVERY` updates is traced from its OPC UA SourceTimestamp
+through the stages of the pipeline (`DAS.update_tag_value`, `CVT.set_value`, filters and IAD,
+observers, Socket.IO emit, logger queue and database write). Each stage is stamped with a
+monotonic clock in the thread that runs it; the trace travels across threads inside the logger
+queue items. The updates that are not sampled only pay a counter increment and a thread-local
+lookup per stage.
+"""
+import os, threading, time
+from collections import deque
+from datetime import datetime, timezone
+from ..singleton import Singleton
+from .metrics import Histogram
+
+AUTOMATION_TRACE_SAMPLE_EVERY = int(os.environ.get('AUTOMATION_TRACE_SAMPLE_EVERY') or 100)
+
+
+class Trace:
+    r"""
+    Stamps of one sampled tag update.
+
+    **Parameters:**
+
+    * **tag** (str): Tag name.
+    * **group** (str): Tag group used to aggregate the histograms.
+    * **source_delay** (float): Seconds between the SourceTimestamp and the start of the trace.
+    """
+
+    __slots__ = ("tag", "group", "start", "source_delay", "stamps")
+
+    def __init__(self, tag:str, group:str, source_delay:float=0.0):
+
+        self.tag = tag
+        self.group = group
+        self.start = time.perf_counter()
+        self.source_delay = source_delay
+        self.stamps = list()
+
+    def age(self, stamp:float)->float:
+        r"""
+        Seconds since the SourceTimestamp at the perf counter instant `stamp`.
+        """
+        return self.source_delay + stamp - self.start
+
+    def serialize(self)->dict:
+        r"""
+        Returns {tag, group, source_delay_ms, stages: [{stage, latency_ms, age_ms}]}.
+        """
+        stages = list()
+        previous = self.start
+        for stage, stamp in list(self.stamps):
+
+            stages.append({
+                "stage": stage,
+                "latency_ms": round((stamp - previous) * 1000, 3),
+                "age_ms": round(self.age(stamp) * 1000, 3)
+            })
+            previous = stamp
+
+        return {
+            "tag": self.tag,
+            "group": self.group,
+            "source_delay_ms": round(self.source_delay * 1000, 3),
+            "stages": stages
+        }
+
+
+class Tracer(Singleton):
+    r"""
+    Sampled latency tracing of the tag updates, aggregated in per group and stage histograms.
+
+    * **latency**: time since the previous stage of the same trace.
+    * **age**: time since the SourceTimestamp (the `opcua` stage is the delay between the
+      SourceTimestamp and `DAS.update_tag_value`).
+
+    **Parameters:**
+
+    * **sample_every** (int): Traces one out of every `sample_every` updates (0 disables the tracing).
+    * **size** (int): Finished traces kept for the export.
+    * **group_by** (str): Tag attribute that defines the group (`segment`, `variable`, `opcua_client_name`...).
+
+    Usage:
+
+    ```python
+    >>> from automation.utils.tracing import Tracer
+    >>> tracer = Tracer()
+    >>> tracer.configure(sample_every=1)
+    >>> tracer.reset()
+    >>> trace = tracer.start(tag="PT-01")
+    >>> tracer.stamp("cvt.set_value")
+    >>> tracer.stamp("socketio.emit")
+    >>> _ = tracer.end()
+    >>> [stage["stage"] for stage in trace.serialize()["stages"]]
+    ['cvt.set_value', 'socketio.emit']
+    >>> sorted(tracer.summary()["default"])
+    ['cvt.set_value', 'socketio.emit']
+    >>> tracer.configure(sample_every=0)
+    >>> tracer.start(tag="PT-01") is None
+    True
+    >>> tracer.reset()
+
+    ```
+    """
+
+    def __init__(self, sample_every:int=AUTOMATION_TRACE_SAMPLE_EVERY, size:int=1000, group_by:str="segment"):
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.sample_every = sample_every
+        self.group_by = group_by
+        self._latency = dict()
+        self._age = dict()
+        self._traces = deque(maxlen=size)
+
+    def configure(self, sample_every:int=None, group_by:str=None, size:int=None):
+        r"""
+        Changes the sampling, the group attribute or the number of traces kept.
+        """
+        if sample_every is not None:
+
+            self.sample_every = max(0, int(sample_every))
+
+        if group_by is not None:
+
+            self.group_by = group_by
+
+        if size is not None:
+
+            with self._lock:
+
+                self._traces = deque(self._traces, maxlen=size)
+
+    def reset(self):
+        r"""
+        Drops the histograms and the kept traces.
+        """
+        with self._lock:
+
+            self._latency = dict()
+            self._age = dict()
+            self._traces.clear()
+
+    def start(self, tag, source_timestamp:datetime=None)->Trace|None:
+        r"""
+        Starts the trace of a tag update in the current thread, if it is sampled.
+
+        **Parameters:**
+
+        * **tag** (Tag | str): Updated tag.
+        * **source_timestamp** (datetime, optional): SourceTimestamp of the value (UTC).
+
+        **Returns:**
+
+        * **Trace | None**: The trace, None when the update is not sampled.
+        """
+        if not self.sample_every:
+
+            return None
+
+        self._counter += 1
+        if self._counter % self.sample_every:
+
+            return None
+
+        if isinstance(tag, str):
+
+            name, group = tag, "default"
+
+        else:
+
+            name, group = tag.name, getattr(tag, self.group_by, None) or "default"
+
+        source_delay = 0.0
+        if source_timestamp is not None:
+
+            if source_timestamp.tzinfo is None:
+
+                source_timestamp = source_timestamp.replace(tzinfo=timezone.utc)
+
+            # Relojes desincronizados pueden dar retardos negativos
+            source_delay = max(0.0, (datetime.now(timezone.utc) - source_timestamp).total_seconds())
+
+        trace = Trace(tag=name, group=str(group), source_delay=source_delay)
+        if source_timestamp is not None:
+
+            self.__observe(trace.group, "opcua", source_delay, source_delay)
+
+        self._local.trace = trace
+
+        return trace
+
+    def current(self)->Trace|None:
+        r"""
+        Returns the trace of the current thread.
+        """
+        return getattr(self._local, "trace", None)
+
+    def stamp(self, stage:str):
+        r"""
+        Stamps a stage of the trace of the current thread (no-op without trace).
+        """
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+
+            self.stamp_trace(trace, stage)
+
+    def stamp_trace(self, trace:Trace, stage:str):
+        r"""
+        Stamps a stage of a trace that came from another thread.
+        """
+        now = time.perf_counter()
+        previous = trace.stamps[-1][1] if trace.stamps else trace.start
+        trace.stamps.append((stage, now))
+        self.__observe(trace.group, stage, now - previous, trace.age(now))
+
+    def end(self)->Trace|None:
+        r"""
+        Ends the synchronous part of the trace of the current thread and keeps it for the export;
+        the stages of other threads (logger) are still stamped on it.
+        """
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+
+            self._local.trace = None
+            with self._lock:
+
+                self._traces.append(trace)
+
+        return trace
+
+    def __observe(self, group:str, stage:str, latency:float, age:float):
+
+        key = (group, stage)
+        with self._lock:
+
+            if key not in self._latency:
+
+                self._latency[key] = Histogram()
+                self._age[key] = Histogram()
+
+            self._latency[key].observe(latency)
+            self._age[key].observe(age)
+
+    def summary(self, group:str=None)->dict:
+        r"""
+        Returns the latency histograms per group and stage.
+
+        **Parameters:**
+
+        * **group** (str, optional): Returns only this group.
+
+        **Returns:**
+
+        * **dict**: {group: {stage: {count, mean_ms, p50_ms, p95_ms, age_p50_ms, age_p95_ms}}}
+        """
+        with self._lock:
+
+            keys = list(self._latency)
+
+        result = dict()
+        for _group, stage in keys:
+
+            if group is not None and _group != group:
+
+                continue
+
+            age = self._age[(_group, stage)].summary()
+            result.setdefault(_group, dict())[stage] = {
+                **self._latency[(_group, stage)].summary(),
+                "age_p50_ms": age["p50_ms"],
+                "age_p95_ms": age["p95_ms"]
+            }
+
+        return result
+
+    def export(self, limit:int=None)->list:
+        r"""
+        Returns the kept traces (oldest first) for offline analysis.
+
+        **Parameters:**
+
+        * **limit** (int, optional): Returns only the last `limit` traces.
+
+        **Returns:**
+
+        * **list**: Serialized traces.
+        """
+        with self._lock:
+
+            traces = list(self._traces)
+
+        if limit:
+
+            traces = traces[-limit:]
+
+        return [trace.serialize() for trace in traces]
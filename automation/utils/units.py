@@ -14,6 +14,57 @@ class UnitSerializer(Enum):
 
         return {unit.name: unit.value for unit in cls}
 
+class ConversionPlan(object):
+    r"""
+    Precomputed linear conversion between two units of the same variable: `value * scale + offset`.
+
+    Plans are resolved once per pair of units (see `EngUnit.conversion_plan`) so hot paths don't
+    look up the conversion factors on every sample.
+
+    ```python
+    >>> from automation.variables.pressure import Pressure
+    >>> plan = Pressure.conversion_plan(from_unit="atm", to_unit="Pa")
+    >>> round(plan(2), 4)
+    202650.0548
+    >>> [round(value, 4) for value in plan.convert_array([1, 2])]
+    [101325.0274, 202650.0548]
+
+    ```
+    """
+    __slots__ = ("from_unit", "to_unit", "scale", "offset", "is_identity")
+
+    def __init__(self, from_unit:str, to_unit:str, scale:float=1.0, offset:float=0.0):
+        self.from_unit = from_unit
+        self.to_unit = to_unit
+        self.scale = float(scale)
+        self.offset = float(offset)
+        self.is_identity = self.scale == 1.0 and self.offset == 0.0
+
+    def __call__(self, value:int|float)->float:
+        if self.is_identity:
+            return float(value)
+        return float(value) * self.scale + self.offset
+
+    def convert_array(self, values):
+        r"""
+        Vectorized conversion for NumPy arrays (or any array-like).
+
+        :param values: [array-like] Values in "from_unit"
+        :return: [numpy.ndarray] Values in "to_unit" as float64
+        """
+        import numpy as np
+        values = np.asarray(values, dtype=np.float64)
+        if self.is_identity:
+            return values
+        return values * self.scale + self.offset
+
+    def __repr__(self):
+        return f"ConversionPlan({self.from_unit} -> {self.to_unit}, scale={self.scale}, offset={self.offset})"
+
+
+_plans = dict()
+
+
 class EngUnit(object):
     """Generic class for engineering unit objects containing a float value and string unit."""
     
@@ -34,11 +85,56 @@ class EngUnit(object):
         return float(self.value) / float(self.conversions[from_unit]) * float(self.conversions[to_unit])
     
     @classmethod
-    def convert_values(self, values:list, from_unit:str, to_unit:str)->list:
+    def convert_values(cls, values:list, from_unit:str, to_unit:str)->list:
         r"""
         Documentation here
         """
-        return [float(value) / float(self.conversions[from_unit]) * float(self.conversions[to_unit]) for value in values]
+        return [float(value) / float(cls.conversions[from_unit]) * float(cls.conversions[to_unit]) for value in values]
+
+    @classmethod
+    def convert_array(cls, values, from_unit:str, to_unit:str):
+        r"""Vectorized unit conversion for NumPy batches (history export, trends)
+
+        :param values: [array-like] Values to convert
+        :param from_unit: [str] Values' unit
+        :param to_unit: [str] Unit which you want to convert the values
+        :return: [numpy.ndarray] Converted values into "to_unit"
+
+        ```python
+        >>> from automation.variables.length import Length
+        >>> Length.convert_array([1.0, 2.0], from_unit="m", to_unit="cm").tolist()
+        [100.0, 200.0]
+
+        ```
+        """
+        return cls.conversion_plan(from_unit=from_unit, to_unit=to_unit).convert_array(values)
+
+    @classmethod
+    def conversion_plan(cls, from_unit:str, to_unit:str)->ConversionPlan:
+        r"""Gets the cached conversion plan between two units
+
+        :param from_unit: [str] Source unit
+        :param to_unit: [str] Target unit
+        :return: [ConversionPlan] Callable that converts a value from "from_unit" to "to_unit"
+        """
+        key = (cls, from_unit, to_unit)
+        plan = _plans.get(key)
+        if plan is None:
+            scale, offset = cls._linear_factors(from_unit=from_unit, to_unit=to_unit)
+            plan = ConversionPlan(from_unit=from_unit, to_unit=to_unit, scale=scale, offset=offset)
+            _plans[key] = plan
+        return plan
+
+    @classmethod
+    def _linear_factors(cls, from_unit:str, to_unit:str)->tuple[float, float]:
+        r"""
+        Returns the (scale, offset) pair to convert from "from_unit" to "to_unit".
+        """
+        if from_unit == to_unit:
+            return 1.0, 0.0
+        if from_unit not in cls.conversions or to_unit not in cls.conversions:
+            raise UnitError(f"Can't convert {cls.__name__} from {from_unit} to {to_unit}")
+        return float(cls.conversions[to_unit]) / float(cls.conversions[from_unit]), 0.0
     
     @classmethod
     def convert_value(cls, value:int|float, from_unit:str, to_unit:str)->float:
@@ -56,6 +56,20 @@ class Temperature(EngUnit):
         'K' : 1.0,
     }
 
+    # Linear (scale, offset) pairs used by conversion plans: to Kelvin and from Kelvin
+    to_kelvin = {
+        'K': (1.0, 0.0),
+        'R': (5.0 / 9.0, 0.0),
+        'C': (1.0, 273.15),
+        'F': (5.0 / 9.0, 459.67 * 5.0 / 9.0)
+    }
+    from_kelvin = {
+        'K': (1.0, 0.0),
+        'R': (9.0 / 5.0, 0.0),
+        'C': (1.0, -273.15),
+        'F': (9.0 / 5.0, -459.67)
+    }
+
     def __init__(self, value, unit):
 
         if unit not in Temperature.Units.list():
@@ -139,6 +153,29 @@ class Temperature(EngUnit):
         else:
             return None  
 
+    @classmethod
+    def _linear_factors(cls, from_unit:str, to_unit:str)->tuple[float, float]:
+        r"""
+        Temperature is not converted with a scalar, the plan composes the affine
+        transformations "from_unit" -> K -> "to_unit".
+
+        ```python
+        >>> plan = Temperature.conversion_plan(from_unit="C", to_unit="F")
+        >>> round(plan(25.0), 6)
+        77.0
+        >>> Temperature.convert_array([0.0, 100.0], from_unit="C", to_unit="K").tolist()
+        [273.15, 373.15]
+
+        ```
+        """
+        if from_unit == to_unit:
+            return 1.0, 0.0
+        if from_unit.upper() not in cls.to_kelvin or to_unit not in cls.from_kelvin:
+            raise UnitError(f"Can't convert {cls.__name__} from {from_unit} to {to_unit}")
+        scale_in, offset_in = cls.to_kelvin[from_unit.upper()]
+        scale_out, offset_out = cls.from_kelvin[to_unit]
+        return scale_out * scale_in, scale_out * offset_in + offset_out
+
     def __add__(self, other):
         self_original_unit = self.unit
 
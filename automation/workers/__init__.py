@@ -1,2 +1,4 @@
 from .state_machine import StateMachineWorker, AsyncStateMachineWorker
 from .logger import LoggerWorker
+from .reconnection import ReconnectionSupervisor
+from .staleness import StalenessMonitor
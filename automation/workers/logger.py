@@ -3,15 +3,13 @@
 
 This module implements the Logger Worker, responsible for persisting data to the database.
 """
-import logging, time, datetime, os, shutil
+import logging, time, datetime, pytz
 from .worker import BaseWorker
 from ..managers import DBManager
-from ..opcua.models import Client
 from ..logger.datalogger import DataLoggerEngine
+from ..logger.compression import HistoryCompressor
 from ..tags.cvt import CVTEngine
-import sqlite3
-from peewee import SqliteDatabase
-from ..dbmodels.tags import TagValue
+from ..utils.tracing import Tracer
 from ..dbmodels.alarms import AlarmSummary
 from ..dbmodels.events import Events
 from ..dbmodels.logs import Logs
@@ -22,10 +20,10 @@ class LoggerWorker(BaseWorker):
     A background worker thread that handles database operations.
 
     It performs the following tasks:
-    1. Periodically writes buffered tag data to the database.
-    2. Manages SQLite database backups and maintenance (vacuuming).
+    1. Periodically writes buffered tag data to the database, compressed per tag (swinging door).
+    2. Applies the history retention policies (drops expired time partitions).
     3. Handles database reconnection logic.
-    4. Checks and maintains OPC UA client connections.
+    4. Loads the OPC UA clients from the database when none is loaded.
     """
 
     def __init__(self, manager:DBManager, period:float=10.0):
@@ -44,85 +42,73 @@ class LoggerWorker(BaseWorker):
         self._period = period
         self.logger = DataLoggerEngine()
         self.cvt = CVTEngine()
-        self.sqlite_db = None
-        self.sqlite_db_name = None
+        self._last_maintenance = None
+        self._rollups_backfilled = False
+        self.compressor = HistoryCompressor()
+        self.tracer = Tracer()
 
-    def sqlite_db_backup(self):
+    def history_maintenance(self):
         r"""
-        Performs a backup of the SQLite database if it exceeds 1GB.
-
-        It copies the database file to the `db/backups` directory, clears the
-        historical tables (TagValue, AlarmSummary, Events, Logs), and performs a VACUUM
-        command to reclaim disk space.
+        Applies the history retention policies, at most once every `AUTOMATION_RETENTION_PERIOD` seconds.
+
+        * **History compression**: the per-tag settings are reloaded from the database.
+        * **TagValue**: partitions older than `AUTOMATION_ARCHIVE_AFTER_DAYS` are moved to the
+          compressed archive (`db/archive`) and expired time partitions are dropped. On SQLite, while
+          the database exceeds `AUTOMATION_SQLITE_MAX_SIZE_MB`, the oldest data is freed: the oldest
+          closed partition is copied to `db/backups` and dropped, or the oldest day of AlarmSummary,
+          Events or Logs is deleted.
+        * **Rollups**: buckets older than the retention of their level (`AUTOMATION_RETENTION_DAYS`)
+          are deleted before checking the SQLite size.
+        * **AlarmSummary, Events, Logs**: expired records are deleted in short batches.
+
+        No `VACUUM` is needed: SQLite reuses the pages of the dropped partitions.
         """
-        if self.sqlite_db:
-            file_size_mb = os.path.getsize(self.sqlite_db_name) / 1024 / 1024 
-            if file_size_mb > 1 * 1024: # 1 Gb: 
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                name = self.sqlite_db_name.split(".db")[0]
-                name = name.split(os.path.sep)[-1]
-                backup_file = os.path.join(".", "db", "backups", f"{name}_{timestamp}.db")
-                shutil.copy2(os.path.join(".", "db", "app.db"), backup_file)
-                logger = logging.getLogger("pyautomation")
-                logger.info(f"Backup creado: {backup_file}")
-                # Empty TagValue 
-                query = TagValue.delete()
-                query.execute()
-                # Empty Alarm Summary
-                query = AlarmSummary.delete()
-                query.execute()
-                # Empty Events
-                query = Events.delete()
-                query.execute()
-                # Empty Logs
-                query = Logs.delete()
-                query.execute()
-                # Execute Vacuum to compact DB
-                self.sqlite_db.close()
-                conn = sqlite3.connect(self.sqlite_db_name)
-                cur = conn.cursor()
-                cur.execute("VACUUM;")
-                conn.commit()
-                conn.close()
-                # Reopen DB connection
-                from ..dbmodels import proxy
-                self._db = self._manager.get_db()
-                proxy.initialize(self._db)
-                
-        else:
-            db = self.logger.logger.get_db()
-            if db:
-                if isinstance(db, SqliteDatabase):
-                    self.sqlite_db = db
-                    self.sqlite_db_name = db.database
+        from .. import AUTOMATION_RETENTION_DAYS, AUTOMATION_SQLITE_MAX_SIZE_MB, AUTOMATION_RETENTION_PERIOD, AUTOMATION_ARCHIVE_AFTER_DAYS
+        now = time.monotonic()
+        if self._last_maintenance is not None and now - self._last_maintenance < AUTOMATION_RETENTION_PERIOD:
+
+            return
+
+        self._last_maintenance = now
+        settings = self.logger.get_history_compression()
+        if settings:
+
+            self.compressor.load(settings)
+
+        tables = ((AlarmSummary, AlarmSummary.alarm_time), (Events, Events.timestamp), (Logs, Logs.timestamp))
+        self.logger.apply_retention(
+            days=AUTOMATION_RETENTION_DAYS["TagValue"],
+            max_size_mb=AUTOMATION_SQLITE_MAX_SIZE_MB,
+            archive_days=AUTOMATION_ARCHIVE_AFTER_DAYS,
+            tables=tables
+        )
+
+        for model, field in tables:
+
+            days = AUTOMATION_RETENTION_DAYS[model.__name__]
+            if not days:
 
+                continue
+
+            try:
+
+                deleted = model.purge_before(field, datetime.datetime.now(pytz.utc) - datetime.timedelta(days=days))
+                if deleted:
+
+                    logging.getLogger("pyautomation").info(f"Retention: {deleted} {model.__name__} records deleted")
+
+            except Exception as err:
+
+                logging.error(f"Error applying {model.__name__} retention: {err}")
 
     def check_opcua_connection(self):
         r"""
-        Checks the status of OPC UA clients and attempts reconnection if necessary.
+        Loads the OPC UA clients from the database when none is loaded. Reconnection is handled
+        by the `ReconnectionSupervisor` worker.
         """
         from automation import PyAutomation
         app = PyAutomation()
-        if app.opcua_client_manager._clients:
-            # Crear una copia de los items para evitar RuntimeError si el diccionario cambia durante la iteración
-            # Esto puede ocurrir si reconnect() o alguna otra operación modifica _clients
-            clients_snapshot = list(app.opcua_client_manager._clients.items())
-            for client_name, opcua_client in clients_snapshot:
-                # Verificar que el cliente aún existe en el diccionario (puede haber sido removido)
-                if client_name not in app.opcua_client_manager._clients:
-                    continue
-                    
-                # Verificar que el cliente en el diccionario es el mismo que tenemos en la snapshot
-                if app.opcua_client_manager._clients[client_name] is not opcua_client:
-                    continue
-
-                if isinstance(opcua_client, Client):
-                    try:
-                        opcua_client.reconnect()
-                    except Exception as e:
-                        # Si hay un error durante la reconexión, registrar pero continuar con otros clientes
-                        logging.error(f"Error reconnecting OPC UA client '{client_name}': {e}")
-        else:
+        if not app.opcua_client_manager._clients:
             
             app.load_opcua_clients_from_db()
 
@@ -144,22 +130,46 @@ class LoggerWorker(BaseWorker):
 
             item = _queue.get(block=False)
             tag_name = item["tag"]
+            trace = item.get("trace")
+            if trace:
+                self.tracer.stamp_trace(trace, "logger.queue")
             tag = self.cvt.get_tag_by_name(name=tag_name)
             if tag:
 
-                if tag.manufacturer==MANUFACTURER and tag.segment==SEGMENT:
+                if (tag.manufacturer==MANUFACTURER and tag.segment==SEGMENT) or (not MANUFACTURER and not SEGMENT):
 
                     value = item['value']
                     timestamp = item["timestamp"]
                     tags.append({"tag":tag_name, "value":value, "timestamp":timestamp})
+                    if trace:
+                        # La traza viaja con el punto (también si la compresión lo retiene)
+                        tags[-1]["trace"] = trace
 
-                elif not MANUFACTURER and not SEGMENT:
+        return tags
 
-                    value = item['value']
-                    timestamp = item["timestamp"]
-                    tags.append({"tag":tag_name, "value":value, "timestamp":timestamp})
+    def write_tags(self, tags:list)->bool:
+        r"""
+        Writes tag values to the history and ends the sampled traces of the points written.
 
-        return tags
+        Points dropped by the compression never reach this method, and the traces of a failed
+        write are not stamped.
+
+        **Parameters:**
+
+        * **tags** (list): Updates ({tag, value, timestamp, trace}) to store.
+
+        **Returns:**
+
+        * **bool**: True if the values were written.
+        """
+        traces = [tag.pop("trace") for tag in tags if "trace" in tag]
+        written = bool(self.logger.write_tags(tags=tags))
+        if written:
+
+            for trace in traces:
+                self.tracer.stamp_trace(trace, "db.write")
+
+        return written
 
     def reconnect_to_db(self):
         r"""
@@ -186,7 +196,7 @@ class LoggerWorker(BaseWorker):
 
         Continuously:
         1. Checks database connectivity.
-        2. Backs up SQLite DB if needed.
+        2. Applies the history retention policies and backfills the trend rollups.
         3. Writes queued tags to the database.
         4. Reconnects to DB if connection lost.
         5. Checks OPC UA connections.
@@ -202,13 +212,19 @@ class LoggerWorker(BaseWorker):
                 db_connection = self.logger.logger.check_connectivity()
             
                 if db_connection:
-                    self.sqlite_db_backup()
-                    tags = self.get_tags_from_queue(_queue=_queue)
+                    self.history_maintenance()
+
+                    if not self._rollups_backfilled:
+                        # Historia previa a los rollups: se procesa por tramos de 1 s por ciclo
+                        self._rollups_backfilled = bool(self.logger.backfill_rollups(budget=1.0))
+
+                    # Solo se guardan los puntos que no caben en la puerta del swinging door
+                    tags = self.compressor.filter(self.get_tags_from_queue(_queue=_queue))
             
                     if tags:
                         
-                        self.logger.write_tags(tags=tags)
-                    
+                        self.write_tags(tags=tags)
+
                 else:
 
                     self.reconnect_to_db()
@@ -220,6 +236,10 @@ class LoggerWorker(BaseWorker):
             self.check_opcua_connection()
 
             if self.stop_event.is_set():
+                # Los puntos retenidos por la compresión se guardan antes de salir
+                held = self.compressor.flush(force=True)
+                if held and self.logger.logger.check_connectivity():
+                    self.write_tags(tags=held)
                 logging.critical("Alarm worker shutdown successfully!")
                 break
 
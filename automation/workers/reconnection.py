@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""automation/workers/reconnection.py
+
+This module implements the OPC UA reconnection supervisor.
+"""
+import logging, random, time
+from concurrent.futures import ThreadPoolExecutor
+from .worker import BaseWorker
+
+
+def client_namespaces(cvt, client)->list:
+    r"""
+    Returns the node namespaces of the tags subscribed by DAS (scan time <= 100 ms) to a client,
+    matched by client name or server URL.
+
+    **Parameters:**
+
+    * **cvt** (CVTEngine): Current value table.
+    * **client** (Client): OPC UA client.
+
+    **Returns:**
+
+    * **list**: Node namespaces.
+    """
+    namespaces = list()
+    for tag in cvt.get_tags():
+
+        if not tag.get("node_namespace"):
+
+            continue
+
+        if tag.get("scan_time") and tag["scan_time"] > 100:
+
+            continue
+
+        client_name = tag.get("opcua_client_name")
+        if (client_name and client_name.lower() == client.name.lower()) or (not client_name and tag.get("opcua_address") == client._server_url):
+
+            namespaces.append(tag["node_namespace"])
+
+    return namespaces
+
+
+class ReconnectionSupervisor(BaseWorker):
+    r"""
+    A background worker thread that reconnects the OPC UA clients.
+
+    Each disconnected client is retried with exponential backoff (with jitter) in a thread pool,
+    so a dead server only delays its own reconnection. After a reconnection only the monitored
+    items of that client are created again, in batches. The time to recover (from the first
+    failed check to the resubscription) is recorded per client.
+
+    **Parameters:**
+
+    * **manager** (OPCUAClientManager): Manager owning the clients.
+    * **resubscribe** (callable): `resubscribe(client)` -> number of monitored items created.
+    * **notify** (callable, optional): `notify(event, message)` on disconnection and reconnection.
+    * **period** (float): Seconds between connection checks.
+    * **min_backoff** (float): Seconds before the first retry.
+    * **max_backoff** (float): Maximum seconds between retries.
+    * **max_workers** (int): Parallel connection attempts.
+    """
+
+    def __init__(
+        self,
+        manager,
+        resubscribe,
+        notify=None,
+        period:float=1.0,
+        min_backoff:float=1.0,
+        max_backoff:float=60.0,
+        max_workers:int=8
+        ):
+
+        super(ReconnectionSupervisor, self).__init__()
+        self.daemon = True
+        self._manager = manager
+        self._resubscribe = resubscribe
+        self._notify = notify
+        self._period = period
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="opcua-reconnect")
+        self._states = dict()
+        self._pending = dict()
+
+    def __state(self, client_name:str)->dict:
+
+        return self._states.setdefault(client_name, {
+            "connected": True,
+            "down_since": None,
+            "attempts": 0,
+            "backoff": 0.0,
+            "next_attempt": 0.0,
+            "last_error": None,
+            "recoveries": 0,
+            "last_time_to_recover_s": None,
+            "max_time_to_recover_s": None,
+            "resubscribed": 0
+        })
+
+    def __emit(self, event:str, message:str):
+
+        if self._notify:
+
+            try:
+
+                self._notify(event, message)
+
+            except Exception as err:
+
+                logging.getLogger("pyautomation").error(f"Error notifying {event}: {err}")
+
+    def check(self):
+        r"""
+        Checks every client once and schedules the due reconnection attempts.
+        """
+        now = time.monotonic()
+        clients = list(self._manager._clients.items())
+        for client_name in list(self._states):
+
+            if client_name not in self._manager._clients:
+
+                self._states.pop(client_name, None)
+
+        for client_name, client in clients:
+
+            state = self.__state(client_name)
+            future = self._pending.get(client_name)
+            if future is not None:
+
+                if not future.done():
+
+                    continue
+
+                self._pending.pop(client_name)
+
+            if client.is_connected():
+
+                state["connected"] = True
+                continue
+
+            if state["connected"]:
+
+                # Primera verificación fallida: empieza la cuenta del tiempo de recuperación
+                state.update({"connected": False, "down_since": now, "attempts": 0, "backoff": 0.0, "next_attempt": now})
+                logging.critical(f"OPC UA client {client_name} disconnected from {client._server_url}")
+                self.__emit("on.opcua.disconnected", f"Disconneted from {client._server_url}")
+
+            if now >= state["next_attempt"]:
+
+                self._pending[client_name] = self._executor.submit(self.__attempt, client_name, client)
+
+    def __attempt(self, client_name:str, client):
+        r"""
+        Connection attempt of one client (runs in the thread pool).
+        """
+        state = self.__state(client_name)
+        state["attempts"] += 1
+        try:
+
+            _, status = client.connect()
+            error = None if status == 200 else "Connection could not be established"
+
+        except Exception as err:
+
+            error = str(err)
+
+        if error is None:
+
+            try:
+
+                state["resubscribed"] = self._resubscribe(client)
+
+            except Exception as err:
+
+                logging.error(f"Error resubscribing OPC UA client {client_name}: {err}")
+
+            time_to_recover = time.monotonic() - state["down_since"]
+            state.update({
+                "connected": True,
+                "last_error": None,
+                "recoveries": state["recoveries"] + 1,
+                "last_time_to_recover_s": round(time_to_recover, 3),
+                "max_time_to_recover_s": round(max(time_to_recover, state["max_time_to_recover_s"] or 0), 3),
+                "backoff": 0.0
+            })
+            logging.critical(f"Reconnected to {client._server_url} in {time_to_recover:.3f} s ({state['attempts']} attempts, {state['resubscribed']} monitored items)")
+            self.__emit("on.opcua.connected", f"Conneted to {client._server_url}")
+
+            return True
+
+        # Backoff exponencial con jitter de ±20 %
+        backoff = min(self.max_backoff, max(self.min_backoff, state["backoff"] * 2))
+        state.update({
+            "backoff": backoff,
+            "next_attempt": time.monotonic() + backoff * random.uniform(0.8, 1.2),
+            "last_error": error
+        })
+        logging.warning(f"Reconnection to OPC UA server {client._server_url} failed, next attempt in {backoff:.1f} s")
+
+        return False
+
+    def status(self)->dict:
+        r"""
+        Returns the reconnection state of every client.
+
+        **Returns:**
+
+        * **dict**: {client_name: {connected, down_for_s, attempts, backoff_s, last_error, recoveries,
+          last_time_to_recover_s, max_time_to_recover_s, resubscribed}}
+        """
+        now = time.monotonic()
+        result = dict()
+        for client_name, state in list(self._states.items()):
+
+            result[client_name] = {
+                "connected": state["connected"],
+                "down_for_s": None if state["connected"] or state["down_since"] is None else round(now - state["down_since"], 3),
+                "attempts": state["attempts"],
+                "backoff_s": state["backoff"],
+                "last_error": state["last_error"],
+                "recoveries": state["recoveries"],
+                "last_time_to_recover_s": state["last_time_to_recover_s"],
+                "max_time_to_recover_s": state["max_time_to_recover_s"],
+                "resubscribed": state["resubscribed"]
+            }
+
+        return result
+
+    def run(self):
+        r"""
+        Main worker loop: checks the clients every `period` seconds until stopped.
+        """
+        while not self.stop_event.is_set():
+
+            try:
+
+                self.check()
+
+            except Exception as err:
+
+                logging.error(f"Error checking OPC UA connections: {err}")
+
+            self.stop_event.wait(self._period)
+
+        self._executor.shutdown(wait=False)
+        logging.critical("OPC UA reconnection supervisor shutdown successfully!")
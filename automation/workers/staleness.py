@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""automation/workers/staleness.py
+
+This module implements the tag staleness monitor.
+"""
+import logging
+from .worker import BaseWorker
+
+
+class StalenessMonitor(BaseWorker):
+    r"""
+    A background worker thread that marks the stale tags of the CVT.
+
+    The deadlines live in the deadline heap of the CVT (`CVT.check_staleness`); the worker only
+    sleeps until the earliest deadline (at most `period` seconds, so tags created meanwhile are
+    picked up) and asks the CVT to expire the due entries.
+
+    **Parameters:**
+
+    * **cvt** (CVTEngine): Current value table.
+    * **period** (float): Maximum seconds between checks.
+    """
+
+    def __init__(self, cvt, period:float=1.0):
+
+        super(StalenessMonitor, self).__init__()
+        self.daemon = True
+        self._cvt = cvt
+        self._period = period
+
+    def run(self):
+        r"""
+        Main worker loop: expires the due deadlines until stopped.
+        """
+        while not self.stop_event.is_set():
+
+            delay = self._period
+            try:
+
+                delay = self._cvt.check_staleness()
+                delay = self._period if delay is None else min(delay, self._period)
+
+            except Exception as err:
+
+                logging.error(f"Error checking tag staleness: {err}")
+
+            self.stop_event.wait(max(delay, 0.01))
+
+        logging.critical("Tag staleness monitor shutdown successfully!")
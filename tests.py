@@ -10,7 +10,43 @@ from automation.tests.test_user import TestUsers
 from automation.tests.test_core import TestCore
 from automation.tests.test_unit import TestConversions
 from automation.tests.test_alarms import TestAlarms
+from automation.tests.test_snapshot import TestTagSnapshot
+from automation.tests.test_iad import TestIAD
+from automation.tests.test_imports import TestImports
+from automation.tests.test_pagination import TestKeysetPagination
+from automation.tests.test_search import TestTextSearch
+from automation.tests.test_partitions import TestHistoryPartitions
+from automation.tests.test_rollups import TestTagRollups
+from automation.tests.test_archive import TestHistoryArchive
+from automation.tests.test_compression import TestHistoryCompression
+from automation.tests.test_export import TestExportHistory
+from automation.tests.test_address_space import TestAddressSpace
+from automation.tests.test_opcua_write import TestOpcuaWrite
+from automation.tests.test_reconnection import TestReconnectionSupervisor, TestResubscribe
+from automation.tests.test_opcua_health import TestOpcuaHealth
+from automation.tests.test_tracing import TestLatencyTracing
+from automation.tests.test_benchmark import TestBenchmark
+from automation.tests.test_loadgen import TestLoadGenerator
+from automation.tests.test_tag import TestCompactTag
+from automation.tests.test_columns import TestColumnStore
+from automation.tests.test_quality import TestStalenessIndex, TestTagQuality
 from automation.utils import units
+from automation.iad import statistics, batch
+from automation.modules.users import token_cache
+from automation.dbmodels import core as dbmodels_core
+from automation.dbmodels import partitions as dbmodels_partitions
+from automation.dbmodels import rollups as dbmodels_rollups
+from automation.dbmodels import archive as dbmodels_archive
+from automation.logger import compression as logger_compression
+from automation.logger import export as logger_export
+from automation.opcua import metrics as opcua_metrics
+from automation.opcua import health as opcua_health
+from automation.utils import metrics as utils_metrics
+from automation.utils import tracing as utils_tracing
+from automation import benchmark
+from automation import loadgen
+from automation.tags import columns as tags_columns
+from automation.tags import quality as tags_quality
 from automation.variables import (
     volumetric_flow,
     pressure,
@@ -39,9 +75,48 @@ def suite():
     tests.append(TestLoader().loadTestsFromTestCase(TestUsers))
     tests.append(TestLoader().loadTestsFromTestCase(TestCore))
     tests.append(TestLoader().loadTestsFromTestCase(TestAlarms))
+    tests.append(TestLoader().loadTestsFromTestCase(TestTagSnapshot))
+    tests.append(TestLoader().loadTestsFromTestCase(TestIAD))
+    tests.append(TestLoader().loadTestsFromTestCase(TestImports))
+    tests.append(TestLoader().loadTestsFromTestCase(TestKeysetPagination))
+    tests.append(TestLoader().loadTestsFromTestCase(TestTextSearch))
+    tests.append(TestLoader().loadTestsFromTestCase(TestHistoryPartitions))
+    tests.append(TestLoader().loadTestsFromTestCase(TestTagRollups))
+    tests.append(TestLoader().loadTestsFromTestCase(TestHistoryArchive))
+    tests.append(TestLoader().loadTestsFromTestCase(TestHistoryCompression))
+    tests.append(TestLoader().loadTestsFromTestCase(TestExportHistory))
+    tests.append(TestLoader().loadTestsFromTestCase(TestAddressSpace))
+    tests.append(TestLoader().loadTestsFromTestCase(TestOpcuaWrite))
+    tests.append(TestLoader().loadTestsFromTestCase(TestReconnectionSupervisor))
+    tests.append(TestLoader().loadTestsFromTestCase(TestResubscribe))
+    tests.append(TestLoader().loadTestsFromTestCase(TestOpcuaHealth))
+    tests.append(TestLoader().loadTestsFromTestCase(TestLatencyTracing))
+    tests.append(TestLoader().loadTestsFromTestCase(TestBenchmark))
+    tests.append(TestLoader().loadTestsFromTestCase(TestLoadGenerator))
+    tests.append(TestLoader().loadTestsFromTestCase(TestCompactTag))
+    tests.append(TestLoader().loadTestsFromTestCase(TestColumnStore))
+    tests.append(TestLoader().loadTestsFromTestCase(TestStalenessIndex))
+    tests.append(TestLoader().loadTestsFromTestCase(TestTagQuality))
     # DOCTESTS
     doctests = list()
     doctests.append(units)
+    doctests.append(statistics)
+    doctests.append(batch)
+    doctests.append(token_cache)
+    doctests.append(dbmodels_core)
+    doctests.append(dbmodels_partitions)
+    doctests.append(dbmodels_rollups)
+    doctests.append(dbmodels_archive)
+    doctests.append(logger_compression)
+    doctests.append(logger_export)
+    doctests.append(opcua_metrics)
+    doctests.append(opcua_health)
+    doctests.append(utils_metrics)
+    doctests.append(utils_tracing)
+    doctests.append(benchmark)
+    doctests.append(loadgen)
+    doctests.append(tags_columns)
+    doctests.append(tags_quality)
     doctests.append(volumetric_flow)
     doctests.append(volume)
     doctests.append(pressure)